@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+基准测试：FastAPI 运行时与轻量运行时（--lite）的启动时间和常驻内存
+
+分别以子进程启动 `python -m monitor_agent` 和 `python -m monitor_agent --lite`
+（临时配置，关闭 GPU、spool 和推送），测量从启动到 /v1/health 首次成功的时间，
+再请求若干次 /v1/snapshot 后读取 /proc/<pid>/status 中的 VmRSS。
+
+使用方式:
+    python benchmarks/bench_runtime_startup.py [重复次数]
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+TOKEN = "bench-token"
+STARTUP_TIMEOUT = 30.0
+SNAPSHOT_REQUESTS = 50
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _write_config(directory: str, port: int) -> str:
+    path = os.path.join(directory, "config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            f"node_id: bench\n"
+            f"listen: 127.0.0.1:{port}\n"
+            f"token: {TOKEN}\n"
+            f"gpu: \"off\"\n"
+            f"disks: [/]\n"
+            f"spool:\n"
+            f"  enabled: false\n"
+        )
+    return path
+
+
+def _get(url: str, token: bool = False) -> bytes:
+    request = urllib.request.Request(url)
+    if token:
+        request.add_header("Authorization", f"Bearer {TOKEN}")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.read()
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(lite: bool) -> dict:
+    """启动一次运行时，返回 {"startup_s": ..., "rss_kb": ...}"""
+    with tempfile.TemporaryDirectory() as directory:
+        port = _free_port()
+        env = dict(os.environ, MONITOR_AGENT_CONFIG=_write_config(directory, port))
+        args = [sys.executable, "-m", "monitor_agent"] + (["--lite"] if lite else [])
+
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            args, cwd=str(ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"agent exited with code {proc.returncode}")
+                if time.perf_counter() - started > STARTUP_TIMEOUT:
+                    raise RuntimeError("agent did not become healthy in time")
+                try:
+                    _get(f"{base}/v1/health")
+                    break
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.01)
+            startup_s = time.perf_counter() - started
+
+            for _ in range(SNAPSHOT_REQUESTS):
+                _get(f"{base}/v1/snapshot", token=True)
+            return {"startup_s": startup_s, "rss_kb": _rss_kb(proc.pid)}
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"{'runtime':<10} {'startup (ms)':>14} {'RSS (MB)':>10}")
+    for name, lite in (("fastapi", False), ("lite", True)):
+        runs = [measure(lite) for _ in range(repeat)]
+        startup_ms = min(r["startup_s"] for r in runs) * 1000
+        rss_mb = min(r["rss_kb"] for r in runs) / 1024
+        print(f"{name:<10} {startup_ms:>14.1f} {rss_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
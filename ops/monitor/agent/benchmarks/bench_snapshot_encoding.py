@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+基准测试：/v1/snapshot 编码与解码开销
+
+构造一个 8 GPU、50 个服务、32 个 GPU 进程的快照，对比：
+- pydantic：SnapshotResponse 校验后 model_dump_json（旧实现每次请求的路径）
+- json：采样器预编码的紧凑 JSON
+- msgpack：Accept: application/msgpack（需 pip install msgpack）
+- 以及各自 gzip 后的大小与耗时
+
+使用方式:
+    python benchmarks/bench_snapshot_encoding.py [轮数]
+"""
+
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent import encoding
+from monitor_agent.config import AgentConfig
+from monitor_agent.models import SnapshotResponse
+from monitor_agent.sampler import Sampler
+
+
+def build_snapshot() -> dict:
+    """用采样器发布一个真实形状的快照"""
+    sampler = Sampler(AgentConfig(node_id="gpu-server-01", token="t", gpu="off"))
+    n_cores = 64
+    values = {
+        "cpu": {
+            "cpu_pct": 37.5, "user_pct": 30.1, "system_pct": 5.2, "iowait_pct": 1.1, "steal_pct": 0.0,
+            "per_core_pct": [round(20 + i * 0.7, 1) for i in range(n_cores)], "window_s": 5.0,
+        },
+        "memory": {
+            "mem_total_bytes": 540_000_000_000, "mem_used_bytes": 210_000_000_000,
+            "mem_available_bytes": 330_000_000_000, "mem_cached_bytes": 120_000_000_000,
+            "mem_used_pct": 38.89, "swap_total_bytes": 8_000_000_000, "swap_used_bytes": 0, "swap_used_pct": 0.0,
+            "loadavg": [12.1, 10.4, 9.8],
+            "psi": {r: {"some": [0.5, 0.4, 0.3], "full": [0.0, 0.0, 0.0]} for r in ("cpu", "memory", "io")},
+        },
+        "disk": [
+            {"mount": m, "total_bytes": 3_840_000_000_000, "used_bytes": 1_200_000_000_000, "used_pct": 31.25}
+            for m in ("/", "/data", "/scratch")
+        ],
+        "diskio": {
+            "devices": ["nvme0n1", "nvme1n1"], "read_bps": [1.2e8, 3.4e7], "write_bps": [5.6e7, 1.0e6],
+            "read_iops": [850.0, 120.0], "write_iops": [430.0, 12.0], "await_ms": [0.21, 0.35],
+        },
+        "network": {
+            "interfaces": ["eth0", "ib0"], "rx_bps": [1.25e8, 9.8e8], "tx_bps": [3.1e7, 9.5e8],
+            "rx_pps": [81000.0, 120000.0], "tx_pps": [40000.0, 118000.0],
+            "rx_errs_ps": [0.0, 0.0], "tx_errs_ps": [0.0, 0.0], "rx_drop_ps": [0.0, 0.0], "tx_drop_ps": [0.0, 0.0],
+        },
+        "gpu": [
+            {"index": i, "name": "NVIDIA A100-SXM4-80GB", "util_pct": 87.0 + i, "mem_used_mb": 61234 + i,
+             "mem_total_mb": 81920, "temperature_c": 61.0 + i}
+            for i in range(8)
+        ],
+        "gpu_processes": [
+            {"gpu_index": i % 8, "pid": 20000 + i, "used_mem_mb": 15000, "sm_util_pct": 80.0, "uid": 1000 + i % 4,
+             "user": f"user{i % 4}", "cmdline": f"python -m torch.distributed.run --nproc_per_node=8 train.py --rank {i}"}
+            for i in range(32)
+        ],
+        "systemd": [
+            {"name": f"service-{i:02d}.service", "active_state": "active", "sub_state": "running"}
+            for i in range(50)
+        ],
+    }
+    for name, value in values.items():
+        sampler._values[name] = value
+        sampler._collected_at[name] = time.time()
+    sampler._publish()
+    return sampler.latest.snapshot
+
+
+def timed(func, rounds: int) -> float:
+    """返回单次调用平均耗时（微秒）"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main(rounds: int):
+    snapshot = build_snapshot()
+    rows = []
+
+    def pydantic_encode():
+        return SnapshotResponse(**snapshot).model_dump_json().encode()
+
+    json_body = encoding.encode(snapshot)
+    rows.append(("pydantic", len(pydantic_encode()), timed(pydantic_encode, rounds),
+                 timed(lambda: json.loads(json_body), rounds)))
+    rows.append(("json", len(json_body), timed(lambda: encoding.encode(snapshot), rounds),
+                 timed(lambda: json.loads(json_body), rounds)))
+
+    json_gz = gzip.compress(json_body, encoding.GZIP_LEVEL)
+    rows.append(("json+gzip", len(json_gz),
+                 timed(lambda: gzip.compress(encoding.encode(snapshot), encoding.GZIP_LEVEL), rounds),
+                 timed(lambda: json.loads(gzip.decompress(json_gz)), rounds)))
+
+    if encoding.msgpack is not None:
+        msgpack = encoding.msgpack
+        mp_body = encoding.encode(snapshot, encoding.MSGPACK_TYPE)
+        rows.append(("msgpack", len(mp_body),
+                     timed(lambda: encoding.encode(snapshot, encoding.MSGPACK_TYPE), rounds),
+                     timed(lambda: msgpack.unpackb(mp_body, raw=False), rounds)))
+        mp_gz = gzip.compress(mp_body, encoding.GZIP_LEVEL)
+        rows.append(("msgpack+gzip", len(mp_gz),
+                     timed(lambda: gzip.compress(encoding.encode(snapshot, encoding.MSGPACK_TYPE), encoding.GZIP_LEVEL), rounds),
+                     timed(lambda: msgpack.unpackb(gzip.decompress(mp_gz), raw=False), rounds)))
+    else:
+        print("未安装 msgpack，跳过 MessagePack 对比（pip install msgpack）")
+
+    print(f"快照: 8 GPU, 50 服务, 32 GPU 进程；轮数: {rounds}")
+    print(f"{'编码':<14}{'字节':>8}{'编码(us)':>12}{'解码(us)':>12}")
+    for name, size, enc_us, dec_us in rows:
+        print(f"{name:<14}{size:>8}{enc_us:>12.1f}{dec_us:>12.1f}")
+    print("（采样器每个样本只编码一次，请求路径上的编码开销为 0；表中为单次编码成本）")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+基准测试：systemd 采集每次快照的子进程数
+
+对比旧实现（每个服务一次 `systemctl show`）与批量实现（一次调用查询所有服务）。
+子进程创建被替换为计数的假进程，无需 systemd 即可运行。
+
+使用方式:
+    python benchmarks/bench_systemd_spawns.py [服务数量]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import systemd
+
+
+class _FakeProcess:
+    def __init__(self, stdout: bytes):
+        self._stdout = stdout
+        self.returncode = 0
+
+    async def communicate(self):
+        return self._stdout, b""
+
+    async def wait(self):
+        return self.returncode
+
+
+def _show_block(unit: str) -> str:
+    return f"Names={unit}\nActiveState=active\nSubState=running\n"
+
+
+class SpawnCounter:
+    """替换 asyncio 子进程创建函数并计数"""
+
+    def __init__(self):
+        self.count = 0
+
+    async def exec(self, *args, **kwargs):
+        self.count += 1
+        units = list(args[args.index("--") + 1:]) if "--" in args else []
+        return _FakeProcess("\n".join(_show_block(u) for u in units).encode())
+
+    async def shell(self, cmd, **kwargs):
+        self.count += 1
+        unit = cmd.split()[2]
+        return _FakeProcess(_show_block(unit).encode())
+
+
+async def legacy_get_service_status(units):
+    """旧实现：每个服务一次 `systemctl show`（副本，仅用于对比）"""
+    async def query(unit):
+        proc = await asyncio.create_subprocess_shell(
+            f"systemctl show {unit} --property=ActiveState,SubState",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, _ = await proc.communicate()
+        state = dict(line.split("=", 1) for line in stdout.decode().split("\n") if "=" in line)
+        return {"name": unit, "active_state": state.get("ActiveState", "unknown"),
+                "sub_state": state.get("SubState", "unknown")}
+
+    return await asyncio.gather(*[query(u) for u in units])
+
+
+async def measure(func, units, rounds=20):
+    counter = SpawnCounter()
+    orig_exec, orig_shell = asyncio.create_subprocess_exec, asyncio.create_subprocess_shell
+    asyncio.create_subprocess_exec, asyncio.create_subprocess_shell = counter.exec, counter.shell
+    try:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            result = await func(units)
+        elapsed = time.perf_counter() - started
+    finally:
+        asyncio.create_subprocess_exec, asyncio.create_subprocess_shell = orig_exec, orig_shell
+
+    assert len(result) == len(units)
+    return counter.count / rounds, elapsed / rounds * 1000
+
+
+async def main(n_units: int):
+    units = [f"svc-{i}.service" for i in range(n_units)]
+
+    legacy_spawns, legacy_ms = await measure(legacy_get_service_status, units)
+    batched_spawns, batched_ms = await measure(systemd.get_service_status, units)
+
+    print(f"服务数量: {n_units}")
+    print(f"{'实现':<10}{'子进程/快照':>12}{'耗时/快照(ms)':>16}")
+    print(f"{'旧实现':<10}{legacy_spawns:>12.0f}{legacy_ms:>16.3f}")
+    print(f"{'批量':<10}{batched_spawns:>12.0f}{batched_ms:>16.3f}")
+    print("（耗时不含真实 fork/exec 开销，仅反映解析与调度成本）")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 40))
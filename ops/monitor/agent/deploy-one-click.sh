@@ -156,6 +156,7 @@ RestartSec=2
 Environment=MONITOR_AGENT_CONFIG=$CONFIG_FILE
 ExecStart=$INSTALL_DIR/venv/bin/python -m monitor_agent
 WorkingDirectory=$INSTALL_DIR
+StateDirectory=monitor-agent
 MemoryLimit=100M
 CPUQuota=5%
 ExecStartPost=/bin/sleep 2
@@ -46,6 +46,8 @@ CONFIG_DIR="$HOME/.config/monitor-agent"
 CONFIG_FILE="$CONFIG_DIR/config.yaml"
 LOG_FILE="$HOME/monitor-agent.log"
 PID_FILE="$HOME/monitor-agent.pid"
+STATE_DIR="${XDG_STATE_HOME:-$HOME/.local/state}/monitor-agent"
+SPOOL_FILE="$STATE_DIR/spool.bin"
 
 format_yaml_list() {
   local csv="$1"
@@ -62,7 +64,7 @@ format_yaml_list() {
 }
 
 echo "==> Preparing directories"
-mkdir -p "$INSTALL_DIR" "$CONFIG_DIR"
+mkdir -p "$INSTALL_DIR" "$CONFIG_DIR" "$STATE_DIR"
 
 echo "==> Syncing agent code to $INSTALL_DIR"
 if command -v rsync >/dev/null 2>&1; then
@@ -95,6 +97,8 @@ fi
     echo "services_allowlist: []"
   fi
   echo "gpu: \"${GPU_MODE}\""
+  echo "spool:"
+  echo "  path: \"${SPOOL_FILE}\""
 } > "$CONFIG_FILE"
 
 echo "==> Starting agent in background"
@@ -109,3 +113,4 @@ fi
 
 echo "==> Done"
 echo "Health check: curl http://127.0.0.1:${LISTEN##*:}/v1/health"
+echo "Sample spool: $SPOOL_FILE"
@@ -4,25 +4,40 @@ Monitor Agent 主程序入口
 使用方式:
     python -m monitor_agent
     或
+    python -m monitor_agent --lite     # 轻量运行时（不加载 FastAPI/uvicorn）
+    或
     uvicorn monitor_agent.app:app --host 0.0.0.0 --port 9109
 """
 
+import argparse
 import sys
-import uvicorn
 
 from monitor_agent.config import get_config
 
 
 def main():
     """主程序入口"""
+    parser = argparse.ArgumentParser(prog="python -m monitor_agent", description="Monitor Agent")
+    parser.add_argument(
+        "--lite", action="store_true",
+        help="使用轻量 asyncio 运行时（内存占用更少、启动更快）"
+    )
+    args = parser.parse_args()
+
     try:
         config = get_config()
 
-        print(f"Starting Monitor Agent...")
+        print(f"Starting Monitor Agent{' (lite)' if args.lite else ''}...")
         print(f"Node ID: {config.node_id}")
         print(f"Listening on: {config.listen}")
 
+        if args.lite:
+            from monitor_agent.lite import run
+            run(config)
+            return
+
         # 启动 uvicorn 服务器
+        import uvicorn
         uvicorn.run(
             "monitor_agent.app:app",
             host=config.host,
@@ -4,33 +4,31 @@ FastAPI 应用入口
 提供 HTTP 接口供中心节点拉取数据
 """
 
-import asyncio
-from datetime import datetime
+import time
 from typing import Optional
 
-from fastapi import FastAPI, Header, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Depends, Query
+from fastapi.responses import Response, StreamingResponse
 
 from monitor_agent.config import get_config, AgentConfig
 from monitor_agent.models import (
     SnapshotResponse,
     HealthResponse,
     ServiceDiscoveryInfo,
-    DiskInfo,
-    GPUInfo,
-    ServiceInfo,
     ProxyStatusResponse,
     ProxyStartRequest,
 )
-from monitor_agent.collectors import (
-    get_cpu_percent,
-    get_disk_usage,
-    get_gpu_stats,
-    get_service_status,
-)
 from monitor_agent.collectors.systemd import discover_services
 from monitor_agent.proxy_forwarder import get_proxy_manager
 from monitor_agent.config import ProxyConfig
+from monitor_agent.sampler import get_sampler
+from monitor_agent.encoding import accepts_gzip, choose_media_type, encode, maybe_gzip
+from monitor_agent.exposition import get_exposition
+from monitor_agent.health import check_health, deep_check
+from monitor_agent.instrumentation import PROMETHEUS_TYPE, get_instrumentation, wants_prometheus
+from monitor_agent.lifecycle import startup, shutdown
+from monitor_agent.spool import get_spool_writer
+from monitor_agent.streaming import sse_events
 
 
 # 创建 FastAPI 应用
@@ -41,6 +39,37 @@ app = FastAPI(
 )
 
 
+class RouteMetricsMiddleware:
+    """按路由模板记录请求数和到响应头发出为止的延迟（纯 ASGI，不缓冲响应体）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                route = scope.get("route")
+                get_instrumentation().observe_request(
+                    getattr(route, "path", "other"), scope["method"], message["status"],
+                    time.perf_counter() - started,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(RouteMetricsMiddleware)
+
+
 def verify_token(authorization: Optional[str] = Header(None)) -> bool:
     """
     验证 Token
@@ -72,145 +101,149 @@ def verify_token(authorization: Optional[str] = Header(None)) -> bool:
 
 
 @app.on_event("startup")
-async def _startup_proxy():
-    config = get_config()
-    manager = get_proxy_manager()
-    await manager.configure(config.proxy)
-    if config.proxy and config.proxy.enabled and config.proxy.auto_start:
-        try:
-            await manager.start()
-        except Exception:
-            # 仅记录状态，不阻塞 Agent 启动
-            pass
+async def _startup():
+    await startup()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await shutdown()
 
 
 @app.get("/v1/snapshot", response_model=SnapshotResponse)
-async def get_snapshot(authorized: bool = Depends(verify_token)):
+async def get_snapshot(
+    since: Optional[int] = Query(None, description="客户端已有样本的 seq，指定时返回增量文档"),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    authorized: bool = Depends(verify_token)
+):
     """
     获取系统快照数据
 
-    返回 CPU、磁盘、GPU、服务状态等信息
+    返回后台采样器发布的最新样本（CPU、磁盘、GPU、服务状态等），
+    响应体已预编码，请求路径上不调用采集器。
+
+    指定 since 时只返回相对该样本变化的字段（见 monitor_agent.delta）；
+    since 过旧或不存在时返回完整快照。
+
+    Accept: application/msgpack 时返回 MessagePack，Accept-Encoding: gzip 时
+    压缩较大的响应体（见 monitor_agent.encoding）。
     """
-    config = get_config()
+    media_type = choose_media_type(accept)
+    body, gzipped = get_sampler().encoded_snapshot(since, media_type, accepts_gzip(accept_encoding))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@app.get("/v1/samples")
+async def get_samples(
+    start: float = Query(..., alias="from", description="起始 Unix 时间戳（含）"),
+    end: Optional[float] = Query(None, alias="to", description="结束 Unix 时间戳（不含），默认当前时间"),
+    limit: int = Query(20000, ge=1, le=100000, description="最多返回条数"),
+    accept_encoding: Optional[str] = Header(None),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    读取本地环形文件中的历史样本
 
-    # 并发调用所有采集器
-    cpu_task = get_cpu_percent()
-    disk_task = get_disk_usage(config.disks)
-    gpu_task = get_gpu_stats() if config.gpu != "off" else None
-    service_task = get_service_status(config.services_allowlist)
-
-    # 等待所有任务完成
-    results = await asyncio.gather(
-        cpu_task,
-        disk_task,
-        gpu_task if gpu_task else asyncio.sleep(0),
-        service_task,
-        return_exceptions=True
-    )
+    供中心节点在重启或网络中断后补齐缺失时段（见 monitor_agent.spool）。
+    每条样本的字段与中心节点小时缓冲区一致。
+    """
+    writer = get_spool_writer()
+    if writer is None:
+        raise HTTPException(status_code=404, detail="Spool is disabled")
 
-    cpu_pct = results[0] if not isinstance(results[0], Exception) else None
-    disks = results[1] if not isinstance(results[1], Exception) else []
-    gpus = results[2] if gpu_task and not isinstance(results[2], Exception) else None
-    services = results[3] if not isinstance(results[3], Exception) else []
-
-    # 构造响应
-    return SnapshotResponse(
-        node_id=config.node_id,
-        ts=datetime.utcnow(),
-        cpu_pct=cpu_pct,
-        disks=[DiskInfo(**d) for d in disks],
-        gpus=[GPUInfo(**g) for g in gpus] if gpus else None,
-        services=[ServiceInfo(**s) for s in services]
+    config = get_config()
+    samples = writer.spool.read_range(start, end if end is not None else time.time(), limit)
+    body = encode({"node_id": config.node_id, "samples": samples})
+    headers = {}
+    if accepts_gzip(accept_encoding):
+        compressed = maybe_gzip(body)
+        if compressed is not None:
+            body = compressed
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/v1/stream")
+async def stream_snapshots(
+    min_interval: float = Query(0.0, ge=0, le=60, description="两条事件的最小间隔（秒）"),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    快照流（Server-Sent Events）
+
+    长连接推送每个新样本：首条为完整快照，之后为增量文档，
+    供中心节点订阅模式使用，避免每次轮询的连接与认证开销
+    """
+    return StreamingResponse(
+        sse_events(get_sampler(), min_interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.get("/v1/health", response_model=HealthResponse)
-async def get_health():
+async def get_health(
+    deep: bool = Query(False, description="实际运行采集器（每个最多 10 秒）")
+):
     """
     健康检查端点
 
-    测试各采集器是否正常工作
+    默认根据各采集器最近的成功时间、错误、耗时和连续失败次数判断，不调用采集器；
+    ?deep=1 时实际运行采集器（见 monitor_agent.health）
     """
     config = get_config()
-    checks = {}
-    details = {}
-    overall_status = "ok"
+    if deep:
+        return HealthResponse(**await deep_check(config, get_sampler()))
+    return HealthResponse(**check_health(config, get_sampler()))
 
-    # 检查 CPU 采集器
-    try:
-        cpu_result = await get_cpu_percent()
-        checks["cpu"] = "ok"
-        details["cpu"] = None
-    except Exception as e:
-        checks["cpu"] = "error"
-        details["cpu"] = str(e)
-        overall_status = "degraded"
 
-    # 检查磁盘采集器
-    try:
-        disk_result = await get_disk_usage(config.disks)
-        if disk_result:
-            checks["disk"] = "ok"
-            details["disk"] = None
-        else:
-            checks["disk"] = "degraded"
-            details["disk"] = "No disk data available"
-            overall_status = "degraded"
-    except Exception as e:
-        checks["disk"] = "error"
-        details["disk"] = str(e)
-        overall_status = "degraded"
-
-    # 检查 GPU 采集器
-    if config.gpu != "off":
-        try:
-            gpu_result = await get_gpu_stats()
-            if gpu_result:
-                checks["gpu"] = "ok"
-                details["gpu"] = f"NVIDIA driver available, {len(gpu_result)} GPU(s) detected"
-            else:
-                checks["gpu"] = "degraded"
-                details["gpu"] = "GPU not available or driver not installed"
-                overall_status = "degraded"
-        except Exception as e:
-            checks["gpu"] = "error"
-            details["gpu"] = str(e)
-            overall_status = "degraded"
-    else:
-        checks["gpu"] = "disabled"
-        details["gpu"] = "GPU monitoring disabled in config"
+@app.get("/v1/metrics")
+async def get_metrics(
+    format: Optional[str] = Query(None, description="json|prometheus，默认按 Accept 选择"),
+    accept: Optional[str] = Header(None),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Agent 自身运行指标
 
-    # 检查 systemd 采集器
-    try:
-        if config.services_allowlist:
-            service_result = await get_service_status(config.services_allowlist[:1])
-            checks["systemd"] = "ok"
-            details["systemd"] = None
-        else:
-            checks["systemd"] = "ok"
-            details["systemd"] = "No services configured"
-    except Exception as e:
-        checks["systemd"] = "error"
-        details["systemd"] = str(e)
-        overall_status = "degraded"
-
-    return HealthResponse(
-        status=overall_status,
-        timestamp=datetime.utcnow(),
-        checks=checks,
-        details=details
-    )
+    采集器耗时直方图、子进程创建次数、事件循环延迟、各路由请求数与延迟、RSS 和 FD 数
+    （见 monitor_agent.instrumentation）
+    """
+    instrumentation = get_instrumentation()
+    if wants_prometheus(format, accept):
+        return Response(content=instrumentation.prometheus(), media_type=PROMETHEUS_TYPE)
+    return Response(content=encode(instrumentation.to_dict()), media_type="application/json")
+
+
+@app.get("/metrics")
+async def prometheus_metrics(
+    accept_encoding: Optional[str] = Header(None),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Prometheus 抓取端点
+
+    从最新样本渲染 CPU、内存、磁盘、GPU、服务状态等指标（见 monitor_agent.exposition），
+    同一样本只渲染一次，高频抓取不触发采集
+    """
+    body, gzipped = get_exposition().render(get_sampler().latest, accepts_gzip(accept_encoding))
+    headers = {"Content-Encoding": "gzip"} if gzipped else {}
+    return Response(content=body, media_type=PROMETHEUS_TYPE, headers=headers)
 
 
 @app.get("/v1/services", response_model=list[ServiceDiscoveryInfo])
-async def list_services(authorized: bool = Depends(verify_token)):
+async def list_services(refresh: bool = False, authorized: bool = Depends(verify_token)):
     """
     服务发现端点
 
-    返回可供监控的 systemd 服务列表
+    返回可供监控的 systemd 服务列表（带缓存，?refresh=1 强制刷新）
     """
     try:
-        services = await discover_services()
+        services = await discover_services(force_refresh=refresh)
         return [ServiceDiscoveryInfo(**s) for s in services]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to discover services: {str(e)}")
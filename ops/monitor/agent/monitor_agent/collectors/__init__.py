@@ -1,17 +1,194 @@
 """
 数据采集器模块
 
-包含 CPU、磁盘、GPU、systemd 服务状态采集器
+包含 CPU、内存、磁盘、磁盘 I/O、网络、GPU、GPU 进程、top-N 进程、systemd 服务状态、服务资源用量（cgroup）和容器采集器
+
+采集器注册表（COLLECTORS）记录每个采集器的默认采样周期、超时和开销等级，
+后台采样器（monitor_agent.sampler）按 build_collectors() 的结果调度；
+配置文件的 collectors 段可覆盖单个采集器的 enabled / interval / timeout：
+
+    collectors:
+      gpu: {interval: 1.0}
+      disk: {interval: 60}
+      systemd: {interval: 10}
+
+新增采集器时用 register_collector() 注册，并在 Sampler._build_sample 中加入对应的快照字段。
 """
 
-from .cpu import get_cpu_percent
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
+
+from monitor_agent.config import AgentConfig
+
+from .cgroup import get_service_usage
+from .containers import get_containers
+from .cpu import get_cpu_percent, get_cpu_stats
 from .disk import get_disk_usage
+from .diskio import get_disk_io
 from .gpu import get_gpu_stats
+from .gpu_processes import get_gpu_processes
+from .memory import get_memory_stats
+from .network import get_network_io
+from .processes import get_top_processes
 from .systemd import get_service_status
 
+logger = logging.getLogger(__name__)
+
+
+# 开销等级：只读 /proc 的采集器为 cheap，可能阻塞在内核或驱动上的为 moderate，
+# 每次采集创建子进程的为 expensive
+COST_CHEAP = "cheap"
+COST_MODERATE = "moderate"
+COST_EXPENSIVE = "expensive"
+
+# 各开销等级允许配置的最小采样周期（秒）
+MIN_INTERVALS: Dict[str, float] = {
+    COST_CHEAP: 0.1,
+    COST_MODERATE: 0.5,
+    COST_EXPENSIVE: 1.0,
+}
+
+CollectFunc = Callable[[], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class CollectorSpec:
+    """
+    采集器注册信息
+
+    Attributes:
+        name: 采集器名称（也是配置 collectors 段的键）
+        build: 根据配置构造无参采集函数
+        interval: 默认采样周期（秒）
+        timeout: 单次采集超时（秒），超时记为失败
+        cost: 开销等级（cheap|moderate|expensive）
+        enabled: 根据配置判断是否启用
+    """
+    name: str
+    build: Callable[[AgentConfig], CollectFunc]
+    interval: float
+    timeout: float
+    cost: str = COST_CHEAP
+    enabled: Callable[[AgentConfig], bool] = lambda config: True
+
+
+@dataclass(frozen=True)
+class ScheduledCollector:
+    """应用配置覆盖后的采集器"""
+    name: str
+    collect: CollectFunc
+    interval: float
+    timeout: float
+    cost: str
+
+
+COLLECTORS: Dict[str, CollectorSpec] = {}
+
+
+def register_collector(spec: CollectorSpec):
+    """注册采集器（同名覆盖）"""
+    COLLECTORS[spec.name] = spec
+
+
+def build_collectors(config: AgentConfig) -> Dict[str, ScheduledCollector]:
+    """按注册表和配置覆盖构造启用的采集器（collectors 段中未注册的名称记录警告后忽略）"""
+    unknown = set(config.collectors) - set(COLLECTORS)
+    if unknown:
+        logger.warning(f"ignoring unknown collectors in config: {', '.join(sorted(unknown))}")
+
+    result: Dict[str, ScheduledCollector] = {}
+    for name, spec in COLLECTORS.items():
+        override = config.collectors.get(name)
+        enabled = spec.enabled(config)
+        if override is not None and override.enabled is not None:
+            enabled = override.enabled
+        if not enabled:
+            continue
+
+        interval = override.interval if override and override.interval is not None else spec.interval
+        timeout = override.timeout if override and override.timeout is not None else spec.timeout
+        result[name] = ScheduledCollector(
+            name=name,
+            collect=spec.build(config),
+            interval=max(interval, MIN_INTERVALS.get(spec.cost, 0.0)),
+            timeout=timeout,
+            cost=spec.cost,
+        )
+    return result
+
+
+def _gpu_enabled(config: AgentConfig) -> bool:
+    return config.gpu != "off"
+
+
+for _spec in (
+    CollectorSpec("cpu", lambda config: lambda: get_cpu_stats(config.cpu_window_s), 1.0, 5.0),
+    CollectorSpec("memory", lambda config: get_memory_stats, 2.0, 5.0),
+    # nvidia-smi 回退后端每次采集 fork 一次，默认 2 秒；NVML 后端可配置为 1 秒
+    CollectorSpec("gpu", lambda config: get_gpu_stats, 2.0, 10.0, COST_MODERATE, _gpu_enabled),
+    CollectorSpec(
+        "gpu_processes", lambda config: get_gpu_processes, 5.0, 10.0, COST_MODERATE,
+        lambda config: _gpu_enabled(config) and config.gpu_processes,
+    ),
+    CollectorSpec(
+        "systemd", lambda config: lambda: get_service_status(config.services_allowlist), 5.0, 15.0, COST_EXPENSIVE,
+    ),
+    # 遍历 /proc（线程池中执行），进程数多时单次耗时与进程数成正比
+    CollectorSpec(
+        "processes", lambda config: lambda: get_top_processes(config.top_processes), 5.0, 10.0, COST_MODERATE,
+        lambda config: config.top_processes > 0,
+    ),
+    # 只读 cgroup 文件，与 systemd 状态分开调度
+    CollectorSpec(
+        "cgroup", lambda config: lambda: get_service_usage(config.services_allowlist), 5.0, 5.0,
+        enabled=lambda config: bool(config.services_allowlist),
+    ),
+    # 目录遍历缓存 30 秒，容器元数据只在首次发现时读取
+    CollectorSpec(
+        "containers", lambda config: get_containers, 5.0, 10.0, COST_MODERATE,
+        lambda config: config.containers,
+    ),
+    # 容量变化缓慢；挂死的网络挂载点由 disk_timeout 单独处理
+    CollectorSpec(
+        "disk",
+        lambda config: lambda: get_disk_usage(
+            config.disks,
+            timeout=config.disk_timeout,
+            discover=config.disk_discovery.enabled,
+            include=config.disk_discovery.include,
+            exclude=config.disk_discovery.exclude,
+        ),
+        30.0, 15.0, COST_MODERATE,
+    ),
+    CollectorSpec("diskio", lambda config: lambda: get_disk_io(config.diskio_exclude), 5.0, 5.0),
+    CollectorSpec(
+        "network", lambda config: lambda: get_network_io(config.network.include, config.network.exclude), 5.0, 5.0,
+    ),
+):
+    register_collector(_spec)
+
+
 __all__ = [
+    "COLLECTORS",
+    "COST_CHEAP",
+    "COST_MODERATE",
+    "COST_EXPENSIVE",
+    "MIN_INTERVALS",
+    "CollectorSpec",
+    "ScheduledCollector",
+    "build_collectors",
+    "register_collector",
     "get_cpu_percent",
+    "get_cpu_stats",
+    "get_containers",
     "get_disk_usage",
+    "get_disk_io",
     "get_gpu_stats",
+    "get_gpu_processes",
+    "get_memory_stats",
+    "get_network_io",
     "get_service_status",
+    "get_service_usage",
+    "get_top_processes",
 ]
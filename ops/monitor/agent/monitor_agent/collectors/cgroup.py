@@ -0,0 +1,206 @@
+"""
+systemd 服务资源用量采集器（cgroup v2）
+
+直接读取 /sys/fs/cgroup/system.slice/<unit>/ 下的 cpu.stat、memory.current、io.stat 和
+pids.current，不创建子进程；CPU 使用率和 I/O 吞吐按两次采样的差值计算。
+
+文件描述符常驻（同内存采集器的 ProcFile），服务重启后 cgroup 目录重建，
+旧描述符读取失败时自动重新打开。未运行的服务没有 cgroup 目录，不输出用量。
+"""
+
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .memory import ProcFile
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# 服务 cgroup 的上级 slice
+SYSTEM_SLICE = "system.slice"
+
+
+def unit_cgroup_dirs(unit: str, root: str = CGROUP_ROOT) -> Tuple[str, ...]:
+    """
+    服务可能所在的 cgroup 目录
+
+    模板实例（foo@bar.service）位于 system.slice/system-foo.slice/ 下。
+    """
+    direct = os.path.join(root, SYSTEM_SLICE, unit)
+    prefix, sep, _ = unit.partition("@")
+    if not sep:
+        return (direct,)
+    return (os.path.join(root, SYSTEM_SLICE, f"system-{prefix}.slice", unit), direct)
+
+
+def parse_cpu_stat(content: str) -> Optional[int]:
+    """解析 cpu.stat，返回 usage_usec（累计 CPU 时间，微秒）"""
+    for line in content.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "usage_usec":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def parse_io_stat(content: str) -> Tuple[int, int]:
+    """
+    解析 io.stat，返回所有设备累计读写字节数之和
+
+    格式: `259:0 rbytes=1024 wbytes=2048 rios=1 wios=2 dbytes=0 dios=0`
+    """
+    rbytes = wbytes = 0
+    for line in content.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "rbytes":
+                rbytes += int(value) if value.isdigit() else 0
+            elif key == "wbytes":
+                wbytes += int(value) if value.isdigit() else 0
+    return rbytes, wbytes
+
+
+def _parse_int(content: Optional[str]) -> Optional[int]:
+    if content is None:
+        return None
+    try:
+        return int(content.strip())
+    except ValueError:
+        # memory.max 等文件可能为 "max"
+        return None
+
+
+class CgroupFiles:
+    """单个 cgroup 的常驻文件"""
+
+    FILES = ("cpu.stat", "memory.current", "io.stat", "pids.current")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._files = {name: ProcFile(os.path.join(path, name)) for name in self.FILES}
+
+    def read(self, name: str) -> Optional[str]:
+        return self._files[name].read()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+
+class CgroupReader:
+    """
+    一组 cgroup 的资源用量读取（按键保存常驻文件和上一次的计数）
+
+    服务（键为 unit 名）和容器（键为容器 ID，见 monitor_agent.collectors.containers）各用一个实例。
+    """
+
+    def __init__(self):
+        self._cgroups: Dict[str, CgroupFiles] = {}
+        # {键: (时间, usage_usec, rbytes, wbytes)}
+        self._last_counters: Dict[str, Tuple[float, Optional[int], int, int]] = {}
+
+    def _open(self, key: str, paths: Sequence[str]) -> Optional[CgroupFiles]:
+        cgroup = self._cgroups.get(key)
+        if cgroup is not None and os.path.isdir(cgroup.path):
+            return cgroup
+        if cgroup is not None:
+            cgroup.close()
+            del self._cgroups[key]
+        for path in paths:
+            if os.path.isdir(path):
+                cgroup = self._cgroups[key] = CgroupFiles(path)
+                return cgroup
+        return None
+
+    def read(self, key: str, paths: Sequence[str], now: float) -> Optional[Dict]:
+        """
+        读取 cgroup 的资源用量
+
+        Args:
+            key: 调用方的标识（unit 名或容器 ID）
+            paths: 候选 cgroup 目录，使用第一个存在的
+            now: 单调时钟时间
+
+        Returns:
+            {"cpu_pct", "mem_bytes", "io_read_bps", "io_write_bps", "pids"}，
+            cgroup 不存在时返回 None；首次采样的速率字段为 None
+        """
+        cgroup = self._open(key, paths)
+        if cgroup is None:
+            self._last_counters.pop(key, None)
+            return None
+
+        cpu_stat = cgroup.read("cpu.stat")
+        usage_usec = parse_cpu_stat(cpu_stat) if cpu_stat is not None else None
+        io_stat = cgroup.read("io.stat")
+        rbytes, wbytes = parse_io_stat(io_stat) if io_stat is not None else (0, 0)
+
+        result = {
+            "cpu_pct": None,
+            "mem_bytes": _parse_int(cgroup.read("memory.current")),
+            "io_read_bps": None,
+            "io_write_bps": None,
+            "pids": _parse_int(cgroup.read("pids.current")),
+        }
+
+        prev = self._last_counters.get(key)
+        self._last_counters[key] = (now, usage_usec, rbytes, wbytes)
+        if prev is not None and now > prev[0]:
+            elapsed = now - prev[0]
+            if usage_usec is not None and prev[1] is not None and usage_usec >= prev[1]:
+                # 100 表示占满一个核
+                result["cpu_pct"] = round((usage_usec - prev[1]) / 1e6 / elapsed * 100, 2)
+            if io_stat is not None and rbytes >= prev[2] and wbytes >= prev[3]:
+                result["io_read_bps"] = round((rbytes - prev[2]) / elapsed, 1)
+                result["io_write_bps"] = round((wbytes - prev[3]) / elapsed, 1)
+        return result
+
+    def retain(self, keys: Iterable[str]):
+        """释放不在 keys 中的 cgroup（服务移出白名单、容器退出）"""
+        keys = set(keys)
+        for key in set(self._cgroups) - keys:
+            self._cgroups.pop(key).close()
+        for key in set(self._last_counters) - keys:
+            del self._last_counters[key]
+
+
+_units = CgroupReader()
+
+
+def read_unit_usage(unit: str, now: float, root: str = CGROUP_ROOT) -> Optional[Dict]:
+    """读取单个服务的资源用量（见 CgroupReader.read），服务未运行（无 cgroup 目录）时返回 None"""
+    return _units.read(unit, unit_cgroup_dirs(unit, root), now)
+
+
+async def get_service_usage(units: Sequence[str], root: str = CGROUP_ROOT) -> Dict[str, Dict]:
+    """
+    采集白名单服务的 cgroup 资源用量
+
+    Args:
+        units: 服务列表（如 ["vllm.service"]）
+        root: cgroup v2 挂载点
+
+    Returns:
+        {unit: {"cpu_pct": 350.2, "mem_bytes": ..., "io_read_bps": ..., "io_write_bps": ..., "pids": 12}}，
+        不含未运行的服务
+    """
+    now = time.monotonic()
+    result = {}
+    for unit in units:
+        usage = read_unit_usage(unit, now, root)
+        if usage is not None:
+            result[unit] = usage
+
+    # 移出白名单的服务释放描述符
+    _units.retain(units)
+    return result
+
+
+def merge_service_usage(services: List[Dict], usage: Dict[str, Dict]) -> List[Dict]:
+    """把资源用量合并到 systemd 服务状态列表（没有用量的服务保持原样）"""
+    if not usage:
+        return services
+    return [{**s, **usage[s["name"]]} if s.get("name") in usage else s for s in services]
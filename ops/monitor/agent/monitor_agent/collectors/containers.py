@@ -0,0 +1,291 @@
+"""
+容器采集器（Docker / containerd / CRI-O / Podman）
+
+把 /sys/fs/cgroup 下的容器 cgroup 映射到容器 ID 和名称，按容器输出 CPU、内存和进程数，
+并把 GPU 计算进程（见 gpu_processes，按 /proc/<pid>/cgroup 归属）汇总到所在容器：
+
+- 容器 cgroup 目录按名称识别：systemd 驱动的 docker-<id>.scope、cri-containerd-<id>.scope、
+  crio-<id>.scope、libpod-<id>.scope，以及 cgroupfs 驱动的 docker/<id>、kubepods/.../<id>
+- 目录遍历结果缓存 DISCOVERY_TTL 秒，期间只读取已知容器的 cgroup 文件
+- 容器名称等元数据从运行时的状态文件读取并缓存，不调用 Docker API：
+  Docker 为 /var/lib/docker/containers/<id>/config.v2.json，
+  containerd（Kubernetes）为任务目录下 OCI config.json 的 CRI 注解
+- 读不到元数据（容器刚创建、Agent 无权限读取 Docker 数据目录等）时名称为短 ID，
+  每隔 METADATA_RETRY 秒重试，读到后缓存
+- 遍历和读取在线程池中执行，不阻塞事件循环
+"""
+
+import asyncio
+import glob
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .cgroup import CGROUP_ROOT, CgroupReader
+
+
+# 容器目录缓存有效期（秒）
+DISCOVERY_TTL = 30.0
+
+# 元数据读取失败后的重试间隔（秒）
+METADATA_RETRY = 30.0
+
+# cgroup 树最大遍历深度（Kubernetes 的容器位于 kubepods/<qos>/<pod>/<容器> 下）
+MAX_DEPTH = 6
+
+# 每轮最多输出的容器数（按内存占用降序截断）
+MAX_CONTAINERS = 256
+
+DOCKER_ROOT = "/var/lib/docker/containers"
+CONTAINERD_TASKS = "/run/containerd/io.containerd.runtime.v2.task"
+
+_ID = r"[0-9a-f]{64}"
+
+# <前缀>-<ID>.scope（systemd cgroup 驱动）
+_SCOPE_RE = re.compile(rf"^(docker|cri-containerd|crio|libpod)-({_ID})\.scope$")
+_BARE_ID_RE = re.compile(rf"^{_ID}$")
+_CGROUP_ID_RE = re.compile(rf"(?:^|[/-])({_ID})(?:\.scope)?$")
+
+_RUNTIMES = {"docker": "docker", "cri-containerd": "containerd", "crio": "cri-o", "libpod": "podman"}
+
+
+def match_container_dir(name: str, parent: str) -> Optional[Tuple[str, str]]:
+    """
+    判断 cgroup 目录是否为容器
+
+    Args:
+        name: 目录名
+        parent: 上级目录名（cgroupfs 驱动下用于判断运行时）
+
+    Returns:
+        (容器 ID, 运行时)，不是容器时返回 None
+    """
+    match = _SCOPE_RE.match(name)
+    if match:
+        return match.group(2), _RUNTIMES[match.group(1)]
+    if _BARE_ID_RE.match(name):
+        return name, "docker" if parent == "docker" else "containerd"
+    return None
+
+
+def container_id_from_cgroup(content: str) -> Optional[str]:
+    """
+    从 /proc/<pid>/cgroup 内容中解析容器 ID
+
+    cgroup v2 只有一行 `0::/system.slice/docker-<id>.scope`；
+    v1/混合模式取第一个路径末尾为容器 ID 的层级。
+    """
+    for line in content.splitlines():
+        path = line.split(":", 2)[-1].rstrip("/")
+        match = _CGROUP_ID_RE.search(path)
+        if match:
+            return match.group(1)
+    return None
+
+
+def discover_containers(root: str = CGROUP_ROOT) -> Dict[str, Tuple[str, str]]:
+    """
+    遍历 cgroup 树找出容器目录（不进入容器目录内部）
+
+    Returns:
+        {容器 ID: (cgroup 目录, 运行时)}
+    """
+    found: Dict[str, Tuple[str, str]] = {}
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                subdirs = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        parent = os.path.basename(path)
+        for entry in subdirs:
+            matched = match_container_dir(entry.name, parent)
+            if matched is not None:
+                found.setdefault(matched[0], (entry.path, matched[1]))
+            elif depth + 1 < MAX_DEPTH:
+                stack.append((entry.path, depth + 1))
+    return found
+
+
+def read_docker_metadata(container_id: str, docker_root: str = DOCKER_ROOT) -> Optional[Dict]:
+    """从 Docker 的 config.v2.json 读取容器名和镜像"""
+    try:
+        with open(os.path.join(docker_root, container_id, "config.v2.json"), "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {
+        "name": (config.get("Name") or "").lstrip("/") or None,
+        "image": (config.get("Config") or {}).get("Image"),
+        "pod": None,
+    }
+
+
+def read_containerd_metadata(container_id: str, tasks_root: str = CONTAINERD_TASKS) -> Optional[Dict]:
+    """从 containerd 任务目录的 OCI config.json 读取 CRI 注解（容器名、Pod）"""
+    for path in glob.glob(os.path.join(tasks_root, "*", container_id, "config.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                annotations = json.load(f).get("annotations") or {}
+        except (OSError, ValueError):
+            continue
+        pod = annotations.get("io.kubernetes.cri.sandbox-name")
+        namespace = annotations.get("io.kubernetes.cri.sandbox-namespace")
+        return {
+            "name": annotations.get("io.kubernetes.cri.container-name"),
+            "image": annotations.get("io.kubernetes.cri.image-name"),
+            "pod": f"{namespace}/{pod}" if namespace and pod else pod,
+        }
+    return None
+
+
+class ContainerCollector:
+    """容器发现（带缓存）、元数据缓存和 cgroup 用量读取"""
+
+    def __init__(
+        self,
+        root: str = CGROUP_ROOT,
+        docker_root: str = DOCKER_ROOT,
+        tasks_root: str = CONTAINERD_TASKS,
+    ):
+        self._root = root
+        self._docker_root = docker_root
+        self._tasks_root = tasks_root
+        self._reader = CgroupReader()
+        # {容器 ID: (cgroup 目录, 运行时)}
+        self._containers: Dict[str, Tuple[str, str]] = {}
+        self._discovered_at: Optional[float] = None
+        # {容器 ID: {"name", "image", "pod"}}
+        self._metadata: Dict[str, Dict] = {}
+        # 元数据读取失败的时间：{容器 ID: 单调时钟时间}
+        self._metadata_misses: Dict[str, float] = {}
+        # 超时后线程仍在运行时，下一轮等待其结束而不是并发修改状态
+        self._lock = threading.Lock()
+
+    def _metadata_for(self, container_id: str, runtime: str, now: float) -> Dict:
+        metadata = self._metadata.get(container_id)
+        if metadata is not None:
+            return metadata
+        missed_at = self._metadata_misses.get(container_id)
+        if missed_at is None or now - missed_at >= METADATA_RETRY:
+            if runtime == "docker":
+                metadata = read_docker_metadata(container_id, self._docker_root)
+            else:
+                metadata = read_containerd_metadata(container_id, self._tasks_root)
+            if metadata is not None:
+                self._metadata_misses.pop(container_id, None)
+                self._metadata[container_id] = metadata
+                return metadata
+            self._metadata_misses[container_id] = now
+        return {"name": None, "image": None, "pod": None}
+
+    def collect(self) -> List[Dict]:
+        """
+        采集所有容器的用量
+
+        Returns:
+            [{"id", "name", "runtime", "image", "pod", "cpu_pct", "mem_bytes", "pids"}]，按内存占用降序
+        """
+        with self._lock:
+            return self._collect()
+
+    def _collect(self) -> List[Dict]:
+        now = time.monotonic()
+        if self._discovered_at is None or now - self._discovered_at >= DISCOVERY_TTL:
+            self._containers = discover_containers(self._root)
+            self._discovered_at = now
+
+        result = []
+        for container_id, (path, runtime) in self._containers.items():
+            usage = self._reader.read(container_id, (path,), now)
+            if usage is None:
+                # 容器已退出，下次发现时移除
+                continue
+            metadata = self._metadata_for(container_id, runtime, now)
+            result.append({
+                "id": container_id[:12],
+                "name": metadata["name"] or container_id[:12],
+                "runtime": runtime,
+                "image": metadata["image"],
+                "pod": metadata["pod"],
+                "cpu_pct": usage["cpu_pct"],
+                "mem_bytes": usage["mem_bytes"],
+                "pids": usage["pids"],
+            })
+
+        live = set(self._containers)
+        self._reader.retain(live)
+        for cache in (self._metadata, self._metadata_misses):
+            for container_id in set(cache) - live:
+                del cache[container_id]
+
+        result.sort(key=lambda c: c["mem_bytes"] or 0, reverse=True)
+        return result[:MAX_CONTAINERS]
+
+
+def attach_gpu_processes(containers: Optional[List[Dict]], gpu_processes: Optional[List[Dict]]) -> Optional[List[Dict]]:
+    """
+    把 GPU 计算进程汇总到所在容器
+
+    Args:
+        containers: ContainerCollector.collect() 的结果
+        gpu_processes: GPU 进程列表（带 container_id，见 gpu_processes.enrich_processes）
+
+    Returns:
+        每个容器增加 gpu_pids 和 gpu_mem_mb（没有 GPU 进程的容器为空列表 / None）
+    """
+    if not containers:
+        return containers
+    by_container: Dict[str, List[Dict]] = {}
+    for proc in gpu_processes or []:
+        container_id = proc.get("container_id")
+        if container_id:
+            by_container.setdefault(container_id[:12], []).append(proc)
+
+    result = []
+    for container in containers:
+        procs = by_container.get(container["id"], [])
+        used = [p["used_mem_mb"] for p in procs if p.get("used_mem_mb") is not None]
+        result.append(dict(
+            container,
+            gpu_pids=sorted({p["pid"] for p in procs}),
+            gpu_mem_mb=sum(used) if used else None,
+        ))
+    return result
+
+
+_collector: Optional[ContainerCollector] = None
+
+
+async def get_containers() -> Optional[List[Dict]]:
+    """
+    采集容器 CPU/内存用量
+
+    Returns:
+        容器列表，格式:
+        [{
+            "id": "3f2a9c1b7d4e",
+            "name": "train-llama",
+            "runtime": "docker",
+            "image": "nvcr.io/nvidia/pytorch:24.05-py3",
+            "pod": None,                # Kubernetes 下为 "namespace/pod"
+            "cpu_pct": 812.5,           # 100 表示占满一个核，首次采样为 None
+            "mem_bytes": 68719476736,
+            "pids": 57
+        }]
+        GPU 进程在发布样本时合并（见 attach_gpu_processes）
+    """
+    global _collector
+    if _collector is None:
+        _collector = ContainerCollector()
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, _collector.collect)
+    except OSError:
+        return None
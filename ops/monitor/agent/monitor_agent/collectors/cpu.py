@@ -2,63 +2,197 @@
 CPU 采集器
 
 通过读取 /proc/stat 计算 CPU 使用率
+
+每次采样把总 CPU 行和每个 cpuN 行解析进预分配的环形缓冲区，
+使用率按时间窗口在环形缓冲区内计算，与调用方无关：
+/v1/health 和 /v1/snapshot 不再互相破坏对方的 delta 窗口。
 """
 
-import asyncio
-from typing import Optional
+import time
+from array import array
+from typing import Dict, List, Optional
 
 
-# 全局变量：保存上一次采样数据
-_last_cpu_stats = None
+# /proc/stat 中参与计算的字段: user nice system idle iowait irq softirq steal
+# （guest/guest_nice 已计入 user/nice，不重复累加）
+NFIELDS = 8
+USER, NICE, SYSTEM, IDLE, IOWAIT, IRQ, SOFTIRQ, STEAL = range(NFIELDS)
 
+# 环形缓冲区容量（采样次数）
+RING_SIZE = 32
 
-async def get_cpu_percent() -> Optional[float]:
-    """
-    采集 CPU 使用率
+# 两次采样的最小间隔（秒），间隔更短的调用直接复用最新样本
+MIN_SAMPLE_SPACING = 0.5
 
-    实现方式：读取 /proc/stat 两次，计算 delta
+# 默认统计窗口（秒）
+DEFAULT_WINDOW = 5.0
 
-    Returns:
-        0~100 的浮点数，首次调用返回 None（需要两次采样）
-    """
-    global _last_cpu_stats
 
-    try:
-        # 读取 /proc/stat
-        with open("/proc/stat", "r") as f:
-            line = f.readline()
-
-        # 解析第一行（总 CPU 统计）
-        # 格式: cpu  user nice system idle iowait irq softirq steal guest guest_nice
-        fields = line.split()
-        if fields[0] != "cpu":
-            return None
+class CpuRing:
+    """
+    /proc/stat 采样环形缓冲区
 
-        # 提取各项时间值
-        values = [int(x) for x in fields[1:]]
-        total = sum(values)
-        idle = values[3]  # idle 是第 4 个字段
+    每个槽位是一块预分配的 array('Q')，布局为
+    [总 CPU 的 8 个字段, 第一个在线核的 8 个字段, ...]，采样时原地覆盖最旧的槽位。
+    核按 cpuN 中的 N 标识（离线的核不出现在 /proc/stat 中，编号可能不连续）。
+    """
 
-        # 首次调用，保存数据并返回 None
-        if _last_cpu_stats is None:
-            _last_cpu_stats = (total, idle)
+    def __init__(self, size: int = RING_SIZE):
+        self._size = size
+        self._ncpu = -1
+        self._core_ids: Optional[List[int]] = None
+        self._slots: List[array] = []
+        self._ts: List[float] = []
+        self._head = -1
+        self._count = 0
+
+    def _allocate(self, core_ids: List[int]):
+        ncpu = len(core_ids)
+        width = (ncpu + 1) * NFIELDS
+        self._ncpu = ncpu
+        self._core_ids = core_ids
+        self._slots = [array('Q', bytes(8 * width)) for _ in range(self._size)]
+        self._ts = [0.0] * self._size
+        self._head = -1
+        self._count = 0
+
+    def record(self, content: str, now: float):
+        """
+        解析 /proc/stat 内容并写入下一个槽位
+
+        Args:
+            content: /proc/stat 内容
+            now: 采样时间（time.monotonic()）
+        """
+        lines = []
+        for line in content.split('\n'):
+            if not line.startswith("cpu"):
+                break
+            lines.append(line)
+        if not lines or not lines[0].startswith("cpu "):
+            raise ValueError("unexpected /proc/stat format")
+
+        core_ids = [int(line.split(None, 1)[0][3:]) for line in lines[1:]]
+        if core_ids != self._core_ids:
+            # CPU 热插拔/上下线：重新分配并丢弃旧样本
+            self._allocate(core_ids)
+
+        head = (self._head + 1) % self._size
+        slot = self._slots[head]
+        for row, line in enumerate(lines):
+            fields = line.split()
+            base = row * NFIELDS
+            for i in range(NFIELDS):
+                slot[base + i] = int(fields[i + 1]) if i + 1 < len(fields) else 0
+
+        self._ts[head] = now
+        self._head = head
+        self._count = min(self._count + 1, self._size)
+
+    @property
+    def latest_ts(self) -> Optional[float]:
+        return self._ts[self._head] if self._count else None
+
+    def window(self, seconds: float) -> Optional[Dict]:
+        """
+        计算最近 seconds 秒窗口内的 CPU 使用情况
+
+        窗口基准为时间不晚于 (最新样本 - seconds) 的最新样本；
+        历史不足时使用最旧样本。
+
+        Returns:
+            CPU 统计字典，样本不足两个时返回 None
+        """
+        if self._count < 2:
             return None
 
-        # 计算 delta
-        last_total, last_idle = _last_cpu_stats
-        total_delta = total - last_total
-        idle_delta = idle - last_idle
-
-        # 更新缓存
-        _last_cpu_stats = (total, idle)
-
-        # 计算使用率
-        if total_delta == 0:
-            return 0.0
+        newest = self._head
+        target = self._ts[newest] - seconds
+        base = None
+        for step in range(1, self._count):
+            idx = (newest - step) % self._size
+            base = idx
+            if self._ts[idx] <= target:
+                break
+
+        cur, prev = self._slots[newest], self._slots[base]
+        result = _breakdown(cur, prev, 0)
+        result["window_s"] = round(self._ts[newest] - self._ts[base], 3)
+        # 最近一个采样间隔的使用率（不经窗口平滑，用于捕捉短时尖峰）
+        result["last_pct"] = _breakdown(cur, self._slots[(newest - 1) % self._size], 0)["cpu_pct"]
+        result["per_core_pct"] = [
+            _breakdown(cur, prev, (row + 1) * NFIELDS)["cpu_pct"] for row in range(self._ncpu)
+        ]
+        result["core_ids"] = list(self._core_ids)
+        return result
+
+
+def _breakdown(cur: array, prev: array, base: int) -> Dict:
+    # 计数器回绕/重置或部分虚拟化内核上单个字段可能回退，按 0 计
+    deltas = [max(0, cur[base + i] - prev[base + i]) for i in range(NFIELDS)]
+    total = sum(deltas)
+    if total <= 0:
+        return {"cpu_pct": 0.0, "user_pct": 0.0, "system_pct": 0.0, "iowait_pct": 0.0, "steal_pct": 0.0}
+
+    def pct(value: int) -> float:
+        return round(value / total * 100.0, 2)
+
+    return {
+        "cpu_pct": pct(total - deltas[IDLE]),
+        "user_pct": pct(deltas[USER] + deltas[NICE]),
+        "system_pct": pct(deltas[SYSTEM] + deltas[IRQ] + deltas[SOFTIRQ]),
+        "iowait_pct": pct(deltas[IOWAIT]),
+        "steal_pct": pct(deltas[STEAL]),
+    }
+
+
+# 全局环形缓冲区
+_ring = CpuRing()
+
+
+def _sample():
+    """采样一次 /proc/stat（距上次采样不足 MIN_SAMPLE_SPACING 时跳过）"""
+    now = time.monotonic()
+    latest = _ring.latest_ts
+    if latest is not None and now - latest < MIN_SAMPLE_SPACING:
+        return
+    with open("/proc/stat", "r") as f:
+        content = f.read()
+    _ring.record(content, now)
+
+
+async def get_cpu_stats(window: float = DEFAULT_WINDOW) -> Optional[Dict]:
+    """
+    采集 CPU 使用情况（总体、分类和每核）
 
-        cpu_pct = (total_delta - idle_delta) / total_delta * 100.0
-        return round(cpu_pct, 2)
+    Args:
+        window: 统计窗口（秒）
 
-    except Exception as e:
+    Returns:
+        {
+            "cpu_pct": 37.5, "user_pct": 30.1, "system_pct": 6.2,
+            "iowait_pct": 1.2, "steal_pct": 0.0,
+            "per_core_pct": [12.0, 98.5, ...],
+            "core_ids": [0, 1, ...],  # per_core_pct 对应的 cpuN 编号（有离线核时不连续）
+            "window_s": 5.0,
+            "last_pct": 41.0      # 最近一个采样间隔（约 1 秒）的使用率
+        }
+        首次调用返回 None（需要两次采样）
+    """
+    try:
+        _sample()
+        return _ring.window(window)
+    except Exception:
         # 采集失败，返回 None
         return None
+
+
+async def get_cpu_percent(window: float = DEFAULT_WINDOW) -> Optional[float]:
+    """
+    采集 CPU 使用率
+
+    Returns:
+        0~100 的浮点数，首次调用返回 None（需要两次采样）
+    """
+    stats = await get_cpu_stats(window)
+    return stats["cpu_pct"] if stats else None
@@ -2,71 +2,222 @@
 磁盘采集器
 
 采集指定挂载点的磁盘使用情况
+
+statvfs 在每个挂载点各自的守护线程中执行，每个挂载点单独设置超时：
+挂死的 NFS/Lustre 挂载点不会阻塞事件循环，也不会让其他挂载点排队等待，
+超时时返回上一次成功的值并标记 stale。
+可选从 /proc/self/mountinfo 自动发现真实文件系统。
 """
 
 import asyncio
-from typing import List, Dict
+import fnmatch
+import os
+import re
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence
+
+
+# 单个挂载点 statvfs 超时（秒）
+DISK_TIMEOUT = 2.0
+
+# 自动发现时排除的伪文件系统类型
+PSEUDO_FSTYPES = frozenset({
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs",
+    "devpts", "devtmpfs", "efivarfs", "fusectl", "fuse.gvfsd-fuse", "fuse.lxcfs",
+    "fuse.portal", "hugetlbfs", "mqueue", "nsfs", "overlay", "proc", "pstore",
+    "ramfs", "rpc_pipefs", "securityfs", "selinuxfs", "squashfs", "sysfs",
+    "tmpfs", "tracefs",
+})
 
+# 每个挂载点正在执行的 statvfs 调用（挂死的调用会一直占用线程，因此每个挂载点同时最多一个）
+_inflight: Dict[str, Future] = {}
 
-async def get_disk_usage(mount_points: List[str]) -> List[Dict]:
+# 每个挂载点最近一次成功的结果
+_last_good: Dict[str, Dict] = {}
+
+
+def _start_statvfs(mount: str) -> Future:
     """
-    采集磁盘使用率
+    在独立的守护线程中执行 statvfs
+
+    不使用共享线程池：多个挂死的挂载点会占满线程池，健康挂载点的调用只能排队直到超时。
+    """
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(_statvfs_usage(mount))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"disk-statvfs {mount}", daemon=True).start()
+    return future
+
+
+def _statvfs_usage(mount: str) -> Dict:
+    """计算磁盘使用情况（与 psutil.disk_usage 口径一致）"""
+    st = os.statvfs(mount)
+    total = st.f_blocks * st.f_frsize
+    avail = st.f_bavail * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    used_pct = used / (used + avail) * 100.0 if used + avail > 0 else 0.0
+    return {
+        "mount": mount,
+        "used_bytes": used,
+        "total_bytes": total,
+        "used_pct": round(used_pct, 2),
+        "stale": False
+    }
+
+
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def _unescape_mount(path: str) -> str:
+    """
+    还原 mountinfo 中的八进制转义（如 \\040 表示空格）
+
+    内核只转义空格、制表符、换行和反斜杠，非 ASCII 字符原样输出，因此只替换 \\ooo。
+    """
+    if "\\" not in path:
+        return path
+    return _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), path)
+
+
+def parse_mountinfo(
+    content: str,
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = (),
+    exclude_fstypes: Sequence[str] = PSEUDO_FSTYPES,
+) -> List[str]:
+    """
+    从 mountinfo 内容中筛选真实文件系统挂载点
+
+    格式（man 5 proc）:
+        36 35 98:0 /mnt1 /mnt2 rw,noatime master:1 - ext3 /dev/root rw,errors=continue
+
+    同一设备的多次挂载（bind mount）只保留第一个挂载点。
 
     Args:
-        mount_points: 挂载点列表（如 ["/", "/data"]）
+        content: /proc/self/mountinfo 内容
+        include: 挂载点通配符白名单
+        exclude: 挂载点通配符黑名单
+        exclude_fstypes: 排除的文件系统类型
 
     Returns:
-        磁盘信息列表，格式:
-        [{"mount": "/", "used_bytes": ..., "total_bytes": ..., "used_pct": ...}]
+        挂载点列表
     """
-    result = []
+    mounts = []
+    seen_devices = set()
+    for line in content.splitlines():
+        left, sep, right = line.partition(" - ")
+        if not sep:
+            continue
+        fields = left.split()
+        tail = right.split()
+        if len(fields) < 5 or not tail:
+            continue
 
-    for mount in mount_points:
-        try:
-            # 使用 psutil 获取磁盘使用情况
-            import psutil
-            usage = psutil.disk_usage(mount)
-
-            result.append({
-                "mount": mount,
-                "used_bytes": usage.used,
-                "total_bytes": usage.total,
-                "used_pct": round(usage.percent, 2)
-            })
-
-        except ImportError:
-            # 如果没有 psutil，使用 df 命令
+        device, mount, fstype = fields[2], _unescape_mount(fields[4]), tail[0]
+        if fstype in exclude_fstypes:
+            continue
+        if not any(fnmatch.fnmatch(mount, p) for p in include):
+            continue
+        if any(fnmatch.fnmatch(mount, p) for p in exclude):
+            continue
+        if device in seen_devices:
+            continue
+
+        seen_devices.add(device)
+        mounts.append(mount)
+    return mounts
+
+
+def discover_mounts(include: Sequence[str] = ("*",), exclude: Sequence[str] = ()) -> List[str]:
+    """读取 /proc/self/mountinfo 发现真实文件系统挂载点"""
+    try:
+        # 非 UTF-8 路径按文件系统编码保留（surrogateescape），statvfs 可直接使用
+        with open("/proc/self/mountinfo", "r", encoding="utf-8", errors="surrogateescape") as f:
+            return parse_mountinfo(f.read(), include, exclude)
+    except OSError:
+        return []
+
+
+def _stale(mount: str) -> Optional[Dict]:
+    last = _last_good.get(mount)
+    if last is None:
+        return None
+    return dict(last, stale=True)
+
+
+async def _usage_with_deadline(mount: str, timeout: float) -> Optional[Dict]:
+    loop = asyncio.get_running_loop()
+
+    future = _inflight.get(mount)
+    if future is not None and not future.done():
+        # 上一次调用仍未返回（挂载点挂死），不再占用新线程
+        return _stale(mount)
+
+    future = _start_statvfs(mount)
+    _inflight[mount] = future
+
+    def _on_done(fut: Future):
+        # 超时后才返回的结果也用于刷新缓存
+        if not fut.cancelled() and fut.exception() is None:
             try:
-                proc = await asyncio.create_subprocess_shell(
-                    f"df -P {mount}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await proc.communicate()
-
-                if proc.returncode == 0:
-                    lines = stdout.decode().strip().split('\n')
-                    if len(lines) >= 2:
-                        # 解析 df 输出
-                        # 格式: Filesystem 1024-blocks Used Available Capacity Mounted
-                        fields = lines[1].split()
-                        if len(fields) >= 5:
-                            total_kb = int(fields[1])
-                            used_kb = int(fields[2])
-                            used_pct = float(fields[4].rstrip('%'))
-
-                            result.append({
-                                "mount": mount,
-                                "used_bytes": used_kb * 1024,
-                                "total_bytes": total_kb * 1024,
-                                "used_pct": round(used_pct, 2)
-                            })
-            except Exception:
-                # 单个挂载点失败，跳过
+                loop.call_soon_threadsafe(_last_good.__setitem__, mount, fut.result())
+            except RuntimeError:
+                # 事件循环已关闭
                 pass
 
-        except Exception:
-            # 单个挂载点失败，跳过
-            pass
+    future.add_done_callback(_on_done)
+
+    try:
+        result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+    except asyncio.TimeoutError:
+        return _stale(mount)
+    except OSError:
+        # 挂载点不存在或无权限，跳过
+        return None
 
+    _last_good[mount] = result
     return result
+
+
+async def get_disk_usage(
+    mount_points: List[str],
+    timeout: float = DISK_TIMEOUT,
+    discover: bool = False,
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = (),
+) -> List[Dict]:
+    """
+    采集磁盘使用率
+
+    Args:
+        mount_points: 挂载点列表（如 ["/", "/data"]）
+        timeout: 单个挂载点超时时间（秒）
+        discover: 是否额外从 /proc/self/mountinfo 自动发现挂载点
+        include: 自动发现的挂载点通配符白名单
+        exclude: 自动发现的挂载点通配符黑名单
+
+    Returns:
+        磁盘信息列表，格式:
+        [{"mount": "/", "used_bytes": ..., "total_bytes": ..., "used_pct": ..., "stale": false}]
+        stale 为 true 表示本次超时，返回的是上一次成功的值
+    """
+    mounts = list(dict.fromkeys(mount_points))
+    if discover:
+        for mount in discover_mounts(include, exclude):
+            if mount not in mounts:
+                mounts.append(mount)
+
+    results = await asyncio.gather(
+        *[_usage_with_deadline(mount, timeout) for mount in mounts],
+        return_exceptions=True
+    )
+
+    # 单个挂载点失败，跳过
+    return [r for r in results if isinstance(r, dict)]
@@ -0,0 +1,135 @@
+"""
+磁盘 I/O 采集器
+
+读取 /proc/diskstats，按两次采样的差值计算每个块设备的
+读写吞吐、IOPS 和平均等待时间（await）。
+"""
+
+import fnmatch
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# /proc/diskstats 扇区大小固定为 512 字节（与设备实际扇区大小无关）
+SECTOR_BYTES = 512
+
+# 默认排除的设备
+DEFAULT_EXCLUDE = ("loop*", "ram*", "zram*", "sr*", "fd*")
+
+# 上一次采样：{device: (reads, sectors_read, ms_reading, writes, sectors_written, ms_writing)}
+_last_counters: Dict[str, Tuple[int, ...]] = {}
+_last_ts: Optional[float] = None
+
+
+def _whole_disks() -> Optional[set]:
+    """列出 /sys/block 下的整盘设备（用于排除分区），不可用时返回 None"""
+    try:
+        return set(os.listdir("/sys/block"))
+    except OSError:
+        return None
+
+
+def parse_diskstats(
+    content: str,
+    devices: Optional[set] = None,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> Dict[str, Tuple[int, ...]]:
+    """
+    解析 /proc/diskstats
+
+    格式（Documentation/admin-guide/iostats.rst）:
+        major minor name reads merged sectors ms_reading writes merged sectors ms_writing ...
+
+    Args:
+        content: /proc/diskstats 内容
+        devices: 只保留这些设备（通常为 /sys/block 下的整盘），None 表示不限制
+        exclude: 设备名通配符黑名单
+
+    Returns:
+        {device: (reads, sectors_read, ms_reading, writes, sectors_written, ms_writing)}
+    """
+    counters = {}
+    for line in content.splitlines():
+        fields = line.split()
+        if len(fields) < 11:
+            continue
+        name = fields[2]
+        if devices is not None and name not in devices:
+            continue
+        if any(fnmatch.fnmatch(name, p) for p in exclude):
+            continue
+        try:
+            counters[name] = (
+                int(fields[3]), int(fields[5]), int(fields[6]),
+                int(fields[7]), int(fields[9]), int(fields[10]),
+            )
+        except ValueError:
+            continue
+    return counters
+
+
+def compute_rates(
+    prev: Dict[str, Tuple[int, ...]],
+    cur: Dict[str, Tuple[int, ...]],
+    elapsed: float,
+) -> Dict[str, List]:
+    """
+    由两次采样计算每个设备的速率（紧凑的列式结构）
+
+    Returns:
+        {
+            "devices": ["nvme0n1", ...],
+            "read_bps": [...], "write_bps": [...],
+            "read_iops": [...], "write_iops": [...],
+            "await_ms": [...]
+        }
+    """
+    result = {"devices": [], "read_bps": [], "write_bps": [],
+              "read_iops": [], "write_iops": [], "await_ms": []}
+    if elapsed <= 0:
+        return result
+
+    for name, c in cur.items():
+        p = prev.get(name)
+        if p is None:
+            continue
+        reads, sect_r, ms_r, writes, sect_w, ms_w = (max(0, a - b) for a, b in zip(c, p))
+        ios = reads + writes
+
+        result["devices"].append(name)
+        result["read_bps"].append(round(sect_r * SECTOR_BYTES / elapsed, 1))
+        result["write_bps"].append(round(sect_w * SECTOR_BYTES / elapsed, 1))
+        result["read_iops"].append(round(reads / elapsed, 2))
+        result["write_iops"].append(round(writes / elapsed, 2))
+        result["await_ms"].append(round((ms_r + ms_w) / ios, 3) if ios else 0.0)
+    return result
+
+
+async def get_disk_io(exclude: Sequence[str] = DEFAULT_EXCLUDE) -> Optional[Dict[str, List]]:
+    """
+    采集块设备 I/O 速率
+
+    Args:
+        exclude: 设备名通配符黑名单
+
+    Returns:
+        列式设备速率（见 compute_rates），首次调用返回 None（需要两次采样）
+    """
+    global _last_counters, _last_ts
+
+    try:
+        with open("/proc/diskstats", "r") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    now = time.monotonic()
+    counters = parse_diskstats(content, _whole_disks(), exclude)
+
+    prev, prev_ts = _last_counters, _last_ts
+    _last_counters, _last_ts = counters, now
+
+    if prev_ts is None:
+        return None
+    return compute_rates(prev, counters, now - prev_ts)
@@ -1,74 +1,638 @@
 """
 GPU 采集器
 
-通过 nvidia-smi 采集 NVIDIA GPU 使用情况
+采集 NVIDIA GPU 使用情况，支持三种后端：
+- nvml: 进程内 NVML 绑定（nvidia-ml-py），Agent 生命周期内只初始化一次
+- smi-loop: 常驻 `nvidia-smi --loop-ms` 进程，持续读取其输出
+- smi: 每次采集执行一次 nvidia-smi（原有方式）
+
+通过 AgentConfig.gpu 选择后端：
+- auto / nvidia: 依次尝试 nvml -> smi-loop
+- nvml / smi-loop / smi: 强制使用指定后端
+- fake: 使用内置假 NVML（无 GPU 机器上开发测试用）
+- off: 禁用
+
+每张卡输出固定字段（GPU_FIELDS）：使用率、显存、温度，以及功耗/功耗上限、SM/显存频率、
+降频原因、ECC 错误计数和 PCIe 吞吐，用于定位热/功耗降频、频率偏低和 PCIe 瓶颈。
+驱动或型号不支持的字段为 None。
 """
 
 import asyncio
-from typing import Optional, List, Dict
+import logging
+import shutil
+import threading
+import time
+from typing import Any, Callable, Optional, List, Dict, Tuple
 
+from monitor_agent.config import get_config
+from monitor_agent.instrumentation import get_instrumentation
+from monitor_agent.utils import run_command
 
-async def get_gpu_stats() -> Optional[List[Dict]]:
+logger = logging.getLogger(__name__)
+
+
+# 降频原因位（nvmlClocksThrottleReason*，与 clocks_throttle_reasons.active 的位掩码一致）
+THROTTLE_REASONS: Tuple[Tuple[int, str], ...] = (
+    (0x1, "gpu_idle"),
+    (0x2, "applications_clocks_setting"),
+    (0x4, "sw_power_cap"),
+    (0x8, "hw_slowdown"),
+    (0x10, "sync_boost"),
+    (0x20, "sw_thermal_slowdown"),
+    (0x40, "hw_thermal_slowdown"),
+    (0x80, "hw_power_brake_slowdown"),
+    (0x100, "display_clock_setting"),
+)
+
+
+def decode_throttle_reasons(mask: int) -> List[str]:
+    """降频原因位掩码 -> 原因名称列表（gpu_idle 不算降频，不输出）"""
+    return [name for bit, name in THROTTLE_REASONS if mask & bit and bit != 0x1]
+
+
+def _parse_mask(value: str) -> List[str]:
+    return decode_throttle_reasons(int(value, 16))
+
+
+# nvidia-smi 查询列：(输出字段, 查询字段, 转换函数)，顺序即 CSV 列顺序
+SMI_COLUMNS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("index", "index", int),
+    ("name", "name", str),
+    ("util_pct", "utilization.gpu", float),
+    ("mem_used_mb", "memory.used", int),
+    ("mem_total_mb", "memory.total", int),
+    ("temperature_c", "temperature.gpu", float),
+    ("power_w", "power.draw", float),
+    ("power_limit_w", "power.limit", float),
+    ("sm_clock_mhz", "clocks.sm", int),
+    ("mem_clock_mhz", "clocks.mem", int),
+    ("throttle_reasons", "clocks_throttle_reasons.active", _parse_mask),
+    ("ecc_corrected", "ecc.errors.corrected.volatile.total", int),
+    ("ecc_uncorrected", "ecc.errors.uncorrected.volatile.total", int),
+)
+
+# 前 6 列为必需字段（解析失败则丢弃该卡），其余缺失或 [N/A] 时为 None
+SMI_REQUIRED_COLUMNS = 6
+
+# 每张卡的输出字段（PCIe 吞吐 nvidia-smi 无法查询，只有 NVML 后端提供）
+GPU_FIELDS: Tuple[str, ...] = tuple(c[0] for c in SMI_COLUMNS) + ("pcie_rx_bps", "pcie_tx_bps")
+
+# nvidia-smi 查询字段
+SMI_QUERY_FIELDS = ",".join(c[1] for c in SMI_COLUMNS)
+
+# 旧驱动不认识扩展字段时整个查询失败，回退到只查询必需字段
+SMI_BASIC_FIELDS = ",".join(c[1] for c in SMI_COLUMNS[:SMI_REQUIRED_COLUMNS])
+
+# nvidia-smi 计算进程查询字段
+SMI_APPS_FIELDS = "gpu_uuid,pid,used_memory"
+
+# smi-loop 后端的输出间隔（毫秒）
+SMI_LOOP_MS = 1000
+
+
+def parse_smi_line(line: str) -> Optional[Dict]:
     """
-    采集 GPU 使用率、显存、名称和温度
+    解析 nvidia-smi CSV 输出的一行（SMI_QUERY_FIELDS 或 SMI_BASIC_FIELDS）
 
     Returns:
-        GPU 信息列表，格式:
-        [{
-            "index": 0,
-            "name": "NVIDIA A100-SXM4-40GB",
-            "util_pct": 56,
-            "mem_used_mb": 2048,
-            "mem_total_mb": 8192,
-            "temperature_c": 75.0
-        }]
-        或 None（无 GPU 或驱动不可用）
+        GPU 信息字典（字段为 GPU_FIELDS），解析失败返回 None
     """
-    try:
-        # 执行 nvidia-smi 命令，增加 name 和 temperature.gpu
-        cmd = (
-            "nvidia-smi --query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu "
-            "--format=csv,noheader,nounits"
-        )
+    fields = [x.strip() for x in line.split(',')]
+    if len(fields) < SMI_REQUIRED_COLUMNS:
+        return None
+    result: Dict[str, Any] = dict.fromkeys(GPU_FIELDS)
+    for position, (key, _, convert) in enumerate(SMI_COLUMNS):
+        if position >= len(fields):
+            break
+        try:
+            result[key] = convert(fields[position])
+        except ValueError:
+            if position < SMI_REQUIRED_COLUMNS:
+                # 单卡解析失败不影响其他卡
+                return None
+            # [N/A] / [Not Supported]
+    return result
+
+
+def parse_smi_apps(output: str, uuid_index: Dict[str, int]) -> List[Dict]:
+    """
+    解析 `nvidia-smi --query-compute-apps` 的 CSV 输出
+
+    Args:
+        output: nvidia-smi 输出
+        uuid_index: GPU UUID -> index
+
+    Returns:
+        [{"gpu_index": 0, "pid": 12345, "used_mem_mb": 20480, "sm_util_pct": None}]
+    """
+    result = []
+    for line in output.splitlines():
+        fields = [x.strip() for x in line.split(',')]
+        if len(fields) < 3 or fields[0] not in uuid_index:
+            continue
+        try:
+            pid = int(fields[1])
+        except ValueError:
+            continue
+        try:
+            used_mem = int(fields[2])
+        except ValueError:
+            # [N/A]（如 Windows WDDM 或权限不足）
+            used_mem = None
+        result.append({
+            "gpu_index": uuid_index[fields[0]],
+            "pid": pid,
+            "used_mem_mb": used_mem,
+            "sm_util_pct": None
+        })
+    return result
+
+
+class GPUBackend:
+    """GPU 采集后端基类"""
+
+    name = "base"
+
+    async def query(self) -> Optional[List[Dict]]:
+        """
+        采集所有 GPU 的当前状态
+
+        Returns:
+            GPU 信息列表，或 None（无 GPU 或驱动不可用）
+        """
+        raise NotImplementedError
+
+    async def query_processes(self) -> Optional[List[Dict]]:
+        """
+        列出所有 GPU 上的计算进程
+
+        Returns:
+            [{"gpu_index", "pid", "used_mem_mb", "sm_util_pct"}]，或 None（不支持）
+        """
+        return None
+
+    async def close(self):
+        """释放后端持有的资源"""
+
+
+class SmiAppsMixin:
+    """nvidia-smi 后端共用的计算进程查询（每轮一次 --query-compute-apps 调用）"""
+
+    _uuid_index: Optional[Dict[str, int]] = None
+
+    async def _load_uuid_index(self) -> Optional[Dict[str, int]]:
+        # GPU UUID -> index 的映射在 Agent 生命周期内不变，只查询一次
+        if self._uuid_index is None:
+            returncode, stdout = await run_command([
+                "nvidia-smi", "--query-gpu=index,uuid", "--format=csv,noheader,nounits",
+            ])
+            if returncode != 0:
+                return None
+            mapping = {}
+            for line in stdout.decode().splitlines():
+                fields = [x.strip() for x in line.split(',')]
+                if len(fields) == 2 and fields[0].isdigit():
+                    mapping[fields[1]] = int(fields[0])
+            self._uuid_index = mapping
+        return self._uuid_index
+
+    async def query_processes(self) -> Optional[List[Dict]]:
+        try:
+            uuid_index = await self._load_uuid_index()
+            if not uuid_index:
+                return None
+            returncode, stdout = await run_command([
+                "nvidia-smi",
+                f"--query-compute-apps={SMI_APPS_FIELDS}",
+                "--format=csv,noheader,nounits",
+            ])
+        except Exception:
+            return None
+
+        if returncode != 0:
+            return None
+        return parse_smi_apps(stdout.decode(errors="replace"), uuid_index)
 
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
 
-        stdout, stderr = await proc.communicate()
+class SmiOneshotBackend(SmiAppsMixin, GPUBackend):
+    """每次采集执行一次 nvidia-smi"""
 
-        if proc.returncode != 0:
+    name = "smi"
+
+    def __init__(self):
+        self._fields = SMI_QUERY_FIELDS
+
+    async def _run(self) -> Tuple[int, bytes]:
+        return await run_command([
+            "nvidia-smi",
+            f"--query-gpu={self._fields}",
+            "--format=csv,noheader,nounits",
+        ])
+
+    async def query(self) -> Optional[List[Dict]]:
+        try:
+            returncode, stdout = await self._run()
+            if returncode != 0 and self._fields != SMI_BASIC_FIELDS:
+                # 旧驱动不支持扩展字段：回退一次，之后只查询必需字段
+                self._fields = SMI_BASIC_FIELDS
+                returncode, stdout = await self._run()
+                if returncode == 0:
+                    logger.info("nvidia-smi does not support extended GPU fields, using basic query")
+                else:
+                    self._fields = SMI_QUERY_FIELDS
+        except Exception:
+            return None
+
+        if returncode != 0:
             # nvidia-smi 执行失败（无驱动或无 GPU）
             return None
 
-        # 解析 CSV 输出
         result = []
-        lines = stdout.decode().strip().split('\n')
+        for line in stdout.decode().strip().split('\n'):
+            if line.strip():
+                gpu_info = parse_smi_line(line)
+                if gpu_info is not None:
+                    result.append(gpu_info)
 
-        for line in lines:
-            if not line.strip():
-                continue
+        return result if result else None
 
-            fields = [x.strip() for x in line.split(',')]
-            if len(fields) >= 6:
-                try:
-                    gpu_info = {
-                        "index": int(fields[0]),
-                        "name": fields[1],
-                        "util_pct": float(fields[2]),
-                        "mem_used_mb": int(fields[3]),
-                        "mem_total_mb": int(fields[4]),
-                        "temperature_c": float(fields[5])
-                    }
-                    result.append(gpu_info)
-                except (ValueError, IndexError) as e:
-                    # 单卡解析失败不影响其他卡，跳过该行
+
+class SmiStreamBackend(SmiAppsMixin, GPUBackend):
+    """
+    常驻 nvidia-smi 进程
+
+    `nvidia-smi --loop-ms` 每个周期为每张卡输出一行，后台任务持续读取，
+    query() 只返回内存中的最新结果；进程退出后按退避时间重启。
+    """
+
+    name = "smi-loop"
+
+    def __init__(self, loop_ms: int = SMI_LOOP_MS):
+        self._loop_ms = loop_ms
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._latest: Dict[int, Dict] = {}
+        self._updated_at: Dict[int, float] = {}
+        # 超过该时间未刷新的卡视为数据失效
+        self._max_age = max(5.0, 3 * loop_ms / 1000.0)
+        self._fields = SMI_QUERY_FIELDS
+
+    async def query(self) -> Optional[List[Dict]]:
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._reader_loop())
+
+        now = time.monotonic()
+        result = [
+            self._latest[index]
+            for index in sorted(self._latest)
+            if now - self._updated_at.get(index, 0.0) <= self._max_age
+        ]
+        return result if result else None
+
+    async def _reader_loop(self):
+        backoff = 1.0
+        while True:
+            try:
+                get_instrumentation().count_spawn("nvidia-smi")
+                self._proc = await asyncio.create_subprocess_exec(
+                    "nvidia-smi",
+                    f"--query-gpu={self._fields}",
+                    "--format=csv,noheader,nounits",
+                    f"--loop-ms={self._loop_ms}",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                parsed = 0
+                while True:
+                    line = await self._proc.stdout.readline()
+                    if not line:
+                        break
+                    gpu_info = parse_smi_line(line.decode(errors="replace"))
+                    if gpu_info is None:
+                        continue
+                    self._latest[gpu_info["index"]] = gpu_info
+                    self._updated_at[gpu_info["index"]] = time.monotonic()
+                    parsed += 1
+                    backoff = 1.0
+
+                rc = await self._proc.wait()
+                if rc != 0 and not parsed and self._fields != SMI_BASIC_FIELDS:
+                    # 旧驱动不支持扩展字段时进程立即退出，改为只查询必需字段
+                    logger.info("nvidia-smi does not support extended GPU fields, using basic query")
+                    self._fields = SMI_BASIC_FIELDS
+                    self._proc = None
                     continue
+                logger.warning(f"nvidia-smi loop exited (rc={rc}), restart in {backoff}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"nvidia-smi loop failed: {e}, retry in {backoff}s")
+
+            self._proc = None
+            await asyncio.sleep(backoff)
+            backoff = min(60.0, backoff * 2)
+
+    async def close(self):
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader_task = None
+
+        proc = self._proc
+        self._proc = None
+        if proc and proc.returncode is None:
+            try:
+                proc.terminate()
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except Exception:
+                try:
+                    proc.kill()
+                except Exception:
+                    pass
+
+
+class NvmlBackend(GPUBackend):
+    """
+    进程内 NVML 后端
+
+    NVML 在创建后端时初始化并常驻，设备句柄缓存复用；
+    NVML 调用是阻塞的，在线程池中执行以免卡住事件循环。
+    初始化加锁：gpu 和 gpu_processes 采集器的线程，以及超时后仍在运行的上一轮调用
+    不会重复调用 nvmlInit（否则 close 时的一次 nvmlShutdown 无法释放全部引用）。
+    """
+
+    name = "nvml"
+
+    def __init__(self, nvml=None):
+        """
+        Args:
+            nvml: pynvml 兼容模块，默认导入 nvidia-ml-py 提供的 pynvml
+        """
+        if nvml is None:
+            import pynvml as nvml
+        self._nvml = nvml
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._handles: List = []
+        self._names: List[str] = []
+        # 每张卡上次读取的进程利用率样本时间戳（微秒）
+        self._util_ts: Dict[int, int] = {}
+
+    def _ensure_init(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            nvml = self._nvml
+            nvml.nvmlInit()
+            handles = [
+                nvml.nvmlDeviceGetHandleByIndex(i) for i in range(nvml.nvmlDeviceGetCount())
+            ]
+            names = []
+            for handle in handles:
+                name = nvml.nvmlDeviceGetName(handle)
+                names.append(name.decode() if isinstance(name, bytes) else name)
+            self._handles = handles
+            self._names = names
+            self._initialized = True
+
+    def _query_sync(self) -> Optional[List[Dict]]:
+        self._ensure_init()
+        nvml = self._nvml
+
+        result = []
+        for index, handle in enumerate(self._handles):
+            try:
+                util = nvml.nvmlDeviceGetUtilizationRates(handle)
+                mem = nvml.nvmlDeviceGetMemoryInfo(handle)
+                temperature = self._optional("nvmlDeviceGetTemperature", handle, nvml.NVML_TEMPERATURE_GPU)
+                power = self._optional("nvmlDeviceGetPowerUsage", handle)
+                power_limit = self._optional("nvmlDeviceGetEnforcedPowerLimit", handle)
+                throttle = self._optional("nvmlDeviceGetCurrentClocksThrottleReasons", handle)
+                pcie_rx = self._optional("nvmlDeviceGetPcieThroughput", handle, nvml.NVML_PCIE_UTIL_RX_BYTES)
+                pcie_tx = self._optional("nvmlDeviceGetPcieThroughput", handle, nvml.NVML_PCIE_UTIL_TX_BYTES)
+                result.append({
+                    "index": index,
+                    "name": self._names[index],
+                    "util_pct": float(util.gpu),
+                    "mem_used_mb": int(mem.used // (1024 * 1024)),
+                    "mem_total_mb": int(mem.total // (1024 * 1024)),
+                    "temperature_c": float(temperature) if temperature is not None else None,
+                    # 功耗单位为毫瓦
+                    "power_w": power / 1000.0 if power is not None else None,
+                    "power_limit_w": power_limit / 1000.0 if power_limit is not None else None,
+                    "sm_clock_mhz": self._optional("nvmlDeviceGetClockInfo", handle, nvml.NVML_CLOCK_SM),
+                    "mem_clock_mhz": self._optional("nvmlDeviceGetClockInfo", handle, nvml.NVML_CLOCK_MEM),
+                    "throttle_reasons": decode_throttle_reasons(throttle) if throttle is not None else None,
+                    "ecc_corrected": self._optional(
+                        "nvmlDeviceGetTotalEccErrors", handle,
+                        nvml.NVML_MEMORY_ERROR_TYPE_CORRECTED, nvml.NVML_VOLATILE_ECC),
+                    "ecc_uncorrected": self._optional(
+                        "nvmlDeviceGetTotalEccErrors", handle,
+                        nvml.NVML_MEMORY_ERROR_TYPE_UNCORRECTED, nvml.NVML_VOLATILE_ECC),
+                    # PCIe 吞吐单位为 KB/s
+                    "pcie_rx_bps": pcie_rx * 1024 if pcie_rx is not None else None,
+                    "pcie_tx_bps": pcie_tx * 1024 if pcie_tx is not None else None,
+                })
+            except nvml.NVMLError as e:
+                # 单卡失败（如掉卡）不影响其他卡
+                logger.debug(f"NVML query failed for GPU {index}: {e}")
 
         return result if result else None
 
+    def _optional(self, function: str, *args) -> Any:
+        """读取可选字段：型号/驱动不支持（NVMLError）或 pynvml 版本没有该函数时返回 None"""
+        try:
+            return getattr(self._nvml, function)(*args)
+        except (self._nvml.NVMLError, AttributeError):
+            return None
+
+    def _process_util(self, index: int, handle) -> Dict[int, float]:
+        """读取自上次以来的进程 SM 利用率样本，每个 pid 取最新一条"""
+        nvml = self._nvml
+        try:
+            samples = nvml.nvmlDeviceGetProcessUtilization(handle, self._util_ts.get(index, 0))
+        except nvml.NVMLError:
+            # 不支持，或上次之后没有新样本
+            return {}
+
+        latest: Dict[int, Tuple[int, float]] = {}
+        for sample in samples:
+            prev = latest.get(sample.pid)
+            if prev is None or sample.timeStamp >= prev[0]:
+                latest[sample.pid] = (sample.timeStamp, float(sample.smUtil))
+        if latest:
+            self._util_ts[index] = max(ts for ts, _ in latest.values())
+        return {pid: util for pid, (_, util) in latest.items()}
+
+    def _query_processes_sync(self) -> List[Dict]:
+        self._ensure_init()
+        nvml = self._nvml
+
+        result = []
+        for index, handle in enumerate(self._handles):
+            try:
+                procs = nvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            except nvml.NVMLError as e:
+                logger.debug(f"NVML process query failed for GPU {index}: {e}")
+                continue
+            if not procs:
+                continue
+            util = self._process_util(index, handle)
+            for proc in procs:
+                used = proc.usedGpuMemory
+                result.append({
+                    "gpu_index": index,
+                    "pid": int(proc.pid),
+                    "used_mem_mb": int(used // (1024 * 1024)) if used is not None else None,
+                    "sm_util_pct": util.get(proc.pid)
+                })
+        return result
+
+    async def query_processes(self) -> Optional[List[Dict]]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._query_processes_sync)
+        except Exception as e:
+            logger.debug(f"NVML process query failed: {e}")
+            return None
+
+    def init(self):
+        """初始化 NVML（失败时抛出异常，用于 auto 模式探测）"""
+        self._ensure_init()
+
+    async def query(self) -> Optional[List[Dict]]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._query_sync)
+        except Exception as e:
+            logger.debug(f"NVML query failed: {e}")
+            return None
+
+    async def close(self):
+        if self._initialized:
+            try:
+                self._nvml.nvmlShutdown()
+            except Exception:
+                pass
+        self._initialized = False
+        self._handles = []
+        self._names = []
+        self._util_ts = {}
+
+
+def create_gpu_backend(mode: str) -> Optional[GPUBackend]:
+    """
+    根据配置创建 GPU 后端
+
+    Args:
+        mode: AgentConfig.gpu 的取值
+
+    Returns:
+        GPU 后端实例，mode 为 off 或无可用后端时返回 None
+    """
+    if mode == "off":
+        return None
+    if mode == "smi":
+        return SmiOneshotBackend()
+    if mode == "smi-loop":
+        return SmiStreamBackend()
+    if mode in ("nvml", "fake"):
+        if mode == "fake":
+            from monitor_agent.collectors import nvml_fake
+            backend = NvmlBackend(nvml_fake)
+        else:
+            backend = NvmlBackend()
+        # 在创建时（线程池中、全局锁内）初始化；失败时保留后端，采集时再重试
+        try:
+            backend.init()
+        except Exception as e:
+            logger.warning(f"NVML init failed ({e}), will retry on next collection")
+        return backend
+
+    # auto / nvidia：优先 NVML，其次常驻 nvidia-smi
+    try:
+        backend = NvmlBackend()
+        backend.init()
+        return backend
+    except Exception as e:
+        logger.info(f"NVML unavailable ({e}), falling back to nvidia-smi")
+
+    if shutil.which("nvidia-smi"):
+        return SmiStreamBackend()
+    return None
+
+
+# 全局 GPU 后端（延迟创建）
+_backend: Optional[GPUBackend] = None
+_backend_created = False
+_backend_lock: Optional[asyncio.Lock] = None
+
+
+async def get_gpu_backend() -> Optional[GPUBackend]:
+    """
+    获取全局 GPU 后端实例
+
+    首次调用时创建后端：auto 模式的 nvmlInit 在未开启持久模式的多卡主机上可能耗时数秒，
+    因此在线程池中执行；gpu 和 gpu_processes 采集器并发调用时只创建一次。
+    """
+    global _backend, _backend_created, _backend_lock
+    if _backend_created:
+        return _backend
+
+    if _backend_lock is None:
+        _backend_lock = asyncio.Lock()
+
+    async with _backend_lock:
+        if not _backend_created:
+            loop = asyncio.get_running_loop()
+            _backend = await loop.run_in_executor(None, create_gpu_backend, get_config().gpu)
+            _backend_created = True
+            if _backend is not None:
+                logger.info(f"GPU backend: {_backend.name}")
+    return _backend
+
+
+async def close_gpu_backend():
+    """关闭全局 GPU 后端（Agent 退出时调用）"""
+    global _backend, _backend_created, _backend_lock
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+    _backend_created = False
+    _backend_lock = None
+
+
+async def get_gpu_stats() -> Optional[List[Dict]]:
+    """
+    采集 GPU 使用率、显存、名称、温度、功耗、频率、降频原因、ECC 和 PCIe 吞吐
+
+    Returns:
+        GPU 信息列表，格式:
+        [{
+            "index": 0,
+            "name": "NVIDIA A100-SXM4-40GB",
+            "util_pct": 56,
+            "mem_used_mb": 2048,
+            "mem_total_mb": 8192,
+            "temperature_c": 75.0,
+            "power_w": 251.3,
+            "power_limit_w": 400.0,
+            "sm_clock_mhz": 1410,
+            "mem_clock_mhz": 1215,
+            "throttle_reasons": ["sw_power_cap"],
+            "ecc_corrected": 0,
+            "ecc_uncorrected": 0,
+            "pcie_rx_bps": 1048576,
+            "pcie_tx_bps": 524288
+        }]
+        或 None（无 GPU 或驱动不可用）
+    """
+    try:
+        backend = await get_gpu_backend()
+        if backend is None:
+            return None
+        return await backend.query()
     except Exception:
         # 采集失败，返回 None
         return None
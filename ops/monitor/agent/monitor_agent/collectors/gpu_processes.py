@@ -0,0 +1,145 @@
+"""
+GPU 进程采集器
+
+通过 GPU 后端（NVML 或一次 `nvidia-smi --query-compute-apps` 调用）列出每张卡上的计算进程，
+再关联 /proc/<pid>/status 的 uid、/proc/<pid>/cmdline 和 /proc/<pid>/cgroup 中的容器 ID。
+
+开销有界：
+- 每轮最多输出 MAX_PROCESSES 个进程（按显存占用降序截断）
+- 进程的 uid/cmdline/容器 ID 按 pid 缓存，只为新出现的 pid 读取 /proc，消失的 pid 随即清理
+- uid -> 用户名查询缓存
+"""
+
+import pwd
+from typing import Dict, List, Optional, Tuple
+
+from monitor_agent.collectors.containers import container_id_from_cgroup
+from monitor_agent.collectors.gpu import get_gpu_backend
+
+
+# 每轮最多输出的进程数
+MAX_PROCESSES = 256
+
+# cmdline 最大长度（字符）
+MAX_CMDLINE = 256
+
+# uid -> 用户名
+_usernames: Dict[int, str] = {}
+
+# pid -> (uid, cmdline, 容器 ID)
+_proc_cache: Dict[int, Tuple[Optional[int], str, Optional[str]]] = {}
+
+
+def lookup_username(uid: Optional[int]) -> Optional[str]:
+    """uid 转用户名（带缓存，未知 uid 返回数字字符串）"""
+    if uid is None:
+        return None
+    name = _usernames.get(uid)
+    if name is None:
+        try:
+            name = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            name = str(uid)
+        _usernames[uid] = name
+    return name
+
+
+def parse_status_uid(content: str) -> Optional[int]:
+    """从 /proc/<pid>/status 中解析真实 uid"""
+    for line in content.splitlines():
+        if line.startswith("Uid:"):
+            parts = line.split()
+            if len(parts) >= 2:
+                try:
+                    return int(parts[1])
+                except ValueError:
+                    return None
+    return None
+
+
+def _read_proc_info(pid: int, proc_root: str = "/proc") -> Tuple[Optional[int], str]:
+    uid = None
+    cmdline = ""
+    try:
+        with open(f"{proc_root}/{pid}/status", "r") as f:
+            uid = parse_status_uid(f.read())
+    except OSError:
+        pass
+    try:
+        with open(f"{proc_root}/{pid}/cmdline", "rb") as f:
+            raw = f.read(MAX_CMDLINE * 4)
+        cmdline = raw.replace(b"\0", b" ").decode("utf-8", "replace").strip()[:MAX_CMDLINE]
+    except OSError:
+        pass
+    return uid, cmdline
+
+
+def _read_container_id(pid: int, proc_root: str = "/proc") -> Optional[str]:
+    try:
+        with open(f"{proc_root}/{pid}/cgroup", "r") as f:
+            return container_id_from_cgroup(f.read())
+    except OSError:
+        return None
+
+
+def enrich_processes(processes: List[Dict], proc_root: str = "/proc") -> List[Dict]:
+    """
+    为进程列表补充 uid/user/cmdline/container_id，并按显存占用截断到 MAX_PROCESSES
+
+    Args:
+        processes: 后端返回的 [{"gpu_index", "pid", "used_mem_mb", "sm_util_pct"}]
+        proc_root: /proc 路径（测试用）
+
+    Returns:
+        补充字段后的进程列表
+    """
+    processes = sorted(processes, key=lambda p: p.get("used_mem_mb") or 0, reverse=True)[:MAX_PROCESSES]
+
+    current = {p["pid"] for p in processes}
+    for pid in list(_proc_cache):
+        if pid not in current:
+            del _proc_cache[pid]
+
+    result = []
+    for proc in processes:
+        pid = proc["pid"]
+        info = _proc_cache.get(pid)
+        if info is None:
+            info = _read_proc_info(pid, proc_root) + (_read_container_id(pid, proc_root),)
+            _proc_cache[pid] = info
+        uid, cmdline, container_id = info
+        result.append(dict(
+            proc, uid=uid, user=lookup_username(uid), cmdline=cmdline, container_id=container_id,
+        ))
+    return result
+
+
+async def get_gpu_processes() -> Optional[List[Dict]]:
+    """
+    采集每张 GPU 上的计算进程
+
+    Returns:
+        进程列表，格式:
+        [{
+            "gpu_index": 0,
+            "pid": 12345,
+            "used_mem_mb": 20480,
+            "sm_util_pct": 85.0,      # 后端不支持时为 None
+            "uid": 1000,
+            "user": "alice",
+            "cmdline": "python train.py --epochs 10",
+            "container_id": None      # 容器内进程为 64 位容器 ID
+        }]
+        无 GPU 或后端不支持时返回 None
+    """
+    try:
+        backend = await get_gpu_backend()
+        if backend is None:
+            return None
+        processes = await backend.query_processes()
+        if processes is None:
+            return None
+        return enrich_processes(processes)
+    except Exception:
+        # 采集失败，返回 None
+        return None
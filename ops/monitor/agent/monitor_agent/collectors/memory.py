@@ -0,0 +1,205 @@
+"""
+内存采集器
+
+每次采样一轮读取 /proc/meminfo、/proc/loadavg 和 /proc/pressure/{cpu,memory,io}，
+输出内存/交换分区使用量、系统负载和 PSI（pressure stall information）。
+
+文件描述符在首次采样时打开并常驻，之后每次用 os.pread 从偏移 0 重读，
+不再重复 open/close。
+"""
+
+import os
+from typing import Dict, List, Optional
+
+
+# 单次 pread 读取大小（/proc/meminfo 约 1.5KB）
+READ_SIZE = 8192
+
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+_KB = 1024
+
+
+class ProcFile:
+    """常驻文件描述符的 /proc 文件，每次从偏移 0 重读"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def read(self) -> Optional[str]:
+        """读取完整内容，文件不存在（如内核未开启 PSI）时返回 None"""
+        if self._fd is None:
+            try:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            except OSError:
+                return None
+
+        try:
+            chunks = []
+            offset = 0
+            while True:
+                chunk = os.pread(self._fd, READ_SIZE, offset)
+                chunks.append(chunk)
+                if len(chunk) < READ_SIZE:
+                    break
+                offset += len(chunk)
+        except OSError:
+            # 描述符失效，下次重新打开
+            self.close()
+            return None
+        return b"".join(chunks).decode("ascii", "replace")
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+def parse_meminfo(content: str) -> Dict:
+    """
+    解析 /proc/meminfo
+
+    used 按 MemTotal - MemAvailable 计算（内核对"可用内存"的估算，包含可回收缓存），
+    cached 为 Cached + SReclaimable（与 psutil 口径一致）。
+
+    Returns:
+        {
+            "mem_total_bytes": ..., "mem_used_bytes": ..., "mem_available_bytes": ...,
+            "mem_cached_bytes": ..., "mem_used_pct": ...,
+            "swap_total_bytes": ..., "swap_used_bytes": ..., "swap_used_pct": ...
+        }
+    """
+    fields: Dict[str, int] = {}
+    for line in content.splitlines():
+        key, sep, rest = line.partition(":")
+        if not sep:
+            continue
+        parts = rest.split()
+        if parts:
+            try:
+                fields[key] = int(parts[0]) * _KB
+            except ValueError:
+                continue
+
+    total = fields.get("MemTotal", 0)
+    available = fields.get("MemAvailable", fields.get("MemFree", 0))
+    used = max(0, total - available)
+    swap_total = fields.get("SwapTotal", 0)
+    swap_used = max(0, swap_total - fields.get("SwapFree", 0))
+
+    return {
+        "mem_total_bytes": total,
+        "mem_used_bytes": used,
+        "mem_available_bytes": available,
+        "mem_cached_bytes": fields.get("Cached", 0) + fields.get("SReclaimable", 0),
+        "mem_used_pct": round(used / total * 100.0, 2) if total else 0.0,
+        "swap_total_bytes": swap_total,
+        "swap_used_bytes": swap_used,
+        "swap_used_pct": round(swap_used / swap_total * 100.0, 2) if swap_total else 0.0,
+    }
+
+
+def parse_loadavg(content: str) -> Optional[List[float]]:
+    """解析 /proc/loadavg，返回 [load1, load5, load15]"""
+    parts = content.split()
+    if len(parts) < 3:
+        return None
+    try:
+        return [float(parts[0]), float(parts[1]), float(parts[2])]
+    except ValueError:
+        return None
+
+
+def parse_pressure(content: str) -> Dict[str, List[float]]:
+    """
+    解析 /proc/pressure/<resource>
+
+    格式:
+        some avg10=1.67 avg60=1.50 avg300=1.19 total=24096958
+        full avg10=0.00 avg60=0.00 avg300=0.00 total=0
+
+    Returns:
+        {"some": [avg10, avg60, avg300], "full": [avg10, avg60, avg300]}
+        （旧内核的 cpu 文件没有 full 行）
+    """
+    result = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if not parts or parts[0] not in ("some", "full"):
+            continue
+        values = {}
+        for item in parts[1:]:
+            key, _, value = item.partition("=")
+            values[key] = value
+        try:
+            result[parts[0]] = [float(values["avg10"]), float(values["avg60"]), float(values["avg300"])]
+        except (KeyError, ValueError):
+            continue
+    return result
+
+
+class MemoryCollector:
+    """内存、负载和 PSI 采集器（持有常驻文件描述符）"""
+
+    def __init__(self, proc_root: str = "/proc"):
+        self._meminfo = ProcFile(f"{proc_root}/meminfo")
+        self._loadavg = ProcFile(f"{proc_root}/loadavg")
+        self._pressure = {r: ProcFile(f"{proc_root}/pressure/{r}") for r in PSI_RESOURCES}
+
+    def collect(self) -> Optional[Dict]:
+        """
+        采样一次
+
+        Returns:
+            parse_meminfo 的字段，外加
+            "loadavg": [1.2, 0.8, 0.5],
+            "psi": {"cpu": {"some": [...], "full": [...]}, "memory": {...}, "io": {...}}
+            （内核未开启 PSI 时 psi 为 None）
+            /proc/meminfo 不可读时返回 None
+        """
+        meminfo = self._meminfo.read()
+        if meminfo is None:
+            return None
+        result = parse_meminfo(meminfo)
+
+        loadavg = self._loadavg.read()
+        result["loadavg"] = parse_loadavg(loadavg) if loadavg is not None else None
+
+        psi = {}
+        for resource, proc_file in self._pressure.items():
+            content = proc_file.read()
+            if content is not None:
+                psi[resource] = parse_pressure(content)
+        result["psi"] = psi or None
+        return result
+
+    def close(self):
+        self._meminfo.close()
+        self._loadavg.close()
+        for proc_file in self._pressure.values():
+            proc_file.close()
+
+
+# 全局采集器（常驻文件描述符）
+_collector: Optional[MemoryCollector] = None
+
+
+async def get_memory_stats() -> Optional[Dict]:
+    """
+    采集内存、交换分区、系统负载和 PSI
+
+    Returns:
+        见 MemoryCollector.collect
+    """
+    global _collector
+    if _collector is None:
+        _collector = MemoryCollector()
+    try:
+        return _collector.collect()
+    except Exception:
+        # 采集失败，返回 None
+        return None
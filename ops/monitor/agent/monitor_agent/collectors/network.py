@@ -0,0 +1,137 @@
+"""
+网络采集器
+
+读取 /proc/net/dev，按两次采样的差值计算每个网卡的
+收发吞吐、包速率以及错误/丢包速率。
+"""
+
+import fnmatch
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 默认排除的网卡（容器/虚拟网卡会让 payload 膨胀）
+DEFAULT_EXCLUDE = (
+    "lo", "veth*", "docker*", "br-*", "virbr*", "cali*", "flannel*", "cni*", "tun*", "tap*",
+)
+
+# 上一次采样：{iface: (rx_bytes, rx_packets, rx_errs, rx_drop, tx_bytes, tx_packets, tx_errs, tx_drop)}
+_last_counters: Dict[str, Tuple[int, ...]] = {}
+_last_ts: Optional[float] = None
+
+
+def parse_net_dev(
+    content: str,
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> Dict[str, Tuple[int, ...]]:
+    """
+    解析 /proc/net/dev
+
+    格式（前两行为表头）:
+        eth0: rx_bytes rx_packets rx_errs rx_drop fifo frame compressed multicast
+              tx_bytes tx_packets tx_errs tx_drop fifo colls carrier compressed
+
+    Args:
+        content: /proc/net/dev 内容
+        include: 网卡名通配符白名单
+        exclude: 网卡名通配符黑名单
+
+    Returns:
+        {iface: (rx_bytes, rx_packets, rx_errs, rx_drop, tx_bytes, tx_packets, tx_errs, tx_drop)}
+    """
+    counters = {}
+    for line in content.splitlines():
+        name, sep, rest = line.partition(":")
+        if not sep:
+            continue
+        name = name.strip()
+        if not any(fnmatch.fnmatch(name, p) for p in include):
+            continue
+        if any(fnmatch.fnmatch(name, p) for p in exclude):
+            continue
+        fields = rest.split()
+        if len(fields) < 12:
+            continue
+        try:
+            counters[name] = (
+                int(fields[0]), int(fields[1]), int(fields[2]), int(fields[3]),
+                int(fields[8]), int(fields[9]), int(fields[10]), int(fields[11]),
+            )
+        except ValueError:
+            continue
+    return counters
+
+
+def compute_rates(
+    prev: Dict[str, Tuple[int, ...]],
+    cur: Dict[str, Tuple[int, ...]],
+    elapsed: float,
+) -> Dict[str, List]:
+    """
+    由两次采样计算每个网卡的速率（紧凑的列式结构）
+
+    Returns:
+        {
+            "interfaces": ["eth0", ...],
+            "rx_bps": [...], "tx_bps": [...],
+            "rx_pps": [...], "tx_pps": [...],
+            "rx_errs_ps": [...], "tx_errs_ps": [...],
+            "rx_drop_ps": [...], "tx_drop_ps": [...]
+        }
+    """
+    result = {"interfaces": [], "rx_bps": [], "tx_bps": [], "rx_pps": [], "tx_pps": [],
+              "rx_errs_ps": [], "tx_errs_ps": [], "rx_drop_ps": [], "tx_drop_ps": []}
+    if elapsed <= 0:
+        return result
+
+    for name, c in cur.items():
+        p = prev.get(name)
+        if p is None:
+            continue
+        # 计数器回绕或网卡重建时差值为负，按 0 处理
+        rx_b, rx_p, rx_e, rx_d, tx_b, tx_p, tx_e, tx_d = (max(0, a - b) for a, b in zip(c, p))
+
+        result["interfaces"].append(name)
+        result["rx_bps"].append(round(rx_b / elapsed, 1))
+        result["tx_bps"].append(round(tx_b / elapsed, 1))
+        result["rx_pps"].append(round(rx_p / elapsed, 2))
+        result["tx_pps"].append(round(tx_p / elapsed, 2))
+        result["rx_errs_ps"].append(round(rx_e / elapsed, 3))
+        result["tx_errs_ps"].append(round(tx_e / elapsed, 3))
+        result["rx_drop_ps"].append(round(rx_d / elapsed, 3))
+        result["tx_drop_ps"].append(round(tx_d / elapsed, 3))
+    return result
+
+
+async def get_network_io(
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> Optional[Dict[str, List]]:
+    """
+    采集网卡收发速率
+
+    Args:
+        include: 网卡名通配符白名单
+        exclude: 网卡名通配符黑名单
+
+    Returns:
+        列式网卡速率（见 compute_rates），首次调用返回 None（需要两次采样）
+    """
+    global _last_counters, _last_ts
+
+    try:
+        with open("/proc/net/dev", "r") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    now = time.monotonic()
+    counters = parse_net_dev(content, include, exclude)
+
+    prev, prev_ts = _last_counters, _last_ts
+    _last_counters, _last_ts = counters, now
+
+    if prev_ts is None:
+        return None
+    return compute_rates(prev, counters, now - prev_ts)
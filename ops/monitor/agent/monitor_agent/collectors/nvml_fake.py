@@ -0,0 +1,171 @@
+"""
+假 NVML 模块
+
+实现 GPU 采集器用到的 pynvml 接口子集，返回可配置的假设备数据，
+用于在没有 GPU 的机器上测试 NVML 后端（配置 gpu: "fake" 或直接注入 NvmlBackend）。
+"""
+
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+NVML_TEMPERATURE_GPU = 0
+NVML_CLOCK_SM = 1
+NVML_CLOCK_MEM = 2
+NVML_MEMORY_ERROR_TYPE_CORRECTED = 0
+NVML_MEMORY_ERROR_TYPE_UNCORRECTED = 1
+NVML_VOLATILE_ECC = 0
+NVML_PCIE_UTIL_TX_BYTES = 0
+NVML_PCIE_UTIL_RX_BYTES = 1
+
+
+class NVMLError(Exception):
+    """与 pynvml.NVMLError 对应的异常"""
+
+
+Utilization = namedtuple("Utilization", ["gpu", "memory"])
+Memory = namedtuple("Memory", ["total", "free", "used"])
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "usedGpuMemory"])
+ProcessUtilizationSample = namedtuple(
+    "ProcessUtilizationSample", ["pid", "timeStamp", "smUtil", "memUtil", "encUtil", "decUtil"]
+)
+
+_MB = 1024 * 1024
+
+_DEFAULT_DEVICES: List[Dict] = [
+    {"name": "Fake NVIDIA A100-SXM4-40GB", "util_pct": 56, "mem_used_mb": 2048,
+     "mem_total_mb": 40960, "temperature_c": 65,
+     "power_mw": 251300, "power_limit_mw": 400000, "sm_clock_mhz": 1410, "mem_clock_mhz": 1215,
+     "throttle_reasons": 0x4, "ecc_corrected": 3, "ecc_uncorrected": 0,
+     "pcie_rx_kbps": 1024, "pcie_tx_kbps": 512,
+     "processes": [{"pid": 4242, "used_mem_mb": 2000, "sm_util_pct": 55}]},
+    {"name": "Fake NVIDIA A100-SXM4-40GB", "util_pct": 12, "mem_used_mb": 512,
+     "mem_total_mb": 40960, "temperature_c": 48,
+     "power_mw": 61000, "power_limit_mw": 400000, "sm_clock_mhz": 210, "mem_clock_mhz": 1215,
+     "throttle_reasons": 0x1, "ecc_corrected": 0, "ecc_uncorrected": 0,
+     "pcie_rx_kbps": 0, "pcie_tx_kbps": 0},
+]
+
+_devices: List[Dict] = [dict(d) for d in _DEFAULT_DEVICES]
+_initialized = False
+
+# 调用计数（测试用，可验证 NVML 只初始化一次）
+init_count = 0
+
+
+def set_devices(devices: Optional[List[Dict]] = None):
+    """
+    设置假设备列表
+
+    Args:
+        devices: 设备字典列表，字段同 _DEFAULT_DEVICES（processes 及功耗、频率等扩展字段可选，
+                 缺失时对应函数抛出 NVMLError，模拟不支持的型号）；None 恢复默认设备
+    """
+    global _devices
+    _devices = [dict(d) for d in (devices if devices is not None else _DEFAULT_DEVICES)]
+
+
+def _check_init():
+    if not _initialized:
+        raise NVMLError("NVML not initialized")
+
+
+def _device(handle: int) -> Dict:
+    _check_init()
+    if not 0 <= handle < len(_devices):
+        raise NVMLError(f"invalid handle: {handle}")
+    return _devices[handle]
+
+
+def nvmlInit():
+    global _initialized, init_count
+    _initialized = True
+    init_count += 1
+
+
+def nvmlShutdown():
+    global _initialized
+    _initialized = False
+
+
+def nvmlDeviceGetCount() -> int:
+    _check_init()
+    return len(_devices)
+
+
+def nvmlDeviceGetHandleByIndex(index: int) -> int:
+    _check_init()
+    if not 0 <= index < len(_devices):
+        raise NVMLError(f"invalid index: {index}")
+    return index
+
+
+def nvmlDeviceGetName(handle: int) -> str:
+    return _device(handle)["name"]
+
+
+def nvmlDeviceGetUtilizationRates(handle: int) -> Utilization:
+    return Utilization(gpu=_device(handle)["util_pct"], memory=0)
+
+
+def nvmlDeviceGetMemoryInfo(handle: int) -> Memory:
+    device = _device(handle)
+    total = device["mem_total_mb"] * _MB
+    used = device["mem_used_mb"] * _MB
+    return Memory(total=total, free=total - used, used=used)
+
+
+def nvmlDeviceGetTemperature(handle: int, sensor: int) -> int:
+    temperature = _device(handle).get("temperature_c")
+    if temperature is None:
+        raise NVMLError("temperature not supported")
+    return temperature
+
+
+def _field(handle: int, key: str):
+    value = _device(handle).get(key)
+    if value is None:
+        raise NVMLError(f"{key} not supported")
+    return value
+
+
+def nvmlDeviceGetPowerUsage(handle: int) -> int:
+    return _field(handle, "power_mw")
+
+
+def nvmlDeviceGetEnforcedPowerLimit(handle: int) -> int:
+    return _field(handle, "power_limit_mw")
+
+
+def nvmlDeviceGetClockInfo(handle: int, clock_type: int) -> int:
+    return _field(handle, "sm_clock_mhz" if clock_type == NVML_CLOCK_SM else "mem_clock_mhz")
+
+
+def nvmlDeviceGetCurrentClocksThrottleReasons(handle: int) -> int:
+    return _field(handle, "throttle_reasons")
+
+
+def nvmlDeviceGetTotalEccErrors(handle: int, error_type: int, counter_type: int) -> int:
+    return _field(handle, "ecc_corrected" if error_type == NVML_MEMORY_ERROR_TYPE_CORRECTED else "ecc_uncorrected")
+
+
+def nvmlDeviceGetPcieThroughput(handle: int, counter: int) -> int:
+    return _field(handle, "pcie_rx_kbps" if counter == NVML_PCIE_UTIL_RX_BYTES else "pcie_tx_kbps")
+
+
+def nvmlDeviceGetComputeRunningProcesses(handle: int) -> List[ProcessInfo]:
+    return [
+        ProcessInfo(pid=p["pid"], usedGpuMemory=p["used_mem_mb"] * _MB)
+        for p in _device(handle).get("processes", [])
+    ]
+
+
+def nvmlDeviceGetProcessUtilization(handle: int, timeStamp: int) -> List[ProcessUtilizationSample]:
+    # 与真实 NVML 一致：没有新样本时抛出 NOT_FOUND
+    samples = [
+        ProcessUtilizationSample(p["pid"], timeStamp + 1, p["sm_util_pct"], 0, 0, 0)
+        for p in _device(handle).get("processes", [])
+        if p.get("sm_util_pct") is not None
+    ]
+    if not samples:
+        raise NVMLError("no process utilization samples")
+    return samples
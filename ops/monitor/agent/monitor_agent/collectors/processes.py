@@ -0,0 +1,197 @@
+"""
+进程采集器（top-N）
+
+遍历 /proc/[pid]/stat，按 CPU 使用率和常驻内存各取前 N 个进程（类似 top）。
+
+开销有界（5000+ 进程的主机上也是如此）：
+- 每个进程每轮只读一次 /proc/[pid]/stat（os.open/os.read，不经过文件对象）
+- 上一轮的 CPU 时间按 pid 保存为 (starttime, jiffies) 紧凑元组，每轮重建，
+  退出的进程随之清理；starttime 变化视为 pid 被复用
+- 前 N 名用大小为 N 的小顶堆选择（O(P log N)），不对全部进程排序
+- uid/cmdline 只为入选进程读取，并按 (pid, starttime) 缓存
+- 遍历在线程池中执行，不阻塞事件循环
+"""
+
+import asyncio
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .gpu_processes import _read_proc_info, lookup_username
+
+
+# 允许配置的最大 N
+MAX_TOP_N = 50
+
+# 单次读取 /proc/[pid]/stat 的大小（comm 最长 16 字节，整行通常不足 400 字节）
+STAT_READ_SIZE = 1024
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def parse_stat(content: bytes) -> Optional[Tuple[str, int, int, int, int]]:
+    """
+    解析 /proc/[pid]/stat
+
+    comm 可能含空格和括号，按最后一个 ")" 切分（proc(5)）。
+
+    Returns:
+        (comm, utime + stime, 线程数, starttime, rss 页数)，解析失败返回 None
+    """
+    start = content.find(b"(")
+    end = content.rfind(b")")
+    if start < 0 or end < start:
+        return None
+    fields = content[end + 2:].split()
+    if len(fields) < 22:
+        return None
+    try:
+        # 字段 14/15 utime/stime、20 num_threads、22 starttime、24 rss（从 1 计，fields[0] 为字段 3）
+        return (
+            content[start + 1:end].decode("utf-8", "replace"),
+            int(fields[11]) + int(fields[12]),
+            int(fields[17]),
+            int(fields[19]),
+            int(fields[21]),
+        )
+    except ValueError:
+        return None
+
+
+def _read_stat(path: str) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # 进程已退出
+        return None
+    try:
+        return os.read(fd, STAT_READ_SIZE)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _push(heap: List[Tuple], n: int, item: Tuple):
+    """维护大小为 n 的小顶堆（堆顶为当前第 n 名）"""
+    if len(heap) < n:
+        heapq.heappush(heap, item)
+    elif item[0] > heap[0][0]:
+        heapq.heapreplace(heap, item)
+
+
+class ProcessSampler:
+    """增量进程采样（保存上一轮每个 pid 的 CPU 时间）"""
+
+    def __init__(self, proc_root: str = "/proc"):
+        self._proc_root = proc_root
+        # pid -> (starttime, utime + stime)
+        self._prev: Dict[int, Tuple[int, int]] = {}
+        self._prev_ts: Optional[float] = None
+        # (pid, starttime) -> (uid, cmdline)
+        self._info: Dict[Tuple[int, int], Tuple[Optional[int], str]] = {}
+        # 超时后线程仍在运行时，下一轮等待其结束而不是并发修改状态
+        self._lock = threading.Lock()
+
+    def sample(self, top_n: int) -> Dict:
+        """
+        遍历一次 /proc
+
+        Returns:
+            {
+                "total": 进程数,
+                "by_cpu": [{"pid", "name", "user", "cpu_pct", "rss_bytes", "threads", "cmdline"}],
+                "by_rss": [...]
+            }
+            首轮没有 CPU 时间差，by_cpu 为空
+        """
+        with self._lock:
+            return self._sample(top_n)
+
+    def _sample(self, top_n: int) -> Dict:
+        now = time.monotonic()
+        elapsed = now - self._prev_ts if self._prev_ts is not None else None
+        prev = self._prev
+        current: Dict[int, Tuple[int, int]] = {}
+        # 堆元素：(排序键, pid, comm, CPU 时间差, 线程数, starttime, rss 页数)
+        by_cpu: List[Tuple] = []
+        by_rss: List[Tuple] = []
+
+        with os.scandir(self._proc_root) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                content = _read_stat(f"{self._proc_root}/{name}/stat")
+                if content is None:
+                    continue
+                parsed = parse_stat(content)
+                if parsed is None:
+                    continue
+                pid = int(name)
+                comm, jiffies, threads, starttime, rss = parsed
+                current[pid] = (starttime, jiffies)
+
+                last = prev.get(pid)
+                delta = jiffies - last[1] if last is not None and last[0] == starttime else None
+                if delta is not None:
+                    _push(by_cpu, top_n, (delta, pid, comm, delta, threads, starttime, rss))
+                _push(by_rss, top_n, (rss, pid, comm, delta, threads, starttime, rss))
+
+        self._prev = current
+        self._prev_ts = now
+
+        winners = {(item[1], item[5]) for item in by_cpu + by_rss}
+        self._info = {key: info for key, info in self._info.items() if key in winners}
+
+        def describe(item: Tuple) -> Dict:
+            _, pid, comm, delta, threads, starttime, rss = item
+            info = self._info.get((pid, starttime))
+            if info is None:
+                info = self._info[(pid, starttime)] = _read_proc_info(pid, self._proc_root)
+            uid, cmdline = info
+            cpu_pct = None
+            if delta is not None and elapsed:
+                cpu_pct = round(delta / _CLK_TCK / elapsed * 100, 1)
+            return {
+                "pid": pid,
+                "name": comm,
+                "user": lookup_username(uid),
+                "cpu_pct": cpu_pct,
+                "rss_bytes": rss * _PAGE_SIZE,
+                "threads": threads,
+                "cmdline": cmdline,
+            }
+
+        return {
+            "total": len(current),
+            "by_cpu": [describe(item) for item in sorted(by_cpu, reverse=True)],
+            "by_rss": [describe(item) for item in sorted(by_rss, reverse=True)],
+        }
+
+
+_sampler: Optional[ProcessSampler] = None
+
+
+async def get_top_processes(top_n: int = 10) -> Optional[Dict]:
+    """
+    采集 CPU 和常驻内存占用最高的进程
+
+    Args:
+        top_n: 每个排行的进程数（最多 MAX_TOP_N）
+
+    Returns:
+        见 ProcessSampler.sample，/proc 不可用时返回 None
+    """
+    global _sampler
+    if _sampler is None:
+        _sampler = ProcessSampler()
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, _sampler.sample, min(top_n, MAX_TOP_N))
+    except OSError:
+        return None
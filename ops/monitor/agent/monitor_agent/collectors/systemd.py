@@ -5,13 +5,19 @@ systemd 服务采集器
 """
 
 import asyncio
-from typing import List, Dict
+import os
+import time
+from typing import List, Dict, Optional, Tuple
+
+from monitor_agent.utils import run_command
 
 
 async def get_service_status(units: List[str]) -> List[Dict]:
     """
     采集 systemd 服务状态
 
+    所有服务通过一次 `systemctl show` 批量查询，一次解析完成。
+
     Args:
         units: 服务列表（如 ["nginx.service", "docker.service"]）
 
@@ -22,138 +28,223 @@ async def get_service_status(units: List[str]) -> List[Dict]:
     if not units:
         return []
 
-    # 并发查询所有服务
-    tasks = [_query_single_service(unit) for unit in units]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        returncode, stdout = await run_command(
+            ["systemctl", "show", "--property=Names,ActiveState,SubState", "--", *units]
+        )
+    except Exception:
+        return [_unknown_status(unit) for unit in units]
 
-    # 过滤掉失败的结果
-    return [r for r in results if isinstance(r, dict)]
+    if returncode != 0:
+        # 查询失败，返回未知状态
+        return [_unknown_status(unit) for unit in units]
 
+    return parse_show_output(stdout.decode(errors="replace"), units)
 
-async def _query_single_service(unit: str) -> Dict:
-    """
-    查询单个服务状态
 
-    Args:
-        unit: 服务名称
+def _unknown_status(unit: str) -> Dict:
+    return {
+        "name": unit,
+        "active_state": "unknown",
+        "sub_state": "unknown"
+    }
 
-    Returns:
-        服务状态字典
-    """
-    try:
-        cmd = f"systemctl show {unit} --property=ActiveState,SubState"
 
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+def parse_show_output(output: str, units: List[str]) -> List[Dict]:
+    """
+    解析多服务 `systemctl show` 输出
 
-        stdout, stderr = await proc.communicate()
-
-        if proc.returncode != 0:
-            # 查询失败，返回未知状态
-            return {
-                "name": unit,
-                "active_state": "unknown",
-                "sub_state": "unknown"
-            }
-
-        # 解析输出
-        # 格式:
-        # ActiveState=active
-        # SubState=running
-        lines = stdout.decode().strip().split('\n')
-        active_state = "unknown"
-        sub_state = "unknown"
-
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                if key == "ActiveState":
-                    active_state = value
-                elif key == "SubState":
-                    sub_state = value
-
-        return {
-            "name": unit,
-            "active_state": active_state,
-            "sub_state": sub_state
-        }
+    输出按参数顺序每个服务一段，段之间以空行分隔:
+        Names=nginx.service
+        ActiveState=active
+        SubState=running
 
-    except Exception:
-        # 查询失败
-        return {
-            "name": unit,
-            "active_state": "unknown",
-            "sub_state": "unknown"
-        }
+        Names=docker.service
+        ...
 
+    Args:
+        output: systemctl show 标准输出
+        units: 查询时传入的服务列表（顺序与输出段一致）
 
-async def discover_services() -> List[Dict]:
+    Returns:
+        服务状态列表，顺序与 units 一致
+    """
+    blocks: List[Dict[str, str]] = []
+    current: Dict[str, str] = {}
+    for line in output.split('\n'):
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = {}
+            continue
+        if '=' in line:
+            key, value = line.split('=', 1)
+            current[key] = value
+    if current:
+        blocks.append(current)
+
+    if len(blocks) == len(units):
+        by_unit = dict(zip(units, blocks))
+    else:
+        # 段数不一致时按 Names（含别名）匹配
+        by_unit = {}
+        for block in blocks:
+            for name in block.get("Names", "").split():
+                by_unit.setdefault(name, block)
+
+    result = []
+    for unit in units:
+        block = by_unit.get(unit)
+        if block is None:
+            result.append(_unknown_status(unit))
+            continue
+        result.append({
+            "name": unit,
+            "active_state": block.get("ActiveState", "unknown"),
+            "sub_state": block.get("SubState", "unknown")
+        })
+    return result
+
+
+# 服务发现缓存有效期（秒）
+DISCOVERY_TTL = 60.0
+
+# unit 文件所在目录；目录（及其 .wants/.requires 子目录）mtime 变化即视为 unit 文件变化
+UNIT_DIRS = (
+    "/etc/systemd/system",
+    "/run/systemd/system",
+    "/usr/lib/systemd/system",
+    "/lib/systemd/system",
+)
+
+_discovery_cache: Optional[List[Dict]] = None
+_discovery_cached_at = 0.0
+_discovery_signature: Optional[Tuple] = None
+_discovery_lock: Optional[asyncio.Lock] = None
+
+
+def _unit_dirs_signature() -> Tuple:
+    """计算 unit 目录的 mtime 签名（enable/disable 会修改 .wants 目录）"""
+    signature = []
+    for path in UNIT_DIRS:
+        try:
+            signature.append((path, os.stat(path).st_mtime_ns))
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith((".wants", ".requires")) and entry.is_dir():
+                        signature.append((entry.path, entry.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(signature)
+
+
+async def discover_services(force_refresh: bool = False) -> List[Dict]:
     """
     服务发现：列出所有可用的 systemd 服务
 
+    只调用一次 `systemctl list-units` 和一次 `systemctl list-unit-files`，在内存中合并；
+    结果缓存 DISCOVERY_TTL 秒，unit 文件变化时提前失效。
+
+    Args:
+        force_refresh: 忽略缓存强制刷新
+
     Returns:
         服务列表，格式:
         [{"name": "nginx.service", "active_state": "active", "enabled": true, "description": "..."}]
     """
+    global _discovery_cache, _discovery_cached_at, _discovery_signature, _discovery_lock
+
+    if _discovery_lock is None:
+        _discovery_lock = asyncio.Lock()
+
+    async with _discovery_lock:
+        signature = _unit_dirs_signature()
+        if (
+            not force_refresh
+            and _discovery_cache is not None
+            and time.monotonic() - _discovery_cached_at < DISCOVERY_TTL
+            and signature == _discovery_signature
+        ):
+            return _discovery_cache
+
+        result = await _discover_services_uncached()
+        if result is not None:
+            _discovery_cache = result
+            _discovery_cached_at = time.monotonic()
+            _discovery_signature = signature
+        # 刷新失败时继续返回上一次结果
+        return result if result is not None else (_discovery_cache or [])
+
+
+async def _discover_services_uncached() -> Optional[List[Dict]]:
+    """执行两次 systemctl 调用并合并结果，失败返回 None"""
     try:
-        # 列出所有服务
-        cmd = "systemctl list-units --type=service --all --no-pager --no-legend"
-
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        (units_rc, units_out), (files_rc, files_out) = await asyncio.gather(
+            run_command(["systemctl", "list-units", "--type=service", "--all",
+                         "--no-pager", "--no-legend", "--plain"]),
+            run_command(["systemctl", "list-unit-files", "--type=service",
+                         "--no-pager", "--no-legend"]),
         )
+    except Exception:
+        return None
 
-        stdout, stderr = await proc.communicate()
+    if units_rc != 0:
+        return None
 
-        if proc.returncode != 0:
-            return []
+    unit_file_states = parse_unit_files(files_out.decode(errors="replace")) if files_rc == 0 else {}
+    return parse_list_units(units_out.decode(errors="replace"), unit_file_states)
 
-        # 解析输出
-        result = []
-        lines = stdout.decode().strip().split('\n')
 
-        for line in lines:
-            if not line.strip():
-                continue
+def parse_unit_files(output: str) -> Dict[str, str]:
+    """
+    解析 `systemctl list-unit-files` 输出
+
+    格式: UNIT_FILE STATE [VENDOR_PRESET]
 
-            # 格式: UNIT LOAD ACTIVE SUB DESCRIPTION
-            fields = line.split(None, 4)
-            if len(fields) >= 5:
-                unit_name = fields[0]
-                active_state = fields[2]
-                description = fields[4] if len(fields) > 4 else ""
+    Returns:
+        {unit_name: state}
+    """
+    states = {}
+    for line in output.split('\n'):
+        fields = line.split()
+        if len(fields) >= 2:
+            states[fields[0]] = fields[1]
+    return states
 
-                # 检查是否开机自启
-                enabled = await _is_service_enabled(unit_name)
 
-                result.append({
-                    "name": unit_name,
-                    "active_state": active_state,
-                    "enabled": enabled,
-                    "description": description
-                })
+def unit_file_state(unit_name: str, unit_file_states: Dict[str, str]) -> Optional[str]:
+    """
+    查找服务的 unit 文件状态
 
-        return result
+    list-unit-files 通常只列出模板（foo@.service），模板实例（foo@bar.service）
+    没有单独条目时使用模板的状态。
+    """
+    state = unit_file_states.get(unit_name)
+    if state is None:
+        prefix, sep, rest = unit_name.partition("@")
+        if sep:
+            state = unit_file_states.get(f"{prefix}@{rest[rest.rfind('.'):]}")
+    return state
 
-    except Exception:
-        return []
 
+def parse_list_units(output: str, unit_file_states: Dict[str, str]) -> List[Dict]:
+    """
+    解析 `systemctl list-units --plain` 输出并合并开机自启状态
 
-async def _is_service_enabled(unit: str) -> bool:
-    """检查服务是否开机自启"""
-    try:
-        cmd = f"systemctl is-enabled {unit}"
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, _ = await proc.communicate()
-        return stdout.decode().strip() == "enabled"
-    except Exception:
-        return False
+    格式: UNIT LOAD ACTIVE SUB DESCRIPTION
+    """
+    result = []
+    for line in output.split('\n'):
+        if not line.strip():
+            continue
+
+        fields = line.split(None, 4)
+        if len(fields) >= 4:
+            unit_name = fields[0]
+            result.append({
+                "name": unit_name,
+                "active_state": fields[2],
+                "enabled": unit_file_state(unit_name, unit_file_states) == "enabled",
+                "description": fields[4] if len(fields) > 4 else ""
+            })
+    return result
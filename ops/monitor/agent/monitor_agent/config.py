@@ -6,12 +6,23 @@
 
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import yaml
 from pydantic import BaseModel, Field
 
 
+def _default_network_exclude() -> List[str]:
+    # 延迟导入：collectors 包在导入时依赖本模块
+    from monitor_agent.collectors.network import DEFAULT_EXCLUDE
+    return list(DEFAULT_EXCLUDE)
+
+
+def _default_diskio_exclude() -> List[str]:
+    from monitor_agent.collectors.diskio import DEFAULT_EXCLUDE
+    return list(DEFAULT_EXCLUDE)
+
+
 class ProxyConfig(BaseModel):
     """代理转发配置模型"""
 
@@ -26,16 +37,84 @@ class ProxyConfig(BaseModel):
     auto_start: bool = Field(default=False, description="Agent 启动时自动启动代理")
 
 
+class DiskDiscoveryConfig(BaseModel):
+    """磁盘挂载点自动发现配置"""
+
+    enabled: bool = Field(default=False, description="是否从 /proc/self/mountinfo 自动发现真实文件系统")
+    include: List[str] = Field(default=["*"], description="挂载点通配符白名单")
+    exclude: List[str] = Field(default=["/boot*", "/snap/*", "/var/lib/docker/*", "/run/*"], description="挂载点通配符黑名单")
+
+
+class NetworkConfig(BaseModel):
+    """网卡采集配置"""
+
+    include: List[str] = Field(default=["*"], description="网卡名通配符白名单")
+    exclude: List[str] = Field(
+        default_factory=_default_network_exclude,
+        description="网卡名通配符黑名单（默认为 collectors.network.DEFAULT_EXCLUDE）"
+    )
+
+
+class CollectorOverride(BaseModel):
+    """单个采集器的调度覆盖（未设置的字段使用注册表默认值）"""
+
+    enabled: Optional[bool] = Field(default=None, description="是否启用")
+    interval: Optional[float] = Field(default=None, gt=0, description="采样周期（秒）")
+    timeout: Optional[float] = Field(default=None, gt=0, description="单次采集超时（秒）")
+
+
+class PushConfig(BaseModel):
+    """推送模式配置（Agent 主动上报到中心节点）"""
+
+    enabled: bool = Field(default=False, description="是否启用推送模式")
+    url: str = Field(..., description="中心节点 ingest 地址，如 http://center:8080/api/ingest")
+    sample_interval: float = Field(default=5.0, description="取样间隔（秒）")
+    batch_size: int = Field(default=6, ge=1, description="每批样本数")
+    max_queue: int = Field(default=120, ge=1, description="待发送批次上限，超出丢弃最旧批次")
+    timeout: float = Field(default=10.0, description="单次 POST 超时（秒）")
+    max_backoff: float = Field(default=300.0, description="发送失败时最大退避时间（秒）")
+    gzip_level: int = Field(default=6, ge=1, le=9, description="gzip 压缩级别")
+
+
+class SpoolConfig(BaseModel):
+    """本地样本环形文件配置（中心节点中断后补齐历史）"""
+
+    enabled: bool = Field(default=True, description="是否写入本地样本环形文件")
+    path: str = Field(default="/var/lib/monitor-agent/spool.bin", description="环形文件路径")
+    interval: float = Field(default=5.0, description="写入间隔（秒）")
+    capacity: int = Field(default=17280, ge=1, description="记录条数（默认 5 秒一条，保留 24 小时）")
+
+
 class AgentConfig(BaseModel):
     """Agent 配置模型"""
 
     node_id: str = Field(..., description="节点唯一标识")
     listen: str = Field(default="0.0.0.0:9109", description="监听地址")
     token: str = Field(..., description="认证 Token")
+    cpu_window_s: float = Field(default=5.0, description="CPU 使用率统计窗口（秒）")
     disks: List[str] = Field(default=["/"], description="监控的磁盘挂载点")
+    disk_discovery: DiskDiscoveryConfig = Field(default_factory=DiskDiscoveryConfig, description="磁盘挂载点自动发现")
+    disk_timeout: float = Field(default=2.0, description="单个挂载点 statvfs 超时（秒），超时返回上一次的值")
+    diskio_exclude: List[str] = Field(
+        default_factory=_default_diskio_exclude,
+        description="磁盘 I/O 采集排除的设备名通配符（默认为 collectors.diskio.DEFAULT_EXCLUDE）"
+    )
+    network: NetworkConfig = Field(default_factory=NetworkConfig, description="网卡采集配置")
     services_allowlist: List[str] = Field(default=[], description="允许查询的 systemd 服务列表")
-    gpu: str = Field(default="auto", description="GPU 采集模式: auto|off|nvidia")
+    gpu: str = Field(default="auto", description="GPU 采集后端: auto|off|nvidia|nvml|smi-loop|smi|fake")
+    gpu_processes: bool = Field(default=True, description="是否采集每张 GPU 上的计算进程（pid/用户/命令行）")
+    top_processes: int = Field(
+        default=10, ge=0, le=50, description="按 CPU 和常驻内存各输出前 N 个进程（0 禁用）"
+    )
+    containers: bool = Field(
+        default=True, description="是否按容器（Docker/containerd/CRI-O/Podman）采集 CPU、内存和 GPU 进程"
+    )
+    collectors: Dict[str, CollectorOverride] = Field(
+        default_factory=dict, description="按采集器覆盖采样周期/超时/启用状态（见 monitor_agent.collectors）"
+    )
     proxy: Optional[ProxyConfig] = Field(default=None, description="代理转发配置（可选）")
+    push: Optional[PushConfig] = Field(default=None, description="推送模式配置（可选）")
+    spool: SpoolConfig = Field(default_factory=SpoolConfig, description="本地样本环形文件")
 
     @property
     def host(self) -> str:
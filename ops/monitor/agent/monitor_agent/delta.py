@@ -0,0 +1,79 @@
+"""
+增量快照
+
+/v1/snapshot?since=<seq> 返回相对客户端已有样本（base）的增量文档：
+
+    {
+        "epoch": "...", "seq": 120, "base_seq": 118,
+        "changed": {"ts": "...", "cpu_pct": 37.5, "cpu": {...}},
+        "lists": {
+            "gpus": {"key": "index", "upsert": [{...}], "remove": []},
+            "services": {"key": "name", "upsert": [], "remove": ["old.service"]}
+        }
+    }
+
+- changed: 值发生变化的顶层字段（整体替换）
+- lists: 按主键比较的列表字段，只包含新增/变化的条目和被移除的主键
+"""
+
+from typing import Any, Dict, List
+
+
+# 按主键做条目级增量的列表字段：{字段: 主键}
+KEYED_LISTS: Dict[str, str] = {
+    "gpus": "index",
+    "services": "name",
+    "disks": "mount",
+}
+
+# 不参与比较的字段（由 make_delta 单独写入）
+_HEADER_FIELDS = ("epoch", "seq")
+
+
+def _diff_list(key: str, base: List[Dict], cur: List[Dict]) -> Dict[str, Any]:
+    base_by_key = {item.get(key): item for item in base}
+    cur_keys = set()
+    upsert = []
+    for item in cur:
+        item_key = item.get(key)
+        cur_keys.add(item_key)
+        if base_by_key.get(item_key) != item:
+            upsert.append(item)
+    remove = [k for k in base_by_key if k not in cur_keys]
+    return {"key": key, "upsert": upsert, "remove": remove}
+
+
+def make_delta(base: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    计算两个快照之间的增量
+
+    Args:
+        base: 客户端已有的快照
+        cur: 当前快照
+
+    Returns:
+        增量文档（格式见模块说明）
+    """
+    changed: Dict[str, Any] = {}
+    lists: Dict[str, Any] = {}
+
+    for field, value in cur.items():
+        if field in _HEADER_FIELDS:
+            continue
+        base_value = base.get(field)
+        if value == base_value:
+            continue
+
+        key = KEYED_LISTS.get(field)
+        if key is not None and isinstance(value, list) and isinstance(base_value, list):
+            lists[field] = _diff_list(key, base_value, value)
+        else:
+            changed[field] = value
+
+    return {
+        "epoch": cur.get("epoch"),
+        "seq": cur.get("seq"),
+        "base_seq": base.get("seq"),
+        "changed": changed,
+        "lists": lists,
+    }
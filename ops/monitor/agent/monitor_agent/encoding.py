@@ -0,0 +1,75 @@
+"""
+响应编码协商
+
+/v1/snapshot 按请求头选择编码：
+- Accept 包含 application/msgpack 且已安装 msgpack 时返回 MessagePack，否则返回 JSON
+- Accept-Encoding 包含 gzip 且响应体不小于 GZIP_MIN_BYTES 时 gzip 压缩
+  （小快照压缩收益低于 CPU 开销；服务列表、GPU 进程列表较大时才值得压缩）
+
+msgpack 为可选依赖（pip install msgpack），未安装时始终返回 JSON。
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖
+    msgpack = None
+
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPE = "application/msgpack"
+
+# 兼容部分客户端使用的非标准类型名
+_MSGPACK_ALIASES = (MSGPACK_TYPE, "application/x-msgpack")
+
+# 小于该大小的响应体不压缩（字节）
+GZIP_MIN_BYTES = 4096
+
+GZIP_LEVEL = 6
+
+
+def _tokens(header: Optional[str]) -> Iterator[str]:
+    """解析 Accept / Accept-Encoding，跳过 q=0 的条目"""
+    for item in (header or "").split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        rejected = False
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    rejected = float(value) == 0
+                except ValueError:
+                    pass
+        if not rejected:
+            yield parts[0].lower()
+
+
+def choose_media_type(accept: Optional[str]) -> str:
+    """根据 Accept 选择响应编码"""
+    if msgpack is not None and any(t in _MSGPACK_ALIASES for t in _tokens(accept)):
+        return MSGPACK_TYPE
+    return JSON_TYPE
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """客户端是否接受 gzip"""
+    return "gzip" in _tokens(accept_encoding)
+
+
+def encode(document: Dict[str, Any], media_type: str = JSON_TYPE) -> bytes:
+    """按媒体类型编码文档"""
+    if media_type == MSGPACK_TYPE:
+        return msgpack.packb(document, use_bin_type=True)
+    return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def maybe_gzip(body: bytes) -> Optional[bytes]:
+    """响应体足够大时返回 gzip 压缩结果，否则返回 None"""
+    if len(body) < GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
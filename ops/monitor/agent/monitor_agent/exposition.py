@@ -0,0 +1,274 @@
+"""
+Prometheus 文本格式导出（/metrics）
+
+Prometheus 可以直接以 1 秒的间隔抓取 Agent，不经过中心节点。
+指标直接从采样器发布的最新样本（Sample.snapshot）渲染，请求路径上不调用采集器、
+不构造 pydantic 模型：
+
+- `名称{标签}` 前缀在首次出现时格式化一次并缓存（LabelCache），之后只拼接数值
+- 同一样本（seq 相同）的渲染结果（含 gzip 压缩结果）缓存，高频抓取在样本更新前不重复渲染
+
+所有序列带 node 标签（配置中的 node_id）。
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from monitor_agent.config import get_config
+from monitor_agent.encoding import maybe_gzip
+
+
+_MB = 1024 * 1024
+_MHZ = 1000 * 1000
+
+# 指标族：名称 -> (类型, 说明, 标签名（node 之外）)
+FAMILIES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "monitor_sample_seq": ("gauge", "Sequence number of the latest published sample.", ()),
+    "monitor_sample_age_seconds": (
+        "gauge", "Age of each collector's data when the latest sample was published.", ("collector",),
+    ),
+    "monitor_sample_collected_timestamp_seconds": (
+        "gauge", "Unix time of each collector's last completed run (age = time() - value).", ("collector",),
+    ),
+    "monitor_cpu_usage_percent": ("gauge", "Total CPU usage over the CPU window.", ()),
+    "monitor_cpu_mode_percent": ("gauge", "CPU usage by mode over the CPU window.", ("mode",)),
+    "monitor_cpu_core_usage_percent": ("gauge", "Per-core CPU usage over the CPU window.", ("core",)),
+    "monitor_memory_total_bytes": ("gauge", "Total memory.", ()),
+    "monitor_memory_used_bytes": ("gauge", "Used memory (MemTotal - MemAvailable).", ()),
+    "monitor_memory_available_bytes": ("gauge", "Available memory.", ()),
+    "monitor_memory_used_percent": ("gauge", "Memory usage.", ()),
+    "monitor_swap_total_bytes": ("gauge", "Total swap.", ()),
+    "monitor_swap_used_bytes": ("gauge", "Used swap.", ()),
+    "monitor_load_average": ("gauge", "System load average.", ("period",)),
+    "monitor_disk_total_bytes": ("gauge", "Filesystem size.", ("mount",)),
+    "monitor_disk_used_bytes": ("gauge", "Filesystem used bytes.", ("mount",)),
+    "monitor_disk_used_percent": ("gauge", "Filesystem usage.", ("mount",)),
+    "monitor_disk_stale": ("gauge", "1 if the last statvfs timed out and the value is stale.", ("mount",)),
+    "monitor_disk_read_bytes_per_second": ("gauge", "Block device read throughput.", ("device",)),
+    "monitor_disk_write_bytes_per_second": ("gauge", "Block device write throughput.", ("device",)),
+    "monitor_network_receive_bytes_per_second": ("gauge", "Network receive throughput.", ("interface",)),
+    "monitor_network_transmit_bytes_per_second": ("gauge", "Network transmit throughput.", ("interface",)),
+    "monitor_gpu_utilization_percent": ("gauge", "GPU utilization.", ("gpu", "name")),
+    "monitor_gpu_memory_used_bytes": ("gauge", "GPU memory used.", ("gpu", "name")),
+    "monitor_gpu_memory_total_bytes": ("gauge", "GPU memory total.", ("gpu", "name")),
+    "monitor_gpu_temperature_celsius": ("gauge", "GPU temperature.", ("gpu", "name")),
+    "monitor_gpu_power_watts": ("gauge", "GPU power draw.", ("gpu", "name")),
+    "monitor_gpu_power_limit_watts": ("gauge", "GPU enforced power limit.", ("gpu", "name")),
+    "monitor_gpu_sm_clock_hertz": ("gauge", "GPU SM clock.", ("gpu", "name")),
+    "monitor_gpu_memory_clock_hertz": ("gauge", "GPU memory clock.", ("gpu", "name")),
+    "monitor_gpu_throttled": ("gauge", "1 for each active clock throttle reason.", ("gpu", "name", "reason")),
+    "monitor_gpu_ecc_errors": ("gauge", "Volatile ECC error count since driver load.", ("gpu", "name", "type")),
+    "monitor_gpu_pcie_receive_bytes_per_second": ("gauge", "GPU PCIe receive throughput.", ("gpu", "name")),
+    "monitor_gpu_pcie_transmit_bytes_per_second": ("gauge", "GPU PCIe transmit throughput.", ("gpu", "name")),
+    "monitor_service_active": ("gauge", "1 if the systemd unit is active.", ("service",)),
+    "monitor_service_state": ("gauge", "systemd unit state (always 1).", ("service", "active_state", "sub_state")),
+    "monitor_service_cpu_percent": ("gauge", "systemd unit CPU usage (100 = one core).", ("service",)),
+    "monitor_service_memory_bytes": ("gauge", "systemd unit cgroup memory.current.", ("service",)),
+    "monitor_service_io_read_bytes_per_second": ("gauge", "systemd unit block I/O read throughput.", ("service",)),
+    "monitor_service_io_write_bytes_per_second": ("gauge", "systemd unit block I/O write throughput.", ("service",)),
+    "monitor_service_pids": ("gauge", "Number of tasks in the systemd unit cgroup.", ("service",)),
+    "monitor_container_cpu_percent": ("gauge", "Container CPU usage (100 = one core).", ("container", "name")),
+    "monitor_container_memory_bytes": ("gauge", "Container cgroup memory.current.", ("container", "name")),
+    "monitor_container_gpu_memory_bytes": (
+        "gauge", "GPU memory used by compute processes in the container.", ("container", "name"),
+    ),
+}
+
+_HEADERS: Dict[str, str] = {
+    name: f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n"
+    for name, (kind, help_text, _) in FAMILIES.items()
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value: Any) -> Optional[str]:
+    """格式化样本值，None 返回 None（不输出该序列）"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class LabelCache:
+    """预格式化的 `名称{node="...",...} ` 序列前缀"""
+
+    def __init__(self, node_id: str, maxsize: int = 8192):
+        self._node = f'node="{_escape(node_id)}"'
+        self._maxsize = maxsize
+        self._cache: Dict[Tuple[str, Tuple[Any, ...]], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def series(self, name: str, values: Tuple[Any, ...] = ()) -> str:
+        key = (name, values)
+        prefix = self._cache.get(key)
+        if prefix is None:
+            if len(self._cache) >= self._maxsize:
+                # 标签组合持续变化（如服务/挂载点频繁增减）时整体重建，避免无限增长
+                self._cache.clear()
+            labels = [self._node]
+            labels.extend(
+                f'{label}="{_escape(str(value))}"' for label, value in zip(FAMILIES[name][2], values)
+            )
+            prefix = self._cache[key] = f"{name}{{{','.join(labels)}}} "
+        return prefix
+
+
+def _columns(block: Optional[Dict[str, Any]], key: str, *fields: str) -> Iterable[Tuple[Any, ...]]:
+    """列式结构（disk_io / network）按行迭代"""
+    if not block:
+        return ()
+    return zip(block.get(key) or [], *(block.get(f) or [] for f in fields))
+
+
+class Exposition:
+    """从样本渲染 Prometheus 文本，按 seq 缓存"""
+
+    def __init__(self, node_id: str):
+        self.labels = LabelCache(node_id)
+        # {是否 gzip: (seq, 响应体, 是否已压缩)}
+        self._cache: Dict[bool, Tuple[int, bytes, bool]] = {}
+
+    def render_snapshot(self, snapshot: Dict[str, Any]) -> str:
+        """渲染快照文档（Sample.snapshot）"""
+        out: Dict[str, List[str]] = {}
+        series = self.labels.series
+
+        def emit(name: str, value: Any, *labels: Any):
+            text = format_value(value)
+            if text is not None:
+                out.setdefault(name, []).append(series(name, labels) + text)
+
+        emit("monitor_sample_seq", snapshot.get("seq"))
+        for collector, age in (snapshot.get("sample_age_s") or {}).items():
+            emit("monitor_sample_age_seconds", age, collector)
+        for collector, at in (snapshot.get("collected_at") or {}).items():
+            emit("monitor_sample_collected_timestamp_seconds", at, collector)
+
+        cpu = snapshot.get("cpu")
+        if cpu:
+            emit("monitor_cpu_usage_percent", cpu.get("cpu_pct"))
+            for mode in ("user", "system", "iowait", "steal"):
+                emit("monitor_cpu_mode_percent", cpu.get(f"{mode}_pct"), mode)
+            per_core = cpu.get("per_core_pct") or []
+            for core, pct in zip(cpu.get("core_ids") or range(len(per_core)), per_core):
+                emit("monitor_cpu_core_usage_percent", pct, core)
+        else:
+            emit("monitor_cpu_usage_percent", snapshot.get("cpu_pct"))
+
+        memory = snapshot.get("memory")
+        if memory:
+            emit("monitor_memory_total_bytes", memory.get("mem_total_bytes"))
+            emit("monitor_memory_used_bytes", memory.get("mem_used_bytes"))
+            emit("monitor_memory_available_bytes", memory.get("mem_available_bytes"))
+            emit("monitor_memory_used_percent", memory.get("mem_used_pct"))
+            emit("monitor_swap_total_bytes", memory.get("swap_total_bytes"))
+            emit("monitor_swap_used_bytes", memory.get("swap_used_bytes"))
+            for period, load in zip(("1m", "5m", "15m"), memory.get("loadavg") or []):
+                emit("monitor_load_average", load, period)
+
+        for disk in snapshot.get("disks") or []:
+            mount = disk.get("mount")
+            emit("monitor_disk_total_bytes", disk.get("total_bytes"), mount)
+            emit("monitor_disk_used_bytes", disk.get("used_bytes"), mount)
+            emit("monitor_disk_used_percent", disk.get("used_pct"), mount)
+            emit("monitor_disk_stale", bool(disk.get("stale")), mount)
+
+        for device, read_bps, write_bps in _columns(snapshot.get("disk_io"), "devices", "read_bps", "write_bps"):
+            emit("monitor_disk_read_bytes_per_second", read_bps, device)
+            emit("monitor_disk_write_bytes_per_second", write_bps, device)
+
+        for interface, rx_bps, tx_bps in _columns(snapshot.get("network"), "interfaces", "rx_bps", "tx_bps"):
+            emit("monitor_network_receive_bytes_per_second", rx_bps, interface)
+            emit("monitor_network_transmit_bytes_per_second", tx_bps, interface)
+
+        for gpu in snapshot.get("gpus") or []:
+            labels = (gpu.get("index"), gpu.get("name"))
+            emit("monitor_gpu_utilization_percent", gpu.get("util_pct"), *labels)
+            mem_used, mem_total = gpu.get("mem_used_mb"), gpu.get("mem_total_mb")
+            emit("monitor_gpu_memory_used_bytes", mem_used * _MB if mem_used is not None else None, *labels)
+            emit("monitor_gpu_memory_total_bytes", mem_total * _MB if mem_total is not None else None, *labels)
+            emit("monitor_gpu_temperature_celsius", gpu.get("temperature_c"), *labels)
+            emit("monitor_gpu_power_watts", gpu.get("power_w"), *labels)
+            emit("monitor_gpu_power_limit_watts", gpu.get("power_limit_w"), *labels)
+            sm_clock, mem_clock = gpu.get("sm_clock_mhz"), gpu.get("mem_clock_mhz")
+            emit("monitor_gpu_sm_clock_hertz", sm_clock * _MHZ if sm_clock is not None else None, *labels)
+            emit("monitor_gpu_memory_clock_hertz", mem_clock * _MHZ if mem_clock is not None else None, *labels)
+            for reason in gpu.get("throttle_reasons") or ():
+                emit("monitor_gpu_throttled", 1, *labels, reason)
+            emit("monitor_gpu_ecc_errors", gpu.get("ecc_corrected"), *labels, "corrected")
+            emit("monitor_gpu_ecc_errors", gpu.get("ecc_uncorrected"), *labels, "uncorrected")
+            emit("monitor_gpu_pcie_receive_bytes_per_second", gpu.get("pcie_rx_bps"), *labels)
+            emit("monitor_gpu_pcie_transmit_bytes_per_second", gpu.get("pcie_tx_bps"), *labels)
+
+        for service in snapshot.get("services") or []:
+            name, active_state = service.get("name"), service.get("active_state")
+            emit("monitor_service_active", active_state == "active", name)
+            emit("monitor_service_state", 1, name, active_state, service.get("sub_state"))
+            emit("monitor_service_cpu_percent", service.get("cpu_pct"), name)
+            emit("monitor_service_memory_bytes", service.get("mem_bytes"), name)
+            emit("monitor_service_io_read_bytes_per_second", service.get("io_read_bps"), name)
+            emit("monitor_service_io_write_bytes_per_second", service.get("io_write_bps"), name)
+            emit("monitor_service_pids", service.get("pids"), name)
+
+        for container in snapshot.get("containers") or []:
+            labels = (container.get("id"), container.get("name"))
+            emit("monitor_container_cpu_percent", container.get("cpu_pct"), *labels)
+            emit("monitor_container_memory_bytes", container.get("mem_bytes"), *labels)
+            gpu_mem = container.get("gpu_mem_mb")
+            emit("monitor_container_gpu_memory_bytes", gpu_mem * _MB if gpu_mem is not None else None, *labels)
+
+        parts = []
+        for name, lines in out.items():
+            parts.append(_HEADERS[name])
+            parts.append("\n".join(lines))
+            parts.append("\n")
+        return "".join(parts)
+
+    def render(self, sample, accept_gzip: bool = False) -> Tuple[bytes, bool]:
+        """
+        渲染样本（同一 seq 只渲染一次）
+
+        Returns:
+            (响应体, 是否已 gzip 压缩)
+        """
+        cached = self._cache.get(accept_gzip)
+        if cached is not None and cached[0] == sample.seq:
+            return cached[1], cached[2]
+
+        plain = self._cache.get(False)
+        if plain is not None and plain[0] == sample.seq:
+            body = plain[1]
+        else:
+            body = self.render_snapshot(sample.snapshot).encode()
+            self._cache[False] = (sample.seq, body, False)
+
+        if not accept_gzip:
+            return body, False
+        compressed = maybe_gzip(body)
+        result = (compressed, True) if compressed is not None else (body, False)
+        self._cache[True] = (sample.seq, result[0], result[1])
+        return result
+
+
+_exposition: Optional[Exposition] = None
+
+
+def get_exposition() -> Exposition:
+    """获取全局导出实例"""
+    global _exposition
+    if _exposition is None:
+        _exposition = Exposition(get_config().node_id)
+    return _exposition
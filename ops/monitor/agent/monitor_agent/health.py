@@ -0,0 +1,160 @@
+"""
+健康检查
+
+/v1/health 默认只读取采样器记录的各采集器运行状态（CollectorTelemetry），
+不调用任何采集器：负载均衡器和巡检脚本的高频探测不会再 fork nvidia-smi / systemctl。
+
+    - 尚未完成首次采集: pending（超过 STALE_INTERVALS 个周期仍未完成时为 degraded）
+    - 从未成功: error
+    - 最近一次失败，或最近成功已超过 STALE_INTERVALS 个周期: degraded
+    - 其它: ok
+
+?deep=1 时实际运行 CPU、磁盘、GPU、systemd 采集器（并发执行，每个最多 DEEP_TIMEOUT 秒）。
+FastAPI 应用与轻量运行时共用。
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+from monitor_agent.config import AgentConfig
+from monitor_agent.collectors import (
+    get_cpu_percent,
+    get_disk_usage,
+    get_gpu_stats,
+    get_service_status,
+)
+
+
+# 最近一次成功采集超过多少个采样周期视为停滞
+STALE_INTERVALS = 3
+
+# ?deep=1 时每个采集器的超时（秒）
+DEEP_TIMEOUT = 10.0
+
+
+def _format_ts(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.utcfromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _overall(checks: Dict[str, str]) -> str:
+    return "degraded" if any(c in ("error", "degraded") for c in checks.values()) else "ok"
+
+
+def _evaluate(name: str, telemetry, result: Any, now: float) -> Tuple[str, Optional[str]]:
+    stale_after = telemetry.interval_s * STALE_INTERVALS
+    if telemetry.runs == 0:
+        if telemetry.last_started is not None and now - telemetry.last_started > stale_after:
+            return "degraded", f"First collection still running after {now - telemetry.last_started:.0f}s"
+        return "pending", "Not collected yet"
+    if telemetry.last_success is None:
+        return "error", telemetry.last_error
+    if telemetry.consecutive_failures:
+        return "degraded", f"{telemetry.consecutive_failures} consecutive failure(s): {telemetry.last_error}"
+    if now - telemetry.last_success > stale_after:
+        return "degraded", f"No successful collection for {now - telemetry.last_success:.0f}s"
+
+    # 采集器不抛异常但没有数据
+    if name == "gpu" and not result:
+        return "degraded", "GPU not available or driver not installed"
+    if name == "disk" and not result:
+        return "degraded", "No disk data available"
+    return "ok", None
+
+
+def check_health(config: AgentConfig, sampler, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    根据采集器运行状态生成健康检查结果（不调用采集器）
+
+    Args:
+        config: Agent 配置
+        sampler: 后台采样器
+        now: 当前 Unix 时间戳（测试用）
+
+    Returns:
+        {"status", "timestamp", "checks", "details", "collectors", "deep"}
+    """
+    now = time.time() if now is None else now
+    values = sampler.latest.values
+    checks: Dict[str, str] = {}
+    details: Dict[str, Optional[str]] = {}
+    collectors: Dict[str, Dict[str, Any]] = {}
+
+    for name, telemetry in sampler.telemetry.items():
+        checks[name], details[name] = _evaluate(name, telemetry, values.get(name), now)
+        collectors[name] = {
+            "interval_s": telemetry.interval_s,
+            "cost": telemetry.cost,
+            "last_success": _format_ts(telemetry.last_success),
+            "last_success_age_s": (
+                round(now - telemetry.last_success, 3) if telemetry.last_success is not None else None
+            ),
+            "last_error": telemetry.last_error,
+            "last_duration_s": telemetry.last_duration_s,
+            "consecutive_failures": telemetry.consecutive_failures,
+        }
+
+    if config.gpu == "off":
+        checks["gpu"] = "disabled"
+        details["gpu"] = "GPU monitoring disabled in config"
+
+    return {
+        "status": _overall(checks),
+        "timestamp": datetime.utcfromtimestamp(now),
+        "checks": checks,
+        "details": details,
+        "collectors": collectors,
+        "deep": False,
+    }
+
+
+async def _probe(coro: Awaitable[Any], timeout: float) -> Tuple[Any, Optional[str]]:
+    try:
+        return await asyncio.wait_for(coro, timeout), None
+    except asyncio.TimeoutError:
+        return None, f"Timed out after {timeout:g}s"
+    except Exception as e:
+        return None, str(e)
+
+
+async def deep_check(config: AgentConfig, sampler, timeout: float = DEEP_TIMEOUT) -> Dict[str, Any]:
+    """
+    实际运行 CPU、磁盘、GPU、systemd 采集器（?deep=1）
+
+    各采集器并发执行，每个最多 timeout 秒；结果覆盖 check_health 中对应的检查项。
+    """
+    probes = {
+        "cpu": get_cpu_percent(),
+        "disk": get_disk_usage(config.disks, timeout=config.disk_timeout),
+    }
+    if config.gpu != "off":
+        probes["gpu"] = get_gpu_stats()
+    if config.services_allowlist:
+        probes["systemd"] = get_service_status(config.services_allowlist[:1])
+
+    names = list(probes)
+    results = await asyncio.gather(*(_probe(probes[name], timeout) for name in names))
+
+    document = check_health(config, sampler)
+    checks, details = document["checks"], document["details"]
+    for name, (result, error) in zip(names, results):
+        if error is not None:
+            checks[name], details[name] = "error", error
+        elif name == "gpu":
+            if result:
+                checks[name], details[name] = "ok", f"NVIDIA driver available, {len(result)} GPU(s) detected"
+            else:
+                checks[name], details[name] = "degraded", "GPU not available or driver not installed"
+        elif name == "disk" and not result:
+            checks[name], details[name] = "degraded", "No disk data available"
+        else:
+            checks[name], details[name] = "ok", None
+    if "systemd" not in probes:
+        checks["systemd"], details["systemd"] = "ok", "No services configured"
+
+    document["status"] = _overall(checks)
+    document["deep"] = True
+    return document
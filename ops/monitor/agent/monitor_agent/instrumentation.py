@@ -0,0 +1,253 @@
+"""
+Agent 自身运行指标（/v1/metrics）
+
+用于判断 Agent 本身是否成为瓶颈：
+
+- 各采集器单次耗时直方图和失败次数
+- 按命令统计的子进程创建次数（nvidia-smi、systemctl、ssh 等）
+- 事件循环延迟（定时器实际触发时间与预期的差）
+- 按路由统计的请求数（按方法/状态码）和延迟直方图（到响应头发出为止）
+- 常驻内存（RSS）和打开的文件描述符数
+
+计数器和直方图桶在首次出现某个采集器/路由时分配一次，之后每次记录只是
+一次二分查找和几次整数加法；RSS 和 FD 数只在读取指标时计算。
+支持 JSON（默认）和 Prometheus 文本格式输出。
+"""
+
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# 采集器/请求耗时直方图的桶上界（秒）
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 事件循环延迟直方图的桶上界（秒）
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# 事件循环延迟的探测间隔（秒）
+LAG_PROBE_INTERVAL = 0.5
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class Histogram:
+    """固定桶直方图（桶计数预分配，observe 为 O(log 桶数)）"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # 最后一个槽位对应 +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """[(le, 累计计数)]，最后一项为 +Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def read_rss_bytes() -> Optional[int]:
+    """当前进程常驻内存（字节），非 Linux 返回 None"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def count_open_fds() -> Optional[int]:
+    """当前进程打开的文件描述符数，非 Linux 返回 None"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+class Instrumentation:
+    """Agent 运行指标"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.collector_durations: Dict[str, Histogram] = {}
+        self.collector_failures: Dict[str, int] = {}
+        self.spawns: Dict[str, int] = {}
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.loop_lag_max = 0.0
+        self.loop_lag_last = 0.0
+        # {(路由, 方法, 状态码): 次数}
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.request_durations: Dict[str, Histogram] = {}
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def observe_collector(self, name: str, duration: float, ok: bool):
+        """记录一次采集的耗时（失败也记录）"""
+        histogram = self.collector_durations.get(name)
+        if histogram is None:
+            histogram = self.collector_durations[name] = Histogram(DURATION_BUCKETS)
+            self.collector_failures[name] = 0
+        histogram.observe(duration)
+        if not ok:
+            self.collector_failures[name] += 1
+
+    def count_spawn(self, command: str):
+        """记录一次子进程创建（command 为可执行文件名）"""
+        name = os.path.basename(command)
+        self.spawns[name] = self.spawns.get(name, 0) + 1
+
+    def observe_request(self, route: str, method: str, status: int, duration: float):
+        """记录一次请求（route 为路由模板，未匹配的路径统一记为 other）"""
+        key = (route, method, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_durations.get(route)
+        if histogram is None:
+            histogram = self.request_durations[route] = Histogram(DURATION_BUCKETS)
+        histogram.observe(duration)
+
+    async def _probe_loop_lag(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self.loop_lag.observe(lag)
+            self.loop_lag_last = lag
+            if lag > self.loop_lag_max:
+                self.loop_lag_max = lag
+
+    async def start(self, interval: float = LAG_PROBE_INTERVAL):
+        """启动事件循环延迟探测"""
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = asyncio.create_task(self._probe_loop_lag(interval))
+
+    async def stop(self):
+        task = self._lag_task
+        self._lag_task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 格式"""
+        requests: Dict[str, Dict[str, Any]] = {}
+        for (route, method, status), count in sorted(self.requests.items()):
+            entry = requests.setdefault(route, {"count": 0, "by_status": {}})
+            entry["count"] += count
+            label = f"{method} {status}"
+            entry["by_status"][label] = entry["by_status"].get(label, 0) + count
+        for route, histogram in self.request_durations.items():
+            requests.setdefault(route, {"count": 0, "by_status": {}})["duration_s"] = histogram.to_dict()
+
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "process": {"rss_bytes": read_rss_bytes(), "open_fds": count_open_fds()},
+            "event_loop_lag_s": {
+                "last": round(self.loop_lag_last, 6),
+                "max": round(self.loop_lag_max, 6),
+                "histogram": self.loop_lag.to_dict(),
+            },
+            "collectors": {
+                name: {"failures": self.collector_failures.get(name, 0), "duration_s": histogram.to_dict()}
+                for name, histogram in self.collector_durations.items()
+            },
+            "subprocess_spawns": dict(self.spawns),
+            "requests": requests,
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式"""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: Dict[str, Any], hist: Histogram):
+            for le, count in hist.cumulative():
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist.sum:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+
+        rss = read_rss_bytes()
+        if rss is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.")
+            lines.append(f"process_resident_memory_bytes {rss}")
+        fds = count_open_fds()
+        if fds is not None:
+            metric("process_open_fds", "gauge", "Number of open file descriptors.")
+            lines.append(f"process_open_fds {fds}")
+        metric("process_start_time_seconds", "gauge", "Start time of the process since unix epoch in seconds.")
+        lines.append(f"process_start_time_seconds {self.started:.3f}")
+
+        metric("monitor_agent_event_loop_lag_seconds", "histogram", "Event loop timer lateness.")
+        histogram("monitor_agent_event_loop_lag_seconds", {}, self.loop_lag)
+        metric("monitor_agent_event_loop_lag_max_seconds", "gauge", "Largest event loop lag observed.")
+        lines.append(f"monitor_agent_event_loop_lag_max_seconds {self.loop_lag_max:.6f}")
+
+        metric("monitor_agent_collector_duration_seconds", "histogram", "Duration of a single collector run.")
+        for name, hist in self.collector_durations.items():
+            histogram("monitor_agent_collector_duration_seconds", {"collector": name}, hist)
+        metric("monitor_agent_collector_failures_total", "counter", "Failed or timed out collector runs.")
+        for name, count in self.collector_failures.items():
+            lines.append(f"monitor_agent_collector_failures_total{_labels({'collector': name})} {count}")
+
+        metric("monitor_agent_subprocess_spawns_total", "counter", "Child processes started, by command.")
+        for command, count in self.spawns.items():
+            lines.append(f"monitor_agent_subprocess_spawns_total{_labels({'command': command})} {count}")
+
+        metric("monitor_agent_http_requests_total", "counter", "HTTP requests, by route, method and status.")
+        for (route, method, status), count in self.requests.items():
+            labels = {"route": route, "method": method, "status": status}
+            lines.append(f"monitor_agent_http_requests_total{_labels(labels)} {count}")
+        metric("monitor_agent_http_request_duration_seconds", "histogram", "Time until response headers are sent.")
+        for route, hist in self.request_durations.items():
+            histogram("monitor_agent_http_request_duration_seconds", {"route": route}, hist)
+
+        return "\n".join(lines) + "\n"
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """获取全局运行指标实例"""
+    return _instrumentation
+
+
+def wants_prometheus(format_param: Optional[str], accept: Optional[str]) -> bool:
+    """?format=prometheus，或未指定 format 且 Accept 为 text/plain（Prometheus 抓取）时输出文本格式"""
+    if format_param:
+        return format_param.lower() in ("prometheus", "text")
+    return bool(accept) and "text/plain" in accept.lower() and "application/json" not in accept.lower()
@@ -0,0 +1,54 @@
+"""
+后台任务生命周期
+
+FastAPI 应用（monitor_agent.app）与轻量运行时（monitor_agent.lite）共用的启动/停止流程：
+采样器、本地环形文件、推送模式和代理转发。
+"""
+
+from monitor_agent.collectors.gpu import close_gpu_backend
+from monitor_agent.config import get_config
+from monitor_agent.instrumentation import get_instrumentation
+from monitor_agent.proxy_forwarder import get_proxy_manager
+from monitor_agent.pusher import get_pusher
+from monitor_agent.sampler import get_sampler
+from monitor_agent.spool import get_spool_writer
+
+
+async def startup():
+    """启动后台采样及依赖它的任务"""
+    await get_instrumentation().start()
+    await get_sampler().start()
+
+    writer = get_spool_writer()
+    if writer is not None:
+        await writer.start()
+
+    pusher = get_pusher()
+    if pusher is not None:
+        await pusher.start()
+
+    config = get_config()
+    manager = get_proxy_manager()
+    await manager.configure(config.proxy)
+    if config.proxy and config.proxy.enabled and config.proxy.auto_start:
+        try:
+            await manager.start()
+        except Exception:
+            # 仅记录状态，不阻塞 Agent 启动
+            pass
+
+
+async def shutdown():
+    """停止后台任务"""
+    await get_sampler().stop()
+    await close_gpu_backend()
+
+    writer = get_spool_writer()
+    if writer is not None:
+        await writer.stop()
+
+    pusher = get_pusher()
+    if pusher is not None:
+        await pusher.stop()
+
+    await get_instrumentation().stop()
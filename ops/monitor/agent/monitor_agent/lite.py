@@ -0,0 +1,468 @@
+"""
+轻量运行时
+
+python -m monitor_agent --lite 用 asyncio 自带的 TCP 服务器代替 FastAPI/uvicorn，
+提供与 monitor_agent.app 相同的接口（/v1/snapshot、/v1/samples、/v1/stream、/v1/health、
+/v1/services、/v1/proxy/*）、相同的 Token 校验和 {"detail": ...} 错误格式。
+不导入 FastAPI、Starlette、uvicorn 和响应模型，常驻内存更少、启动更快；
+配置加载仍使用 pydantic。
+
+快照响应直接写出采样器预编码的响应体，错误响应体按消息缓存，
+请求路径上不构造任何模型对象。只实现中心节点用到的 HTTP/1.1 子集：
+请求体需带 Content-Length（不支持分块上传），支持 keep-alive。
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+from urllib.parse import parse_qsl, urlsplit
+
+from monitor_agent.config import AgentConfig, ProxyConfig
+from monitor_agent.collectors.systemd import discover_services
+from monitor_agent.encoding import JSON_TYPE, accepts_gzip, choose_media_type, encode, maybe_gzip
+from monitor_agent.exposition import get_exposition
+from monitor_agent.health import check_health, deep_check
+from monitor_agent.instrumentation import PROMETHEUS_TYPE, get_instrumentation, wants_prometheus
+from monitor_agent.lifecycle import shutdown, startup
+from monitor_agent.proxy_forwarder import get_proxy_manager
+from monitor_agent.sampler import get_sampler
+from monitor_agent.spool import get_spool_writer
+from monitor_agent.streaming import sse_events
+
+logger = logging.getLogger(__name__)
+
+
+# 请求行 + 请求头的最大字节数
+MAX_HEADER_BYTES = 16 * 1024
+
+# 请求体最大字节数（只有 /v1/proxy/start 带请求体）
+MAX_BODY_BYTES = 64 * 1024
+
+# 等待下一个请求的超时（秒，与 uvicorn 的 keep-alive 默认值一致）
+KEEPALIVE_TIMEOUT = 5.0
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# 与 FastAPI 一致的布尔查询参数取值
+_TRUE = {"1", "true", "on", "yes"}
+_FALSE = {"0", "false", "off", "no"}
+
+_SERVICE_FIELDS = ("name", "active_state", "enabled", "description")
+
+
+class HTTPError(Exception):
+    """处理请求失败，返回 {"detail": ...}"""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]  # 键为小写
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = JSON_TYPE
+    headers: Dict[str, str] = field(default_factory=dict)
+    # 不为 None 时为流式响应（逐块写出，结束后关闭连接）
+    stream: Optional[AsyncIterator[bytes]] = None
+
+
+@lru_cache(maxsize=64)
+def _error_body(detail: str) -> bytes:
+    return encode({"detail": detail})
+
+
+def _json(document: Any) -> Response:
+    return Response(body=encode(document))
+
+
+def verify_token(config: AgentConfig, headers: Dict[str, str]):
+    """校验 Authorization: Bearer <token>（错误信息与 FastAPI 应用一致）"""
+    authorization = headers.get("authorization")
+    if not authorization:
+        raise HTTPError(401, "Missing authorization header")
+
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPError(401, "Invalid authorization header format")
+
+    if parts[1] != config.token:
+        raise HTTPError(401, "Invalid token")
+
+
+def _param(query: Dict[str, str], name: str, convert: Callable[[str], Any], default: Any = None,
+           required: bool = False, lo: Optional[float] = None, hi: Optional[float] = None) -> Any:
+    raw = query.get(name)
+    if raw is None:
+        if required:
+            raise HTTPError(422, f"Missing query parameter: {name}")
+        return default
+    try:
+        value = convert(raw)
+    except ValueError:
+        raise HTTPError(422, f"Invalid query parameter: {name}")
+    if (lo is not None and value < lo) or (hi is not None and value > hi):
+        raise HTTPError(422, f"Query parameter out of range: {name}")
+    return value
+
+
+def _bool(raw: str) -> bool:
+    value = raw.lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(raw)
+
+
+class LiteApp:
+    """路由与请求处理（不含 HTTP 解析，便于测试）"""
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+        # {path: {method: (handler, 是否需要 Token)}}
+        self._routes: Dict[str, Dict[str, Any]] = {
+            "/v1/snapshot": {"GET": (self.snapshot, True)},
+            "/v1/samples": {"GET": (self.samples, True)},
+            "/v1/stream": {"GET": (self.stream, True)},
+            "/v1/health": {"GET": (self.health, False)},
+            "/v1/metrics": {"GET": (self.metrics, True)},
+            "/metrics": {"GET": (self.prometheus, True)},
+            "/v1/services": {"GET": (self.services, True)},
+            "/v1/proxy/status": {"GET": (self.proxy_status, True)},
+            "/v1/proxy/start": {"POST": (self.proxy_start, True)},
+            "/v1/proxy/stop": {"POST": (self.proxy_stop, True)},
+        }
+
+    async def dispatch(self, request: Request) -> Response:
+        """处理一个请求，错误转换为 {"detail": ...} 响应"""
+        try:
+            methods = self._routes.get(request.path)
+            if methods is None:
+                raise HTTPError(404, "Not Found")
+            route = methods.get(request.method)
+            if route is None:
+                raise HTTPError(405, "Method Not Allowed")
+            handler, protected = route
+            if protected:
+                verify_token(self.config, request.headers)
+            return await handler(request)
+        except HTTPError as e:
+            return Response(status=e.status, body=_error_body(e.detail))
+        except Exception as e:
+            logger.exception(f"{request.method} {request.path} failed: {e}")
+            return Response(status=500, body=_error_body("Internal Server Error"))
+
+    async def snapshot(self, request: Request) -> Response:
+        since = _param(request.query, "since", int)
+        media_type = choose_media_type(request.headers.get("accept"))
+        body, gzipped = get_sampler().encoded_snapshot(
+            since, media_type, accepts_gzip(request.headers.get("accept-encoding"))
+        )
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        return Response(body=body, content_type=media_type, headers=headers)
+
+    async def samples(self, request: Request) -> Response:
+        start = _param(request.query, "from", float, required=True)
+        end = _param(request.query, "to", float)
+        limit = _param(request.query, "limit", int, default=20000, lo=1, hi=100000)
+
+        writer = get_spool_writer()
+        if writer is None:
+            raise HTTPError(404, "Spool is disabled")
+
+        samples = writer.spool.read_range(start, end if end is not None else time.time(), limit)
+        body = encode({"node_id": self.config.node_id, "samples": samples})
+        headers = {}
+        if accepts_gzip(request.headers.get("accept-encoding")):
+            compressed = maybe_gzip(body)
+            if compressed is not None:
+                body = compressed
+                headers["Content-Encoding"] = "gzip"
+        return Response(body=body, headers=headers)
+
+    async def stream(self, request: Request) -> Response:
+        min_interval = _param(request.query, "min_interval", float, default=0.0, lo=0, hi=60)
+        return Response(
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            stream=sse_events(get_sampler(), min_interval),
+        )
+
+    async def health(self, request: Request) -> Response:
+        deep = _param(request.query, "deep", _bool, default=False)
+        if deep:
+            document = await deep_check(self.config, get_sampler())
+        else:
+            document = check_health(self.config, get_sampler())
+        document["timestamp"] = document["timestamp"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        return _json(document)
+
+    async def metrics(self, request: Request) -> Response:
+        instrumentation = get_instrumentation()
+        if wants_prometheus(request.query.get("format"), request.headers.get("accept")):
+            return Response(body=instrumentation.prometheus().encode(), content_type=PROMETHEUS_TYPE)
+        return _json(instrumentation.to_dict())
+
+    async def prometheus(self, request: Request) -> Response:
+        body, gzipped = get_exposition().render(
+            get_sampler().latest, accepts_gzip(request.headers.get("accept-encoding"))
+        )
+        headers = {"Content-Encoding": "gzip"} if gzipped else {}
+        return Response(body=body, content_type=PROMETHEUS_TYPE, headers=headers)
+
+    def route(self, path: str) -> str:
+        """请求路径对应的路由（用于指标，未匹配的路径为 other）"""
+        return path if path in self._routes else "other"
+
+    async def services(self, request: Request) -> Response:
+        refresh = _param(request.query, "refresh", _bool, default=False)
+        try:
+            services = await discover_services(force_refresh=refresh)
+        except Exception as e:
+            raise HTTPError(500, f"Failed to discover services: {str(e)}")
+        return _json([
+            {key: s.get(key, "" if key == "description" else None) for key in _SERVICE_FIELDS}
+            for s in services
+        ])
+
+    async def _proxy_status(self) -> Response:
+        status = await get_proxy_manager().get_status()
+        return _json(status.__dict__)
+
+    async def proxy_status(self, request: Request) -> Response:
+        return await self._proxy_status()
+
+    async def proxy_start(self, request: Request) -> Response:
+        override = None
+        if request.body:
+            try:
+                payload = json.loads(request.body)
+                if payload is not None and not isinstance(payload, dict):
+                    raise ValueError("request body must be an object")
+                if payload and payload.get("config") is not None:
+                    override = ProxyConfig(**payload["config"])
+            except (ValueError, TypeError) as e:
+                raise HTTPError(422, f"Invalid request body: {e}")
+
+        manager = get_proxy_manager()
+        await manager.configure(override if override is not None else self.config.proxy)
+        try:
+            await manager.start(config_override=override)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        except FileNotFoundError as e:
+            raise HTTPError(500, str(e))
+        return await self._proxy_status()
+
+    async def proxy_stop(self, request: Request) -> Response:
+        await get_proxy_manager().stop()
+        return await self._proxy_status()
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """
+    读取一个请求
+
+    Returns:
+        请求；客户端在请求开始前关闭连接时返回 None
+
+    Raises:
+        HTTPError: 请求格式错误或过大
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HTTPError(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "Request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    if not version.startswith("HTTP/1."):
+        raise HTTPError(400, "Unsupported HTTP version")
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPError(400, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(400, "Chunked request body is not supported")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    return Request(method=method.upper(), path=url.path, query=query, headers=headers, body=body, version=version)
+
+
+def _keep_alive(request: Request) -> bool:
+    connection = request.headers.get("connection", "").lower()
+    if request.version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _head(status: int, content_type: str, headers: Dict[str, str],
+          length: Optional[int], keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}", f"content-type: {content_type}"]
+    if length is not None:
+        lines.append(f"content-length: {length}")
+    lines.append("connection: keep-alive" if keep_alive else "connection: close")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class LiteServer:
+    """asyncio HTTP/1.1 服务器"""
+
+    def __init__(self, config: AgentConfig):
+        self.app = LiteApp(config)
+        self._config = config
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def port(self) -> Optional[int]:
+        """实际监听端口（配置端口为 0 时由系统分配）"""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None):
+        self._server = await asyncio.start_server(
+            self._handle,
+            host if host is not None else self._config.host,
+            port if port is not None else self._config.port,
+            limit=MAX_HEADER_BYTES,
+        )
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # 关闭仍在进行的连接（如 /v1/stream 长连接）
+        tasks = list(self._connections)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            try:
+                request = await asyncio.wait_for(read_request(reader), KEEPALIVE_TIMEOUT)
+            except HTTPError as e:
+                body = _error_body(e.detail)
+                writer.write(_head(e.status, JSON_TYPE, {}, len(body), False) + body)
+                await writer.drain()
+                return
+            if request is None:
+                return
+
+            started = time.perf_counter()
+            response = await self.app.dispatch(request)
+            get_instrumentation().observe_request(
+                self.app.route(request.path), request.method, response.status, time.perf_counter() - started
+            )
+            if response.stream is not None:
+                await self._write_stream(writer, response)
+                return
+
+            keep_alive = _keep_alive(request)
+            writer.write(_head(response.status, response.content_type, response.headers,
+                               len(response.body), keep_alive) + response.body)
+            await writer.drain()
+            if not keep_alive:
+                return
+
+    @staticmethod
+    async def _write_stream(writer: asyncio.StreamWriter, response: Response):
+        writer.write(_head(response.status, response.content_type, response.headers, None, False))
+        try:
+            async for chunk in response.stream:
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            await response.stream.aclose()
+
+
+async def serve(config: AgentConfig):
+    """启动后台任务和 HTTP 服务器，收到 SIGINT/SIGTERM 后优雅停止"""
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await startup()
+    server = LiteServer(config)
+    try:
+        await server.start()
+        logger.info(f"Monitor Agent (lite) listening on {config.host}:{server.port}")
+        await stopping.wait()
+    finally:
+        await server.stop()
+        await shutdown()
+
+
+def run(config: AgentConfig):
+    """运行轻量运行时（阻塞直到收到停止信号）"""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    asyncio.run(serve(config))
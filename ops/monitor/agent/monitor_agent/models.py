@@ -10,12 +10,69 @@ from typing import List, Optional, Dict, Literal, Any
 from pydantic import BaseModel, Field
 
 
+class CPUDetail(BaseModel):
+    """CPU 分类使用率与每核使用率"""
+    cpu_pct: float = Field(..., description="总 CPU 使用率 (0-100)")
+    user_pct: float = Field(..., description="用户态（含 nice）占比")
+    system_pct: float = Field(..., description="内核态（含 irq/softirq）占比")
+    iowait_pct: float = Field(..., description="iowait 占比")
+    steal_pct: float = Field(..., description="steal 占比（虚拟化）")
+    per_core_pct: List[float] = Field(default_factory=list, description="每核使用率")
+    core_ids: Optional[List[int]] = Field(None, description="per_core_pct 各项对应的核编号（/proc/stat 的 cpuN）")
+    window_s: float = Field(..., description="统计窗口（秒）")
+    last_pct: Optional[float] = Field(None, description="最近一个采样间隔（约 1 秒）的使用率")
+
+
+class PressureInfo(BaseModel):
+    """单个资源的 PSI（百分比，按 avg10/avg60/avg300 顺序）"""
+    some: List[float] = Field(default_factory=list, description="至少一个任务阻塞的时间占比")
+    full: Optional[List[float]] = Field(None, description="所有非空闲任务同时阻塞的时间占比")
+
+
+class MemoryInfo(BaseModel):
+    """内存、交换分区、系统负载和 PSI"""
+    mem_total_bytes: int = Field(..., description="内存总量（字节）")
+    mem_used_bytes: int = Field(..., description="已使用内存（MemTotal - MemAvailable，字节）")
+    mem_available_bytes: int = Field(..., description="可用内存（字节）")
+    mem_cached_bytes: int = Field(..., description="页缓存（Cached + SReclaimable，字节）")
+    mem_used_pct: float = Field(..., description="内存使用率 (0-100)")
+    swap_total_bytes: int = Field(..., description="交换分区总量（字节）")
+    swap_used_bytes: int = Field(..., description="交换分区已使用（字节）")
+    swap_used_pct: float = Field(..., description="交换分区使用率 (0-100)")
+    loadavg: Optional[List[float]] = Field(None, description="1/5/15 分钟平均负载")
+    psi: Optional[Dict[str, PressureInfo]] = Field(None, description="PSI（cpu/memory/io），内核未开启时为空")
+
+
 class DiskInfo(BaseModel):
     """磁盘信息"""
     mount: str = Field(..., description="挂载点")
     used_bytes: int = Field(..., description="已使用字节数")
     total_bytes: int = Field(..., description="总字节数")
     used_pct: float = Field(..., description="使用率百分比 (0-100)")
+    stale: bool = Field(default=False, description="本次采集超时，数据为上一次成功的值")
+
+
+class DiskIOInfo(BaseModel):
+    """块设备 I/O 速率（列式，各数组按 devices 顺序对齐）"""
+    devices: List[str] = Field(default_factory=list, description="设备名")
+    read_bps: List[float] = Field(default_factory=list, description="读吞吐（字节/秒）")
+    write_bps: List[float] = Field(default_factory=list, description="写吞吐（字节/秒）")
+    read_iops: List[float] = Field(default_factory=list, description="读 IOPS")
+    write_iops: List[float] = Field(default_factory=list, description="写 IOPS")
+    await_ms: List[float] = Field(default_factory=list, description="平均等待时间（毫秒）")
+
+
+class NetworkIOInfo(BaseModel):
+    """网卡收发速率（列式，各数组按 interfaces 顺序对齐）"""
+    interfaces: List[str] = Field(default_factory=list, description="网卡名")
+    rx_bps: List[float] = Field(default_factory=list, description="接收吞吐（字节/秒）")
+    tx_bps: List[float] = Field(default_factory=list, description="发送吞吐（字节/秒）")
+    rx_pps: List[float] = Field(default_factory=list, description="接收包速率（包/秒）")
+    tx_pps: List[float] = Field(default_factory=list, description="发送包速率（包/秒）")
+    rx_errs_ps: List[float] = Field(default_factory=list, description="接收错误速率（个/秒）")
+    tx_errs_ps: List[float] = Field(default_factory=list, description="发送错误速率（个/秒）")
+    rx_drop_ps: List[float] = Field(default_factory=list, description="接收丢包速率（个/秒）")
+    tx_drop_ps: List[float] = Field(default_factory=list, description="发送丢包速率（个/秒）")
 
 
 class GPUInfo(BaseModel):
@@ -26,6 +83,61 @@ class GPUInfo(BaseModel):
     mem_used_mb: int = Field(..., description="显存已使用 MB")
     mem_total_mb: int = Field(..., description="显存总量 MB")
     temperature_c: Optional[float] = Field(None, description="GPU 温度 (摄氏度)")
+    power_w: Optional[float] = Field(None, description="当前功耗 (W)")
+    power_limit_w: Optional[float] = Field(None, description="功耗上限 (W)")
+    sm_clock_mhz: Optional[int] = Field(None, description="SM 频率 (MHz)")
+    mem_clock_mhz: Optional[int] = Field(None, description="显存频率 (MHz)")
+    throttle_reasons: Optional[List[str]] = Field(
+        None, description="当前降频原因（如 sw_power_cap、hw_thermal_slowdown），空列表表示未降频"
+    )
+    ecc_corrected: Optional[int] = Field(None, description="可纠正 ECC 错误数（自驱动加载以来）")
+    ecc_uncorrected: Optional[int] = Field(None, description="不可纠正 ECC 错误数（自驱动加载以来）")
+    pcie_rx_bps: Optional[int] = Field(None, description="PCIe 接收吞吐（字节/秒，仅 NVML 后端）")
+    pcie_tx_bps: Optional[int] = Field(None, description="PCIe 发送吞吐（字节/秒，仅 NVML 后端）")
+
+
+class GPUProcessInfo(BaseModel):
+    """GPU 计算进程"""
+    gpu_index: int = Field(..., description="所在 GPU 索引")
+    pid: int = Field(..., description="进程 ID")
+    used_mem_mb: Optional[int] = Field(None, description="进程占用显存 MB")
+    sm_util_pct: Optional[float] = Field(None, description="进程 SM 利用率 (0-100)，仅 NVML 后端提供")
+    uid: Optional[int] = Field(None, description="进程所有者 uid")
+    user: Optional[str] = Field(None, description="进程所有者用户名")
+    cmdline: str = Field(default="", description="命令行（截断）")
+    container_id: Optional[str] = Field(None, description="所在容器 ID（不在容器内时为 None）")
+
+
+class ProcessInfo(BaseModel):
+    """进程（top-N 排行中的一项）"""
+    pid: int = Field(..., description="进程 ID")
+    name: str = Field(..., description="进程名（/proc/[pid]/stat 的 comm）")
+    user: Optional[str] = Field(None, description="进程所有者用户名")
+    cpu_pct: Optional[float] = Field(None, description="CPU 使用率（100 表示占满一个核），新进程为 None")
+    rss_bytes: int = Field(..., description="常驻内存（字节）")
+    threads: int = Field(..., description="线程数")
+    cmdline: str = Field(default="", description="命令行（截断）")
+
+
+class TopProcesses(BaseModel):
+    """CPU 和常驻内存占用最高的进程"""
+    total: int = Field(..., description="进程总数")
+    by_cpu: List[ProcessInfo] = Field(default_factory=list, description="按 CPU 使用率降序")
+    by_rss: List[ProcessInfo] = Field(default_factory=list, description="按常驻内存降序")
+
+
+class ContainerInfo(BaseModel):
+    """容器资源用量（cgroup）"""
+    id: str = Field(..., description="容器短 ID（12 位）")
+    name: str = Field(..., description="容器名（元数据不可读时为短 ID）")
+    runtime: str = Field(..., description="运行时: docker|containerd|cri-o|podman")
+    image: Optional[str] = Field(None, description="镜像")
+    pod: Optional[str] = Field(None, description="Kubernetes Pod（namespace/name）")
+    cpu_pct: Optional[float] = Field(None, description="CPU 使用率（100 表示占满一个核）")
+    mem_bytes: Optional[int] = Field(None, description="内存占用（memory.current，字节）")
+    pids: Optional[int] = Field(None, description="进程/线程数（pids.current）")
+    gpu_pids: List[int] = Field(default_factory=list, description="容器内的 GPU 计算进程")
+    gpu_mem_mb: Optional[int] = Field(None, description="容器内 GPU 进程占用显存之和 MB")
 
 
 class ServiceInfo(BaseModel):
@@ -33,6 +145,12 @@ class ServiceInfo(BaseModel):
     name: str = Field(..., description="服务名称")
     active_state: str = Field(..., description="激活状态: active|inactive|failed")
     sub_state: str = Field(..., description="子状态: running|exited|dead")
+    # cgroup v2 资源用量（服务未运行或非 cgroup v2 系统时为 None）
+    cpu_pct: Optional[float] = Field(None, description="CPU 使用率（100 表示占满一个核）")
+    mem_bytes: Optional[int] = Field(None, description="内存占用（memory.current，字节）")
+    io_read_bps: Optional[float] = Field(None, description="块设备读取吞吐（字节/秒）")
+    io_write_bps: Optional[float] = Field(None, description="块设备写入吞吐（字节/秒）")
+    pids: Optional[int] = Field(None, description="进程/线程数（pids.current）")
 
 
 class ServiceDiscoveryInfo(BaseModel):
@@ -43,14 +161,47 @@ class ServiceDiscoveryInfo(BaseModel):
     description: str = Field(default="", description="服务描述")
 
 
+class MetricWindow(BaseModel):
+    """单个指标在窗口内的统计"""
+    min: float = Field(..., description="最小值")
+    avg: float = Field(..., description="平均值")
+    max: float = Field(..., description="最大值")
+    last: float = Field(..., description="最后一个值")
+    n: int = Field(..., description="样本点数")
+
+
+class SnapshotWindow(BaseModel):
+    """since 之后各高频采样点的汇总（见 monitor_agent.window）"""
+    since: int = Field(..., description="窗口起点（不含），即请求的 since")
+    cpu_pct: Optional[MetricWindow] = Field(None, description="CPU 使用率（约 1 秒间隔）")
+    gpu_util_pct: Optional[MetricWindow] = Field(None, description="最忙 GPU 的使用率")
+    gpu_mem_used_mb: Optional[MetricWindow] = Field(None, description="所有 GPU 显存使用之和")
+
+
 class SnapshotResponse(BaseModel):
     """快照响应数据"""
+    epoch: Optional[str] = Field(None, description="Agent 启动标识（重启后变化）")
+    seq: Optional[int] = Field(None, description="样本序号（单调递增），可作为 since 参数获取增量")
     node_id: str = Field(..., description="节点 ID")
     ts: datetime = Field(..., description="采集时间戳")
     cpu_pct: Optional[float] = Field(None, description="CPU 使用率 (0-100)")
+    cpu: Optional[CPUDetail] = Field(None, description="CPU 分类与每核使用率")
+    memory: Optional[MemoryInfo] = Field(None, description="内存、交换分区、负载和 PSI")
     disks: List[DiskInfo] = Field(default_factory=list, description="磁盘信息列表")
+    disk_io: Optional[DiskIOInfo] = Field(None, description="块设备 I/O 速率")
+    network: Optional[NetworkIOInfo] = Field(None, description="网卡收发速率")
     gpus: Optional[List[GPUInfo]] = Field(None, description="GPU 信息列表")
+    gpu_processes: Optional[List[GPUProcessInfo]] = Field(None, description="GPU 计算进程列表")
+    top_processes: Optional[TopProcesses] = Field(None, description="CPU/常驻内存占用最高的进程")
+    containers: Optional[List[ContainerInfo]] = Field(None, description="容器资源用量列表")
     services: List[ServiceInfo] = Field(default_factory=list, description="服务状态列表")
+    sample_age_s: Dict[str, float] = Field(
+        default_factory=dict, description="各采集器数据相对 ts 的样本年龄（秒，发布时计算，不随请求时间增长）"
+    )
+    collected_at: Dict[str, float] = Field(
+        default_factory=dict, description="各采集器最近一次完成时间（Unix 时间戳），请求时的年龄为当前时间减去该值"
+    )
+    window: Optional[SnapshotWindow] = Field(None, description="指定 since 时，since 之后的高频采样汇总")
 
     class Config:
         json_encoders = {
@@ -58,12 +209,25 @@ class SnapshotResponse(BaseModel):
         }
 
 
+class CollectorHealth(BaseModel):
+    """采集器运行状态"""
+    interval_s: float = Field(..., description="采样周期（秒）")
+    cost: str = Field("cheap", description="开销等级: cheap|moderate|expensive")
+    last_success: Optional[str] = Field(None, description="最近一次成功时间（UTC ISO 8601）")
+    last_success_age_s: Optional[float] = Field(None, description="距最近一次成功的秒数")
+    last_error: Optional[str] = Field(None, description="最近一次失败的错误信息")
+    last_duration_s: Optional[float] = Field(None, description="最近一次采集耗时（秒）")
+    consecutive_failures: int = Field(0, description="连续失败次数")
+
+
 class HealthResponse(BaseModel):
     """健康检查响应"""
     status: str = Field(..., description="健康状态: ok|degraded|error")
     timestamp: datetime = Field(..., description="检查时间")
-    checks: Dict[str, str] = Field(..., description="各组件检查结果")
+    checks: Dict[str, str] = Field(..., description="各组件检查结果（ok|pending|degraded|error|disabled）")
     details: Dict[str, Optional[str]] = Field(..., description="详细信息")
+    collectors: Dict[str, CollectorHealth] = Field(default_factory=dict, description="各采集器运行状态")
+    deep: bool = Field(False, description="是否实际运行了采集器（?deep=1）")
 
     class Config:
         json_encoders = {
@@ -14,6 +14,7 @@ from datetime import datetime
 from typing import Optional, List
 
 from monitor_agent.config import ProxyConfig
+from monitor_agent.instrumentation import get_instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -207,6 +208,7 @@ class ProxyForwarderManager:
                     self._status.target = f"127.0.0.1:{cfg.center_proxy_port}"
                     self._status.last_error = None
 
+                get_instrumentation().count_spawn(cmd[0])
                 proc = await asyncio.create_subprocess_exec(
                     *cmd,
                     stdout=asyncio.subprocess.DEVNULL,
@@ -0,0 +1,196 @@
+"""
+推送模式
+
+适用于位于 NAT 之后、中心节点无法直接拉取的 Agent：
+按 sample_interval 从后台采样器取样，每 batch_size 个样本打成一批，
+gzip 压缩后 POST 到中心节点的 /api/ingest（使用 Agent 的 token 认证）。
+
+- 待发送批次保存在有界队列中，队列满时丢弃最旧的批次
+- 发送失败或中心节点返回 429/503 时指数退避（遵循 Retry-After），
+  退避期间继续采样入队，不阻塞采样
+- 4xx（如 token 错误、数据无效）不会因重试而成功，直接丢弃该批次
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from monitor_agent.config import AgentConfig, PushConfig
+
+logger = logging.getLogger(__name__)
+
+
+# 发送结果
+PUSH_OK = "ok"
+PUSH_RETRY = "retry"
+PUSH_DROP = "drop"
+
+# 首次失败后的退避时间（秒）
+BACKOFF_MIN = 1.0
+
+
+def encode_batch(node_id: str, samples: List[Dict[str, Any]], level: int = 6) -> bytes:
+    """编码一批样本：{"node_id": ..., "samples": [...]}，gzip 压缩"""
+    payload = json.dumps({"node_id": node_id, "samples": samples}, separators=(",", ":"))
+    return gzip.compress(payload.encode("utf-8"), compresslevel=level)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def http_post(url: str, token: str, body: bytes, timeout: float) -> Tuple[str, Optional[float]]:
+    """
+    发送一批样本（阻塞，在线程池中执行）
+
+    Returns:
+        (结果, Retry-After 秒数)
+    """
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+        },
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+        return PUSH_OK, None
+    except urllib.error.HTTPError as e:
+        retry_after = _parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+        if e.code in (408, 429) or e.code >= 500:
+            return PUSH_RETRY, retry_after
+        logger.warning(f"push rejected by aggregator (HTTP {e.code}), dropping batch")
+        return PUSH_DROP, None
+    except Exception as e:
+        logger.debug(f"push failed: {e}")
+        return PUSH_RETRY, None
+
+
+class Pusher:
+    """样本批量推送器"""
+
+    def __init__(
+        self,
+        config: AgentConfig,
+        sampler,
+        post: Optional[Callable[[bytes], Tuple[str, Optional[float]]]] = None,
+    ):
+        """
+        Args:
+            config: Agent 配置（使用 config.push 和 config.token）
+            sampler: 后台采样器
+            post: 发送函数（测试注入），默认 http_post
+        """
+        self._config = config
+        self._push: PushConfig = config.push
+        self._sampler = sampler
+        self._post = post or (
+            lambda body: http_post(self._push.url, config.token, body, self._push.timeout)
+        )
+        self._batch: List[Dict[str, Any]] = []
+        self._queue: Deque[bytes] = deque()
+        self._last_seq: Optional[int] = None
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    @property
+    def queued(self) -> int:
+        """待发送批次数"""
+        return len(self._queue)
+
+    def take_sample(self):
+        """取最新样本加入当前批次，凑满 batch_size 后编码入队"""
+        sample = self._sampler.latest
+        if sample.seq == self._last_seq:
+            return
+        snapshot = sample.snapshot
+        if self._last_seq is not None:
+            # 附带上一次取样之后的高频采样汇总（见 monitor_agent.window）
+            snapshot = dict(snapshot, window=self._sampler.window_summary(self._last_seq))
+        self._last_seq = sample.seq
+        self._batch.append(snapshot)
+
+        if len(self._batch) >= self._push.batch_size:
+            body = encode_batch(self._config.node_id, self._batch, self._push.gzip_level)
+            self._batch = []
+            if len(self._queue) >= self._push.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+                logger.warning("push queue full, dropped oldest batch")
+            self._queue.append(body)
+
+    async def flush(self):
+        """按顺序发送队列中的批次，失败时设置退避并停止本轮发送"""
+        loop = asyncio.get_running_loop()
+        while self._queue and time.monotonic() >= self._next_attempt:
+            result, retry_after = await loop.run_in_executor(None, self._post, self._queue[0])
+            if result == PUSH_RETRY:
+                self._backoff = min(self._push.max_backoff, max(BACKOFF_MIN, self._backoff * 2))
+                delay = retry_after if retry_after is not None else self._backoff * random.uniform(0.8, 1.2)
+                self._next_attempt = time.monotonic() + delay
+                return
+            if result == PUSH_DROP:
+                self.dropped += 1
+            self._queue.popleft()
+            self._backoff = 0.0
+            self._next_attempt = 0.0
+
+    async def _run(self):
+        while True:
+            try:
+                self.take_sample()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"push loop error: {e}")
+            await asyncio.sleep(self._push.sample_interval)
+
+    async def start(self):
+        """启动推送循环"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止推送循环（未发送的批次丢弃）"""
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+_pusher: Optional[Pusher] = None
+
+
+def get_pusher() -> Optional[Pusher]:
+    """获取全局推送器（未启用推送模式时返回 None）"""
+    global _pusher
+    if _pusher is None:
+        from monitor_agent.config import get_config
+        from monitor_agent.sampler import get_sampler
+
+        config = get_config()
+        if config.push is None or not config.push.enabled:
+            return None
+        _pusher = Pusher(config, get_sampler())
+    return _pusher
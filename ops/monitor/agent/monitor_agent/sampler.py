@@ -0,0 +1,373 @@
+"""
+后台采样引擎
+
+Agent 启动时开始运行，每个采集器按注册表中的周期（可在配置中覆盖，见 monitor_agent.collectors）
+在后台采样，并发布一个不可变的"最新样本"。所有采集器共用一个调度任务和定时器堆，
+到期的采集器各自在独立任务中运行，慢采集器不会推迟其它采集器；单次采集超过 timeout 记为失败。
+/v1/snapshot 直接返回预编码的样本，请求路径上不再调用任何采集器（不再 fork nvidia-smi / systemctl）。
+
+最近 DELTA_HISTORY 个样本保留在内存中，用于 /v1/snapshot?since=<seq> 的增量响应。
+其它编码（MessagePack、gzip，见 monitor_agent.encoding）按需编码一次，缓存到下一个样本发布。
+CPU/GPU 的每个采集结果另记入窗口，带 since 的响应附带 since 之后的 min/avg/max/last
+（见 monitor_agent.window）。
+每个采集器的最近成功时间、错误、耗时和连续失败次数记入 CollectorTelemetry，
+/v1/health 直接读取（见 monitor_agent.health）。
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from monitor_agent.config import AgentConfig, get_config
+from monitor_agent.delta import make_delta
+from monitor_agent.encoding import JSON_TYPE, encode, maybe_gzip
+from monitor_agent.instrumentation import get_instrumentation
+from monitor_agent.window import WindowRecorder, window_points
+from monitor_agent.collectors import ScheduledCollector, build_collectors
+from monitor_agent.collectors.cgroup import merge_service_usage
+from monitor_agent.collectors.containers import attach_gpu_processes
+
+logger = logging.getLogger(__name__)
+
+
+# 保留用于增量响应的历史样本数（base 早于此范围时返回完整快照）
+DELTA_HISTORY = 64
+
+
+@dataclass(frozen=True)
+class Sample:
+    """
+    最新样本（发布后不再修改）
+
+    Attributes:
+        seq: 发布序号（单调递增）
+        ts: 发布时间（Unix 时间戳）
+        values: 各采集器最近一次结果 {collector: result}
+        collected_at: 各采集器最近一次完成时间 {collector: Unix 时间戳}
+        snapshot: /v1/snapshot 文档（用于计算增量）
+        body: 预编码的 /v1/snapshot JSON 响应体
+    """
+    seq: int
+    ts: float
+    values: Dict[str, Any] = field(default_factory=dict)
+    collected_at: Dict[str, float] = field(default_factory=dict)
+    snapshot: Dict[str, Any] = field(default_factory=dict)
+    body: bytes = b""
+
+
+@dataclass
+class CollectorTelemetry:
+    """
+    采集器运行状态（由采集循环更新）
+
+    Attributes:
+        interval_s: 采样周期（秒）
+        cost: 开销等级（见 monitor_agent.collectors）
+        runs: 已完成的采集次数（含失败）
+        last_started: 最近一次开始采集的时间（Unix 时间戳）
+        last_success: 最近一次成功的时间（Unix 时间戳）
+        last_error: 最近一次失败的错误信息
+        last_duration_s: 最近一次采集耗时（秒）
+        consecutive_failures: 连续失败次数（成功后清零）
+    """
+    interval_s: float
+    cost: str = "cheap"
+    runs: int = 0
+    last_started: Optional[float] = None
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    last_duration_s: Optional[float] = None
+    consecutive_failures: int = 0
+
+
+def _format_ts(ts: float) -> str:
+    return datetime.utcfromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _encode(document: Dict[str, Any]) -> bytes:
+    return encode(document, JSON_TYPE)
+
+
+class Sampler:
+    """后台采样器：每个采集器一个循环，结果汇总后发布为 Sample"""
+
+    def __init__(self, config: AgentConfig):
+        self._config = config
+        self._collectors: Dict[str, ScheduledCollector] = build_collectors(config)
+        self._values: Dict[str, Any] = {}
+        self._collected_at: Dict[str, float] = {}
+        self._seq = 0
+        # 每次启动不同，客户端据此识别 Agent 重启（seq 从 0 重新开始）
+        self._epoch = uuid.uuid4().hex[:16]
+        # 调度任务、运行中的采集任务，以及采集完成后待加入定时器堆的 (到期时间, 采集器)
+        self._scheduler: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._rescheduled: List[Tuple[float, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._telemetry: Dict[str, CollectorTelemetry] = {
+            name: CollectorTelemetry(interval_s=c.interval, cost=c.cost) for name, c in self._collectors.items()
+        }
+        self._latest = self._build_sample(time.time())
+        self._history: Deque[Sample] = deque([self._latest], maxlen=DELTA_HISTORY)
+        # 高频采样点（用于 since 之后的窗口汇总）
+        self._window = WindowRecorder()
+        # 当前样本相对各 base_seq 的预编码增量
+        self._delta_cache: Dict[Tuple[int, int], bytes] = {}
+        # 当前样本的其它编码：{(since, 媒体类型, 是否接受 gzip): (响应体, 是否已压缩)}
+        self._encoded_cache: Dict[Tuple[Optional[int], str, bool], Tuple[bytes, bool]] = {}
+        # 新样本发布通知（首次等待时创建，每次发布后替换）
+        self._updated: Optional[asyncio.Event] = None
+
+    @property
+    def latest(self) -> Sample:
+        """获取最新样本（O(1)）"""
+        return self._latest
+
+    @property
+    def telemetry(self) -> Dict[str, CollectorTelemetry]:
+        """各采集器运行状态 {collector: CollectorTelemetry}"""
+        return self._telemetry
+
+    def _base(self, since: Optional[int]) -> Optional[Sample]:
+        if since is None:
+            return None
+        return next((s for s in self._history if s.seq == since), None)
+
+    def window_summary(self, since: int) -> Dict[str, Any]:
+        """since 之后 CPU/GPU 高频采样点的 min/avg/max/last"""
+        return self._window.summary(since)
+
+    def _snapshot_document(self, since: int) -> Dict[str, Any]:
+        latest = self._latest
+        base = self._base(since)
+        if base is None:
+            document = dict(latest.snapshot)
+        else:
+            document = make_delta(base.snapshot, latest.snapshot)
+        document["window"] = self.window_summary(since)
+        return document
+
+    def snapshot_body(self, since: Optional[int] = None) -> bytes:
+        """
+        获取 /v1/snapshot 响应体
+
+        Args:
+            since: 客户端已有样本的 seq；为 None 时返回完整快照，
+                   否则返回增量文档（不在历史范围内时为完整快照），并附带 since 之后的窗口汇总
+
+        Returns:
+            预编码的完整快照或增量文档
+        """
+        latest = self._latest
+        if since is None:
+            return latest.body
+
+        cache_key = (latest.seq, since)
+        body = self._delta_cache.get(cache_key)
+        if body is None:
+            body = _encode(self._snapshot_document(since))
+            self._delta_cache[cache_key] = body
+        return body
+
+    def encoded_snapshot(
+        self, since: Optional[int] = None, media_type: str = JSON_TYPE, accept_gzip: bool = False
+    ) -> Tuple[bytes, bool]:
+        """
+        按协商结果编码 /v1/snapshot 响应体
+
+        Args:
+            since: 同 snapshot_body
+            media_type: 响应媒体类型（见 monitor_agent.encoding）
+            accept_gzip: 客户端是否接受 gzip
+
+        Returns:
+            (响应体, 是否已 gzip 压缩)
+        """
+        if media_type == JSON_TYPE and not accept_gzip:
+            return self.snapshot_body(since), False
+
+        cache_key = (since, media_type, accept_gzip)
+        cached = self._encoded_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if media_type == JSON_TYPE:
+            body = self.snapshot_body(since)
+        elif since is None:
+            body = encode(self._latest.snapshot, media_type)
+        else:
+            body = encode(self._snapshot_document(since), media_type)
+
+        compressed = maybe_gzip(body) if accept_gzip else None
+        result = (compressed, True) if compressed is not None else (body, False)
+        self._encoded_cache[cache_key] = result
+        return result
+
+    async def wait_for_update(self, seq: int, timeout: float) -> Sample:
+        """
+        等待 seq 之后的新样本
+
+        Args:
+            seq: 调用方已有样本的 seq
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            最新样本；超时时 seq 可能仍等于传入值
+        """
+        if self._latest.seq == seq:
+            if self._updated is None:
+                self._updated = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._latest
+
+    async def start(self):
+        """启动采集调度"""
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run_scheduler())
+
+    async def stop(self):
+        """停止调度和运行中的采集"""
+        tasks = list(self._running.values())
+        if self._scheduler is not None:
+            tasks.append(self._scheduler)
+        self._scheduler = None
+        self._running.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_scheduler(self):
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._rescheduled = []
+        # 定时器堆：(到期时间, 采集器)，启动时所有采集器立即运行一次
+        timers = [(loop.time(), name) for name in self._collectors]
+        heapq.heapify(timers)
+
+        while True:
+            while self._rescheduled:
+                heapq.heappush(timers, self._rescheduled.pop())
+
+            delay = timers[0][0] - loop.time() if timers else None
+            if delay is None or delay > 0:
+                # 等到最早的定时器到期，或有采集完成需要重新排期
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, name = heapq.heappop(timers)
+            self._running[name] = asyncio.create_task(self._run_collector(name))
+
+    async def _run_collector(self, name: str):
+        """运行一次采集，完成后按周期重新排期（同一采集器不会重叠运行）"""
+        collector = self._collectors[name]
+        loop = asyncio.get_running_loop()
+        telemetry = self._telemetry.setdefault(
+            name, CollectorTelemetry(interval_s=collector.interval, cost=collector.cost)
+        )
+
+        started = loop.time()
+        telemetry.last_started = time.time()
+        ok = False
+        try:
+            result = await asyncio.wait_for(collector.collect(), timeout=collector.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 采集失败保留上一次结果，等待下个周期
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"timed out after {collector.timeout:g}s"
+            else:
+                error = str(e) or type(e).__name__
+            logger.debug(f"collector {name} failed: {error}")
+            telemetry.last_error = error
+            telemetry.consecutive_failures += 1
+        else:
+            self._values[name] = result
+            self._collected_at[name] = time.time()
+            telemetry.last_success = self._collected_at[name]
+            telemetry.consecutive_failures = 0
+            ok = True
+            self._publish()
+            self._window.record(self._seq, window_points(name, result))
+
+        finished = loop.time()
+        telemetry.runs += 1
+        telemetry.last_duration_s = round(finished - started, 4)
+        get_instrumentation().observe_collector(name, finished - started, ok)
+
+        self._running.pop(name, None)
+        self._rescheduled.append((max(started + collector.interval, finished), name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _publish(self):
+        self._seq += 1
+        self._latest = self._build_sample(time.time())
+        self._history.append(self._latest)
+        self._delta_cache = {}
+        self._encoded_cache = {}
+        if self._updated is not None:
+            self._updated.set()
+            self._updated = None
+
+    def _build_sample(self, now: float) -> Sample:
+        values = dict(self._values)
+        collected_at = dict(self._collected_at)
+        cpu = values.get("cpu")
+        gpus = values.get("gpu")
+
+        snapshot = {
+            "epoch": self._epoch,
+            "seq": self._seq,
+            "node_id": self._config.node_id,
+            "ts": _format_ts(now),
+            "cpu_pct": cpu["cpu_pct"] if cpu else None,
+            "cpu": cpu,
+            "memory": values.get("memory"),
+            "disks": values.get("disk") or [],
+            "disk_io": values.get("diskio"),
+            "network": values.get("network"),
+            "gpus": gpus if gpus else None,
+            "gpu_processes": values.get("gpu_processes"),
+            "top_processes": values.get("processes"),
+            "containers": attach_gpu_processes(values.get("containers"), values.get("gpu_processes")),
+            "services": merge_service_usage(values.get("systemd") or [], values.get("cgroup")),
+            # 发布时的年龄；样本发布后年龄继续增长，请求时的年龄由客户端按 collected_at 计算
+            "sample_age_s": {
+                name: round(max(0.0, now - at), 3) for name, at in collected_at.items()
+            },
+            "collected_at": {name: round(at, 3) for name, at in collected_at.items()},
+        }
+
+        return Sample(
+            seq=self._seq,
+            ts=now,
+            values=values,
+            collected_at=collected_at,
+            snapshot=snapshot,
+            body=_encode(snapshot),
+        )
+
+
+_sampler: Optional[Sampler] = None
+
+
+def get_sampler() -> Sampler:
+    """获取全局采样器实例"""
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(get_config())
+    return _sampler
@@ -0,0 +1,307 @@
+"""
+本地样本环形文件（spool）
+
+中心节点重启或网络中断期间，拉取到的数据只存在于中心节点内存中，会整段丢失。
+Agent 每 interval 秒把一条定长记录写入内存映射的环形文件，
+中心节点恢复后通过 /v1/samples?from=&to= 取回缺失时段并补齐小时记录。
+
+文件布局：
+    头部（32 字节）: magic(8s) record_size(I) capacity(I) written(Q) reserved(Q)
+    记录区: capacity 条 RECORD 定长记录，第 n 条写入槽位 n % capacity
+
+记录字段与中心节点小时缓冲区的字段一致（见 SPOOL_FIELDS），
+缺失值写为 NaN（浮点）、-1（字节数）或 0（样本点数）。
+文件大小固定，Agent 重启后继续使用已有记录。
+"""
+
+import asyncio
+import logging
+import math
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from monitor_agent.config import AgentConfig, SpoolConfig
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b"MONSPL01"
+HEADER = struct.Struct("<8sIIQQ")
+
+# (字段, struct 格式)：f 为 float32，q 为字节数，H 为窗口样本点数
+SPOOL_FIELDS = (
+    ("ts", "d"),
+    ("cpu_pct", "f"), ("cpu_pct_max", "f"), ("cpu_n", "H"),
+    ("gpu_util_pct", "f"), ("gpu_util_pct_max", "f"), ("gpu_n", "H"),
+    ("gpu_mem_used_mb", "f"), ("gpu_mem_total_mb", "f"),
+    ("disk_used_pct", "f"), ("disk_used_bytes", "q"), ("disk_total_bytes", "q"),
+    ("disk_read_bps", "f"), ("disk_write_bps", "f"),
+    ("net_rx_bps", "f"), ("net_tx_bps", "f"), ("net_errs_ps", "f"), ("net_drops_ps", "f"),
+    ("mem_used_pct", "f"), ("swap_used_pct", "f"), ("load1", "f"),
+    ("psi_cpu_some", "f"), ("psi_mem_some", "f"), ("psi_mem_full", "f"),
+    ("psi_io_some", "f"), ("psi_io_full", "f"),
+)
+
+RECORD = struct.Struct("<" + "".join(fmt for _, fmt in SPOOL_FIELDS))
+_TS = struct.Struct("<d")
+
+# 每写入多少条记录 msync 一次
+FLUSH_EVERY = 12
+
+# 浮点字段保留的小数位（float32 只有约 7 位有效数字）
+_NDIGITS = 3
+
+
+def _sum(values, ndigits: int = 1) -> Optional[float]:
+    values = [v for v in values or [] if v is not None]
+    return round(sum(values), ndigits) if values else None
+
+
+def spool_record(ts: float, snapshot: Dict[str, Any], window: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    把快照（和上一条记录之后的窗口汇总）转换为记录字段
+
+    聚合口径与中心节点一致：磁盘取第一个挂载点，磁盘 I/O 和网络按设备求和，
+    GPU 使用率取最忙的卡、显存求和，PSI 取 avg10。
+
+    Args:
+        ts: 样本的 Unix 时间戳
+        snapshot: 快照
+        window: 上一条记录之后的窗口汇总（见 monitor_agent.window）
+    """
+    window = window or {}
+    record: Dict[str, Any] = {"ts": ts}
+
+    for metric, n_field in (("cpu_pct", "cpu_n"), ("gpu_util_pct", "gpu_n")):
+        summary = window.get(metric)
+        if summary:
+            record[metric] = summary["avg"]
+            record[f"{metric}_max"] = summary["max"]
+            record[n_field] = summary["n"]
+
+    if "cpu_pct" not in record:
+        record["cpu_pct"] = snapshot.get("cpu_pct")
+
+    gpus = snapshot.get("gpus") or []
+    utils = [g.get("util_pct") for g in gpus if g.get("util_pct") is not None]
+    if "gpu_util_pct" not in record and utils:
+        record["gpu_util_pct"] = max(utils)
+    record["gpu_mem_used_mb"] = _sum([g.get("mem_used_mb") for g in gpus], 0)
+    record["gpu_mem_total_mb"] = _sum([g.get("mem_total_mb") for g in gpus], 0)
+
+    disks = snapshot.get("disks") or []
+    if disks:
+        record["disk_used_pct"] = disks[0].get("used_pct")
+        record["disk_used_bytes"] = disks[0].get("used_bytes")
+        record["disk_total_bytes"] = disks[0].get("total_bytes")
+
+    disk_io = snapshot.get("disk_io") or {}
+    if disk_io.get("devices"):
+        record["disk_read_bps"] = _sum(disk_io.get("read_bps"))
+        record["disk_write_bps"] = _sum(disk_io.get("write_bps"))
+
+    network = snapshot.get("network") or {}
+    if network.get("interfaces"):
+        record["net_rx_bps"] = _sum(network.get("rx_bps"))
+        record["net_tx_bps"] = _sum(network.get("tx_bps"))
+        record["net_errs_ps"] = _sum((network.get("rx_errs_ps") or []) + (network.get("tx_errs_ps") or []), 3)
+        record["net_drops_ps"] = _sum((network.get("rx_drop_ps") or []) + (network.get("tx_drop_ps") or []), 3)
+
+    memory = snapshot.get("memory") or {}
+    record["mem_used_pct"] = memory.get("mem_used_pct")
+    record["swap_used_pct"] = memory.get("swap_used_pct")
+    loadavg = memory.get("loadavg") or []
+    record["load1"] = loadavg[0] if loadavg else None
+    psi = memory.get("psi") or {}
+    for field, resource, kind in (
+        ("psi_cpu_some", "cpu", "some"), ("psi_mem_some", "memory", "some"), ("psi_mem_full", "memory", "full"),
+        ("psi_io_some", "io", "some"), ("psi_io_full", "io", "full"),
+    ):
+        values = (psi.get(resource) or {}).get(kind)
+        record[field] = values[0] if values else None
+    return record
+
+
+def _pack(record: Dict[str, Any]) -> bytes:
+    values = []
+    for field, fmt in SPOOL_FIELDS:
+        value = record.get(field)
+        if fmt == "q":
+            values.append(int(value) if value is not None else -1)
+        elif fmt == "H":
+            values.append(min(int(value or 0), 0xFFFF))
+        else:
+            values.append(float(value) if value is not None else math.nan)
+    return RECORD.pack(*values)
+
+
+def _unpack(buffer, offset: int) -> Dict[str, Any]:
+    """解码为中心节点小时缓冲区条目格式（窗口字段放入 window）"""
+    raw = dict(zip((field for field, _ in SPOOL_FIELDS), RECORD.unpack_from(buffer, offset)))
+    entry: Dict[str, Any] = {"ts": datetime.utcfromtimestamp(raw.pop("ts")).strftime("%Y-%m-%dT%H:%M:%SZ")}
+    window = {}
+    for metric, n_field in (("cpu_pct", "cpu_n"), ("gpu_util_pct", "gpu_n")):
+        n = raw.pop(n_field)
+        peak = raw.pop(f"{metric}_max")
+        if n and not math.isnan(peak):
+            window[metric] = {"avg": round(raw[metric], _NDIGITS), "max": round(peak, _NDIGITS), "n": n}
+
+    for field, fmt in SPOOL_FIELDS:
+        if field not in raw:
+            continue
+        value = raw[field]
+        if fmt == "q":
+            entry[field] = value if value >= 0 else None
+        else:
+            entry[field] = None if math.isnan(value) else round(value, _NDIGITS)
+    if window:
+        entry["window"] = window
+    return entry
+
+
+class Spool:
+    """内存映射的定长记录环形文件"""
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        size = HEADER.size + RECORD.size * capacity
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o640)
+        try:
+            existing = os.fstat(fd).st_size
+            valid = False
+            if existing == size:
+                magic, record_size, file_capacity, _, _ = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+                valid = magic == MAGIC and record_size == RECORD.size and file_capacity == capacity
+            if not valid:
+                # 新文件或格式/容量变化：重新初始化
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        if not valid:
+            HEADER.pack_into(self._mm, 0, MAGIC, RECORD.size, capacity, 0, 0)
+        self._written = HEADER.unpack_from(self._mm, 0)[3]
+        self._unflushed = 0
+
+    @property
+    def written(self) -> int:
+        """累计写入的记录数"""
+        return self._written
+
+    def append(self, record: Dict[str, Any]):
+        """写入一条记录（覆盖最旧的槽位）"""
+        offset = HEADER.size + (self._written % self.capacity) * RECORD.size
+        self._mm[offset:offset + RECORD.size] = _pack(record)
+        self._written += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, RECORD.size, self.capacity, self._written, 0)
+
+        self._unflushed += 1
+        if self._unflushed >= FLUSH_EVERY:
+            self.flush()
+
+    def read_range(self, start: float, end: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        读取 ts 在 [start, end) 内的记录（按写入顺序）
+
+        Args:
+            start: 起始 Unix 时间戳（含）
+            end: 结束 Unix 时间戳（不含）
+            limit: 最多返回条数
+        """
+        count = min(self._written, self.capacity)
+        result = []
+        for n in range(self._written - count, self._written):
+            offset = HEADER.size + (n % self.capacity) * RECORD.size
+            ts = _TS.unpack_from(self._mm, offset)[0]
+            if start <= ts < end:
+                result.append(_unpack(self._mm, offset))
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def flush(self):
+        self._mm.flush()
+        self._unflushed = 0
+
+    def close(self):
+        if not self._mm.closed:
+            self.flush()
+            self._mm.close()
+
+
+class SpoolWriter:
+    """每 interval 秒把最新样本写入 spool"""
+
+    def __init__(self, config: SpoolConfig, sampler, spool: Spool):
+        self._config = config
+        self._sampler = sampler
+        self.spool = spool
+        self._last_seq: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def write_once(self):
+        """写入一条记录（无新样本，或还没有采集器完成时跳过）"""
+        sample = self._sampler.latest
+        if sample.seq == self._last_seq:
+            return
+        if sample.seq == 0 or not sample.collected_at:
+            # 启动时的初始样本各项均为 null，写入后会混入回填的小时汇总
+            return
+        window = self._sampler.window_summary(self._last_seq) if self._last_seq is not None else None
+        self._last_seq = sample.seq
+        self.spool.append(spool_record(sample.ts, sample.snapshot, window))
+
+    async def _run(self):
+        while True:
+            try:
+                self.write_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"spool write failed: {e}")
+            await asyncio.sleep(self._config.interval)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.spool.close()
+
+
+_writer: Optional[SpoolWriter] = None
+_opened = False
+
+
+def get_spool_writer() -> Optional[SpoolWriter]:
+    """获取全局 spool 写入器（未启用或文件无法打开时返回 None）"""
+    global _writer, _opened
+    if not _opened:
+        _opened = True
+        from monitor_agent.config import get_config
+        from monitor_agent.sampler import get_sampler
+
+        config: AgentConfig = get_config()
+        if config.spool.enabled:
+            try:
+                spool = Spool(config.spool.path, config.spool.capacity)
+            except OSError as e:
+                logger.warning(f"spool disabled: cannot open {config.spool.path}: {e}")
+            else:
+                _writer = SpoolWriter(config.spool, get_sampler(), spool)
+    return _writer
@@ -0,0 +1,62 @@
+"""
+快照流（Server-Sent Events）
+
+/v1/stream 保持一个长连接，每发布一个新样本推送一条事件：
+首条事件为完整快照，之后为相对上一条事件的增量文档（格式见 monitor_agent.delta）；
+客户端处理过慢导致 base 超出历史范围时推送完整快照。
+空闲时定期发送注释行保活。
+
+事件格式：
+    event: snapshot
+    id: <seq>
+    data: <JSON>
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from monitor_agent.sampler import Sampler
+
+
+# 无新样本时的保活间隔（秒）
+KEEPALIVE_S = 15.0
+
+
+def format_event(seq: int, body: bytes) -> bytes:
+    """编码一条 SSE 事件（JSON 为单行，无需拆分 data 行）"""
+    return b"event: snapshot\nid: %d\ndata: %s\n\n" % (seq, body)
+
+
+async def sse_events(
+    sampler: Sampler,
+    min_interval: float = 0.0,
+    keepalive: float = KEEPALIVE_S,
+) -> AsyncIterator[bytes]:
+    """
+    生成快照事件流
+
+    Args:
+        sampler: 后台采样器
+        min_interval: 两条事件的最小间隔（秒），期间发布的样本合并为一条增量
+        keepalive: 保活间隔（秒）
+    """
+    loop = asyncio.get_running_loop()
+    sample = sampler.latest
+    yield format_event(sample.seq, sample.body)
+    last_seq = sample.seq
+    last_sent = loop.time()
+
+    while True:
+        if min_interval > 0:
+            remaining = min_interval - (loop.time() - last_sent)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+        sample = await sampler.wait_for_update(last_seq, keepalive)
+        if sample.seq == last_seq:
+            yield b": keepalive\n\n"
+            continue
+
+        yield format_event(sample.seq, sampler.snapshot_body(last_seq))
+        last_seq = sample.seq
+        last_sent = loop.time()
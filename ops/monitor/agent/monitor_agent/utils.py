@@ -2,7 +2,11 @@
 工具函数模块
 """
 
+import asyncio
 import secrets
+from typing import Sequence, Tuple
+
+from monitor_agent.instrumentation import get_instrumentation
 
 
 def generate_token(length: int = 32) -> str:
@@ -18,6 +22,39 @@ def generate_token(length: int = 32) -> str:
     return secrets.token_urlsafe(length)
 
 
+async def run_command(args: Sequence[str], timeout: float = 10.0) -> Tuple[int, bytes]:
+    """
+    执行外部命令（不经过 /bin/sh）
+
+    Args:
+        args: 命令及参数
+        timeout: 超时时间（秒），超时或调用方取消时终止子进程
+
+    Returns:
+        (返回码, stdout)
+
+    Raises:
+        FileNotFoundError: 命令不存在
+        asyncio.TimeoutError: 执行超时
+    """
+    get_instrumentation().count_spawn(args[0])
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        try:
+            proc.kill()
+            await proc.wait()
+        except ProcessLookupError:
+            pass
+        raise
+    return proc.returncode, stdout
+
+
 if __name__ == "__main__":
     # 生成一个新的 Token
     print("Generated Token:")
@@ -0,0 +1,97 @@
+"""
+窗口汇总
+
+采样器以高频（CPU 约 1 秒、GPU 约 2 秒）采样，而中心节点每 5 秒才拉取一次，
+两次拉取之间的短时尖峰（如 2 秒的 GPU 停顿、CPU 突发）在点采样中会丢失。
+
+每个采集结果按发布时的 seq 记入 WindowRecorder；
+客户端带 since（上一次拉取到的 seq，即轮询游标）请求时，
+返回 since 之后各指标的 min/avg/max/last：
+
+    "window": {
+        "since": 118,
+        "cpu_pct": {"min": 3.0, "avg": 21.4, "max": 97.0, "last": 5.0, "n": 5},
+        "gpu_util_pct": {...},
+        "gpu_mem_used_mb": {...}
+    }
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# 参与窗口汇总的指标
+WINDOW_METRICS = ("cpu_pct", "gpu_util_pct", "gpu_mem_used_mb")
+
+# 每个指标保留的采样点数（CPU 1 秒一次约 10 分钟）
+WINDOW_POINTS = 600
+
+
+def window_points(collector: str, result: Any) -> Dict[str, float]:
+    """
+    从采集结果中提取窗口指标
+
+    - cpu: 最近一个采样间隔的使用率（last_pct，旧结果回退到 cpu_pct）
+    - gpu: 最忙 GPU 的使用率、所有 GPU 显存使用之和（与中心节点的聚合口径一致）
+    """
+    if not result:
+        return {}
+    if collector == "cpu":
+        value = result.get("last_pct", result.get("cpu_pct"))
+        return {"cpu_pct": value} if value is not None else {}
+    if collector == "gpu":
+        points = {}
+        utils = [g["util_pct"] for g in result if g.get("util_pct") is not None]
+        mems = [g["mem_used_mb"] for g in result if g.get("mem_used_mb") is not None]
+        if utils:
+            points["gpu_util_pct"] = max(utils)
+        if mems:
+            points["gpu_mem_used_mb"] = sum(mems)
+        return points
+    return {}
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, Any]]:
+    """计算 min/avg/max/last，空列表返回 None"""
+    if not values:
+        return None
+    return {
+        "min": min(values),
+        "avg": round(sum(values) / len(values), 2),
+        "max": max(values),
+        "last": values[-1],
+        "n": len(values),
+    }
+
+
+class WindowRecorder:
+    """按 seq 记录高频采样点"""
+
+    def __init__(self, maxlen: int = WINDOW_POINTS):
+        self._points: Dict[str, Deque[Tuple[int, float]]] = {
+            metric: deque(maxlen=maxlen) for metric in WINDOW_METRICS
+        }
+
+    def record(self, seq: int, points: Dict[str, float]):
+        """记录一次采集结果（points 见 window_points）"""
+        for metric, value in points.items():
+            self._points[metric].append((seq, value))
+
+    def summary(self, since: int) -> Dict[str, Any]:
+        """
+        since 之后（不含）各指标的汇总
+
+        Returns:
+            {"since": since, "cpu_pct": {...} | None, ...}
+        """
+        result: Dict[str, Any] = {"since": since}
+        for metric, points in self._points.items():
+            values = []
+            # 从最新往前扫描，遇到 since 及更早的点即停止
+            for seq, value in reversed(points):
+                if seq <= since:
+                    break
+                values.append(value)
+            values.reverse()
+            result[metric] = summarize(values)
+        return result
@@ -23,6 +23,10 @@ setup(
         "PyYAML>=6.0",
         "psutil>=5.9.0",
     ],
+    extras_require={
+        "nvml": ["nvidia-ml-py>=12.535.0"],
+        "msgpack": ["msgpack>=1.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "monitor-agent=monitor_agent.__main__:main",
@@ -0,0 +1,27 @@
+"""
+测试共用的 fixture
+"""
+
+from pathlib import Path
+
+import pytest
+
+
+def _write_cgroup(
+    path: Path, usage_usec: int, rbytes: int = 0, wbytes: int = 0, memory: int = 1024, pids: int = 3
+):
+    """写入 cgroup v2 的 cpu.stat / io.stat / memory.current / pids.current"""
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (path / "io.stat").write_text(
+        f"259:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=1 dbytes=0 dios=0\n"
+        "8:0 rbytes=0 wbytes=0 rios=0 wios=0 dbytes=0 dios=0\n"
+    )
+    (path / "memory.current").write_text(f"{memory}\n")
+    (path / "pids.current").write_text(f"{pids}\n")
+
+
+@pytest.fixture
+def write_cgroup():
+    """模拟 cgroup v2 目录的写入函数（cgroup 和容器采集器测试共用）"""
+    return _write_cgroup
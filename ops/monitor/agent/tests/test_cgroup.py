@@ -0,0 +1,85 @@
+"""
+单元测试：systemd 服务资源用量（cgroup v2）采集器
+
+使用临时目录模拟 /sys/fs/cgroup。
+
+测试覆盖：
+- cpu.stat / io.stat 解析
+- CPU 使用率和 I/O 吞吐按两次采样差值计算，首次为 None
+- 模板实例位于 system-<prefix>.slice 下，未运行的服务不输出
+- 合并到 systemd 服务状态
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import cgroup
+from monitor_agent.collectors.cgroup import (
+    get_service_usage,
+    merge_service_usage,
+    parse_cpu_stat,
+    parse_io_stat,
+    read_unit_usage,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    yield
+    cgroup._units.retain(())
+
+
+def test_parse_cpu_and_io_stat():
+    """测试：cpu.stat 取 usage_usec，io.stat 按设备求和"""
+    assert parse_cpu_stat("usage_usec 1500\nuser_usec 1000\n") == 1500
+    assert parse_cpu_stat("nr_periods 0\n") is None
+    assert parse_io_stat("259:0 rbytes=10 wbytes=20\n8:0 rbytes=5 wbytes=1 rios=1\n") == (15, 21)
+    assert parse_io_stat("") == (0, 0)
+
+
+def test_usage_rates_from_deltas(tmp_path, write_cgroup):
+    """测试：第二次采样按差值计算 CPU 使用率和 I/O 吞吐"""
+    unit_dir = tmp_path / "system.slice" / "vllm.service"
+    write_cgroup(unit_dir, usage_usec=0, rbytes=0, wbytes=0, memory=60 * 2**30, pids=42)
+
+    first = read_unit_usage("vllm.service", 100.0, root=str(tmp_path))
+    assert first == {
+        "cpu_pct": None, "mem_bytes": 60 * 2**30, "io_read_bps": None, "io_write_bps": None, "pids": 42,
+    }
+
+    # 2 秒内使用 6 秒 CPU 时间 = 3 个核
+    write_cgroup(unit_dir, usage_usec=6_000_000, rbytes=4096, wbytes=2048, memory=60 * 2**30, pids=42)
+    second = read_unit_usage("vllm.service", 102.0, root=str(tmp_path))
+    assert second["cpu_pct"] == 300.0
+    assert second["io_read_bps"] == 2048.0
+    assert second["io_write_bps"] == 1024.0
+
+
+def test_template_and_missing_units(tmp_path, write_cgroup):
+    """测试：模板实例路径；未运行的服务不输出；移出白名单后释放"""
+    write_cgroup(tmp_path / "system.slice" / "system-worker.slice" / "worker@1.service", 0, 0, 0)
+
+    usage = asyncio.run(get_service_usage(["worker@1.service", "stopped.service"], root=str(tmp_path)))
+    assert set(usage) == {"worker@1.service"}
+    assert usage["worker@1.service"]["pids"] == 3
+
+    asyncio.run(get_service_usage([], root=str(tmp_path)))
+    assert cgroup._units._cgroups == {}
+
+
+def test_merge_service_usage():
+    """测试：用量合并到对应服务，其它服务保持原样"""
+    services = [
+        {"name": "vllm.service", "active_state": "active", "sub_state": "running"},
+        {"name": "nginx.service", "active_state": "inactive", "sub_state": "dead"},
+    ]
+    merged = merge_service_usage(services, {"vllm.service": {"cpu_pct": 12.5, "mem_bytes": 1}})
+    assert merged[0]["cpu_pct"] == 12.5 and merged[0]["active_state"] == "active"
+    assert merged[1] == services[1]
+    assert merge_service_usage(services, None) is services
@@ -0,0 +1,143 @@
+"""
+单元测试：容器采集器
+
+使用临时目录模拟 /sys/fs/cgroup、Docker 数据目录和 containerd 任务目录。
+
+测试覆盖：
+- 容器 cgroup 目录识别（systemd / cgroupfs 驱动）和 /proc/<pid>/cgroup 解析
+- 发现结果和元数据缓存，容器退出后释放；元数据读取失败时定期重试
+- 采集在线程池中执行
+- GPU 进程按容器 ID 汇总
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import containers
+from monitor_agent.collectors.containers import (
+    ContainerCollector,
+    attach_gpu_processes,
+    container_id_from_cgroup,
+    match_container_dir,
+)
+
+DOCKER_ID = "a" * 64
+POD_ID = "b" * 64
+
+
+def test_match_container_dir_and_proc_cgroup():
+    """测试：各运行时的目录命名；/proc/<pid>/cgroup 中的容器 ID"""
+    assert match_container_dir(f"docker-{DOCKER_ID}.scope", "system.slice") == (DOCKER_ID, "docker")
+    assert match_container_dir(f"cri-containerd-{POD_ID}.scope", "kubepods-pod1.slice") == (POD_ID, "containerd")
+    assert match_container_dir(DOCKER_ID, "docker") == (DOCKER_ID, "docker")
+    assert match_container_dir("vllm.service", "system.slice") is None
+
+    assert container_id_from_cgroup(f"0::/system.slice/docker-{DOCKER_ID}.scope\n") == DOCKER_ID
+    assert container_id_from_cgroup(f"12:memory:/docker/{DOCKER_ID}\n0::/\n") == DOCKER_ID
+    assert container_id_from_cgroup("0::/user.slice/user-1000.slice/session-1.scope\n") is None
+
+
+def test_collect_with_cached_metadata(tmp_path, monkeypatch, write_cgroup):
+    """测试：CPU 按差值计算；元数据只读取一次；容器退出后清理"""
+    clock = {"t": 100.0}
+    monkeypatch.setattr(containers.time, "monotonic", lambda: clock["t"])
+
+    root = tmp_path / "cgroup"
+    docker_dir = root / "system.slice" / f"docker-{DOCKER_ID}.scope"
+    pod_dir = root / "kubepods.slice" / "kubepods-burstable.slice" / "kubepods-burstable-pod1.slice" / \
+        f"cri-containerd-{POD_ID}.scope"
+    write_cgroup(docker_dir, 0, memory=2 * 2**30)
+    write_cgroup(pod_dir, 0, memory=2**30)
+
+    docker_root = tmp_path / "docker"
+    (docker_root / DOCKER_ID).mkdir(parents=True)
+    (docker_root / DOCKER_ID / "config.v2.json").write_text(
+        json.dumps({"Name": "/train-llama", "Config": {"Image": "pytorch:24.05"}})
+    )
+    tasks_root = tmp_path / "tasks"
+    (tasks_root / "k8s.io" / POD_ID).mkdir(parents=True)
+    (tasks_root / "k8s.io" / POD_ID / "config.json").write_text(json.dumps({"annotations": {
+        "io.kubernetes.cri.container-name": "server",
+        "io.kubernetes.cri.sandbox-name": "vllm-0",
+        "io.kubernetes.cri.sandbox-namespace": "ml",
+    }}))
+
+    collector = ContainerCollector(str(root), str(docker_root), str(tasks_root))
+    first = collector.collect()
+    assert [(c["id"], c["name"], c["runtime"]) for c in first] == [
+        (DOCKER_ID[:12], "train-llama", "docker"),
+        (POD_ID[:12], "server", "containerd"),
+    ]
+    assert first[0]["image"] == "pytorch:24.05" and first[1]["pod"] == "ml/vllm-0"
+    assert first[0]["cpu_pct"] is None
+
+    # 元数据已缓存，删除后名称不变；2 秒内使用 4 秒 CPU 时间 = 2 个核
+    shutil.rmtree(docker_root)
+    clock["t"] = 102.0
+    write_cgroup(docker_dir, 4_000_000, memory=2 * 2**30)
+    second = collector.collect()
+    assert second[0]["name"] == "train-llama"
+    assert second[0]["cpu_pct"] == 200.0
+
+    # 容器退出：立即不再输出，下次发现后释放缓存
+    shutil.rmtree(docker_dir)
+    assert [c["id"] for c in collector.collect()] == [POD_ID[:12]]
+    clock["t"] += containers.DISCOVERY_TTL
+    collector.collect()
+    assert set(collector._metadata) == {POD_ID}
+    assert set(collector._reader._cgroups) == {POD_ID}
+
+
+def test_metadata_miss_retried(tmp_path, monkeypatch, write_cgroup):
+    """测试：容器先于 config.v2.json 被发现时显示短 ID，METADATA_RETRY 后读到名称"""
+    clock = {"t": 100.0}
+    monkeypatch.setattr(containers.time, "monotonic", lambda: clock["t"])
+
+    root = tmp_path / "cgroup"
+    write_cgroup(root / "system.slice" / f"docker-{DOCKER_ID}.scope", 0, memory=1)
+    docker_root = tmp_path / "docker"
+    collector = ContainerCollector(str(root), str(docker_root), str(tmp_path / "tasks"))
+    assert collector.collect()[0]["name"] == DOCKER_ID[:12]
+
+    (docker_root / DOCKER_ID).mkdir(parents=True)
+    (docker_root / DOCKER_ID / "config.v2.json").write_text(json.dumps({"Name": "/late"}))
+    clock["t"] += 1
+    assert collector.collect()[0]["name"] == DOCKER_ID[:12]
+    clock["t"] += containers.METADATA_RETRY
+    assert collector.collect()[0]["name"] == "late"
+    assert collector._metadata_misses == {}
+
+
+def test_get_containers_runs_in_thread(monkeypatch):
+    """测试：采集在线程池中执行"""
+    threads = []
+
+    class FakeCollector:
+        def collect(self):
+            threads.append(threading.current_thread())
+            return []
+
+    monkeypatch.setattr(containers, "_collector", FakeCollector())
+    assert asyncio.run(containers.get_containers()) == []
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_attach_gpu_processes():
+    """测试：GPU 进程按容器 ID 汇总，容器外的进程忽略"""
+    listed = [{"id": DOCKER_ID[:12], "name": "train"}, {"id": POD_ID[:12], "name": "idle"}]
+    procs = [
+        {"gpu_index": 0, "pid": 10, "used_mem_mb": 1000, "container_id": DOCKER_ID},
+        {"gpu_index": 1, "pid": 11, "used_mem_mb": 500, "container_id": DOCKER_ID},
+        {"gpu_index": 0, "pid": 12, "used_mem_mb": 800, "container_id": None},
+    ]
+    result = attach_gpu_processes(listed, procs)
+    assert result[0]["gpu_pids"] == [10, 11] and result[0]["gpu_mem_mb"] == 1500
+    assert result[1]["gpu_pids"] == [] and result[1]["gpu_mem_mb"] is None
+    assert attach_gpu_processes(None, procs) is None
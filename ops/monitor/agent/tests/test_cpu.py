@@ -0,0 +1,102 @@
+"""
+单元测试：CPU 采集器
+
+测试覆盖：
+- 总体/分类/每核使用率计算
+- 按时间窗口选择基准样本，与调用次数无关
+- CPU 数量变化或核上下线时重新分配缓冲区，每核使用率按 cpuN 编号标识
+- 字段回退（计数器重置）按 0 计
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors.cpu import CpuRing
+
+
+def _stat(total_row, *core_rows, core_ids=None):
+    """构造 /proc/stat 内容（字段: user nice system idle iowait irq softirq steal）"""
+    lines = ["cpu  " + " ".join(map(str, total_row)) + " 0 0"]
+    for i, row in zip(core_ids or range(len(core_rows)), core_rows):
+        lines.append(f"cpu{i} " + " ".join(map(str, row)) + " 0 0")
+    lines.append("intr 12345")
+    return "\n".join(lines) + "\n"
+
+
+def test_breakdown_and_per_core():
+    """测试：分类使用率与每核使用率"""
+    ring = CpuRing(size=4)
+    ring.record(_stat([0] * 8, [0] * 8, [0] * 8), now=0.0)
+    # 总计 200 jiffies: user 60 + nice 10, system 20 + irq 5 + softirq 5, idle 80, iowait 10, steal 10
+    ring.record(_stat([60, 10, 20, 80, 10, 5, 5, 10], [0, 0, 0, 100, 0, 0, 0, 0], [60, 10, 20, 0, 0, 5, 5, 0]), now=1.0)
+
+    result = ring.window(5.0)
+
+    assert result["cpu_pct"] == 60.0
+    assert result["user_pct"] == 35.0
+    assert result["system_pct"] == 15.0
+    assert result["iowait_pct"] == 5.0
+    assert result["steal_pct"] == 5.0
+    assert result["per_core_pct"] == [0.0, 100.0]
+    assert result["core_ids"] == [0, 1]
+    assert result["window_s"] == 1.0
+    assert result["last_pct"] == result["cpu_pct"]
+
+
+def test_window_independent_of_callers():
+    """测试：窗口按时间选择基准样本"""
+    ring = CpuRing(size=8)
+    busy = 0
+    for t in range(6):
+        ring.record(_stat([busy, 0, 0, 100 * t - busy, 0, 0, 0, 0]), now=float(t))
+        busy += 50 if t < 3 else 100
+
+    # t=5 相对 t=3: busy 150->350, idle 不变 => 100%
+    assert ring.window(2.0)["cpu_pct"] == pytest.approx(100.0)
+    assert ring.window(2.0)["window_s"] == 2.0
+    # 窗口超过历史时使用最旧样本
+    assert ring.window(60.0)["window_s"] == 5.0
+
+
+def test_first_sample_returns_none():
+    """测试：样本不足两个时返回 None"""
+    ring = CpuRing(size=4)
+    ring.record(_stat([0] * 8), now=0.0)
+    assert ring.window(5.0) is None
+
+
+def test_cpu_hotplug_reallocates():
+    """测试：CPU 数量变化时丢弃旧样本"""
+    ring = CpuRing(size=4)
+    ring.record(_stat([0] * 8, [0] * 8), now=0.0)
+    ring.record(_stat([0] * 8, [0] * 8, [0] * 8), now=1.0)
+    assert ring.window(5.0) is None
+
+
+def test_offline_core_ids():
+    """测试：cpu1 离线时后面的核保留自己的编号；同数量不同编号也重新分配"""
+    ring = CpuRing(size=4)
+    ring.record(_stat([0] * 8, [0] * 8, [0] * 8, core_ids=[0, 2]), now=0.0)
+    ring.record(_stat([0] * 8, [0, 0, 0, 100, 0, 0, 0, 0], [100, 0, 0, 0, 0, 0, 0, 0], core_ids=[0, 2]), now=1.0)
+    result = ring.window(5.0)
+    assert result["core_ids"] == [0, 2]
+    assert result["per_core_pct"] == [0.0, 100.0]
+
+    ring.record(_stat([0] * 8, [0] * 8, [0] * 8, core_ids=[0, 1]), now=2.0)
+    assert ring.window(5.0) is None
+
+
+def test_negative_deltas_clamped():
+    """测试：单个字段回退时按 0 计，不产生负数或超过 100 的使用率"""
+    ring = CpuRing(size=4)
+    ring.record(_stat([100, 0, 50, 1000, 0, 0, 0, 0]), now=0.0)
+    # user +100，iowait 不变，system 回退 40
+    ring.record(_stat([200, 0, 10, 1100, 0, 0, 0, 0]), now=1.0)
+    result = ring.window(5.0)
+    assert result["cpu_pct"] == 50.0
+    assert result["system_pct"] == 0.0
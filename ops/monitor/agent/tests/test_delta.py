@@ -0,0 +1,85 @@
+"""
+单元测试：增量快照
+
+测试覆盖：
+- 只包含变化的标量、GPU 条目和服务
+- 列表条目的新增与移除
+- since 不在历史范围内时回退到完整快照
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import ScheduledCollector
+from monitor_agent.config import AgentConfig
+from monitor_agent.delta import make_delta
+from monitor_agent.sampler import Sampler
+
+
+BASE = {
+    "epoch": "e1", "seq": 1, "ts": "2026-01-20T10:00:00Z",
+    "cpu_pct": 10.0, "disks": [{"mount": "/", "used_pct": 50.0}],
+    "gpus": [{"index": 0, "util_pct": 10.0}, {"index": 1, "util_pct": 20.0}],
+    "services": [{"name": "a.service", "active_state": "active"}, {"name": "b.service", "active_state": "active"}],
+}
+
+
+def test_make_delta_only_changed():
+    """测试：未变化的字段和条目不出现在增量中"""
+    cur = dict(BASE, seq=2, ts="2026-01-20T10:00:05Z",
+               gpus=[{"index": 0, "util_pct": 99.0}, {"index": 1, "util_pct": 20.0}])
+    delta = make_delta(BASE, cur)
+
+    assert delta["seq"] == 2
+    assert delta["base_seq"] == 1
+    assert delta["changed"] == {"ts": "2026-01-20T10:00:05Z"}
+    assert delta["lists"] == {"gpus": {"key": "index", "upsert": [{"index": 0, "util_pct": 99.0}], "remove": []}}
+
+
+def test_make_delta_added_and_removed():
+    """测试：列表条目新增与移除"""
+    cur = dict(BASE, seq=3, services=[
+        {"name": "a.service", "active_state": "failed"},
+        {"name": "c.service", "active_state": "active"},
+    ])
+    services = make_delta(BASE, cur)["lists"]["services"]
+    assert services["upsert"] == cur["services"]
+    assert services["remove"] == ["b.service"]
+
+
+def test_sampler_snapshot_body_since():
+    """测试：已知 base 返回增量，未知 base 返回完整快照，均附带窗口汇总"""
+    async def cpu():
+        return {"cpu_pct": 12.5}
+
+    async def run():
+        sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+        sampler._collectors = {"cpu": ScheduledCollector("cpu", cpu, 1.0, timeout=5.0, cost="cheap")}
+        base_seq = sampler.latest.seq
+        await sampler.start()
+        await asyncio.sleep(0.05)
+        await sampler.stop()
+        return sampler, base_seq
+
+    sampler, base_seq = asyncio.run(run())
+    latest = sampler.latest
+
+    delta = json.loads(sampler.snapshot_body(base_seq))
+    assert delta["base_seq"] == base_seq
+    assert delta["seq"] == latest.seq
+    assert delta["changed"]["cpu_pct"] == 12.5
+    assert "node_id" not in delta["changed"]
+
+    assert delta["window"]["since"] == base_seq
+    assert delta["window"]["cpu_pct"]["max"] == 12.5
+    assert delta["window"]["cpu_pct"]["n"] == latest.seq - base_seq
+
+    full = json.loads(sampler.snapshot_body(latest.seq + 100))
+    assert full.pop("window")["cpu_pct"] is None
+    assert full == latest.snapshot
+    assert sampler.snapshot_body(None) == latest.body
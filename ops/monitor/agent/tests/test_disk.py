@@ -0,0 +1,113 @@
+"""
+单元测试：磁盘采集器
+
+测试覆盖：
+- mountinfo 解析：排除伪文件系统、bind mount 去重、通配符过滤
+- 挂载点超时返回上一次的值并标记 stale
+- 多个挂死的挂载点不影响健康挂载点
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import disk
+from monitor_agent.collectors.disk import get_disk_usage, parse_mountinfo
+
+
+MOUNTINFO = """\
+22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw
+23 22 0:21 / /proc rw,nosuid shared:12 - proc proc rw
+24 22 0:22 / /sys rw,nosuid shared:7 - sysfs sysfs rw
+25 22 0:5 / /dev rw,nosuid shared:2 - devtmpfs udev rw
+26 22 0:25 / /run rw,nosuid shared:5 - tmpfs tmpfs rw
+40 22 259:3 / /data rw,relatime shared:30 - xfs /dev/nvme1n1 rw
+41 22 259:3 /sub /data-bind rw,relatime shared:30 - xfs /dev/nvme1n1 rw
+42 22 0:50 / /mnt/nfs\\040share rw,relatime shared:31 - nfs4 10.0.0.5:/export rw
+43 22 7:1 / /snap/core/100 ro,relatime shared:32 - squashfs /dev/loop1 ro
+44 22 259:4 / /scratch rw,relatime shared:33 - ext4 /dev/nvme2n1 rw
+"""
+
+
+def test_parse_mountinfo_real_filesystems():
+    """测试：只保留真实文件系统，bind mount 去重"""
+    assert parse_mountinfo(MOUNTINFO) == ["/", "/data", "/mnt/nfs share", "/scratch"]
+
+
+def test_parse_mountinfo_non_ascii_escape():
+    """测试：挂载点同时含非 ASCII 字符和转义"""
+    content = "45 22 259:5 / /mnt/数据\\040盘\\011x rw,relatime shared:34 - ext4 /dev/nvme3n1 rw\n"
+    assert parse_mountinfo(content) == ["/mnt/数据 盘\tx"]
+
+
+def test_parse_mountinfo_patterns():
+    """测试：include/exclude 通配符"""
+    assert parse_mountinfo(MOUNTINFO, include=["/data*", "/scratch"]) == ["/data", "/scratch"]
+    assert parse_mountinfo(MOUNTINFO, exclude=["/mnt/*"]) == ["/", "/data", "/scratch"]
+
+
+def test_hung_mount_returns_stale(monkeypatch):
+    """测试：statvfs 挂死时返回上一次成功的值并标记 stale，且不重复占用线程"""
+    release = threading.Event()
+    calls = {"n": 0}
+
+    def fake_usage(mount):
+        calls["n"] += 1
+        if calls["n"] > 1:
+            release.wait(5)
+        return {"mount": mount, "used_bytes": 1, "total_bytes": 2, "used_pct": 50.0, "stale": False}
+
+    monkeypatch.setattr(disk, "_statvfs_usage", fake_usage)
+    monkeypatch.setattr(disk, "_inflight", {})
+    monkeypatch.setattr(disk, "_last_good", {})
+
+    async def run():
+        first = await get_disk_usage(["/hung"], timeout=0.5)
+        second = await get_disk_usage(["/hung"], timeout=0.05)
+        third = await get_disk_usage(["/hung"], timeout=0.05)
+        release.set()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert first[0]["stale"] is False
+    assert second[0]["stale"] is True and second[0]["used_pct"] == 50.0
+    assert third[0]["stale"] is True
+    assert calls["n"] == 2
+
+
+def test_many_hung_mounts_do_not_block_healthy(monkeypatch):
+    """测试：挂死的挂载点数量较多时，健康挂载点每轮仍能按时返回新值"""
+    release = threading.Event()
+    calls = {"/": 0}
+
+    def fake_usage(mount):
+        if mount != "/":
+            release.wait(5)
+        else:
+            calls["/"] += 1
+        return {"mount": mount, "used_bytes": 1, "total_bytes": 2, "used_pct": 50.0, "stale": False}
+
+    monkeypatch.setattr(disk, "_statvfs_usage", fake_usage)
+    monkeypatch.setattr(disk, "_inflight", {})
+    monkeypatch.setattr(disk, "_last_good", {})
+    mounts = [f"/mnt/hung{i}" for i in range(8)] + ["/"]
+
+    async def run():
+        rounds = [await get_disk_usage(mounts, timeout=0.2) for _ in range(3)]
+        release.set()
+        return rounds
+
+    for result in asyncio.run(run()):
+        assert [(d["mount"], d["stale"]) for d in result] == [("/", False)]
+    assert calls["/"] == 3
+
+
+def test_missing_mount_skipped():
+    """测试：不存在的挂载点被跳过"""
+    result = asyncio.run(get_disk_usage(["/", "/definitely/not/a/mount"]))
+    assert [d["mount"] for d in result] == ["/"]
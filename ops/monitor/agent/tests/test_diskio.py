@@ -0,0 +1,54 @@
+"""
+单元测试：磁盘 I/O 采集器
+
+测试覆盖：
+- /proc/diskstats 解析：排除分区和虚拟设备
+- 吞吐、IOPS、await 计算
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors.diskio import DEFAULT_EXCLUDE, compute_rates, parse_diskstats
+from monitor_agent.config import AgentConfig
+
+
+DISKSTATS = """\
+ 259       0 nvme0n1 1000 0 80000 500 2000 0 160000 1500 0 1200 2000 0 0 0 0
+ 259       1 nvme0n1p1 10 0 80 5 0 0 0 0 0 5 5 0 0 0 0
+   7       0 loop0 50 0 400 10 0 0 0 0 0 10 10 0 0 0 0
+   8       0 sda 10 0 100 20 0 0 0 0 0 20 20
+"""
+
+
+def test_parse_diskstats_whole_disks_only():
+    """测试：只保留整盘，排除 loop 设备"""
+    counters = parse_diskstats(DISKSTATS, devices={"nvme0n1", "loop0", "sda"})
+    assert set(counters) == {"nvme0n1", "sda"}
+    assert counters["nvme0n1"] == (1000, 80000, 500, 2000, 160000, 1500)
+
+
+def test_compute_rates():
+    """测试：速率按间隔计算，新出现的设备跳过"""
+    prev = {"nvme0n1": (1000, 80000, 500, 2000, 160000, 1500)}
+    cur = {
+        "nvme0n1": (1100, 82048, 600, 2300, 168192, 1900),
+        "sdb": (1, 1, 1, 1, 1, 1),
+    }
+    rates = compute_rates(prev, cur, elapsed=2.0)
+
+    assert rates["devices"] == ["nvme0n1"]
+    assert rates["read_bps"] == [2048 * 512 / 2]
+    assert rates["write_bps"] == [8192 * 512 / 2]
+    assert rates["read_iops"] == [50.0]
+    assert rates["write_iops"] == [150.0]
+    # (100 + 400) ms / 400 次 I/O
+    assert rates["await_ms"] == [1.25]
+
+
+def test_config_default_exclude():
+    """测试：配置默认值与采集器的 DEFAULT_EXCLUDE 一致"""
+    assert AgentConfig(node_id="n", token="t").diskio_exclude == list(DEFAULT_EXCLUDE)
@@ -0,0 +1,79 @@
+"""
+单元测试：响应编码协商
+
+测试覆盖：
+- Accept / Accept-Encoding 解析（q=0 视为拒绝）
+- 小响应体不压缩，大响应体 gzip
+- 采样器按编码缓存响应体，发布新样本后失效
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent import encoding
+from monitor_agent.config import AgentConfig
+from monitor_agent.encoding import JSON_TYPE, MSGPACK_TYPE, accepts_gzip, choose_media_type
+from monitor_agent.sampler import Sampler
+
+
+def test_accepts_gzip():
+    """测试：解析 Accept-Encoding"""
+    assert accepts_gzip("gzip, deflate")
+    assert accepts_gzip("br;q=1.0, GZIP;q=0.5")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip(None)
+
+
+def test_choose_media_type(monkeypatch):
+    """测试：未安装 msgpack 时始终返回 JSON"""
+    monkeypatch.setattr(encoding, "msgpack", None)
+    assert choose_media_type("application/msgpack") == JSON_TYPE
+
+    monkeypatch.setattr(encoding, "msgpack", object())
+    assert choose_media_type("application/msgpack, application/json;q=0.9") == MSGPACK_TYPE
+    assert choose_media_type("application/x-msgpack") == MSGPACK_TYPE
+    assert choose_media_type("application/msgpack;q=0, application/json") == JSON_TYPE
+    assert choose_media_type(None) == JSON_TYPE
+
+
+def test_sampler_gzip_threshold_and_cache():
+    """测试：大快照才压缩，结果缓存到下一个样本发布"""
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+
+    body, gzipped = sampler.encoded_snapshot(accept_gzip=True)
+    assert not gzipped and body == sampler.snapshot_body()
+
+    sampler._values["systemd"] = [
+        {"name": f"svc-{i}.service", "active_state": "active", "sub_state": "running"} for i in range(100)
+    ]
+    sampler._collected_at["systemd"] = 0.0
+    sampler._publish()
+
+    body, gzipped = sampler.encoded_snapshot(accept_gzip=True)
+    assert gzipped
+    assert json.loads(gzip.decompress(body)) == json.loads(sampler.snapshot_body())
+    assert len(body) < len(sampler.snapshot_body())
+    assert sampler.encoded_snapshot(accept_gzip=True)[0] is body
+
+    sampler._publish()
+    assert sampler.encoded_snapshot(accept_gzip=True)[0] is not body
+
+
+def test_sampler_msgpack_delta():
+    """测试：MessagePack 编码的增量与 JSON 增量一致"""
+    msgpack = pytest.importorskip("msgpack")
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+    sampler._values["cpu"] = {"cpu_pct": 12.0}
+    sampler._collected_at["cpu"] = 0.0
+    sampler._publish()
+
+    body, gzipped = sampler.encoded_snapshot(since=0, media_type=MSGPACK_TYPE)
+    assert not gzipped
+    assert msgpack.unpackb(body, raw=False) == json.loads(sampler.snapshot_body(since=0))
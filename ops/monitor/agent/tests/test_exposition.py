@@ -0,0 +1,83 @@
+"""
+单元测试：Prometheus 文本格式导出
+
+测试覆盖：
+- 从快照渲染 CPU、磁盘、GPU、服务状态，标签转义
+- 同一 seq 只渲染一次，标签前缀缓存复用
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.config import AgentConfig
+from monitor_agent.exposition import Exposition, format_value
+from monitor_agent.sampler import Sampler
+
+
+def _sampler():
+    sampler = Sampler(AgentConfig(node_id="gpu-01", token="t", gpu="off"))
+    sampler._values.update({
+        "cpu": {"cpu_pct": 40.0, "user_pct": 30.0, "system_pct": 10.0, "iowait_pct": 0.0,
+                "steal_pct": 0.0, "per_core_pct": [80.0, 0.0], "core_ids": [0, 2],
+                "window_s": 5.0},
+        "disk": [{"mount": "/data", "used_bytes": 10, "total_bytes": 40, "used_pct": 25.0, "stale": True}],
+        "gpu": [{"index": 0, "name": "A100 \"SXM\"", "util_pct": 97.0, "mem_used_mb": 2, "mem_total_mb": 4,
+                 "power_w": 250.5, "sm_clock_mhz": 1410, "throttle_reasons": ["hw_thermal_slowdown"]}],
+        "systemd": [{"name": "nginx.service", "active_state": "failed", "sub_state": "failed"}],
+    })
+    sampler._collected_at["cpu"] = 1700000000.0
+    sampler._publish()
+    return sampler
+
+
+def test_render_snapshot():
+    """测试：各指标族的序列与值"""
+    sampler = _sampler()
+    text, _ = Exposition("gpu-01").render(sampler.latest)
+    text = text.decode()
+
+    assert "# TYPE monitor_cpu_usage_percent gauge" in text
+    assert 'monitor_cpu_usage_percent{node="gpu-01"} 40.0' in text
+    assert 'monitor_cpu_core_usage_percent{node="gpu-01",core="0"} 80.0' in text
+    assert 'monitor_cpu_core_usage_percent{node="gpu-01",core="2"} 0.0' in text
+    assert 'monitor_disk_used_bytes{node="gpu-01",mount="/data"} 10' in text
+    assert 'monitor_disk_stale{node="gpu-01",mount="/data"} 1' in text
+    assert 'monitor_gpu_utilization_percent{node="gpu-01",gpu="0",name="A100 \\"SXM\\""} 97.0' in text
+    assert 'monitor_gpu_memory_used_bytes{node="gpu-01",gpu="0",name="A100 \\"SXM\\""} 2097152' in text
+    assert 'monitor_gpu_power_watts{node="gpu-01",gpu="0",name="A100 \\"SXM\\""} 250.5' in text
+    assert 'monitor_gpu_sm_clock_hertz{node="gpu-01",gpu="0",name="A100 \\"SXM\\""} 1410000000' in text
+    assert 'reason="hw_thermal_slowdown"} 1' in text
+    assert "monitor_gpu_pcie_receive_bytes_per_second" not in text
+    assert 'monitor_service_active{node="gpu-01",service="nginx.service"} 0' in text
+    assert 'active_state="failed",sub_state="failed"} 1' in text
+    assert text.count("# HELP monitor_cpu_mode_percent") == 1
+    assert 'monitor_sample_collected_timestamp_seconds{node="gpu-01",collector="cpu"} 1700000000.0' in text
+
+
+def test_render_cached_per_seq():
+    """测试：同一 seq 返回缓存结果，新样本复用标签前缀"""
+    sampler = _sampler()
+    exposition = Exposition("gpu-01")
+
+    first, _ = exposition.render(sampler.latest)
+    assert exposition.render(sampler.latest)[0] is first
+    prefixes = len(exposition.labels)
+
+    sampler._values["cpu"] = dict(sampler._values["cpu"], cpu_pct=50.0)
+    sampler._publish()
+    second, _ = exposition.render(sampler.latest)
+    assert second is not first
+    assert b'monitor_cpu_usage_percent{node="gpu-01"} 50.0' in second
+    assert len(exposition.labels) == prefixes
+
+
+def test_format_value():
+    """测试：布尔、整数、浮点、缺失值"""
+    assert format_value(True) == "1"
+    assert format_value(3) == "3"
+    assert format_value(0.5) == "0.5"
+    assert format_value(float("nan")) == "NaN"
+    assert format_value(None) is None
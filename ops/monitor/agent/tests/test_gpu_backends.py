@@ -0,0 +1,246 @@
+"""
+单元测试：GPU 采集后端
+
+使用内置假 NVML 模块，无需 GPU 即可运行。
+
+测试覆盖：
+- NVML 后端输出格式与 nvidia-smi 一致
+- NVML 只初始化一次，单卡失败不影响其他卡
+- nvidia-smi CSV 行解析（扩展字段、[N/A]、旧驱动只返回必需字段）
+- 功耗、频率、降频原因、ECC、PCIe 吞吐
+- 后端选择，全局后端只在线程池中创建一次
+- 计算进程列表（NVML / --query-compute-apps）
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import gpu as gpu_module
+from monitor_agent.collectors import nvml_fake
+from monitor_agent.collectors.gpu import (
+    GPU_FIELDS,
+    NvmlBackend,
+    SmiOneshotBackend,
+    SmiStreamBackend,
+    create_gpu_backend,
+    decode_throttle_reasons,
+    parse_smi_apps,
+    parse_smi_line,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_devices():
+    nvml_fake.set_devices()
+    yield
+    nvml_fake.set_devices()
+
+
+def test_nvml_backend_query():
+    """测试：NVML 后端返回与 nvidia-smi 相同的字段"""
+    backend = NvmlBackend(nvml_fake)
+    result = asyncio.run(backend.query())
+
+    assert len(result) == 2
+    assert result[0] == {
+        "index": 0,
+        "name": "Fake NVIDIA A100-SXM4-40GB",
+        "util_pct": 56.0,
+        "mem_used_mb": 2048,
+        "mem_total_mb": 40960,
+        "temperature_c": 65.0,
+        "power_w": 251.3,
+        "power_limit_w": 400.0,
+        "sm_clock_mhz": 1410,
+        "mem_clock_mhz": 1215,
+        "throttle_reasons": ["sw_power_cap"],
+        "ecc_corrected": 3,
+        "ecc_uncorrected": 0,
+        "pcie_rx_bps": 1024 * 1024,
+        "pcie_tx_bps": 512 * 1024,
+    }
+    assert tuple(result[0]) == GPU_FIELDS
+    assert result[1]["index"] == 1
+    # 空闲不算降频
+    assert result[1]["throttle_reasons"] == []
+
+
+def test_nvml_backend_initializes_once():
+    """测试：多次采集只初始化一次 NVML"""
+    backend = NvmlBackend(nvml_fake)
+    before = nvml_fake.init_count
+
+    async def run():
+        for _ in range(3):
+            await backend.query()
+        await backend.close()
+
+    asyncio.run(run())
+    assert nvml_fake.init_count == before + 1
+
+
+def test_nvml_backend_concurrent_init(monkeypatch):
+    """测试：多个线程同时首次采集时只调用一次 nvmlInit"""
+    backend = NvmlBackend(nvml_fake)
+    before = nvml_fake.init_count
+    original = nvml_fake.nvmlInit
+
+    def slow_init():
+        time.sleep(0.05)
+        original()
+
+    monkeypatch.setattr(nvml_fake, "nvmlInit", slow_init)
+    threads = [threading.Thread(target=backend._query_sync) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert nvml_fake.init_count == before + 1
+    asyncio.run(backend.close())
+
+
+def test_nvml_backend_missing_temperature():
+    """测试：不支持温度的卡 temperature_c 为 None"""
+    nvml_fake.set_devices([
+        {"name": "Fake T4", "util_pct": 10, "mem_used_mb": 100, "mem_total_mb": 15360, "temperature_c": None},
+    ])
+    result = asyncio.run(NvmlBackend(nvml_fake).query())
+    assert result[0]["temperature_c"] is None
+    # 不支持的扩展字段为 None，不影响基础字段
+    assert result[0]["power_w"] is None
+    assert result[0]["throttle_reasons"] is None
+    assert result[0]["util_pct"] == 10.0
+
+
+def test_nvml_backend_no_devices():
+    """测试：无设备时返回 None"""
+    nvml_fake.set_devices([])
+    assert asyncio.run(NvmlBackend(nvml_fake).query()) is None
+
+
+def test_parse_smi_line():
+    """测试：nvidia-smi CSV 行解析"""
+    line = (
+        "0, NVIDIA A100-SXM4-40GB, 56, 2048, 40960, 75, 251.30, 400.00, 1410, 1215, "
+        "0x0000000000000044, 0, [N/A]"
+    )
+    assert parse_smi_line(line) == {
+        "index": 0,
+        "name": "NVIDIA A100-SXM4-40GB",
+        "util_pct": 56.0,
+        "mem_used_mb": 2048,
+        "mem_total_mb": 40960,
+        "temperature_c": 75.0,
+        "power_w": 251.3,
+        "power_limit_w": 400.0,
+        "sm_clock_mhz": 1410,
+        "mem_clock_mhz": 1215,
+        "throttle_reasons": ["sw_power_cap", "hw_thermal_slowdown"],
+        "ecc_corrected": 0,
+        "ecc_uncorrected": None,
+        "pcie_rx_bps": None,
+        "pcie_tx_bps": None,
+    }
+    # 旧驱动只查询必需字段：扩展字段为 None
+    basic = parse_smi_line("0, NVIDIA A100-SXM4-40GB, 56, 2048, 40960, 75")
+    assert tuple(basic) == GPU_FIELDS
+    assert basic["temperature_c"] == 75.0 and basic["power_w"] is None
+    assert parse_smi_line("0, NVIDIA A100, [N/A], 2048, 40960, 75") is None
+    assert parse_smi_line("garbage") is None
+
+
+def test_decode_throttle_reasons():
+    """测试：降频原因位掩码解码，gpu_idle 不计入"""
+    assert decode_throttle_reasons(0) == []
+    assert decode_throttle_reasons(0x1) == []
+    assert decode_throttle_reasons(0x4 | 0x8 | 0x20) == ["sw_power_cap", "hw_slowdown", "sw_thermal_slowdown"]
+
+
+def test_smi_oneshot_falls_back_to_basic_fields(monkeypatch):
+    """测试：旧驱动不认识扩展字段时回退到必需字段，之后不再尝试扩展查询"""
+
+    queries = []
+
+    async def fake_run_command(args, timeout=10.0):
+        fields = args[1].split("=", 1)[1]
+        queries.append(fields)
+        if fields != gpu_module.SMI_BASIC_FIELDS:
+            return 2, b""
+        return 0, b"0, NVIDIA T4, 10, 100, 15360, 40\n"
+
+    monkeypatch.setattr(gpu_module, "run_command", fake_run_command)
+    backend = SmiOneshotBackend()
+
+    async def run():
+        first = await backend.query()
+        second = await backend.query()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0]["name"] == "NVIDIA T4" and first[0]["power_w"] is None
+    assert second == first
+    assert queries == [gpu_module.SMI_QUERY_FIELDS, gpu_module.SMI_BASIC_FIELDS, gpu_module.SMI_BASIC_FIELDS]
+
+
+def test_create_gpu_backend():
+    """测试：按配置选择后端"""
+    assert create_gpu_backend("off") is None
+    assert isinstance(create_gpu_backend("smi"), SmiOneshotBackend)
+    assert isinstance(create_gpu_backend("smi-loop"), SmiStreamBackend)
+    backend = create_gpu_backend("fake")
+    assert isinstance(backend, NvmlBackend) and backend._initialized
+    asyncio.run(backend.close())
+
+
+def test_get_gpu_backend_created_once_off_loop(monkeypatch):
+    """测试：并发获取全局后端时只创建一次，且在线程池中创建（nvmlInit 不阻塞事件循环）"""
+    created = []
+
+    def slow_create(mode):
+        time.sleep(0.05)
+        created.append((mode, threading.current_thread()))
+        return SmiOneshotBackend()
+
+    monkeypatch.setattr(gpu_module, "create_gpu_backend", slow_create)
+    monkeypatch.setattr(gpu_module, "get_config", lambda: SimpleNamespace(gpu="auto"))
+
+    async def run():
+        await gpu_module.close_gpu_backend()
+        backends = await asyncio.gather(*(gpu_module.get_gpu_backend() for _ in range(3)))
+        await gpu_module.close_gpu_backend()
+        return backends
+
+    backends = asyncio.run(run())
+    assert len(created) == 1
+    assert created[0][0] == "auto" and created[0][1] is not threading.main_thread()
+    assert backends[0] is backends[1] is backends[2]
+
+
+def test_nvml_backend_processes():
+    """测试：NVML 后端列出计算进程，并带上 SM 利用率"""
+    backend = NvmlBackend(nvml_fake)
+    result = asyncio.run(backend.query_processes())
+    assert result == [{"gpu_index": 0, "pid": 4242, "used_mem_mb": 2000, "sm_util_pct": 55.0}]
+
+
+def test_parse_smi_apps():
+    """测试：--query-compute-apps 输出按 UUID 映射到 GPU 索引"""
+    output = (
+        "GPU-aaaa, 1234, 20480\n"
+        "GPU-bbbb, 5678, [N/A]\n"
+        "GPU-cccc, 9999, 100\n"
+    )
+    result = parse_smi_apps(output, {"GPU-aaaa": 0, "GPU-bbbb": 1})
+    assert result == [
+        {"gpu_index": 0, "pid": 1234, "used_mem_mb": 20480, "sm_util_pct": None},
+        {"gpu_index": 1, "pid": 5678, "used_mem_mb": None, "sm_util_pct": None},
+    ]
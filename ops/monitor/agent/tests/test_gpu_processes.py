@@ -0,0 +1,65 @@
+"""
+单元测试：GPU 进程采集器
+
+测试覆盖：
+- /proc/<pid>/status uid 解析、cmdline 和所在容器读取
+- pid 信息缓存：只为新 pid 读 /proc，消失的 pid 被清理
+- 输出数量上限
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import gpu_processes
+from monitor_agent.collectors.gpu_processes import enrich_processes, parse_status_uid
+
+
+def _make_proc(root: Path, pid: int, uid: int, cmdline: bytes):
+    (root / str(pid)).mkdir()
+    (root / str(pid) / "status").write_text(f"Name:\tpython\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n")
+    (root / str(pid) / "cmdline").write_bytes(cmdline)
+
+
+def test_parse_status_uid():
+    """测试：取 Uid 行的真实 uid"""
+    assert parse_status_uid("Name:\tpython\nUid:\t1000\t0\t0\t0\n") == 1000
+    assert parse_status_uid("Name:\tpython\n") is None
+
+
+def test_enrich_processes(tmp_path, monkeypatch):
+    """测试：补充 uid/用户/命令行，缓存命中后不再读取 /proc"""
+    monkeypatch.setattr(gpu_processes, "_proc_cache", {})
+    _make_proc(tmp_path, 100, os.getuid(), b"python\0train.py\0--epochs\x0010\0")
+    (tmp_path / "100" / "cgroup").write_text("0::/system.slice/docker-" + "c" * 64 + ".scope\n")
+
+    procs = [{"gpu_index": 0, "pid": 100, "used_mem_mb": 1024, "sm_util_pct": 90.0}]
+    result = enrich_processes(procs, proc_root=str(tmp_path))
+    assert result[0]["uid"] == os.getuid()
+    assert result[0]["user"]
+    assert result[0]["cmdline"] == "python train.py --epochs 10"
+    assert result[0]["container_id"] == "c" * 64
+
+    # 删除 /proc 条目后仍命中缓存
+    (tmp_path / "100" / "cmdline").unlink()
+    assert enrich_processes(procs, proc_root=str(tmp_path))[0]["cmdline"] == "python train.py --epochs 10"
+
+    # 进程消失后缓存被清理
+    enrich_processes([], proc_root=str(tmp_path))
+    assert gpu_processes._proc_cache == {}
+
+
+def test_enrich_processes_bounded(tmp_path, monkeypatch):
+    """测试：超过上限时按显存占用保留前 MAX_PROCESSES 个"""
+    monkeypatch.setattr(gpu_processes, "_proc_cache", {})
+    monkeypatch.setattr(gpu_processes, "MAX_PROCESSES", 2)
+
+    procs = [{"gpu_index": 0, "pid": pid, "used_mem_mb": pid, "sm_util_pct": None} for pid in range(1, 6)]
+    result = enrich_processes(procs, proc_root=str(tmp_path))
+    assert [p["pid"] for p in result] == [5, 4]
+    assert result[0]["uid"] is None
+    assert result[0]["cmdline"] == ""
+    assert result[0]["container_id"] is None
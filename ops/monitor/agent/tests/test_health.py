@@ -0,0 +1,104 @@
+"""
+单元测试：健康检查
+
+测试覆盖：
+- 默认只读取采集器运行状态（成功时间、错误、连续失败次数），不调用采集器
+- 采集停滞、尚未采集的判定
+- ?deep=1 实际运行采集器，超时受限
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent import health
+from monitor_agent.collectors import ScheduledCollector
+from monitor_agent.config import AgentConfig
+from monitor_agent.sampler import Sampler
+
+
+def _make_sampler(collectors, interval=1.0):
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+    sampler._collectors = {
+        name: ScheduledCollector(name, collect, interval, timeout=5.0, cost="cheap")
+        for name, collect in collectors.items()
+    }
+    sampler._telemetry = {}
+    return sampler
+
+
+def test_telemetry_from_collector_loop():
+    """测试：采集循环记录成功时间、错误和连续失败次数"""
+    calls = {"n": 0}
+
+    async def cpu():
+        calls["n"] += 1
+        if calls["n"] > 1:
+            raise RuntimeError("boom")
+        return {"cpu_pct": 1.0}
+
+    async def memory():
+        return {"mem_used_pct": 10.0}
+
+    async def run():
+        sampler = _make_sampler({"cpu": cpu, "memory": memory}, interval=0.01)
+        await sampler.start()
+        await asyncio.sleep(0.05)
+        await sampler.stop()
+        return sampler
+
+    sampler = asyncio.run(run())
+    cpu_state = sampler.telemetry["cpu"]
+    assert cpu_state.last_success is not None
+    assert cpu_state.consecutive_failures == calls["n"] - 1 > 0
+    assert cpu_state.last_error == "boom"
+
+    document = health.check_health(sampler._config, sampler, now=cpu_state.last_success)
+    assert document["checks"]["cpu"] == "degraded"
+    assert "boom" in document["details"]["cpu"]
+    assert document["checks"]["memory"] == "ok"
+    assert document["checks"]["gpu"] == "disabled"
+    assert document["status"] == "degraded"
+    assert document["collectors"]["cpu"]["consecutive_failures"] == cpu_state.consecutive_failures
+
+
+def test_pending_stale_and_error():
+    """测试：尚未采集为 pending，成功过期为 degraded，从未成功为 error"""
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+    document = health.check_health(sampler._config, sampler, now=1000.0)
+    assert document["checks"]["cpu"] == "pending"
+    assert document["status"] == "ok"
+
+    cpu = sampler.telemetry["cpu"]
+    cpu.runs, cpu.last_success = 5, 1000.0
+    now = 1000.0 + cpu.interval_s * health.STALE_INTERVALS + 1
+    assert health.check_health(sampler._config, sampler, now=now)["checks"]["cpu"] == "degraded"
+
+    disk = sampler.telemetry["disk"]
+    disk.runs, disk.consecutive_failures, disk.last_error = 2, 2, "timeout"
+    document = health.check_health(sampler._config, sampler, now=1000.0)
+    assert document["checks"]["disk"] == "error"
+    assert document["details"]["disk"] == "timeout"
+
+
+def test_deep_check_bounded(monkeypatch):
+    """测试：?deep=1 运行采集器，超时的采集器报告 error"""
+    async def slow_cpu():
+        await asyncio.sleep(10)
+
+    async def disk(*args, **kwargs):
+        return [{"mount": "/"}]
+
+    monkeypatch.setattr(health, "get_cpu_percent", slow_cpu)
+    monkeypatch.setattr(health, "get_disk_usage", disk)
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+
+    document = asyncio.run(health.deep_check(sampler._config, sampler, timeout=0.05))
+    assert document["deep"] is True
+    assert document["checks"]["cpu"] == "error"
+    assert "Timed out" in document["details"]["cpu"]
+    assert document["checks"]["disk"] == "ok"
+    assert document["status"] == "degraded"
@@ -0,0 +1,76 @@
+"""
+单元测试：Agent 运行指标
+
+测试覆盖：
+- 直方图分桶（上界包含）与累计计数
+- run_command 统计子进程创建次数
+- 请求/采集器指标的 JSON 与 Prometheus 文本输出
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent import instrumentation as instrumentation_module
+from monitor_agent.instrumentation import Histogram, Instrumentation, wants_prometheus
+from monitor_agent.utils import run_command
+
+
+def test_histogram_buckets():
+    """测试：值等于上界时计入该桶，超出所有上界计入 +Inf"""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.to_dict()["sum"] == 3.65
+
+
+def test_run_command_counts_spawns(monkeypatch):
+    """测试：run_command 按可执行文件名计数"""
+    instrumentation = Instrumentation()
+    monkeypatch.setattr(instrumentation_module, "_instrumentation", instrumentation)
+
+    async def run():
+        for _ in range(2):
+            await run_command(["/bin/true"])
+
+    asyncio.run(run())
+    assert instrumentation.spawns == {"true": 2}
+
+
+def test_render_json_and_prometheus():
+    """测试：JSON 按路由汇总，Prometheus 文本包含直方图、计数器和进程指标"""
+    instrumentation = Instrumentation()
+    instrumentation.observe_collector("gpu", 0.02, ok=True)
+    instrumentation.observe_collector("gpu", 12.0, ok=False)
+    instrumentation.observe_request("/v1/snapshot", "GET", 200, 0.002)
+    instrumentation.observe_request("/v1/snapshot", "GET", 401, 0.001)
+    instrumentation.count_spawn("/usr/bin/systemctl")
+
+    document = instrumentation.to_dict()
+    assert document["collectors"]["gpu"]["failures"] == 1
+    assert document["collectors"]["gpu"]["duration_s"]["count"] == 2
+    assert document["requests"]["/v1/snapshot"]["count"] == 2
+    assert document["requests"]["/v1/snapshot"]["by_status"] == {"GET 200": 1, "GET 401": 1}
+    assert document["subprocess_spawns"] == {"systemctl": 1}
+    assert document["process"]["rss_bytes"] > 0
+
+    text = instrumentation.prometheus()
+    assert 'monitor_agent_collector_duration_seconds_bucket{collector="gpu",le="+Inf"} 2' in text
+    assert 'monitor_agent_collector_failures_total{collector="gpu"} 1' in text
+    assert 'monitor_agent_http_requests_total{route="/v1/snapshot",method="GET",status="401"} 1' in text
+    assert 'monitor_agent_subprocess_spawns_total{command="systemctl"} 1' in text
+    assert "# TYPE process_resident_memory_bytes gauge" in text
+
+
+def test_wants_prometheus():
+    """测试：format 参数优先，否则 Prometheus 的 Accept 头选择文本格式"""
+    assert wants_prometheus("prometheus", None)
+    assert not wants_prometheus("json", "text/plain")
+    assert wants_prometheus(None, "application/openmetrics-text;version=1.0.0;q=0.5,text/plain;version=0.0.4;q=0.3")
+    assert not wants_prometheus(None, None)
@@ -0,0 +1,116 @@
+"""
+单元测试：轻量运行时
+
+测试覆盖：
+- Token 校验与 FastAPI 应用的错误信息一致
+- /v1/snapshot 直接返回预编码响应体，keep-alive 连接可连续请求
+- 查询参数校验、未知路径与方法
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent import lite
+from monitor_agent.config import AgentConfig
+from monitor_agent.sampler import Sampler
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, headers, body
+
+
+def _request(path, token=None, method="GET", extra=""):
+    auth = f"Authorization: {token}\r\n" if token else ""
+    return f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n{auth}{extra}\r\n".encode()
+
+
+def _serve(monkeypatch, scenario):
+    """在随机端口启动轻量服务器并运行 scenario(reader, writer, sampler)"""
+    config = AgentConfig(node_id="test-node", token="secret", gpu="off")
+    sampler = Sampler(config)
+    monkeypatch.setattr(lite, "get_sampler", lambda: sampler)
+    monkeypatch.setattr(lite, "get_spool_writer", lambda: None)
+
+    async def run():
+        server = lite.LiteServer(config)
+        await server.start(host="127.0.0.1", port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        try:
+            await scenario(reader, writer, sampler)
+        finally:
+            writer.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_token_check(monkeypatch):
+    """测试：缺失、格式错误和错误的 Token 返回 401 及对应 detail"""
+    async def scenario(reader, writer, sampler):
+        details = []
+        for token in (None, "secret", "Bearer wrong"):
+            writer.write(_request("/v1/snapshot", token))
+            status, _, body = await _read_response(reader)
+            assert status == 401
+            details.append(json.loads(body)["detail"])
+        assert details == ["Missing authorization header", "Invalid authorization header format", "Invalid token"]
+
+    _serve(monkeypatch, scenario)
+
+
+def test_snapshot_keep_alive(monkeypatch):
+    """测试：同一连接上连续请求，响应体为预编码样本"""
+    async def scenario(reader, writer, sampler):
+        writer.write(_request("/v1/snapshot", "Bearer secret"))
+        status, headers, body = await _read_response(reader)
+        assert status == 200
+        assert headers["content-type"] == "application/json"
+        assert headers["connection"] == "keep-alive"
+        assert body == sampler.latest.body
+
+        sampler._publish()
+        writer.write(_request("/v1/snapshot?since=0", "Bearer secret"))
+        status, _, body = await _read_response(reader)
+        assert status == 200
+        document = json.loads(body)
+        assert document["seq"] == 1 and document["window"]["since"] == 0
+
+        writer.write(_request("/v1/snapshot", "Bearer secret", extra="Connection: close\r\n"))
+        status, headers, _ = await _read_response(reader)
+        assert headers["connection"] == "close"
+        assert await reader.read() == b""
+
+    _serve(monkeypatch, scenario)
+
+
+def test_errors(monkeypatch):
+    """测试：参数错误 422、未知路径 404、方法不符 405、spool 未启用 404"""
+    async def scenario(reader, writer, sampler):
+        cases = [
+            (_request("/v1/snapshot?since=abc", "Bearer secret"), 422),
+            (_request("/v1/unknown", "Bearer secret"), 404),
+            (_request("/v1/proxy/stop", "Bearer secret"), 405),
+            (_request("/v1/samples?from=0", "Bearer secret"), 404),
+            (_request("/v1/samples", "Bearer secret"), 422),
+        ]
+        for raw, expected in cases:
+            writer.write(raw)
+            status, _, body = await _read_response(reader)
+            assert status == expected
+            assert "detail" in json.loads(body)
+
+    _serve(monkeypatch, scenario)
@@ -0,0 +1,86 @@
+"""
+单元测试：内存采集器
+
+测试覆盖：
+- /proc/meminfo、/proc/loadavg、/proc/pressure 解析
+- 常驻文件描述符：文件内容变化后重读得到新值
+- 内核未开启 PSI 时 psi 为 None
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors.memory import MemoryCollector, parse_meminfo, parse_pressure
+
+
+MEMINFO = """\
+MemTotal:        1000000 kB
+MemFree:          100000 kB
+MemAvailable:     250000 kB
+Buffers:           10000 kB
+Cached:           200000 kB
+SwapTotal:        400000 kB
+SwapFree:         300000 kB
+SReclaimable:      50000 kB
+"""
+
+PRESSURE = """\
+some avg10=1.67 avg60=1.50 avg300=1.19 total=24096958
+full avg10=0.50 avg60=0.25 avg300=0.00 total=10
+"""
+
+
+def _write_proc(root: Path, meminfo: str = MEMINFO, psi: bool = True):
+    (root / "meminfo").write_text(meminfo)
+    (root / "loadavg").write_text("1.50 0.80 0.25 2/300 12345\n")
+    if psi:
+        (root / "pressure").mkdir(exist_ok=True)
+        for resource in ("cpu", "memory", "io"):
+            (root / "pressure" / resource).write_text(PRESSURE)
+
+
+def test_parse_meminfo():
+    """测试：used = MemTotal - MemAvailable，cached 含 SReclaimable"""
+    result = parse_meminfo(MEMINFO)
+    assert result["mem_total_bytes"] == 1000000 * 1024
+    assert result["mem_used_bytes"] == 750000 * 1024
+    assert result["mem_cached_bytes"] == 250000 * 1024
+    assert result["mem_used_pct"] == 75.0
+    assert result["swap_used_bytes"] == 100000 * 1024
+    assert result["swap_used_pct"] == 25.0
+
+
+def test_parse_pressure():
+    """测试：PSI some/full 行解析"""
+    assert parse_pressure(PRESSURE) == {"some": [1.67, 1.5, 1.19], "full": [0.5, 0.25, 0.0]}
+    assert parse_pressure("some avg10=0.10 avg60=0.20 avg300=0.30 total=1\n") == {"some": [0.1, 0.2, 0.3]}
+
+
+def test_collector_rereads_persistent_fds(tmp_path):
+    """测试：常驻描述符重读到最新内容"""
+    _write_proc(tmp_path)
+    collector = MemoryCollector(str(tmp_path))
+
+    first = collector.collect()
+    assert first["loadavg"] == [1.5, 0.8, 0.25]
+    assert first["psi"]["memory"]["full"] == [0.5, 0.25, 0.0]
+
+    # 原地改写（保持 inode），模拟 /proc 内容变化
+    with open(tmp_path / "meminfo", "r+") as f:
+        f.write(MEMINFO.replace("MemAvailable:     250000", "MemAvailable:     500000"))
+    second = collector.collect()
+    assert second["mem_used_pct"] == 50.0
+    collector.close()
+
+
+def test_collector_without_psi(tmp_path):
+    """测试：没有 /proc/pressure 时 psi 为 None"""
+    _write_proc(tmp_path, psi=False)
+    collector = MemoryCollector(str(tmp_path))
+    result = collector.collect()
+    assert result["psi"] is None
+    assert result["mem_used_pct"] == 75.0
+    collector.close()
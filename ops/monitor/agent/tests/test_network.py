@@ -0,0 +1,59 @@
+"""
+单元测试：网络采集器
+
+测试覆盖：
+- /proc/net/dev 解析：include/exclude 过滤
+- 吞吐、包速率、错误/丢包速率计算
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors.network import DEFAULT_EXCLUDE, compute_rates, parse_net_dev
+from monitor_agent.config import AgentConfig
+
+
+NET_DEV = """\
+Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 5000      50    0    0    0     0          0         0     5000      50    0    0    0     0       0          0
+  eth0: 1000000  2000    1    2    0     0          0         0  3000000   4000    0    3    0     0       0          0
+ib0:2000000 1000 0 0 0 0 0 0 4000000 2000 0 0 0 0 0 0
+vethabc123: 10 1 0 0 0 0 0 0 10 1 0 0 0 0 0 0
+"""
+
+
+def test_parse_net_dev_default_exclude():
+    """测试：默认排除 lo 和 veth 网卡，兼容冒号后无空格的行"""
+    counters = parse_net_dev(NET_DEV)
+    assert set(counters) == {"eth0", "ib0"}
+    assert counters["eth0"] == (1000000, 2000, 1, 2, 3000000, 4000, 0, 3)
+
+
+def test_parse_net_dev_include():
+    """测试：include 白名单"""
+    counters = parse_net_dev(NET_DEV, include=["ib*"], exclude=[])
+    assert set(counters) == {"ib0"}
+
+
+def test_compute_rates():
+    """测试：速率按间隔计算，计数器回绕按 0 处理"""
+    prev = {"eth0": (1000000, 2000, 1, 2, 3000000, 4000, 0, 3)}
+    cur = {"eth0": (3000000, 4000, 1, 6, 2000000, 8000, 0, 3), "eth1": (1,) * 8}
+    rates = compute_rates(prev, cur, elapsed=2.0)
+
+    assert rates["interfaces"] == ["eth0"]
+    assert rates["rx_bps"] == [1000000.0]
+    assert rates["tx_bps"] == [0.0]
+    assert rates["rx_pps"] == [1000.0]
+    assert rates["tx_pps"] == [2000.0]
+    assert rates["rx_drop_ps"] == [2.0]
+    assert rates["rx_errs_ps"] == [0.0]
+
+
+def test_config_default_exclude():
+    """测试：配置默认值与采集器的 DEFAULT_EXCLUDE 一致"""
+    assert AgentConfig(node_id="n", token="t").network.exclude == list(DEFAULT_EXCLUDE)
@@ -0,0 +1,92 @@
+"""
+单元测试：top-N 进程采集器
+
+使用临时目录模拟 /proc。
+
+测试覆盖：
+- /proc/[pid]/stat 解析（comm 含空格和括号）
+- CPU 使用率按两轮 CPU 时间差计算，首轮 by_cpu 为空
+- 按 CPU / 常驻内存选出前 N 个，退出的进程被清理，pid 复用不产生错误的差值
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import processes
+from monitor_agent.collectors.processes import ProcessSampler, parse_stat
+
+
+def _stat_line(pid: int, comm: str, jiffies: int, rss: int, starttime: int = 100, threads: int = 1) -> str:
+    # 字段 3 起：state ppid pgrp session tty tpgid flags minflt cminflt majflt cmajflt
+    #          utime stime cutime cstime priority nice num_threads itrealvalue starttime vsize rss ...
+    rest = ["S", "1", "1", "1", "0", "-1", "0", "0", "0", "0", "0",
+            str(jiffies), "0", "0", "0", "20", "0", str(threads), "0", str(starttime), "0", str(rss), "0"]
+    return f"{pid} ({comm}) " + " ".join(rest) + "\n"
+
+
+def _write_proc(root: Path, pid: int, comm: str, jiffies: int, rss: int, starttime: int = 100):
+    proc = root / str(pid)
+    proc.mkdir(exist_ok=True)
+    (proc / "stat").write_text(_stat_line(pid, comm, jiffies, rss, starttime))
+    (proc / "status").write_text(f"Name:\t{comm}\nUid:\t{os.getuid()}\t0\t0\t0\n")
+    (proc / "cmdline").write_bytes(comm.encode() + b"\0--flag\0")
+
+
+def test_parse_stat_comm_with_spaces():
+    """测试：comm 含空格和右括号时按最后一个 ) 切分"""
+    line = _stat_line(42, "tmux: server) (x", jiffies=250, rss=1000, starttime=7, threads=3).encode()
+    assert parse_stat(line) == ("tmux: server) (x", 250, 3, 7, 1000)
+    assert parse_stat(b"garbage") is None
+
+
+def test_top_n_selection_and_pruning(tmp_path, monkeypatch):
+    """测试：按 CPU 时间差和 RSS 选出前 N 个；退出进程被清理；pid 复用不计算差值"""
+    clock = {"t": 100.0}
+    monkeypatch.setattr(processes.time, "monotonic", lambda: clock["t"])
+    monkeypatch.setattr(processes, "_CLK_TCK", 100)
+
+    for pid in range(1, 11):
+        _write_proc(tmp_path, pid, f"proc{pid}", jiffies=0, rss=pid * 10)
+    (tmp_path / "self").mkdir()
+
+    sampler = ProcessSampler(str(tmp_path))
+    first = sampler.sample(3)
+    assert first["total"] == 10
+    assert first["by_cpu"] == []
+    assert [p["pid"] for p in first["by_rss"]] == [10, 9, 8]
+
+    # 2 秒后：pid 3 使用 1 个核，pid 5 使用 0.5 个核；pid 10 退出；pid 9 被复用
+    clock["t"] = 102.0
+    _write_proc(tmp_path, 3, "proc3", jiffies=200, rss=30)
+    _write_proc(tmp_path, 5, "proc5", jiffies=100, rss=50)
+    _write_proc(tmp_path, 9, "reused", jiffies=5000, rss=90, starttime=999)
+    for name in ("stat", "status", "cmdline"):
+        (tmp_path / "10" / name).unlink()
+    (tmp_path / "10").rmdir()
+
+    second = sampler.sample(2)
+    assert second["total"] == 9
+    assert [(p["pid"], p["cpu_pct"]) for p in second["by_cpu"]] == [(3, 100.0), (5, 50.0)]
+    top_rss = second["by_rss"][0]
+    assert top_rss["pid"] == 9 and top_rss["name"] == "reused"
+    assert top_rss["cpu_pct"] is None
+    assert top_rss["cmdline"] == "reused --flag"
+    assert 10 not in sampler._prev
+    # 只缓存入选进程的 uid/cmdline
+    assert {pid for pid, _ in sampler._info} == {3, 5, 9, 8}
+
+
+def test_get_top_processes_runs_in_thread():
+    """测试：真实 /proc 上采集（在线程池中执行）"""
+    if not os.path.isdir("/proc/self"):
+        return
+    processes._sampler = None
+    result = asyncio.run(processes.get_top_processes(5))
+    assert result["total"] > 0
+    assert 0 < len(result["by_rss"]) <= 5
+    processes._sampler = None
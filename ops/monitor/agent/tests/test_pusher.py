@@ -0,0 +1,116 @@
+"""
+单元测试：推送模式
+
+测试覆盖：
+- 按 batch_size 攒批，重复 seq 不重复入批
+- 队列有界，满时丢弃最旧批次
+- 发送失败时退避并保持批次顺序，4xx 丢弃批次
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.config import AgentConfig, PushConfig
+from monitor_agent.pusher import Pusher, PUSH_OK, PUSH_RETRY, PUSH_DROP
+from monitor_agent.sampler import Sampler
+
+
+def _make(post, **push):
+    config = AgentConfig(
+        node_id="test-node", token="t", gpu="off",
+        push=PushConfig(enabled=True, url="http://center/api/ingest", **push),
+    )
+    sampler = Sampler(config)
+    return sampler, Pusher(config, sampler, post=post)
+
+
+def _decode(body: bytes) -> dict:
+    return json.loads(gzip.decompress(body))
+
+
+def test_batching():
+    """测试：凑满 batch_size 个新样本后入队，payload 为 gzip JSON"""
+    sampler, pusher = _make(lambda body: (PUSH_OK, None), batch_size=2)
+
+    pusher.take_sample()
+    pusher.take_sample()  # 同一 seq，不重复
+    assert pusher.queued == 0
+
+    sampler._publish()
+    pusher.take_sample()
+    assert pusher.queued == 1
+
+    payload = _decode(pusher._queue[0])
+    assert payload["node_id"] == "test-node"
+    assert [s["seq"] for s in payload["samples"]] == [0, 1]
+
+
+def test_queue_bounded():
+    """测试：队列满时丢弃最旧批次"""
+    sampler, pusher = _make(lambda body: (PUSH_OK, None), batch_size=1, max_queue=2)
+
+    for _ in range(3):
+        sampler._publish()
+        pusher.take_sample()
+
+    assert pusher.queued == 2
+    assert pusher.dropped == 1
+    assert [_decode(b)["samples"][0]["seq"] for b in pusher._queue] == [2, 3]
+
+
+def test_backoff_keeps_order():
+    """测试：发送失败后退避，恢复后按原顺序发送"""
+    sent = []
+    results = [PUSH_RETRY]
+
+    def post(body):
+        result = results.pop(0) if results else PUSH_OK
+        if result == PUSH_OK:
+            sent.append(_decode(body)["samples"][0]["seq"])
+        return result, None
+
+    sampler, pusher = _make(post, batch_size=1)
+
+    async def run():
+        for _ in range(2):
+            sampler._publish()
+            pusher.take_sample()
+
+        await pusher.flush()
+        assert pusher.queued == 2 and sent == []
+        assert pusher._next_attempt > time.monotonic()
+
+        # 退避期间不发送
+        await pusher.flush()
+        assert sent == []
+
+        pusher._next_attempt = 0.0
+        await pusher.flush()
+
+    asyncio.run(run())
+    assert sent == [1, 2]
+    assert pusher.queued == 0
+    assert pusher._backoff == 0.0
+
+
+def test_rejected_batch_dropped():
+    """测试：4xx 拒绝的批次直接丢弃，不阻塞后续批次"""
+    results = [PUSH_DROP, PUSH_OK]
+    sampler, pusher = _make(lambda body: (results.pop(0), None), batch_size=1)
+
+    async def run():
+        for _ in range(2):
+            sampler._publish()
+            pusher.take_sample()
+        await pusher.flush()
+
+    asyncio.run(run())
+    assert pusher.queued == 0
+    assert pusher.dropped == 1
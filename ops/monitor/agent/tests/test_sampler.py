@@ -0,0 +1,133 @@
+"""
+单元测试：后台采样引擎
+
+测试覆盖：
+- 启动后发布预编码样本，seq 单调递增
+- 采集失败时保留上一次结果
+- 采集器注册表与配置覆盖
+- 共用调度器，慢采集器不推迟其它采集器，超时记为失败
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import COLLECTORS, COST_EXPENSIVE, MIN_INTERVALS, ScheduledCollector, build_collectors
+from monitor_agent.config import AgentConfig
+from monitor_agent.sampler import Sampler
+
+
+def _make_sampler(collectors, interval=1.0):
+    sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+    sampler._collectors = {
+        name: ScheduledCollector(name, collect, interval, timeout=5.0, cost="cheap")
+        for name, collect in collectors.items()
+    }
+    return sampler
+
+
+def test_publishes_precomputed_sample():
+    """测试：启动后发布包含各采集器结果的预编码样本"""
+    async def cpu():
+        return {"cpu_pct": 12.5}
+
+    async def disk():
+        return [{"mount": "/", "used_bytes": 1, "total_bytes": 2, "used_pct": 50.0}]
+
+    async def run():
+        sampler = _make_sampler({"cpu": cpu, "disk": disk})
+        assert sampler.latest.seq == 0
+        await sampler.start()
+        await asyncio.sleep(0.05)
+        await sampler.stop()
+        return sampler.latest
+
+    sample = asyncio.run(run())
+    body = json.loads(sample.body)
+
+    assert sample.seq >= 2
+    assert body["node_id"] == "test-node"
+    assert body["cpu_pct"] == 12.5
+    assert body["disks"][0]["mount"] == "/"
+    assert body["gpus"] is None
+    assert set(body["sample_age_s"]) == {"cpu", "disk"}
+    # 采集完成时间：请求时的年龄由客户端计算
+    assert set(body["collected_at"]) == {"cpu", "disk"}
+    assert body["collected_at"]["cpu"] <= time.time()
+
+
+def test_failed_collector_keeps_previous_value():
+    """测试：采集失败不覆盖上一次结果"""
+    calls = {"n": 0}
+
+    async def cpu():
+        calls["n"] += 1
+        if calls["n"] > 1:
+            raise RuntimeError("boom")
+        return {"cpu_pct": 42.0}
+
+    async def run():
+        sampler = _make_sampler({"cpu": cpu}, interval=0.01)
+        await sampler.start()
+        await asyncio.sleep(0.05)
+        await sampler.stop()
+        return sampler.latest
+
+    sample = asyncio.run(run())
+    assert calls["n"] > 1
+    assert json.loads(sample.body)["cpu_pct"] == 42.0
+
+
+def test_build_collectors_overrides():
+    """测试：配置覆盖采样周期/超时/启用状态，最小周期按开销等级限制"""
+    config = AgentConfig(
+        node_id="test-node", token="t", gpu="auto",
+        collectors={
+            "gpu": {"interval": 1.0},
+            "disk": {"interval": 60, "timeout": 20},
+            "systemd": {"interval": 0.2},
+            "network": {"enabled": False},
+        },
+    )
+    collectors = build_collectors(config)
+
+    assert collectors["gpu"].interval == 1.0
+    assert collectors["disk"].interval == 60 and collectors["disk"].timeout == 20
+    assert collectors["systemd"].interval == MIN_INTERVALS[COST_EXPENSIVE]
+    assert collectors["cpu"].interval == COLLECTORS["cpu"].interval
+    assert "network" not in collectors
+
+    collectors = build_collectors(AgentConfig(node_id="test-node", token="t", gpu="off"))
+    assert "gpu" not in collectors and "gpu_processes" not in collectors
+
+
+def test_scheduler_slow_collector_does_not_block():
+    """测试：共用调度器时慢采集器不推迟其它采集器，超时记为失败"""
+    calls = {"cpu": 0}
+
+    async def cpu():
+        calls["cpu"] += 1
+        return {"cpu_pct": 1.0}
+
+    async def disk():
+        await asyncio.sleep(10)
+
+    async def run():
+        sampler = _make_sampler({"cpu": cpu}, interval=0.01)
+        sampler._collectors["disk"] = ScheduledCollector("disk", disk, 0.01, timeout=0.03, cost="moderate")
+        await sampler.start()
+        await asyncio.sleep(0.1)
+        await sampler.stop()
+        return sampler
+
+    sampler = asyncio.run(run())
+    assert calls["cpu"] >= 5
+    disk_state = sampler.telemetry["disk"]
+    assert disk_state.last_success is None
+    assert disk_state.last_error == "timed out after 0.03s"
+    assert disk_state.consecutive_failures >= 1
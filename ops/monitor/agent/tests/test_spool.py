@@ -0,0 +1,109 @@
+"""
+单元测试：本地样本环形文件
+
+测试覆盖：
+- 快照转换为记录字段（与中心节点聚合口径一致）
+- 按时间范围读取，环形覆盖最旧记录
+- 重新打开文件后保留已有记录，容量变化时重新初始化
+- 不写入启动时尚无采集结果的初始样本
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.config import SpoolConfig
+from monitor_agent.spool import Spool, SpoolWriter, spool_record
+
+
+SNAPSHOT = {
+    "cpu_pct": 20.0,
+    "gpus": [
+        {"index": 0, "util_pct": 10.0, "mem_used_mb": 1000, "mem_total_mb": 8000},
+        {"index": 1, "util_pct": 90.0, "mem_used_mb": 3000, "mem_total_mb": 8000},
+    ],
+    "disks": [{"mount": "/", "used_pct": 50.0, "used_bytes": 500 * 2**30, "total_bytes": 1000 * 2**30}],
+    "disk_io": {"devices": ["sda", "sdb"], "read_bps": [100.0, 50.0], "write_bps": [10.0, 5.0]},
+    "network": {
+        "interfaces": ["eth0"], "rx_bps": [1000.0], "tx_bps": [500.0],
+        "rx_errs_ps": [0.5], "tx_errs_ps": [0.25], "rx_drop_ps": [0.0], "tx_drop_ps": [1.0],
+    },
+    "memory": {
+        "mem_used_pct": 40.0, "swap_used_pct": 0.0, "loadavg": [1.5, 1.0, 0.5],
+        "psi": {"memory": {"some": [2.0, 1.0, 0.5], "full": [0.5, 0.0, 0.0]}},
+    },
+}
+
+
+def test_spool_record():
+    """测试：窗口汇总优先，其余字段按中心节点口径聚合"""
+    window = {"cpu_pct": {"min": 5.0, "avg": 30.0, "max": 99.0, "last": 20.0, "n": 5}, "gpu_util_pct": None}
+    record = spool_record(1000.0, SNAPSHOT, window)
+
+    assert record["cpu_pct"] == 30.0 and record["cpu_pct_max"] == 99.0 and record["cpu_n"] == 5
+    assert record["gpu_util_pct"] == 90.0 and "gpu_n" not in record
+    assert record["gpu_mem_used_mb"] == 4000 and record["gpu_mem_total_mb"] == 16000
+    assert record["disk_read_bps"] == 150.0 and record["disk_write_bps"] == 15.0
+    assert record["net_errs_ps"] == 0.75 and record["net_drops_ps"] == 1.0
+    assert record["load1"] == 1.5
+    assert record["psi_mem_some"] == 2.0 and record["psi_cpu_some"] is None
+
+
+def test_read_range_and_wraparound(tmp_path):
+    """测试：按 [from, to) 读取，写满后覆盖最旧记录"""
+    spool = Spool(str(tmp_path / "spool.bin"), capacity=4)
+    for i in range(6):
+        spool.append({"ts": 3600.0 + i * 5, "cpu_pct": float(i)})
+
+    entries = spool.read_range(0, 1e10)
+    assert [e["cpu_pct"] for e in entries] == [2.0, 3.0, 4.0, 5.0]
+    assert entries[0]["ts"] == "1970-01-01T01:00:10Z"
+    assert entries[0]["gpu_util_pct"] is None and entries[0]["disk_used_bytes"] is None
+    assert "window" not in entries[0]
+
+    assert [e["cpu_pct"] for e in spool.read_range(3615.0, 3625.0)] == [3.0, 4.0]
+    assert len(spool.read_range(0, 1e10, limit=1)) == 1
+    spool.close()
+
+
+def test_reopen_keeps_records(tmp_path):
+    """测试：重新打开保留记录和窗口字段；容量变化时重新初始化"""
+    path = str(tmp_path / "spool.bin")
+    spool = Spool(path, capacity=8)
+    spool.append(spool_record(7200.0, SNAPSHOT, {"cpu_pct": {"avg": 30.0, "max": 99.0, "n": 5}}))
+    spool.close()
+
+    spool = Spool(path, capacity=8)
+    assert spool.written == 1
+    entry = spool.read_range(0, 1e10)[0]
+    assert entry["window"] == {"cpu_pct": {"avg": 30.0, "max": 99.0, "n": 5}}
+    assert entry["cpu_pct"] == 30.0
+    assert entry["disk_total_bytes"] == 1000 * 2**30
+    assert entry["load1"] == pytest.approx(1.5)
+    spool.close()
+
+    spool = Spool(path, capacity=16)
+    assert spool.written == 0
+    spool.close()
+
+
+def test_writer_skips_initial_sample(tmp_path):
+    """测试：seq 0 / 尚无采集器完成的样本不写入，第一个真实样本正常写入"""
+    sampler = SimpleNamespace(
+        latest=SimpleNamespace(seq=0, ts=1000.0, snapshot={}, collected_at={}),
+        window_summary=lambda since: None,
+    )
+    writer = SpoolWriter(SpoolConfig(), sampler, Spool(str(tmp_path / "spool.bin"), capacity=8))
+    writer.write_once()
+    assert writer.spool.read_range(0, 2000) == []
+
+    sampler.latest = SimpleNamespace(seq=1, ts=1001.0, snapshot=SNAPSHOT, collected_at={"cpu": 1001.0})
+    writer.write_once()
+    records = writer.spool.read_range(0, 2000)
+    assert len(records) == 1 and records[0]["cpu_pct"] == 20.0
+    writer.spool.close()
@@ -0,0 +1,63 @@
+"""
+单元测试：快照流
+
+测试覆盖：
+- 首条事件为完整快照，之后为增量
+- 无新样本时发送保活注释
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.config import AgentConfig
+from monitor_agent.sampler import Sampler
+from monitor_agent.streaming import sse_events
+
+
+def _data(event: bytes) -> dict:
+    for line in event.decode().splitlines():
+        if line.startswith("data: "):
+            return json.loads(line[len("data: "):])
+    raise AssertionError(f"no data line in {event!r}")
+
+
+def test_stream_full_then_delta():
+    """测试：首条完整快照，发布新样本后推送增量"""
+    async def run():
+        sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+        stream = sse_events(sampler, keepalive=1.0)
+        first = await stream.__anext__()
+
+        next_event = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        sampler._values["cpu"] = {"cpu_pct": 33.0}
+        sampler._collected_at["cpu"] = 0.0
+        sampler._publish()
+        second = await asyncio.wait_for(next_event, timeout=1.0)
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    full = _data(first)
+    delta = _data(second)
+    assert full["node_id"] == "test-node" and "base_seq" not in full
+    assert delta["base_seq"] == full["seq"]
+    assert delta["changed"]["cpu_pct"] == 33.0
+
+
+def test_stream_keepalive():
+    """测试：空闲时发送保活注释"""
+    async def run():
+        sampler = Sampler(AgentConfig(node_id="test-node", token="t", gpu="off"))
+        stream = sse_events(sampler, keepalive=0.01)
+        await stream.__anext__()
+        event = await stream.__anext__()
+        await stream.aclose()
+        return event
+
+    assert asyncio.run(run()) == b": keepalive\n\n"
@@ -0,0 +1,126 @@
+"""
+单元测试：systemd 采集器
+
+测试覆盖：
+- 多服务 `systemctl show` 输出按顺序解析
+- 段数不一致时按 Names 匹配，缺失的服务返回 unknown
+- 服务发现合并 list-units / list-unit-files 并缓存
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.collectors import systemd
+from monitor_agent.collectors.systemd import parse_list_units, parse_show_output, parse_unit_files
+
+
+SHOW_OUTPUT = """Names=nginx.service
+ActiveState=active
+SubState=running
+
+Names=ssh.service sshd.service
+ActiveState=failed
+SubState=failed
+
+Names=missing.service
+ActiveState=inactive
+SubState=dead
+"""
+
+
+def test_parse_show_output_in_order():
+    """测试：输出段与服务列表一一对应"""
+    units = ["nginx.service", "sshd.service", "missing.service"]
+    result = parse_show_output(SHOW_OUTPUT, units)
+
+    assert result == [
+        {"name": "nginx.service", "active_state": "active", "sub_state": "running"},
+        {"name": "sshd.service", "active_state": "failed", "sub_state": "failed"},
+        {"name": "missing.service", "active_state": "inactive", "sub_state": "dead"},
+    ]
+
+
+def test_parse_show_output_mismatch_matches_by_names():
+    """测试：段数不一致时按 Names 匹配"""
+    units = ["sshd.service", "nginx.service", "other.service", "extra.service"]
+    result = parse_show_output(SHOW_OUTPUT, units)
+
+    assert result[0] == {"name": "sshd.service", "active_state": "failed", "sub_state": "failed"}
+    assert result[1]["active_state"] == "active"
+    assert result[2] == {"name": "other.service", "active_state": "unknown", "sub_state": "unknown"}
+    assert result[3]["active_state"] == "unknown"
+
+
+def test_parse_discovery_output():
+    """测试：list-units 与 list-unit-files 在内存中合并"""
+    files = parse_unit_files(
+        "nginx.service enabled enabled\n"
+        "cron.service disabled enabled\n"
+        "getty@.service static -\n"
+    )
+    units = parse_list_units(
+        "nginx.service loaded active running A high performance web server\n"
+        "cron.service loaded inactive dead Regular background program processing daemon\n"
+        "ghost.service not-found inactive dead ghost.service\n",
+        files,
+    )
+
+    assert units[0] == {
+        "name": "nginx.service",
+        "active_state": "active",
+        "enabled": True,
+        "description": "A high performance web server",
+    }
+    assert units[1]["enabled"] is False
+    assert units[2]["active_state"] == "inactive"
+    assert units[2]["enabled"] is False
+
+
+def test_template_instance_uses_template_state():
+    """测试：模板实例没有单独的 unit 文件条目时使用模板的开机自启状态"""
+    files = parse_unit_files(
+        "worker@.service enabled enabled\n"
+        "getty@.service static -\n"
+        "vllm@b.service disabled enabled\n"
+        "vllm@.service enabled enabled\n"
+    )
+    units = parse_list_units(
+        "worker@1.service loaded active running Worker 1\n"
+        "getty@tty1.service loaded active running Getty on tty1\n"
+        "vllm@b.service loaded inactive dead vLLM b\n",
+        files,
+    )
+    assert [u["enabled"] for u in units] == [True, False, False]
+
+
+def test_discover_services_cached(monkeypatch):
+    """测试：TTL 内重复请求命中缓存，unit 文件变化时失效"""
+    calls = {"n": 0}
+    signature = {"value": ("a",)}
+
+    async def fake_uncached():
+        calls["n"] += 1
+        return [{"name": "x.service", "active_state": "active", "enabled": True, "description": ""}]
+
+    monkeypatch.setattr(systemd, "_discover_services_uncached", fake_uncached)
+    monkeypatch.setattr(systemd, "_unit_dirs_signature", lambda: signature["value"])
+    monkeypatch.setattr(systemd, "_discovery_cache", None)
+    monkeypatch.setattr(systemd, "_discovery_lock", None)
+
+    async def run():
+        await systemd.discover_services()
+        await systemd.discover_services()
+        assert calls["n"] == 1
+
+        signature["value"] = ("b",)
+        await systemd.discover_services()
+        assert calls["n"] == 2
+
+        await systemd.discover_services(force_refresh=True)
+        assert calls["n"] == 3
+
+    asyncio.run(run())
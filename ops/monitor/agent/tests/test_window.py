@@ -0,0 +1,53 @@
+"""
+单元测试：窗口汇总
+
+测试覆盖：
+- 从 CPU/GPU 采集结果提取窗口指标
+- 按 since 截取采样点并计算 min/avg/max/last
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_agent.window import WindowRecorder, window_points
+
+
+def test_window_points():
+    """测试：CPU 取最近间隔使用率，GPU 取最忙卡使用率和显存之和"""
+    assert window_points("cpu", {"cpu_pct": 20.0, "last_pct": 95.0}) == {"cpu_pct": 95.0}
+    assert window_points("cpu", {"cpu_pct": 20.0}) == {"cpu_pct": 20.0}
+    assert window_points("cpu", None) == {}
+
+    gpus = [
+        {"index": 0, "util_pct": 10.0, "mem_used_mb": 1000},
+        {"index": 1, "util_pct": 90.0, "mem_used_mb": 3000},
+    ]
+    assert window_points("gpu", gpus) == {"gpu_util_pct": 90.0, "gpu_mem_used_mb": 4000}
+    assert window_points("memory", {"mem_used_pct": 1.0}) == {}
+
+
+def test_summary_since_cursor():
+    """测试：只汇总 since 之后的采样点，短时尖峰体现在 max 中"""
+    recorder = WindowRecorder()
+    for seq, value in enumerate([10.0, 12.0, 98.0, 11.0, 9.0], start=1):
+        recorder.record(seq, {"cpu_pct": value})
+    recorder.record(4, {"gpu_util_pct": 50.0})
+
+    summary = recorder.summary(1)
+    assert summary["since"] == 1
+    assert summary["cpu_pct"] == {"min": 9.0, "avg": 32.5, "max": 98.0, "last": 9.0, "n": 4}
+    assert summary["gpu_util_pct"]["n"] == 1
+    assert summary["gpu_mem_used_mb"] is None
+
+    assert recorder.summary(5)["cpu_pct"] is None
+
+
+def test_recorder_bounded():
+    """测试：每个指标保留的采样点数有上限"""
+    recorder = WindowRecorder(maxlen=3)
+    for seq in range(10):
+        recorder.record(seq, {"cpu_pct": float(seq)})
+    assert recorder.summary(-1)["cpu_pct"]["n"] == 3
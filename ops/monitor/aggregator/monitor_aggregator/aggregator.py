@@ -7,15 +7,98 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 from .config import get_config
-from .database import get_db
+from .database import get_db, HOURLY_EXTRA_COLUMNS
 from .models import cache
 
 logger = logging.getLogger(__name__)
 
 
+# 缓冲区相邻条目之间（或与整点之间）超过该间隔视为中断，该小时记录不完整
+PARTIAL_GAP = timedelta(minutes=5)
+
+# 按小时计算 avg/max 的内存、负载和 PSI 指标
+MEMORY_METRICS = (
+    "mem_used_pct", "swap_used_pct", "load1",
+    "psi_cpu_some", "psi_mem_some", "psi_mem_full", "psi_io_some", "psi_io_full",
+)
+
+
+def _avg_max(snapshots: List[Dict[str, Any]], key: str, ndigits: int = 2) -> Tuple[Optional[float], Optional[float]]:
+    """计算缓冲区中某个指标的 (avg, max)，忽略缺失值"""
+    values = [s.get(key) for s in snapshots if s.get(key) is not None]
+    if not values:
+        return None, None
+    return round(sum(values) / len(values), ndigits), round(max(values), ndigits)
+
+
+def _window_avg_max(snapshots: List[Dict[str, Any]], key: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    合并窗口汇总计算 (avg, max)
+    
+    带窗口汇总（Agent 两次拉取之间的 min/avg/max/last）的条目按样本点数 n 加权平均、
+    取窗口 max；旧版 Agent 的点值视为 n=1 的窗口。
+    """
+    total = 0.0
+    count = 0
+    peak = None
+    for s in snapshots:
+        window = (s.get("window") or {}).get(key)
+        if window:
+            n = window.get("n") or 1
+            total += window["avg"] * n
+            count += n
+            value_max = window["max"]
+        else:
+            value = s.get(key)
+            if value is None:
+                continue
+            total += value
+            count += 1
+            value_max = value
+        peak = value_max if peak is None else max(peak, value_max)
+    if not count:
+        return None, None
+    return total / count, peak
+
+
+def calculate_gpu_details(snapshots: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    按 GPU 计算小时明细
+    
+    使用率和功耗取 avg/max，显存和温度取最后一个快照值；
+    缓冲条目中没有每卡数据（如补齐的历史样本）时返回 None。
+    """
+    per_gpu: Dict[int, List[Dict[str, Any]]] = {}
+    for s in snapshots:
+        for gpu in s.get("gpus") or []:
+            if gpu.get("index") is not None:
+                per_gpu.setdefault(gpu["index"], []).append(gpu)
+    if not per_gpu:
+        return None
+    
+    details = []
+    for index in sorted(per_gpu):
+        entries = per_gpu[index]
+        last = entries[-1]
+        util_avg, util_max = _avg_max(entries, "util_pct")
+        power_avg, power_max = _avg_max(entries, "power_w")
+        details.append({
+            "index": index,
+            "name": last.get("name"),
+            "util_pct_avg": util_avg,
+            "util_pct_max": util_max,
+            "mem_used_mb": last.get("mem_used_mb"),
+            "mem_total_mb": last.get("mem_total_mb"),
+            "temperature_c": last.get("temperature_c"),
+            "power_w_avg": power_avg,
+            "power_w_max": power_max,
+        })
+    return details
+
+
 def calculate_aggregation(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     计算聚合指标
@@ -29,15 +112,11 @@ def calculate_aggregation(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not snapshots:
         return {}
     
-    # CPU 聚合（avg + max）
-    cpu_values = [s.get("cpu_pct") for s in snapshots if s.get("cpu_pct") is not None]
-    cpu_avg = sum(cpu_values) / len(cpu_values) if cpu_values else None
-    cpu_max = max(cpu_values) if cpu_values else None
+    # CPU 聚合（avg + max，合并窗口汇总，拉取间隔内的尖峰计入 max）
+    cpu_avg, cpu_max = _window_avg_max(snapshots, "cpu_pct")
     
     # GPU 聚合（avg + max）
-    gpu_values = [s.get("gpu_util_pct") for s in snapshots if s.get("gpu_util_pct") is not None]
-    gpu_avg = sum(gpu_values) / len(gpu_values) if gpu_values else None
-    gpu_max = max(gpu_values) if gpu_values else None
+    gpu_avg, gpu_max = _window_avg_max(snapshots, "gpu_util_pct")
     
     # 磁盘取最后一个快照值（变化慢）
     last = snapshots[-1]
@@ -47,10 +126,26 @@ def calculate_aggregation(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
     gpu_mem_total = None
     for s in reversed(snapshots):
         if s.get("gpu_mem_used_mb") is not None:
-            gpu_mem_used = s.get("gpu_mem_used_mb")
+            window = (s.get("window") or {}).get("gpu_mem_used_mb")
+            gpu_mem_used = window["last"] if window else s.get("gpu_mem_used_mb")
             gpu_mem_total = s.get("gpu_mem_total_mb")
             break
     
+    # 磁盘 I/O 吞吐（avg + max）
+    disk_read_avg, disk_read_max = _avg_max(snapshots, "disk_read_bps", 1)
+    disk_write_avg, disk_write_max = _avg_max(snapshots, "disk_write_bps", 1)
+    
+    # 网络吞吐（avg + max），错误/丢包只记录峰值
+    net_rx_avg, net_rx_max = _avg_max(snapshots, "net_rx_bps", 1)
+    net_tx_avg, net_tx_max = _avg_max(snapshots, "net_tx_bps", 1)
+    _, net_errs_max = _avg_max(snapshots, "net_errs_ps", 3)
+    _, net_drops_max = _avg_max(snapshots, "net_drops_ps", 3)
+    
+    # 内存、负载和 PSI（avg + max）
+    memory_agg = {}
+    for key in MEMORY_METRICS:
+        memory_agg[f"{key}_avg"], memory_agg[f"{key}_max"] = _avg_max(snapshots, key)
+    
     return {
         "cpu_pct_avg": round(cpu_avg, 2) if cpu_avg is not None else None,
         "cpu_pct_max": round(cpu_max, 2) if cpu_max is not None else None,
@@ -61,9 +156,66 @@ def calculate_aggregation(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
         "gpu_util_pct_max": round(gpu_max, 2) if gpu_max is not None else None,
         "gpu_mem_used_mb": gpu_mem_used,
         "gpu_mem_total_mb": gpu_mem_total,
+        "disk_read_bps_avg": disk_read_avg,
+        "disk_read_bps_max": disk_read_max,
+        "disk_write_bps_avg": disk_write_avg,
+        "disk_write_bps_max": disk_write_max,
+        "net_rx_bps_avg": net_rx_avg,
+        "net_rx_bps_max": net_rx_max,
+        "net_tx_bps_avg": net_tx_avg,
+        "net_tx_bps_max": net_tx_max,
+        "net_errs_ps_max": net_errs_max,
+        "net_drops_ps_max": net_drops_max,
+        **memory_agg,
+        "gpu_details": calculate_gpu_details(snapshots),
     }
 
 
+def is_partial_hour(snapshots: List[Dict[str, Any]], hour_ts: str) -> bool:
+    """
+    判断一小时的条目是否有中断（服务器离线、中心节点重启等）
+
+    Args:
+        snapshots: 缓冲条目（带 ts）
+        hour_ts: 小时记录的 ts（结束整点），覆盖 [hour_ts - 1h, hour_ts)
+    """
+    hour_end = datetime.strptime(hour_ts, "%Y-%m-%dT%H:00:00Z")
+    times = []
+    for snapshot in snapshots:
+        try:
+            times.append(datetime.strptime(snapshot["ts"][:19], "%Y-%m-%dT%H:%M:%S"))
+        except (KeyError, TypeError, ValueError):
+            continue
+    points = [hour_end - timedelta(hours=1)] + sorted(times) + [hour_end]
+    return any(b - a > PARTIAL_GAP for a, b in zip(points, points[1:]))
+
+
+def save_aggregation(db, server_id: int, hour_ts: str, snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    聚合一小时的缓冲条目并写入 samples_hourly
+    
+    Returns:
+        聚合后的指标字典
+    """
+    agg = calculate_aggregation(snapshots)
+    db.save_hourly_sample(
+        server_id=server_id,
+        ts=hour_ts,
+        cpu_pct_avg=agg.get("cpu_pct_avg"),
+        cpu_pct_max=agg.get("cpu_pct_max"),
+        disk_used_pct=agg.get("disk_used_pct"),
+        disk_used_bytes=agg.get("disk_used_bytes"),
+        disk_total_bytes=agg.get("disk_total_bytes"),
+        gpu_util_pct_avg=agg.get("gpu_util_pct_avg"),
+        gpu_util_pct_max=agg.get("gpu_util_pct_max"),
+        gpu_mem_used_mb=agg.get("gpu_mem_used_mb"),
+        gpu_mem_total_mb=agg.get("gpu_mem_total_mb"),
+        gpu_details=agg.get("gpu_details"),
+        **{col: agg.get(col) for col in HOURLY_EXTRA_COLUMNS},
+    )
+    return agg
+
+
 async def aggregate_and_save(hour_ts: str):
     """
     聚合所有服务器的缓冲数据并入库
@@ -79,22 +231,11 @@ async def aggregate_and_save(hour_ts: str):
         if not snapshots:
             continue
         
-        agg = calculate_aggregation(snapshots)
-        
-        db.save_hourly_sample(
-            server_id=server_id,
-            ts=hour_ts,
-            cpu_pct_avg=agg.get("cpu_pct_avg"),
-            cpu_pct_max=agg.get("cpu_pct_max"),
-            disk_used_pct=agg.get("disk_used_pct"),
-            disk_used_bytes=agg.get("disk_used_bytes"),
-            disk_total_bytes=agg.get("disk_total_bytes"),
-            gpu_util_pct_avg=agg.get("gpu_util_pct_avg"),
-            gpu_util_pct_max=agg.get("gpu_util_pct_max"),
-            gpu_mem_used_mb=agg.get("gpu_mem_used_mb"),
-            gpu_mem_total_mb=agg.get("gpu_mem_total_mb"),
-        )
+        agg = save_aggregation(db, server_id, hour_ts, snapshots)
         saved_count += 1
+        if is_partial_hour(snapshots, hour_ts):
+            # 整点后由 backfill 从 Agent 本地环形文件补齐
+            await cache.mark_partial_hour(server_id, hour_ts)
         logger.debug(f"Saved hourly sample for server {server_id}: {agg}")
     
     # 清空缓冲区
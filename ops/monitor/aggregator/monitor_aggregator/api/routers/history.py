@@ -6,12 +6,13 @@
 
 import csv
 import io
+import json
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query, status
 from fastapi.responses import StreamingResponse
 
-from ...database import Database
+from ...database import Database, HOURLY_EXTRA_COLUMNS
 from ...models import HourlyHistoryResponse, HourlySampleResponse
 from ..dependencies import get_database
 
@@ -116,6 +117,14 @@ async def export_hourly_history(
             "disk_used_pct", "disk_used_bytes", "disk_total_bytes",
             "gpu_util_pct_avg", "gpu_util_pct_max", "gpu_mem_used_mb", "gpu_mem_total_mb"
         ]
+        # v1.2 可选列（仅在数据库已迁移时存在）
+        fieldnames += [c for c in HOURLY_EXTRA_COLUMNS if c in data[0]]
+        # 每卡明细（v1.1 可选列）以 JSON 字符串导出
+        if "gpu_details" in data[0]:
+            fieldnames.append("gpu_details")
+            for row in data:
+                if row["gpu_details"] is not None:
+                    row["gpu_details"] = json.dumps(row["gpu_details"], ensure_ascii=False)
         writer = csv.DictWriter(output, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(data)
@@ -0,0 +1,90 @@
+"""
+推送样本接收 API
+
+推送模式的 Agent 将一批样本 gzip 压缩后 POST 到 /api/ingest：
+
+    POST /api/ingest
+    Authorization: Bearer <Agent token>
+    Content-Encoding: gzip
+    {"node_id": "gpu-server-01", "samples": [<快照>, ...]}
+
+按 token 匹配启用的服务器，样本经 collector.ingest_pushed_samples
+走与拉取数据相同的 process_snapshot 路径。
+"""
+
+import json
+import logging
+import zlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+
+from ...collector import ingest_pushed_samples
+from ...database import Database
+from ..dependencies import get_database
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/ingest", tags=["ingest"])
+
+
+# 解压后请求体上限（字节）
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# 单批样本数上限
+MAX_SAMPLES = 1000
+
+
+def _decompress(body: bytes) -> bytes:
+    """gzip 解压，限制解压后大小"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, MAX_BODY_BYTES + 1)
+    if len(data) > MAX_BODY_BYTES or decompressor.unconsumed_tail:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
+    return data
+
+
+@router.post("")
+async def ingest_samples(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    content_encoding: Optional[str] = Header(None),
+    db: Database = Depends(get_database)
+):
+    """
+    接收 Agent 推送的一批样本
+    
+    Agent 重试时可能重复发送，已接收的样本（按 epoch/seq）会被跳过。
+    """
+    parts = (authorization or "").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid authorization header")
+    
+    server = db.get_server_by_token(parts[1])
+    if server is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    
+    body = await request.body()
+    if (content_encoding or "").lower() == "gzip":
+        try:
+            body = _decompress(body)
+        except zlib.error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip body")
+    elif len(body) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+    
+    samples = payload.get("samples") if isinstance(payload, dict) else None
+    if not isinstance(samples, list) or not all(isinstance(s, dict) for s in samples):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="samples must be a list of snapshots")
+    if len(samples) > MAX_SAMPLES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many samples")
+    
+    accepted, skipped = await ingest_pushed_samples(server, samples)
+    logger.debug(f"Ingested {accepted} samples from {server['name']} (skipped {skipped})")
+    
+    return {"accepted": accepted, "skipped": skipped}
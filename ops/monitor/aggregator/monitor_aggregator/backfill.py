@@ -0,0 +1,232 @@
+"""
+中断补齐
+
+中心节点重启或与服务器网络中断期间，小时缓冲区只在内存中，中断时段的小时记录会缺失或不完整。
+服务器（重新）上线时，以及每个整点 HOUR_GRACE 之后（run_backfill_sweep），
+从 Agent 的本地环形文件（/v1/samples）取回缺失时段：
+
+- 已结束且 samples_hourly 中没有记录的小时：聚合后直接写入
+- 整点聚合时缓冲区有中断的小时（见 aggregator.is_partial_hour）：环形文件中该小时完整时替换原记录
+- 当前小时在缓冲区最早条目之前的部分：插入缓冲区头部，整点时随缓冲区一起聚合（仅上线时）
+
+刚过整点 HOUR_GRACE 内上一小时不补齐（可能正由 aggregate_and_save 写入），留给整点后的补齐任务，
+因此中心节点恰在整点附近重启、或服务器整点时离线，上一小时的记录也不会永久缺失。
+
+小时记录的 ts 为该小时的结束整点（与 aggregate_and_save 一致），即 ts=T 覆盖 [T-1h, T)。
+"""
+
+import asyncio
+import calendar
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .aggregator import is_partial_hour, save_aggregation
+from .config import get_config
+from .database import get_db
+from .models import cache
+
+logger = logging.getLogger(__name__)
+
+
+# 刚过整点时当前小时的记录可能正由 aggregate_and_save 写入，留出余量避免重复
+HOUR_GRACE = timedelta(minutes=5)
+
+# /v1/samples 请求超时（秒），一次可能返回 24 小时的数据
+FETCH_TIMEOUT = 30.0
+
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# 正在进行的补齐任务：{server_id: Task}
+_tasks: Dict[int, asyncio.Task] = {}
+
+
+def _hour_label(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:00:00Z")
+
+
+def _unix(dt: datetime) -> float:
+    return float(calendar.timegm(dt.timetuple()))
+
+
+async def fetch_agent_samples(
+    host: str,
+    port: int,
+    token: str,
+    start: datetime,
+    end: datetime,
+    timeout: float = FETCH_TIMEOUT
+) -> List[Dict[str, Any]]:
+    """
+    读取 Agent 本地环形文件中 [start, end) 的样本
+
+    Returns:
+        样本列表（字段与小时缓冲区条目一致）
+
+    Raises:
+        Exception: 请求失败或 Agent 未启用 spool（404）时抛出
+    """
+    url = f"http://{host}:{port}/v1/samples"
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"from": _unix(start), "to": _unix(end)}
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        response = await client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        return response.json().get("samples") or []
+
+
+def group_by_hour(samples: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """按小时记录的 ts（结束整点）分组"""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        try:
+            ts = datetime.strptime(sample["ts"], _TS_FORMAT)
+        except (KeyError, TypeError, ValueError):
+            continue
+        label = _hour_label(ts.replace(minute=0, second=0) + timedelta(hours=1))
+        groups.setdefault(label, []).append(sample)
+    return groups
+
+
+async def catch_up_server(
+    server: Dict[str, Any],
+    now: Optional[datetime] = None,
+    fill_buffer: bool = True
+) -> int:
+    """
+    补齐单个服务器最近 backfill_hours 内缺失或不完整的小时记录和当前小时的缓冲区
+
+    Args:
+        server: 服务器信息
+        now: 当前时间（测试用）
+        fill_buffer: 是否补齐当前小时缓冲区之前的部分（整点后的补齐任务不需要）
+
+    Returns:
+        写入的小时记录数
+    """
+    hours = get_config().collector.backfill_hours
+    if hours <= 0:
+        return 0
+
+    server_id = server["id"]
+    now = now or datetime.utcnow()
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    oldest = current_hour - timedelta(hours=hours)
+
+    # 已结束的小时：ts 在 (oldest, current_hour] 内且没有记录或记录不完整
+    db = get_db()
+    existing = db.get_hourly_timestamps(server_id, _hour_label(oldest), _hour_label(current_hour))
+    partial = await cache.get_partial_hours(server_id)
+    for label in partial:
+        if label <= _hour_label(oldest):
+            # 超出补齐范围
+            await cache.clear_partial_hour(server_id, label)
+    missing = []
+    label_time = oldest + timedelta(hours=1)
+    while label_time <= current_hour:
+        label = _hour_label(label_time)
+        if label not in existing or label in partial:
+            if label_time < current_hour or now - current_hour >= HOUR_GRACE:
+                missing.append(label_time)
+        label_time += timedelta(hours=1)
+
+    # 当前小时：缓冲区最早条目之前的部分
+    buffer = await cache.get_buffer(server_id) if fill_buffer else []
+    buffer_start = now if fill_buffer else current_hour
+    if buffer:
+        try:
+            buffer_start = datetime.strptime(buffer[0]["ts"], _TS_FORMAT)
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    start = missing[0] - timedelta(hours=1) if missing else current_hour
+    end = max(buffer_start, current_hour)
+    if not missing and end <= current_hour:
+        return 0
+
+    samples = await fetch_agent_samples(server["host"], server["agent_port"], server["token"], start, end)
+    groups = group_by_hour(samples)
+
+    saved = 0
+    for label_time in missing:
+        label = _hour_label(label_time)
+        if not groups.get(label):
+            continue
+        if label in existing:
+            # 不完整的记录：环形文件中该小时也不完整时保留原记录
+            if is_partial_hour(groups[label], label):
+                continue
+            db.delete_hourly_sample(server_id, label)
+        save_aggregation(db, server_id, label, groups[label])
+        await cache.clear_partial_hour(server_id, label)
+        saved += 1
+
+    current = groups.get(_hour_label(current_hour + timedelta(hours=1))) or []
+    current = [s for s in current if datetime.strptime(s["ts"], _TS_FORMAT) < buffer_start]
+    if current:
+        await cache.prepend_to_buffer(server_id, current)
+
+    logger.info(
+        f"Backfilled server {server.get('name', server_id)}: {saved} hourly samples, "
+        f"{len(current)} buffered samples"
+    )
+    return saved
+
+
+async def _run_catch_up(server: Dict[str, Any], fill_buffer: bool):
+    try:
+        await catch_up_server(server, fill_buffer=fill_buffer)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # 旧版 Agent 没有 /v1/samples，或推送模式下无法直接访问 Agent
+        logger.debug(f"Backfill skipped for server {server.get('name', server['id'])}: {e}")
+    finally:
+        _tasks.pop(server["id"], None)
+
+
+def schedule_catch_up(server: Dict[str, Any], fill_buffer: bool = True):
+    """在后台补齐服务器的缺失数据（同一服务器同时只运行一个补齐任务）"""
+    server_id = server["id"]
+    if server_id not in _tasks:
+        _tasks[server_id] = asyncio.create_task(_run_catch_up(server, fill_buffer))
+
+
+async def catch_up_online_servers():
+    """为所有在线服务器安排补齐（离线服务器在重新上线时补齐）"""
+    if get_config().collector.backfill_hours <= 0:
+        return
+    for server in get_db().get_enabled_servers():
+        latest = await cache.get_latest(server["id"])
+        if latest is not None and latest.online:
+            schedule_catch_up(server, fill_buffer=False)
+
+
+async def run_backfill_sweep():
+    """
+    运行整点后的补齐任务
+
+    每个整点 HOUR_GRACE 之后补齐上一小时（及更早）缺失或不完整的记录。
+    没有需要补齐的小时时只查询一次数据库，不访问 Agent。
+    """
+    logger.info("Starting backfill sweep task")
+
+    while True:
+        try:
+            now = datetime.utcnow()
+            next_run = now.replace(minute=0, second=0, microsecond=0) + HOUR_GRACE
+            if next_run <= now:
+                next_run += timedelta(hours=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+
+            await catch_up_online_servers()
+
+        except asyncio.CancelledError:
+            logger.info("Backfill sweep task cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Backfill sweep error: {e}", exc_info=True)
+            await asyncio.sleep(60)
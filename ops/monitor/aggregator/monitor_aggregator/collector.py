@@ -2,29 +2,61 @@
 5s 采集循环
 
 每 5 秒拉取所有 Agent 数据，更新内存缓存，并触发事件检测。
+
+collector.mode 为 stream 时改为订阅模式：每个 Agent 保持一个 /v1/stream 长连接，
+样本到达即处理，断线后指数退避重连。
+
+推送模式的 Agent 通过 /api/ingest 上报样本（见 ingest_pushed_samples），
+与拉取的数据走同一个 process_snapshot 路径；最近推送过的服务器不再拉取。
 """
 
 import asyncio
 import json
 import logging
+import random
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
 import httpx
 
+try:
+    import msgpack
+except ImportError:  # 可选依赖：未安装时请求 JSON
+    msgpack = None
+
 from .config import get_config
 from .database import get_db
 from .models import cache, LatestSnapshot
 from .event_detector import detect_events
+from .backfill import schedule_catch_up
 
 logger = logging.getLogger(__name__)
 
 
+# 快照请求的 Accept：已安装 msgpack 时优先请求 MessagePack（旧版 Agent 忽略该头，返回 JSON）
+SNAPSHOT_ACCEPT = "application/msgpack, application/json;q=0.9" if msgpack is not None else "application/json"
+
+# Agent 窗口汇总中的指标（与缓冲区中的点值字段同名）
+WINDOW_METRICS = ("cpu_pct", "gpu_util_pct", "gpu_mem_used_mb")
+
+# 缓冲区中保留的每卡字段（小时聚合写入 gpu_details）
+GPU_DETAIL_FIELDS = ("index", "name", "util_pct", "mem_used_mb", "mem_total_mb", "temperature_c", "power_w")
+
+# 订阅模式重连退避（秒）
+STREAM_BACKOFF_MIN = 1.0
+STREAM_BACKOFF_MAX = 60.0
+
+# 订阅模式读超时（秒），需大于 Agent 的保活间隔（15s）
+STREAM_READ_TIMEOUT = 45.0
+
+
 async def fetch_agent_snapshot(
     host: str,
     port: int,
     token: str,
-    timeout: float = 2.0
+    timeout: float = 2.0,
+    since: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     拉取单个 Agent 的快照数据
@@ -34,20 +66,68 @@ async def fetch_agent_snapshot(
         port: Agent 端口
         token: Bearer Token
         timeout: 超时时间（秒）
+        since: 已有快照的 seq，指定时 Agent 可能返回增量文档（见 merge_delta）
     
     Returns:
-        Agent 快照数据字典
+        Agent 快照数据字典（完整快照或增量文档）
     
     Raises:
         Exception: 拉取失败时抛出
     """
     url = f"http://{host}:{port}/v1/snapshot"
-    headers = {"Authorization": f"Bearer {token}"}
+    # httpx 默认发送 Accept-Encoding: gzip 并自动解压
+    headers = {"Authorization": f"Bearer {token}", "Accept": SNAPSHOT_ACCEPT}
+    params = {"since": since} if since is not None else None
     
     async with httpx.AsyncClient(timeout=timeout) as client:
-        response = await client.get(url, headers=headers)
+        response = await client.get(url, headers=headers, params=params)
         response.raise_for_status()
-        return response.json()
+        return decode_snapshot(response)
+
+
+def decode_snapshot(response: httpx.Response) -> Dict[str, Any]:
+    """按 Content-Type 解码快照响应（MessagePack 或 JSON）"""
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/msgpack", "application/x-msgpack"):
+        if msgpack is None:
+            raise ValueError("agent returned msgpack but msgpack is not installed")
+        return msgpack.unpackb(response.content, raw=False)
+    return response.json()
+
+
+def merge_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    将 Agent 的增量文档合并到已有快照
+    
+    Args:
+        base: 已有的完整快照
+        delta: 增量文档（含 base_seq/changed/lists）
+    
+    Returns:
+        合并后的新快照；增量与 base 不匹配（Agent 重启或 seq 不一致）时返回 None
+    """
+    if delta.get("epoch") != base.get("epoch") or delta.get("base_seq") != base.get("seq"):
+        return None
+    
+    merged = dict(base)
+    merged.update(delta.get("changed") or {})
+    
+    for field, change in (delta.get("lists") or {}).items():
+        key = change["key"]
+        removed = set(change.get("remove") or [])
+        upsert = {item.get(key): item for item in change.get("upsert") or []}
+        
+        items = []
+        for item in merged.get(field) or []:
+            item_key = item.get(key)
+            if item_key in removed:
+                continue
+            items.append(upsert.pop(item_key, item))
+        items.extend(upsert.values())
+        merged[field] = items
+    
+    merged["seq"] = delta.get("seq")
+    return merged
 
 
 def aggregate_gpu_metrics(gpus: Optional[list]) -> Dict[str, Any]:
@@ -88,11 +168,100 @@ def aggregate_gpu_metrics(gpus: Optional[list]) -> Dict[str, Any]:
     }
 
 
-async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any]):
+def aggregate_disk_io(disk_io: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    聚合块设备 I/O 速率
+
+    Args:
+        disk_io: Agent 的 disk_io 字段（列式：devices/read_bps/write_bps/...）
+
+    Returns:
+        - disk_read_bps: 所有设备读吞吐之和（字节/秒）
+        - disk_write_bps: 所有设备写吞吐之和（字节/秒）
+    """
+    if not disk_io or not disk_io.get("devices"):
+        return {"disk_read_bps": None, "disk_write_bps": None}
+
+    read_values = [v for v in disk_io.get("read_bps") or [] if v is not None]
+    write_values = [v for v in disk_io.get("write_bps") or [] if v is not None]
+    return {
+        "disk_read_bps": round(sum(read_values), 1) if read_values else None,
+        "disk_write_bps": round(sum(write_values), 1) if write_values else None,
+    }
+
+
+def aggregate_network(network: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    聚合网卡收发速率
+
+    Args:
+        network: Agent 的 network 字段（列式：interfaces/rx_bps/tx_bps/...）
+
+    Returns:
+        - net_rx_bps / net_tx_bps: 所有网卡收/发吞吐之和（字节/秒）
+        - net_errs_ps: 所有网卡收发错误速率之和（个/秒）
+        - net_drops_ps: 所有网卡收发丢包速率之和（个/秒）
+    """
+    if not network or not network.get("interfaces"):
+        return {"net_rx_bps": None, "net_tx_bps": None, "net_errs_ps": None, "net_drops_ps": None}
+
+    def total(*keys: str, ndigits: int = 1) -> Optional[float]:
+        values = [v for key in keys for v in network.get(key) or [] if v is not None]
+        return round(sum(values), ndigits) if values else None
+
+    return {
+        "net_rx_bps": total("rx_bps"),
+        "net_tx_bps": total("tx_bps"),
+        "net_errs_ps": total("rx_errs_ps", "tx_errs_ps", ndigits=3),
+        "net_drops_ps": total("rx_drop_ps", "tx_drop_ps", ndigits=3),
+    }
+
+
+def aggregate_memory(memory: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    提取内存、负载和 PSI 指标
+
+    Args:
+        memory: Agent 的 memory 字段
+
+    Returns:
+        - mem_used_pct / mem_used_bytes / mem_total_bytes: 内存使用
+        - swap_used_pct: 交换分区使用率
+        - load1: 1 分钟平均负载
+        - psi_cpu_some / psi_mem_some / psi_mem_full / psi_io_some / psi_io_full:
+          PSI avg10（百分比），内核未开启 PSI 时为 None
+    """
+    memory = memory or {}
+    loadavg = memory.get("loadavg") or []
+    psi = memory.get("psi") or {}
+
+    def pressure(resource: str, kind: str) -> Optional[float]:
+        values = (psi.get(resource) or {}).get(kind)
+        return values[0] if values else None
+
+    return {
+        "mem_used_pct": memory.get("mem_used_pct"),
+        "mem_used_bytes": memory.get("mem_used_bytes"),
+        "mem_total_bytes": memory.get("mem_total_bytes"),
+        "swap_used_pct": memory.get("swap_used_pct"),
+        "load1": loadavg[0] if loadavg else None,
+        "psi_cpu_some": pressure("cpu", "some"),
+        "psi_mem_some": pressure("memory", "some"),
+        "psi_mem_full": pressure("memory", "full"),
+        "psi_io_some": pressure("io", "some"),
+        "psi_io_full": pressure("io", "full"),
+    }
+
+
+async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any], persist: bool = True):
     """
     \u5904\u7406\u6210\u529f\u62c9\u53d6\u7684\u5feb\u7167
     
     \u66f4\u65b0\u5185\u5b58\u7f13\u5b58\u3001\u8ffd\u52a0\u5230\u7f13\u51b2\u533a\u3001\u68c0\u6d4b\u4e8b\u4ef6\u3002
+    
+    Args:
+        persist: 是否追加到小时缓冲区并更新 last_seen_at
+                 （订阅模式下样本频率高于采集间隔，按间隔抽样写入）
     """
     server_id = server["id"]
     ts = snapshot.get("ts", datetime.utcnow().isoformat() + "Z")
@@ -100,6 +269,9 @@ async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any]):
     # \u89e3\u6790\u78c1\u76d8\u6570\u636e\uff08\u53d6\u7b2c\u4e00\u4e2a\u6302\u8f7d\u70b9\uff09
     disks = snapshot.get("disks", [])
     disk_data = disks[0] if disks else {}
+    disk_io_agg = aggregate_disk_io(snapshot.get("disk_io"))
+    net_agg = aggregate_network(snapshot.get("network"))
+    memory_agg = aggregate_memory(snapshot.get("memory"))
     
     # \u89e3\u6790 GPU \u6570\u636e\uff08\u4fdd\u7559\u5b8c\u6574\u6570\u7ec4 + \u8ba1\u7b97\u805a\u5408\u503c\uff09
     gpus = snapshot.get("gpus") or []
@@ -117,6 +289,10 @@ async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any]):
         disk_used_pct=disk_data.get("used_pct"),
         disk_used_bytes=disk_data.get("used_bytes"),
         disk_total_bytes=disk_data.get("total_bytes"),
+        disk_read_bps=disk_io_agg["disk_read_bps"],
+        disk_write_bps=disk_io_agg["disk_write_bps"],
+        **net_agg,
+        **memory_agg,
         # \u591a GPU \u652f\u6301
         gpus=gpus if gpus else None,
         gpu_count=gpu_agg["gpu_count"],
@@ -125,6 +301,7 @@ async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any]):
         gpu_util_pct_avg=gpu_agg["gpu_util_pct_avg"],
         gpu_mem_used_mb=gpu_agg["gpu_mem_used_mb"],
         gpu_mem_total_mb=gpu_agg["gpu_mem_total_mb"],
+        services=services or None,
         services_failed_count=failed_count
     )
     
@@ -138,16 +315,33 @@ async def process_snapshot(server: Dict[str, Any], snapshot: Dict[str, Any]):
         "disk_used_pct": disk_data.get("used_pct"),
         "disk_used_bytes": disk_data.get("used_bytes"),
         "disk_total_bytes": disk_data.get("total_bytes"),
+        "disk_read_bps": disk_io_agg["disk_read_bps"],
+        "disk_write_bps": disk_io_agg["disk_write_bps"],
+        **net_agg,
+        **memory_agg,
         # \u4f7f\u7528\u805a\u5408\u503c\u5b58\u50a8\u5230\u5c0f\u65f6\u8bb0\u5f55
         "gpu_util_pct": gpu_agg["gpu_util_pct"],
         "gpu_mem_used_mb": gpu_agg["gpu_mem_used_mb"],
         "gpu_mem_total_mb": gpu_agg["gpu_mem_total_mb"],
     }
-    await cache.append_to_buffer(server_id, buffer_entry)
+    if gpus:
+        buffer_entry["gpus"] = [{key: g.get(key) for key in GPU_DETAIL_FIELDS} for g in gpus]
+    window = snapshot.get("window")
+    if window:
+        # 两次拉取之间的高频采样汇总，小时聚合时代替点值参与计算
+        buffer_entry["window"] = {
+            key: window[key] for key in WINDOW_METRICS if window.get(key)
+        }
+    if persist:
+        await cache.append_to_buffer(server_id, buffer_entry)
+        
+        # \u66f4\u65b0\u6570\u636e\u5e93\u4e2d\u7684 last_seen_at
+        db = get_db()
+        db.update_last_seen(server_id, ts)
     
-    # \u66f4\u65b0\u6570\u636e\u5e93\u4e2d\u7684 last_seen_at
-    db = get_db()
-    db.update_last_seen(server_id, ts)
+    # 服务器（重新）上线：从 Agent 本地环形文件补齐中断期间的数据
+    if persist and (await cache.get_prev_state(server_id)).get("online") is not True:
+        schedule_catch_up(server)
     
     # \u68c0\u6d4b\u4e8b\u4ef6\uff08\u5728\u7ebf\u72b6\u6001\u53d8\u5316\u3001\u670d\u52a1\u72b6\u6001\u53d8\u5316\uff09
     await detect_events(server_id, True, services)
@@ -162,6 +356,11 @@ async def process_failure(server: Dict[str, Any], error: Exception):
     server_id = server["id"]
     server_name = server.get("name", f"server-{server_id}")
     
+    if await is_push_active(server_id):
+        # 推送仍在进行，拉取失败不代表离线
+        logger.debug(f"Ignoring fetch failure for pushing server {server_name}: {error}")
+        return
+    
     logger.warning(f"Failed to fetch server {server_name}: {error}")
     
     # \u83b7\u53d6\u4e0a\u4e00\u6b21\u7684\u72b6\u6001\uff0c\u4fdd\u7559\u6700\u540e\u7684\u6307\u6807\u503c
@@ -169,22 +368,7 @@ async def process_failure(server: Dict[str, Any], error: Exception):
     
     if prev_latest:
         # \u66f4\u65b0\u4e3a\u79bb\u7ebf\u72b6\u6001\uff0c\u4fdd\u7559\u5386\u53f2\u6307\u6807
-        offline_latest = LatestSnapshot(
-            ts=prev_latest.ts,
-            online=False,
-            cpu_pct=prev_latest.cpu_pct,
-            disk_used_pct=prev_latest.disk_used_pct,
-            disk_used_bytes=prev_latest.disk_used_bytes,
-            disk_total_bytes=prev_latest.disk_total_bytes,
-            # \u4fdd\u7559 GPU \u4fe1\u606f
-            gpus=prev_latest.gpus,
-            gpu_count=prev_latest.gpu_count,
-            gpu_util_pct=prev_latest.gpu_util_pct,
-            gpu_util_pct_avg=prev_latest.gpu_util_pct_avg,
-            gpu_mem_used_mb=prev_latest.gpu_mem_used_mb,
-            gpu_mem_total_mb=prev_latest.gpu_mem_total_mb,
-            services_failed_count=prev_latest.services_failed_count
-        )
+        offline_latest = prev_latest.model_copy(update={"online": False})
     else:
         # \u9996\u6b21\u5c31\u5931\u8d25\uff0c\u521b\u5efa\u7a7a\u7684\u79bb\u7ebf\u72b6\u6001
         offline_latest = LatestSnapshot(
@@ -198,15 +382,54 @@ async def process_failure(server: Dict[str, Any], error: Exception):
     await detect_events(server_id, False, [])
 
 
+async def fetch_merged_snapshot(server: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """
+    拉取快照，优先请求相对上一次快照的增量并在本地合并
+    
+    旧版 Agent 不返回 seq，此时始终拉取完整快照。
+    Agent 返回的窗口汇总（上次拉取之后的 min/avg/max/last）附加在返回的快照上。
+    """
+    server_id = server["id"]
+    base = await cache.get_delta_base(server_id)
+    since = base.get("seq") if base else None
+    
+    snapshot = await fetch_agent_snapshot(
+        host=server["host"],
+        port=server["agent_port"],
+        token=server["token"],
+        timeout=timeout,
+        since=since
+    )
+    
+    # 窗口汇总只属于本次响应，不进入增量合并基准
+    window = snapshot.pop("window", None)
+    
+    if "base_seq" in snapshot:
+        merged = merge_delta(base or {}, snapshot)
+        if merged is None:
+            # base 不匹配（如 Agent 重启），重新拉取完整快照
+            snapshot = await fetch_agent_snapshot(
+                host=server["host"],
+                port=server["agent_port"],
+                token=server["token"],
+                timeout=timeout
+            )
+            window = None
+        else:
+            snapshot = merged
+    
+    await cache.set_delta_base(server_id, snapshot if "seq" in snapshot else None)
+    if window:
+        snapshot = dict(snapshot, window=window)
+    return snapshot
+
+
 async def collect_single_server(server: Dict[str, Any], timeout: float):
-    """采集单个服务器"""
+    """采集单个服务器（最近推送过的服务器跳过）"""
+    if await is_push_active(server["id"]):
+        return
     try:
-        snapshot = await fetch_agent_snapshot(
-            host=server["host"],
-            port=server["agent_port"],
-            token=server["token"],
-            timeout=timeout
-        )
+        snapshot = await fetch_merged_snapshot(server, timeout)
         await process_snapshot(server, snapshot)
     except Exception as e:
         await process_failure(server, e)
@@ -222,6 +445,10 @@ async def run_collector():
     interval = config.collector.interval
     timeout = config.collector.timeout
     
+    if config.collector.mode == "stream":
+        await run_subscriber()
+        return
+    
     logger.info(f"Starting collector loop (interval={interval}s, timeout={timeout}s)")
     
     while True:
@@ -243,3 +470,179 @@ async def run_collector():
             logger.error(f"Collector loop error: {e}", exc_info=True)
         
         await asyncio.sleep(interval)
+
+
+# =========================================================================
+# 推送模式
+# =========================================================================
+
+async def is_push_active(server_id: int) -> bool:
+    """服务器是否在 push_grace 秒内推送过样本"""
+    state = await cache.get_push_state(server_id)
+    at = state.get("at")
+    return at is not None and time.monotonic() - at <= get_config().collector.push_grace
+
+
+async def ingest_pushed_samples(server: Dict[str, Any], samples: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    处理 Agent 推送的一批样本
+    
+    按 (epoch, seq) 去重：Agent 重试时可能重复发送已接收的批次，
+    同一 epoch 下 seq 不大于已接收位置的样本跳过；epoch 变化（Agent 重启）时重新计数。
+    
+    Returns:
+        (接收数, 跳过数)
+    """
+    server_id = server["id"]
+    state = await cache.get_push_state(server_id)
+    epoch = state.get("epoch")
+    last_seq = state.get("seq")
+    accepted = skipped = 0
+    
+    for snapshot in samples:
+        sample_epoch = snapshot.get("epoch")
+        seq = snapshot.get("seq")
+        if (
+            sample_epoch is not None and sample_epoch == epoch
+            and isinstance(seq, int) and last_seq is not None and seq <= last_seq
+        ):
+            skipped += 1
+            continue
+        
+        await process_snapshot(server, snapshot)
+        accepted += 1
+        if sample_epoch is not None and isinstance(seq, int):
+            epoch, last_seq = sample_epoch, seq
+    
+    await cache.set_push_state(server_id, {"at": time.monotonic(), "epoch": epoch, "seq": last_seq})
+    return accepted, skipped
+
+
+# =========================================================================
+# 订阅模式
+# =========================================================================
+
+async def stream_agent_snapshots(
+    host: str,
+    port: int,
+    token: str,
+    timeout: float = 2.0,
+    min_interval: float = 0.0
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    订阅 Agent 的快照流（Server-Sent Events）
+    
+    Yields:
+        完整快照或增量文档（见 merge_delta）
+    
+    Raises:
+        Exception: 连接失败、读超时或流被关闭时抛出 / 结束迭代
+    """
+    url = f"http://{host}:{port}/v1/stream"
+    headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+    params = {"min_interval": min_interval}
+    client_timeout = httpx.Timeout(timeout, read=STREAM_READ_TIMEOUT)
+    
+    async with httpx.AsyncClient(timeout=client_timeout) as client:
+        async with client.stream("GET", url, headers=headers, params=params) as response:
+            response.raise_for_status()
+            data_lines = []
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    data_lines.append(line[5:].lstrip())
+                elif not line and data_lines:
+                    yield json.loads("\n".join(data_lines))
+                    data_lines = []
+                # 其余为 event/id 字段或保活注释，忽略
+
+
+async def subscribe_server(server: Dict[str, Any], timeout: float):
+    """
+    保持单个 Agent 的订阅
+    
+    样本到达即更新实时状态；小时缓冲区和 last_seen_at 按 collector.interval 抽样写入。
+    断线时标记离线，并按指数退避（带抖动）重连。
+    """
+    config = get_config()
+    interval = config.collector.interval
+    backoff = STREAM_BACKOFF_MIN
+    
+    while True:
+        try:
+            base: Optional[Dict[str, Any]] = None
+            last_persist: Optional[float] = None
+            async for document in stream_agent_snapshots(
+                host=server["host"],
+                port=server["agent_port"],
+                token=server["token"],
+                timeout=timeout,
+                min_interval=config.collector.stream_min_interval
+            ):
+                if "base_seq" in document:
+                    snapshot = merge_delta(base or {}, document)
+                    if snapshot is None:
+                        raise ValueError("stream delta does not match base")
+                else:
+                    snapshot = document
+                base = snapshot
+                
+                now = time.monotonic()
+                persist = last_persist is None or now - last_persist >= interval
+                if persist:
+                    last_persist = now
+                await process_snapshot(server, snapshot, persist=persist)
+                backoff = STREAM_BACKOFF_MIN
+            
+            raise ConnectionError("stream closed by agent")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await process_failure(server, e)
+        
+        await asyncio.sleep(backoff * random.uniform(0.8, 1.2))
+        backoff = min(STREAM_BACKOFF_MAX, backoff * 2)
+
+
+def _subscription_key(server: Dict[str, Any]) -> Tuple[str, int, str]:
+    return (server["host"], server["agent_port"], server["token"])
+
+
+async def run_subscriber():
+    """
+    运行订阅模式
+    
+    每隔 interval 秒同步一次启用的服务器列表：为新服务器建立订阅，
+    取消已删除/禁用服务器的订阅，连接参数变化时重建订阅。
+    """
+    config = get_config()
+    interval = config.collector.interval
+    timeout = config.collector.timeout
+    
+    logger.info(f"Starting collector in stream mode (timeout={timeout}s)")
+    
+    subscriptions: Dict[int, Tuple[Tuple[str, int, str], asyncio.Task]] = {}
+    try:
+        while True:
+            try:
+                servers = {s["id"]: s for s in get_db().get_enabled_servers()}
+                
+                for server_id in list(subscriptions):
+                    key, task = subscriptions[server_id]
+                    server = servers.get(server_id)
+                    if server is None or _subscription_key(server) != key or task.done():
+                        task.cancel()
+                        del subscriptions[server_id]
+                
+                for server_id, server in servers.items():
+                    if server_id not in subscriptions:
+                        task = asyncio.create_task(subscribe_server(server, timeout))
+                        subscriptions[server_id] = (_subscription_key(server), task)
+            except Exception as e:
+                logger.error(f"Subscriber loop error: {e}", exc_info=True)
+            
+            await asyncio.sleep(interval)
+    finally:
+        tasks = [task for _, task in subscriptions.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -40,6 +40,10 @@ class CollectorConfig(BaseModel):
     timeout: int = 2
     retry_count: int = 2
     retry_delay: int = 1
+    mode: str = "poll"  # poll: 定时拉取 /v1/snapshot；stream: 订阅 /v1/stream 长连接
+    stream_min_interval: float = 0.5  # 订阅模式下 Agent 推送的最小间隔（秒）
+    push_grace: int = 120  # 推送模式：距上次推送不超过该秒数时不拉取、不标记离线
+    backfill_hours: int = 24  # 服务器恢复在线时从 Agent 本地环形文件补齐的最长小时数（0 关闭）
 
 
 class AggregatorConfig(BaseModel):
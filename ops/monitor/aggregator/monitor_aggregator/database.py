@@ -14,6 +14,24 @@ from typing import List, Optional, Dict, Any
 from .config import get_config
 
 
+# v1.2 起 samples_hourly 新增的可选列（旧库未迁移时自动跳过）
+HOURLY_EXTRA_COLUMNS = (
+    "disk_read_bps_avg", "disk_read_bps_max",
+    "disk_write_bps_avg", "disk_write_bps_max",
+    "net_rx_bps_avg", "net_rx_bps_max",
+    "net_tx_bps_avg", "net_tx_bps_max",
+    "net_errs_ps_max", "net_drops_ps_max",
+    "mem_used_pct_avg", "mem_used_pct_max",
+    "swap_used_pct_avg", "swap_used_pct_max",
+    "load1_avg", "load1_max",
+    "psi_cpu_some_avg", "psi_cpu_some_max",
+    "psi_mem_some_avg", "psi_mem_some_max",
+    "psi_mem_full_avg", "psi_mem_full_max",
+    "psi_io_some_avg", "psi_io_some_max",
+    "psi_io_full_avg", "psi_io_full_max",
+)
+
+
 class Database:
     """数据库操作类"""
     
@@ -32,6 +50,10 @@ class Database:
         
         # 确保目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # samples_hourly 中已存在的可选列（首次使用时探测）
+        self._hourly_extra_columns: Optional[tuple] = None
+        self._has_gpu_details: Optional[bool] = None
     
     @contextmanager
     def get_conn(self):
@@ -102,6 +124,19 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def get_server_by_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """根据 Agent Token 获取启用的服务器（推送模式认证）"""
+        with self.get_conn() as conn:
+            cursor = conn.execute("""
+                SELECT id, name, host, agent_port, enabled, services, token, last_seen_at, created_at
+                FROM servers
+                WHERE token = ? AND enabled = 1
+                ORDER BY id
+                LIMIT 1
+            """, (token,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
     def create_server(
         self,
         name: str,
@@ -231,6 +266,24 @@ class Database:
     # 小时聚合样本操作
     # =========================================================================
     
+    def get_hourly_extra_columns(self) -> tuple:
+        """
+        获取 samples_hourly 中已存在的可选列
+        
+        兼容：未执行 v1.2 迁移的数据库没有这些列，写入和查询时跳过。
+        """
+        if self._hourly_extra_columns is None:
+            with self.get_conn() as conn:
+                existing = {row["name"] for row in conn.execute("PRAGMA table_info(samples_hourly)")}
+            self._hourly_extra_columns = tuple(c for c in HOURLY_EXTRA_COLUMNS if c in existing)
+            self._has_gpu_details = "gpu_details" in existing
+        return self._hourly_extra_columns
+    
+    def has_gpu_details(self) -> bool:
+        """samples_hourly 是否有 gpu_details 列（v1.1 迁移新增，JSON 格式的每卡明细）"""
+        self.get_hourly_extra_columns()
+        return bool(self._has_gpu_details)
+    
     def save_hourly_sample(
         self,
         server_id: int,
@@ -243,23 +296,58 @@ class Database:
         gpu_util_pct_avg: Optional[float] = None,
         gpu_util_pct_max: Optional[float] = None,
         gpu_mem_used_mb: Optional[int] = None,
-        gpu_mem_total_mb: Optional[int] = None
+        gpu_mem_total_mb: Optional[int] = None,
+        gpu_details: Optional[List[Dict[str, Any]]] = None,
+        **extra: Any
     ):
-        """保存小时聚合样本"""
+        """
+        保存小时聚合样本
+        
+        Args:
+            gpu_details: 每张卡的小时明细（使用率、功耗 avg/max 等），以 JSON 写入 gpu_details 列，
+                         未执行 v1.1 迁移时忽略
+            extra: HOURLY_EXTRA_COLUMNS 中的可选列（如 disk_read_bps_avg），
+                   数据库中不存在的列会被忽略
+        """
+        columns = [
+            "server_id", "ts",
+            "cpu_pct_avg", "cpu_pct_max",
+            "disk_used_pct", "disk_used_bytes", "disk_total_bytes",
+            "gpu_util_pct_avg", "gpu_util_pct_max", "gpu_mem_used_mb", "gpu_mem_total_mb",
+        ]
+        values = [
+            server_id, ts,
+            cpu_pct_avg, cpu_pct_max,
+            disk_used_pct, disk_used_bytes, disk_total_bytes,
+            gpu_util_pct_avg, gpu_util_pct_max, gpu_mem_used_mb, gpu_mem_total_mb,
+        ]
+        for column in self.get_hourly_extra_columns():
+            if column in extra:
+                columns.append(column)
+                values.append(extra[column])
+        if gpu_details is not None and self.has_gpu_details():
+            columns.append("gpu_details")
+            values.append(json.dumps(gpu_details))
+        
         with self.get_conn() as conn:
-            conn.execute("""
-                INSERT INTO samples_hourly (
-                    server_id, ts,
-                    cpu_pct_avg, cpu_pct_max,
-                    disk_used_pct, disk_used_bytes, disk_total_bytes,
-                    gpu_util_pct_avg, gpu_util_pct_max, gpu_mem_used_mb, gpu_mem_total_mb
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                server_id, ts,
-                cpu_pct_avg, cpu_pct_max,
-                disk_used_pct, disk_used_bytes, disk_total_bytes,
-                gpu_util_pct_avg, gpu_util_pct_max, gpu_mem_used_mb, gpu_mem_total_mb
-            ))
+            conn.execute(f"""
+                INSERT INTO samples_hourly ({", ".join(columns)})
+                VALUES ({", ".join("?" * len(columns))})
+            """, values)
+    
+    def delete_hourly_sample(self, server_id: int, ts: str):
+        """删除服务器某个小时的记录（补齐时替换不完整的记录）"""
+        with self.get_conn() as conn:
+            conn.execute("DELETE FROM samples_hourly WHERE server_id = ? AND ts = ?", (server_id, ts))
+    
+    def get_hourly_timestamps(self, server_id: int, from_ts: str, to_ts: str) -> set:
+        """获取服务器在 [from_ts, to_ts] 内已有小时记录的时间戳"""
+        with self.get_conn() as conn:
+            cursor = conn.execute("""
+                SELECT ts FROM samples_hourly
+                WHERE server_id = ? AND ts >= ? AND ts <= ?
+            """, (server_id, from_ts, to_ts))
+            return {row[0] for row in cursor.fetchall()}
     
     def query_timeseries(
         self,
@@ -364,6 +452,11 @@ class Database:
         sort_column = valid_sort_fields.get(sort_by, "sh.ts")
         sort_direction = "ASC" if sort_order.lower() == "asc" else "DESC"
         
+        extra_columns = self.get_hourly_extra_columns()
+        if self.has_gpu_details():
+            extra_columns += ("gpu_details",)
+        extra_select = "".join(f",\n                    sh.{c}" for c in extra_columns)
+        
         with self.get_conn() as conn:
             # 查询总数
             count_sql = f"""
@@ -389,7 +482,7 @@ class Database:
                     sh.gpu_util_pct_avg,
                     sh.gpu_util_pct_max,
                     sh.gpu_mem_used_mb,
-                    sh.gpu_mem_total_mb
+                    sh.gpu_mem_total_mb{extra_select}
                 FROM samples_hourly sh
                 JOIN servers s ON sh.server_id = s.id
                 {where_clause}
@@ -398,6 +491,9 @@ class Database:
             """
             cursor = conn.execute(data_sql, params + [limit, offset])
             data = [dict(row) for row in cursor.fetchall()]
+            for row in data:
+                if row.get("gpu_details"):
+                    row["gpu_details"] = json.loads(row["gpu_details"])
             
             return data, total
     
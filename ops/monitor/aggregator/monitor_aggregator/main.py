@@ -19,6 +19,7 @@ from .config import get_config
 from .database import get_db
 from .collector import run_collector
 from .aggregator import run_aggregator, run_cleanup
+from .backfill import run_backfill_sweep
 from .event_detector import check_all_servers_offline
 
 
@@ -152,11 +153,12 @@ async def main():
     
     logger.info("Starting concurrent tasks...")
     
-    # 启动三个并发任务
+    # 启动并发任务
     try:
         await asyncio.gather(
             run_collector(),      # 5s 采集循环
             run_aggregator(),     # 小时聚合任务
+            run_backfill_sweep(), # 整点后补齐缺失/不完整的小时记录
             run_cleanup(),        # 数据清理任务
             run_api_server()      # REST API 服务
         )
@@ -9,7 +9,7 @@
 
 from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Literal
+from typing import Dict, List, Optional, Any, Literal, Set
 from pydantic import BaseModel, Field
 import asyncio
 
@@ -34,6 +34,28 @@ class GPUInfo(BaseModel):
     mem_used_mb: int
     mem_total_mb: int
     temperature_c: Optional[float] = None  # GPU 温度（摄氏度）
+    power_w: Optional[float] = None  # 当前功耗（W）
+    power_limit_w: Optional[float] = None  # 功耗上限（W）
+    sm_clock_mhz: Optional[int] = None  # SM 频率（MHz）
+    mem_clock_mhz: Optional[int] = None  # 显存频率（MHz）
+    throttle_reasons: Optional[List[str]] = None  # 当前降频原因（空列表表示未降频）
+    ecc_corrected: Optional[int] = None  # 可纠正 ECC 错误数（自驱动加载以来）
+    ecc_uncorrected: Optional[int] = None  # 不可纠正 ECC 错误数
+    pcie_rx_bps: Optional[int] = None  # PCIe 接收吞吐（字节/秒）
+    pcie_tx_bps: Optional[int] = None  # PCIe 发送吞吐（字节/秒）
+
+
+class GPUHourlyDetail(BaseModel):
+    """单张 GPU 的小时明细（samples_hourly.gpu_details）"""
+    index: int
+    name: Optional[str] = None
+    util_pct_avg: Optional[float] = None
+    util_pct_max: Optional[float] = None
+    mem_used_mb: Optional[int] = None  # 最后一个快照值
+    mem_total_mb: Optional[int] = None
+    temperature_c: Optional[float] = None  # 最后一个快照值
+    power_w_avg: Optional[float] = None
+    power_w_max: Optional[float] = None
 
 
 class ServiceInfo(BaseModel):
@@ -41,6 +63,12 @@ class ServiceInfo(BaseModel):
     name: str
     active_state: str
     sub_state: str
+    # cgroup v2 资源用量（旧版 Agent 或服务未运行时为 None）
+    cpu_pct: Optional[float] = None  # CPU 使用率（100 表示占满一个核）
+    mem_bytes: Optional[int] = None  # 内存占用（字节）
+    io_read_bps: Optional[float] = None  # 块设备读取吞吐（字节/秒）
+    io_write_bps: Optional[float] = None  # 块设备写入吞吐（字节/秒）
+    pids: Optional[int] = None  # 进程/线程数
 
 
 class AgentSnapshot(BaseModel):
@@ -49,6 +77,13 @@ class AgentSnapshot(BaseModel):
     ts: str
     cpu_pct: Optional[float] = None
     disks: List[DiskInfo] = Field(default_factory=list)
+    disk_io: Optional[Dict[str, List[Any]]] = None  # 列式块设备 I/O 速率（devices/read_bps/write_bps/...）
+    network: Optional[Dict[str, List[Any]]] = None  # 列式网卡收发速率（interfaces/rx_bps/tx_bps/...）
+    memory: Optional[Dict[str, Any]] = None  # 内存/交换分区/负载/PSI
+    epoch: Optional[str] = None  # Agent 启动标识
+    seq: Optional[int] = None  # 样本序号（用于增量拉取）
+    gpu_processes: Optional[List[Dict[str, Any]]] = None  # GPU 计算进程（gpu_index/pid/user/cmdline/...）
+    window: Optional[Dict[str, Any]] = None  # 上次拉取之后的高频采样汇总（cpu_pct/gpu_util_pct/gpu_mem_used_mb 的 min/avg/max/last/n）
     gpus: Optional[List[GPUInfo]] = None
     services: List[ServiceInfo] = Field(default_factory=list)
 
@@ -61,6 +96,23 @@ class LatestSnapshot(BaseModel):
     disk_used_pct: Optional[float] = None
     disk_used_bytes: Optional[int] = None
     disk_total_bytes: Optional[int] = None
+    disk_read_bps: Optional[float] = None  # 所有块设备读吞吐之和（字节/秒）
+    disk_write_bps: Optional[float] = None  # 所有块设备写吞吐之和（字节/秒）
+    net_rx_bps: Optional[float] = None  # 所有网卡接收吞吐之和（字节/秒）
+    net_tx_bps: Optional[float] = None  # 所有网卡发送吞吐之和（字节/秒）
+    net_errs_ps: Optional[float] = None  # 所有网卡收发错误速率之和（个/秒）
+    net_drops_ps: Optional[float] = None  # 所有网卡收发丢包速率之和（个/秒）
+    # 内存、负载和 PSI（PSI 为 avg10 百分比）
+    mem_used_pct: Optional[float] = None
+    mem_used_bytes: Optional[int] = None
+    mem_total_bytes: Optional[int] = None
+    swap_used_pct: Optional[float] = None
+    load1: Optional[float] = None
+    psi_cpu_some: Optional[float] = None
+    psi_mem_some: Optional[float] = None
+    psi_mem_full: Optional[float] = None
+    psi_io_some: Optional[float] = None
+    psi_io_full: Optional[float] = None
     
     # 多 GPU 支持
     gpus: Optional[List[GPUInfo]] = None  # 完整 GPU 数组
@@ -72,6 +124,7 @@ class LatestSnapshot(BaseModel):
     gpu_mem_used_mb: Optional[int] = None  # 总显存使用（所有 GPU 之和）
     gpu_mem_total_mb: Optional[int] = None  # 总显存容量（所有 GPU 之和）
     
+    services: Optional[List[ServiceInfo]] = None  # 白名单服务状态及资源用量
     services_failed_count: int = 0
 
 
@@ -147,6 +200,35 @@ class HourlySampleResponse(BaseModel):
     gpu_util_pct_max: Optional[float] = None
     gpu_mem_used_mb: Optional[int] = None
     gpu_mem_total_mb: Optional[int] = None
+    # v1.2 扩展指标（未迁移的数据库为 None）
+    disk_read_bps_avg: Optional[float] = None
+    disk_read_bps_max: Optional[float] = None
+    disk_write_bps_avg: Optional[float] = None
+    disk_write_bps_max: Optional[float] = None
+    net_rx_bps_avg: Optional[float] = None
+    net_rx_bps_max: Optional[float] = None
+    net_tx_bps_avg: Optional[float] = None
+    net_tx_bps_max: Optional[float] = None
+    net_errs_ps_max: Optional[float] = None
+    net_drops_ps_max: Optional[float] = None
+    mem_used_pct_avg: Optional[float] = None
+    mem_used_pct_max: Optional[float] = None
+    swap_used_pct_avg: Optional[float] = None
+    swap_used_pct_max: Optional[float] = None
+    load1_avg: Optional[float] = None
+    load1_max: Optional[float] = None
+    psi_cpu_some_avg: Optional[float] = None
+    psi_cpu_some_max: Optional[float] = None
+    psi_mem_some_avg: Optional[float] = None
+    psi_mem_some_max: Optional[float] = None
+    psi_mem_full_avg: Optional[float] = None
+    psi_mem_full_max: Optional[float] = None
+    psi_io_some_avg: Optional[float] = None
+    psi_io_some_max: Optional[float] = None
+    psi_io_full_avg: Optional[float] = None
+    psi_io_full_max: Optional[float] = None
+    # v1.1 每卡明细（含功耗 avg/max）
+    gpu_details: Optional[List[GPUHourlyDetail]] = None
 
 
 class HourlyHistoryResponse(BaseModel):
@@ -217,6 +299,9 @@ class MemoryCache:
     - server_latest: 每台服务器的最新快照（供前端 5s 刷新）
     - hourly_buffer: 每台服务器的小时缓冲区（用于整点聚合）
     - prev_state: 上一次状态（用于事件检测）
+    - delta_base: 每台服务器最近一次完整快照（用于合并 Agent 增量）
+    - push_state: 推送模式下每台服务器最近一次推送的时间和样本位置（用于去重）
+    - partial_hours: 整点聚合时缓冲区有中断的小时记录（等待从 Agent 本地环形文件补齐）
     """
     
     def __init__(self):
@@ -229,6 +314,15 @@ class MemoryCache:
         # 上一次状态（用于事件检测）：{server_id: {"online": bool, "services": {unit_name: active_state}}}
         self._prev_state: Dict[int, Dict[str, Any]] = {}
         
+        # 增量合并基准：{server_id: Agent 快照（含 seq）}
+        self._delta_base: Dict[int, Dict[str, Any]] = {}
+        
+        # 推送状态：{server_id: {"at": monotonic 时间, "epoch": str, "seq": int}}
+        self._push_state: Dict[int, Dict[str, Any]] = {}
+        
+        # 不完整的小时记录：{server_id: {hour_ts}}
+        self._partial_hours: Dict[int, Set[str]] = defaultdict(set)
+        
         # 线程安全锁
         self._lock = asyncio.Lock()
     
@@ -252,6 +346,11 @@ class MemoryCache:
         async with self._lock:
             self._hourly_buffer[server_id].append(snapshot)
     
+    async def prepend_to_buffer(self, server_id: int, snapshots: List[Dict[str, Any]]):
+        """在小时缓冲区头部插入更早的条目（补齐中断期间的数据）"""
+        async with self._lock:
+            self._hourly_buffer[server_id][:0] = snapshots
+    
     async def get_buffer(self, server_id: int) -> List[Dict[str, Any]]:
         """获取服务器的小时缓冲区"""
         async with self._lock:
@@ -277,12 +376,53 @@ class MemoryCache:
         async with self._lock:
             self._prev_state[server_id] = state
     
+    async def get_delta_base(self, server_id: int) -> Optional[Dict[str, Any]]:
+        """获取增量合并基准"""
+        async with self._lock:
+            return self._delta_base.get(server_id)
+    
+    async def set_delta_base(self, server_id: int, snapshot: Optional[Dict[str, Any]]):
+        """设置增量合并基准（None 表示清除）"""
+        async with self._lock:
+            if snapshot is None:
+                self._delta_base.pop(server_id, None)
+            else:
+                self._delta_base[server_id] = snapshot
+    
+    async def get_push_state(self, server_id: int) -> Dict[str, Any]:
+        """获取推送状态"""
+        async with self._lock:
+            return self._push_state.get(server_id, {})
+    
+    async def set_push_state(self, server_id: int, state: Dict[str, Any]):
+        """设置推送状态"""
+        async with self._lock:
+            self._push_state[server_id] = state
+    
+    async def mark_partial_hour(self, server_id: int, hour_ts: str):
+        """标记服务器某个小时的记录不完整"""
+        async with self._lock:
+            self._partial_hours[server_id].add(hour_ts)
+    
+    async def get_partial_hours(self, server_id: int) -> Set[str]:
+        """获取服务器不完整的小时记录"""
+        async with self._lock:
+            return set(self._partial_hours.get(server_id, ()))
+    
+    async def clear_partial_hour(self, server_id: int, hour_ts: str):
+        """清除不完整标记（已补齐或超出补齐范围）"""
+        async with self._lock:
+            self._partial_hours.get(server_id, set()).discard(hour_ts)
+    
     async def remove_server(self, server_id: int):
         """移除服务器相关数据"""
         async with self._lock:
             self._server_latest.pop(server_id, None)
             self._hourly_buffer.pop(server_id, None)
             self._prev_state.pop(server_id, None)
+            self._delta_base.pop(server_id, None)
+            self._push_state.pop(server_id, None)
+            self._partial_hours.pop(server_id, None)
 
 
 # 全局缓存实例
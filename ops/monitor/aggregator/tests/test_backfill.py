@@ -0,0 +1,190 @@
+"""
+单元测试：中断补齐
+
+测试覆盖：
+- 样本按小时记录的结束整点分组
+- 只为缺失的已结束小时写入记录，已有记录的小时不重复写入
+- 当前小时早于缓冲区的样本插入缓冲区头部
+- 整点后宽限期内上线时上一小时留给整点后的补齐任务
+- 整点聚合时缓冲区有中断的小时被替换
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_aggregator import aggregator, backfill
+from monitor_aggregator.backfill import catch_up_server, group_by_hour
+from monitor_aggregator.models import LatestSnapshot, MemoryCache
+
+from test_hourly_rollups import _make_db
+
+
+def test_group_by_hour():
+    """测试：ts=T 的小时记录覆盖 [T-1h, T)"""
+    groups = group_by_hour([
+        {"ts": "2026-01-20T09:00:00Z"},
+        {"ts": "2026-01-20T09:59:59Z"},
+        {"ts": "2026-01-20T10:00:00Z"},
+        {"ts": "bad"},
+    ])
+    assert {k: len(v) for k, v in groups.items()} == {"2026-01-20T10:00:00Z": 2, "2026-01-20T11:00:00Z": 1}
+
+
+def test_catch_up_server(tmp_path, monkeypatch):
+    """测试：补齐缺失小时，跳过已有小时，当前小时只补缓冲区之前的部分"""
+    db = _make_db(tmp_path, migrated=True)
+    server_id = db.create_server("srv-01", "10.0.0.101", "token1")
+    db.save_hourly_sample(server_id, "2026-01-20T09:00:00Z", cpu_pct_avg=1.0)
+
+    cache = MemoryCache()
+    monkeypatch.setattr(backfill, "get_db", lambda: db)
+    monkeypatch.setattr(backfill, "cache", cache)
+
+    requests = []
+
+    async def fake_fetch(host, port, token, start, end, timeout=backfill.FETCH_TIMEOUT):
+        requests.append((start, end))
+        return [
+            {"ts": "2026-01-20T08:10:00Z", "cpu_pct": 90.0},
+            {"ts": "2026-01-20T09:15:00Z", "cpu_pct": 20.0,
+             "window": {"cpu_pct": {"avg": 20.0, "max": 95.0, "n": 5}}},
+            {"ts": "2026-01-20T09:45:00Z", "cpu_pct": 40.0},
+            {"ts": "2026-01-20T10:05:00Z", "cpu_pct": 50.0},
+            {"ts": "2026-01-20T10:20:00Z", "cpu_pct": 60.0},
+        ]
+
+    monkeypatch.setattr(backfill, "fetch_agent_samples", fake_fetch)
+    server = {"id": server_id, "name": "srv-01", "host": "h", "agent_port": 9109, "token": "t"}
+
+    async def run():
+        await cache.append_to_buffer(server_id, {"ts": "2026-01-20T10:20:00Z", "cpu_pct": 60.0})
+        saved = await catch_up_server(server, now=datetime(2026, 1, 20, 10, 30))
+        return saved, await cache.get_buffer(server_id)
+
+    saved, buffer = asyncio.run(run())
+
+    assert saved == 1
+    assert requests == [(datetime(2026, 1, 19, 10, 0), datetime(2026, 1, 20, 10, 20))]
+
+    rows, total = db.query_hourly_history()
+    assert total == 2
+    by_ts = {row["ts"]: row for row in rows}
+    assert by_ts["2026-01-20T09:00:00Z"]["cpu_pct_avg"] == 1.0
+    assert by_ts["2026-01-20T10:00:00Z"]["cpu_pct_avg"] == 23.33  # (20 * 5 + 40) / 6
+    assert by_ts["2026-01-20T10:00:00Z"]["cpu_pct_max"] == 95.0
+
+    assert [entry["ts"] for entry in buffer] == ["2026-01-20T10:05:00Z", "2026-01-20T10:20:00Z"]
+
+
+def _hour_samples(hour: int, minutes, cpu_pct: float):
+    return [{"ts": f"2026-01-20T{hour:02d}:{m:02d}:00Z", "cpu_pct": cpu_pct} for m in minutes]
+
+
+def test_restart_inside_grace_window(tmp_path, monkeypatch):
+    """测试：整点后 HOUR_GRACE 内重启时上一小时暂不补齐，整点后的补齐任务写入"""
+    db = _make_db(tmp_path, migrated=True)
+    server_id = db.create_server("srv-01", "10.0.0.101", "token1")
+    cache = MemoryCache()
+    monkeypatch.setattr(backfill, "get_db", lambda: db)
+    monkeypatch.setattr(backfill, "cache", cache)
+
+    requests = []
+
+    async def fake_fetch(host, port, token, start, end, timeout=backfill.FETCH_TIMEOUT):
+        requests.append((start, end))
+        return _hour_samples(9, range(0, 60, 2), 30.0) + _hour_samples(10, [0, 1], 50.0)
+
+    monkeypatch.setattr(backfill, "fetch_agent_samples", fake_fetch)
+    server = {"id": server_id, "name": "srv-01", "host": "h", "agent_port": 9109, "token": "t"}
+    # 更早的小时都已有记录
+    label_time = datetime(2026, 1, 19, 11)
+    while label_time < datetime(2026, 1, 20, 10):
+        db.save_hourly_sample(server_id, label_time.strftime("%Y-%m-%dT%H:00:00Z"), cpu_pct_avg=1.0)
+        label_time += timedelta(hours=1)
+
+    async def run():
+        await cache.append_to_buffer(server_id, {"ts": "2026-01-20T10:02:00Z", "cpu_pct": 50.0})
+        # 10:02 重启后服务器上线：10:00 的记录还在宽限期内
+        first = await catch_up_server(server, now=datetime(2026, 1, 20, 10, 2))
+        # 10:05 整点后的补齐任务
+        second = await catch_up_server(server, now=datetime(2026, 1, 20, 10, 5), fill_buffer=False)
+        return first, second, await cache.get_buffer(server_id)
+
+    first, second, buffer = asyncio.run(run())
+
+    assert (first, second) == (0, 1)
+    assert requests == [
+        (datetime(2026, 1, 20, 10, 0), datetime(2026, 1, 20, 10, 2)),
+        (datetime(2026, 1, 20, 9, 0), datetime(2026, 1, 20, 10, 0)),
+    ]
+    rows, _ = db.query_hourly_history()
+    assert {row["ts"]: row["cpu_pct_avg"] for row in rows}["2026-01-20T10:00:00Z"] == 30.0
+    assert [entry["ts"] for entry in buffer] == ["2026-01-20T10:00:00Z", "2026-01-20T10:01:00Z", "2026-01-20T10:02:00Z"]
+
+
+def test_partial_hour_replaced(tmp_path, monkeypatch):
+    """测试：整点聚合时缓冲区有中断的小时被标记，环形文件中完整时替换记录"""
+    db = _make_db(tmp_path, migrated=True)
+    server_id = db.create_server("srv-01", "10.0.0.101", "token1")
+    cache = MemoryCache()
+    for module in (backfill, aggregator):
+        monkeypatch.setattr(module, "get_db", lambda: db)
+        monkeypatch.setattr(module, "cache", cache)
+
+    spool = _hour_samples(9, range(0, 60, 2), 40.0)
+
+    async def fake_fetch(host, port, token, start, end, timeout=backfill.FETCH_TIMEOUT):
+        return spool
+
+    monkeypatch.setattr(backfill, "fetch_agent_samples", fake_fetch)
+    server = {"id": server_id, "name": "srv-01", "host": "h", "agent_port": 9109, "token": "t"}
+
+    async def run():
+        # 服务器 09:20 离线，10:00 整点聚合的记录只有前 20 分钟
+        for sample in _hour_samples(9, range(0, 20, 2), 10.0):
+            await cache.append_to_buffer(server_id, sample)
+        await aggregator.aggregate_and_save("2026-01-20T10:00:00Z")
+        marked = await cache.get_partial_hours(server_id)
+        saved = await catch_up_server(server, now=datetime(2026, 1, 20, 10, 5), fill_buffer=False)
+        return marked, saved, await cache.get_partial_hours(server_id)
+
+    marked, saved, remaining = asyncio.run(run())
+
+    assert marked == {"2026-01-20T10:00:00Z"}
+    assert saved == 1 and remaining == set()
+    rows, _ = db.query_hourly_history()
+    assert [row["cpu_pct_avg"] for row in rows if row["ts"] == "2026-01-20T10:00:00Z"] == [40.0]
+
+    # 完整的缓冲区不标记
+    assert not aggregator.is_partial_hour(spool, "2026-01-20T10:00:00Z")
+
+
+def test_catch_up_online_servers(tmp_path, monkeypatch):
+    """测试：整点后的补齐任务只为在线服务器安排，且不补缓冲区"""
+    db = _make_db(tmp_path, migrated=True)
+    online_id = db.create_server("srv-01", "10.0.0.101", "token1")
+    db.create_server("srv-02", "10.0.0.102", "token2")
+    cache = MemoryCache()
+    monkeypatch.setattr(backfill, "get_db", lambda: db)
+    monkeypatch.setattr(backfill, "cache", cache)
+
+    calls = []
+
+    async def fake_catch_up(server, now=None, fill_buffer=True):
+        calls.append((server["id"], fill_buffer))
+        return 0
+
+    monkeypatch.setattr(backfill, "catch_up_server", fake_catch_up)
+
+    async def run():
+        await cache.set_latest(online_id, LatestSnapshot(ts="2026-01-20T10:04:00Z", online=True))
+        await backfill.catch_up_online_servers()
+        await asyncio.gather(*backfill._tasks.values())
+
+    asyncio.run(run())
+    assert calls == [(online_id, False)]
@@ -0,0 +1,221 @@
+"""
+单元测试：扩展指标的实时聚合与小时汇总
+
+测试覆盖：
+- 磁盘 I/O 按设备求和
+- 网络按网卡求和
+- 内存/负载/PSI 提取
+- 小时聚合计算新增指标的 avg/max
+- 小时聚合按样本点数合并 Agent 窗口汇总
+- 未迁移的数据库自动跳过新增列
+- 每卡小时明细（gpu_details）的功耗 avg/max
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_aggregator.aggregator import calculate_aggregation
+from monitor_aggregator.collector import aggregate_disk_io, aggregate_memory, aggregate_network
+from monitor_aggregator.database import Database, HOURLY_EXTRA_COLUMNS
+
+
+SCHEMA_V11 = """
+    CREATE TABLE servers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        host TEXT NOT NULL,
+        agent_port INTEGER DEFAULT 9109,
+        enabled INTEGER DEFAULT 1,
+        services TEXT,
+        token TEXT NOT NULL,
+        last_seen_at TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE samples_hourly (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        server_id INTEGER NOT NULL,
+        ts TEXT NOT NULL,
+        cpu_pct_avg REAL,
+        cpu_pct_max REAL,
+        disk_used_pct REAL,
+        disk_used_bytes INTEGER,
+        disk_total_bytes INTEGER,
+        gpu_util_pct_avg REAL,
+        gpu_util_pct_max REAL,
+        gpu_mem_used_mb INTEGER,
+        gpu_mem_total_mb INTEGER,
+        gpu_details TEXT
+    );
+"""
+
+MIGRATION_V12 = Path(__file__).parent.parent.parent / "scripts" / "migration-v1.2.sql"
+
+
+def _make_db(tmp_path, migrated: bool) -> Database:
+    db = Database(str(tmp_path / "monitor.db"))
+    with db.get_conn() as conn:
+        conn.executescript(SCHEMA_V11)
+        if migrated:
+            conn.executescript(MIGRATION_V12.read_text(encoding="utf-8"))
+    return db
+
+
+def test_aggregate_disk_io():
+    """测试：多块盘的吞吐求和"""
+    disk_io = {
+        "devices": ["nvme0n1", "sda"],
+        "read_bps": [1000.0, 500.0], "write_bps": [200.0, 0.0],
+        "read_iops": [10.0, 5.0], "write_iops": [2.0, 0.0], "await_ms": [0.1, 4.0],
+    }
+    assert aggregate_disk_io(disk_io) == {"disk_read_bps": 1500.0, "disk_write_bps": 200.0}
+    assert aggregate_disk_io(None) == {"disk_read_bps": None, "disk_write_bps": None}
+
+
+def test_calculate_aggregation_disk_io():
+    """测试：小时聚合计算磁盘 I/O avg/max，缺失值忽略"""
+    snapshots = [
+        {"cpu_pct": 10.0, "disk_read_bps": 100.0, "disk_write_bps": 50.0},
+        {"cpu_pct": 20.0, "disk_read_bps": 300.0, "disk_write_bps": None},
+        {"cpu_pct": 30.0},
+    ]
+    agg = calculate_aggregation(snapshots)
+    assert agg["disk_read_bps_avg"] == 200.0
+    assert agg["disk_read_bps_max"] == 300.0
+    assert agg["disk_write_bps_avg"] == 50.0
+    assert agg["disk_write_bps_max"] == 50.0
+
+
+def test_aggregate_network():
+    """测试：多网卡收发速率求和，错误与丢包合并收发两个方向"""
+    network = {
+        "interfaces": ["eth0", "ib0"],
+        "rx_bps": [1000.0, 5000.0], "tx_bps": [2000.0, 6000.0],
+        "rx_pps": [1.0, 2.0], "tx_pps": [1.0, 2.0],
+        "rx_errs_ps": [0.5, 0.0], "tx_errs_ps": [0.0, 0.25],
+        "rx_drop_ps": [1.0, 0.0], "tx_drop_ps": [0.0, 0.0],
+    }
+    assert aggregate_network(network) == {
+        "net_rx_bps": 6000.0, "net_tx_bps": 8000.0, "net_errs_ps": 0.75, "net_drops_ps": 1.0,
+    }
+    assert aggregate_network({"interfaces": []})["net_rx_bps"] is None
+
+
+def test_calculate_aggregation_network():
+    """测试：网络吞吐 avg/max，错误/丢包取峰值"""
+    snapshots = [
+        {"net_rx_bps": 100.0, "net_tx_bps": 10.0, "net_errs_ps": 0.0, "net_drops_ps": 2.0},
+        {"net_rx_bps": 300.0, "net_tx_bps": 30.0, "net_errs_ps": 1.5, "net_drops_ps": 0.0},
+    ]
+    agg = calculate_aggregation(snapshots)
+    assert agg["net_rx_bps_avg"] == 200.0
+    assert agg["net_rx_bps_max"] == 300.0
+    assert agg["net_tx_bps_avg"] == 20.0
+    assert agg["net_errs_ps_max"] == 1.5
+    assert agg["net_drops_ps_max"] == 2.0
+
+
+def test_aggregate_memory():
+    """测试：提取内存使用率、1 分钟负载和 PSI avg10"""
+    memory = {
+        "mem_total_bytes": 1000, "mem_used_bytes": 750, "mem_used_pct": 75.0, "swap_used_pct": 0.0,
+        "loadavg": [3.5, 2.0, 1.0],
+        "psi": {"cpu": {"some": [1.5, 1.0, 0.5]}, "memory": {"some": [2.0, 1.0, 0.0], "full": [0.5, 0.0, 0.0]}},
+    }
+    agg = aggregate_memory(memory)
+    assert agg["mem_used_pct"] == 75.0
+    assert agg["load1"] == 3.5
+    assert agg["psi_cpu_some"] == 1.5
+    assert agg["psi_mem_full"] == 0.5
+    assert agg["psi_io_some"] is None
+    assert all(v is None for v in aggregate_memory(None).values())
+
+
+def test_calculate_aggregation_memory():
+    """测试：内存与 PSI 小时 avg/max"""
+    snapshots = [
+        {"mem_used_pct": 60.0, "psi_mem_some": 0.0},
+        {"mem_used_pct": 90.0, "psi_mem_some": 4.0},
+    ]
+    agg = calculate_aggregation(snapshots)
+    assert agg["mem_used_pct_avg"] == 75.0
+    assert agg["mem_used_pct_max"] == 90.0
+    assert agg["psi_mem_some_max"] == 4.0
+    assert agg["load1_avg"] is None
+
+
+def test_calculate_aggregation_windows():
+    """测试：窗口汇总按 n 加权平均，拉取间隔内的尖峰进入 max；旧版点值按 n=1 计入"""
+    snapshots = [
+        {"cpu_pct": 10.0, "gpu_util_pct": 20.0, "gpu_mem_used_mb": 1000, "gpu_mem_total_mb": 8000},
+        {
+            "cpu_pct": 12.0, "gpu_util_pct": 20.0, "gpu_mem_used_mb": 1000, "gpu_mem_total_mb": 8000,
+            "window": {
+                "cpu_pct": {"min": 8.0, "avg": 30.0, "max": 99.0, "last": 12.0, "n": 4},
+                "gpu_util_pct": {"min": 0.0, "avg": 10.0, "max": 20.0, "last": 20.0, "n": 2},
+                "gpu_mem_used_mb": {"min": 900, "avg": 1500, "max": 4000, "last": 1200, "n": 2},
+            },
+        },
+    ]
+    agg = calculate_aggregation(snapshots)
+    assert agg["cpu_pct_avg"] == 26.0  # (10 + 30 * 4) / 5
+    assert agg["cpu_pct_max"] == 99.0
+    assert agg["gpu_util_pct_avg"] == pytest.approx(13.33)
+    assert agg["gpu_util_pct_max"] == 20.0
+    assert agg["gpu_mem_used_mb"] == 1200
+
+
+@pytest.mark.parametrize("migrated", [False, True])
+def test_save_hourly_sample_extra_columns(tmp_path, migrated):
+    """测试：新增列只在数据库已迁移时写入和返回"""
+    db = _make_db(tmp_path, migrated)
+    server_id = db.create_server("srv-01", "10.0.0.101", "token1")
+
+    extra = {col: 1.0 for col in HOURLY_EXTRA_COLUMNS}
+    db.save_hourly_sample(server_id, "2026-01-20T10:00:00Z", cpu_pct_avg=5.0, **extra)
+
+    rows, total = db.query_hourly_history()
+    assert total == 1
+    assert rows[0]["cpu_pct_avg"] == 5.0
+    for col in HOURLY_EXTRA_COLUMNS:
+        if migrated:
+            assert rows[0][col] == 1.0
+        else:
+            assert col not in rows[0]
+
+
+def test_calculate_gpu_details_power():
+    """测试：每卡使用率和功耗的小时 avg/max，显存取最后快照；没有每卡数据时为 None"""
+    snapshots = [
+        {"gpus": [
+            {"index": 0, "name": "A100", "util_pct": 50.0, "mem_used_mb": 100, "mem_total_mb": 800, "power_w": 200.0},
+            {"index": 1, "name": "A100", "util_pct": 0.0, "mem_used_mb": 0, "mem_total_mb": 800, "power_w": None},
+        ]},
+        {"gpus": [
+            {"index": 0, "name": "A100", "util_pct": 100.0, "mem_used_mb": 300, "mem_total_mb": 800, "power_w": 300.0},
+        ]},
+    ]
+    details = calculate_aggregation(snapshots)["gpu_details"]
+    assert details[0]["power_w_avg"] == 250.0
+    assert details[0]["power_w_max"] == 300.0
+    assert details[0]["util_pct_max"] == 100.0
+    assert details[0]["mem_used_mb"] == 300
+    assert details[1]["index"] == 1
+    assert details[1]["power_w_avg"] is None
+    assert calculate_aggregation([{"cpu_pct": 1.0}])["gpu_details"] is None
+
+
+def test_save_hourly_sample_gpu_details(tmp_path):
+    """测试：gpu_details 以 JSON 写入，查询时解码"""
+    db = _make_db(tmp_path, migrated=False)
+    server_id = db.create_server("srv-01", "10.0.0.101", "token1")
+
+    details = [{"index": 0, "name": "A100", "power_w_avg": 250.0, "power_w_max": 300.0}]
+    db.save_hourly_sample(server_id, "2026-01-20T10:00:00Z", cpu_pct_avg=5.0, gpu_details=details)
+
+    rows, _ = db.query_hourly_history()
+    assert rows[0]["gpu_details"] == details
@@ -0,0 +1,118 @@
+"""
+测试推送样本接收 API
+
+测试 /api/ingest 端点：token 认证、gzip 解压、按 epoch/seq 去重。
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from monitor_aggregator import collector
+from monitor_aggregator.api.app import create_app
+from monitor_aggregator.api.dependencies import get_database
+from monitor_aggregator.database import Database
+from monitor_aggregator.models import cache
+
+
+@pytest.fixture
+def db(tmp_path):
+    """创建临时测试数据库"""
+    db = Database(str(tmp_path / "test_monitor.db"))
+    with db.get_conn() as conn:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS servers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                host TEXT NOT NULL,
+                agent_port INTEGER DEFAULT 9109,
+                enabled INTEGER DEFAULT 1,
+                services TEXT,
+                token TEXT NOT NULL,
+                last_seen_at TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+    return db
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    """记录交给 process_snapshot 的样本"""
+    calls = []
+
+    async def fake_process_snapshot(server, snapshot, persist=True):
+        calls.append((server["name"], snapshot["seq"]))
+
+    monkeypatch.setattr(collector, "process_snapshot", fake_process_snapshot)
+    return calls
+
+
+@pytest.fixture
+def client(db: Database):
+    """创建测试客户端（使用临时数据库）"""
+    app = create_app()
+
+    async def _override_db():
+        return db
+
+    app.dependency_overrides[get_database] = _override_db
+    return TestClient(app)
+
+
+def _post(client, token, samples, gzipped=True):
+    body = json.dumps({"node_id": "n", "samples": samples}).encode()
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    if gzipped:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return client.post("/api/ingest", content=body, headers=headers)
+
+
+def test_ingest_requires_valid_token(client, db, processed):
+    """测试：缺少或错误的 token 返回 401，禁用的服务器不接受推送"""
+    server_id = db.create_server("srv-01", "10.0.0.1", "token1")
+    db.update_server(server_id, enabled=False)
+
+    assert client.post("/api/ingest", json={"samples": []}).status_code == 401
+    assert _post(client, "wrong", []).status_code == 401
+    assert _post(client, "token1", []).status_code == 401
+    assert processed == []
+
+
+def test_ingest_gzip_batch_and_dedup(client, db, processed):
+    """测试：gzip 批次按顺序处理，重发的样本被跳过，epoch 变化后重新接收"""
+    server_id = db.create_server("srv-02", "10.0.0.2", "token2")
+    samples = [{"epoch": "a", "seq": 1}, {"epoch": "a", "seq": 2}]
+
+    response = _post(client, "token2", samples)
+    assert response.status_code == 200
+    assert response.json() == {"accepted": 2, "skipped": 0}
+
+    # Agent 重试：重复批次 + 新样本
+    response = _post(client, "token2", samples + [{"epoch": "a", "seq": 3}], gzipped=False)
+    assert response.json() == {"accepted": 1, "skipped": 2}
+
+    # Agent 重启：seq 从 0 开始
+    response = _post(client, "token2", [{"epoch": "b", "seq": 0}])
+    assert response.json() == {"accepted": 1, "skipped": 0}
+
+    assert processed == [("srv-02", 1), ("srv-02", 2), ("srv-02", 3), ("srv-02", 0)]
+
+    assert asyncio.run(collector.is_push_active(server_id))
+    asyncio.run(cache.remove_server(server_id))
+
+
+def test_ingest_rejects_invalid_body(client, db, processed):
+    """测试：无效 gzip / JSON / samples 返回 400"""
+    db.create_server("srv-03", "10.0.0.3", "token3")
+    headers = {"Authorization": "Bearer token3"}
+
+    response = client.post("/api/ingest", content=b"not gzip", headers=dict(headers, **{"Content-Encoding": "gzip"}))
+    assert response.status_code == 400
+    assert client.post("/api/ingest", content=b"{", headers=headers).status_code == 400
+    assert client.post("/api/ingest", json={"samples": [1]}, headers=headers).status_code == 400
+    assert processed == []
@@ -0,0 +1,143 @@
+"""
+单元测试：Agent 增量快照合并
+
+测试覆盖：
+- 增量中的标量、列表条目更新/新增/移除
+- epoch 或 base_seq 不匹配时拒绝合并
+- 拉取流程：带 since 请求、不匹配时回退完整快照
+- 窗口汇总附加到返回的快照上，不进入合并基准
+- 响应解码：JSON（含 gzip）与 MessagePack
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_aggregator import collector
+from monitor_aggregator.collector import decode_snapshot, fetch_agent_snapshot, fetch_merged_snapshot, merge_delta
+from monitor_aggregator.models import MemoryCache
+
+
+BASE = {
+    "epoch": "e1", "seq": 10, "ts": "2026-01-20T10:00:00Z", "cpu_pct": 10.0,
+    "gpus": [{"index": 0, "util_pct": 10.0}, {"index": 1, "util_pct": 20.0}],
+    "services": [{"name": "a.service", "active_state": "active"}, {"name": "b.service", "active_state": "active"}],
+}
+
+
+def test_merge_delta():
+    """测试：合并标量与列表条目"""
+    delta = {
+        "epoch": "e1", "seq": 12, "base_seq": 10,
+        "changed": {"ts": "2026-01-20T10:00:05Z", "cpu_pct": 55.0},
+        "lists": {
+            "gpus": {"key": "index", "upsert": [{"index": 1, "util_pct": 99.0}], "remove": []},
+            "services": {"key": "name", "upsert": [{"name": "c.service", "active_state": "failed"}],
+                         "remove": ["a.service"]},
+        },
+    }
+    merged = merge_delta(BASE, delta)
+
+    assert merged["seq"] == 12
+    assert merged["cpu_pct"] == 55.0
+    assert merged["gpus"] == [{"index": 0, "util_pct": 10.0}, {"index": 1, "util_pct": 99.0}]
+    assert [s["name"] for s in merged["services"]] == ["b.service", "c.service"]
+    # base 不被修改
+    assert BASE["cpu_pct"] == 10.0
+
+
+def test_merge_delta_mismatch():
+    """测试：Agent 重启（epoch 变化）或 base_seq 不一致时返回 None"""
+    assert merge_delta(BASE, {"epoch": "e2", "seq": 3, "base_seq": 10}) is None
+    assert merge_delta(BASE, {"epoch": "e1", "seq": 13, "base_seq": 11}) is None
+
+
+def test_fetch_merged_snapshot(monkeypatch):
+    """测试：首次拉取完整快照，之后带 since 拉取增量；不匹配时重新拉取完整快照"""
+    monkeypatch.setattr(collector, "cache", MemoryCache())
+    server = {"id": 1, "host": "h", "agent_port": 9109, "token": "t"}
+    calls = []
+    responses = [
+        BASE,
+        {"epoch": "e1", "seq": 11, "base_seq": 10, "changed": {"cpu_pct": 30.0}, "lists": {}},
+        {"epoch": "e2", "seq": 1, "base_seq": 11, "changed": {}, "lists": {}},
+        dict(BASE, epoch="e2", seq=1, cpu_pct=5.0),
+    ]
+
+    async def fake_fetch(host, port, token, timeout=2.0, since=None):
+        calls.append(since)
+        return responses[len(calls) - 1]
+
+    monkeypatch.setattr(collector, "fetch_agent_snapshot", fake_fetch)
+
+    async def run():
+        first = await fetch_merged_snapshot(server, 1.0)
+        second = await fetch_merged_snapshot(server, 1.0)
+        third = await fetch_merged_snapshot(server, 1.0)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert calls == [None, 10, 11, None]
+    assert first["cpu_pct"] == 10.0
+    assert second["cpu_pct"] == 30.0 and second["seq"] == 11
+    assert third["epoch"] == "e2" and third["cpu_pct"] == 5.0
+
+
+def test_fetch_agent_snapshot_decodes_gzip_json(monkeypatch):
+    """测试：发送 Accept 协商头，gzip 压缩的 JSON 响应自动解压"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Accept"] == collector.SNAPSHOT_ACCEPT
+        assert "gzip" in request.headers["Accept-Encoding"]
+        body = gzip.compress(json.dumps(BASE).encode())
+        return httpx.Response(200, content=body, headers={
+            "Content-Type": "application/json", "Content-Encoding": "gzip",
+        })
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        collector.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+
+    snapshot = asyncio.run(fetch_agent_snapshot("h", 9109, "t"))
+    assert snapshot == BASE
+
+
+def test_decode_snapshot_msgpack():
+    """测试：按 Content-Type 解码 MessagePack 响应"""
+    msgpack = pytest.importorskip("msgpack")
+    response = httpx.Response(200, content=msgpack.packb(BASE), headers={"Content-Type": "application/msgpack"})
+    assert decode_snapshot(response) == BASE
+
+
+def test_fetch_merged_snapshot_keeps_window_out_of_base(monkeypatch):
+    """测试：窗口汇总随本次快照返回，但不保存到增量合并基准"""
+    monkeypatch.setattr(collector, "cache", MemoryCache())
+    server = {"id": 2, "host": "h", "agent_port": 9109, "token": "t"}
+    window = {"since": 10, "cpu_pct": {"min": 1.0, "avg": 2.0, "max": 3.0, "last": 2.0, "n": 3}}
+    responses = [
+        dict(BASE),
+        {"epoch": "e1", "seq": 11, "base_seq": 10, "changed": {"cpu_pct": 30.0}, "lists": {}, "window": window},
+    ]
+
+    async def fake_fetch(host, port, token, timeout=2.0, since=None):
+        return responses.pop(0)
+
+    monkeypatch.setattr(collector, "fetch_agent_snapshot", fake_fetch)
+
+    async def run():
+        await fetch_merged_snapshot(server, 1.0)
+        snapshot = await fetch_merged_snapshot(server, 1.0)
+        return snapshot, await collector.cache.get_delta_base(2)
+
+    snapshot, base = asyncio.run(run())
+    assert snapshot["window"] == window and snapshot["cpu_pct"] == 30.0
+    assert "window" not in base
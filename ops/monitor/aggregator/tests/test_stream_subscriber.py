@@ -0,0 +1,84 @@
+"""
+单元测试：订阅模式
+
+测试覆盖：
+- SSE 事件解析（忽略保活注释）
+- 增量合并后交给 process_snapshot，小时缓冲区按间隔抽样写入
+- 断线后标记离线并退避重连
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加项目路径到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitor_aggregator import collector
+from monitor_aggregator.collector import stream_agent_snapshots, subscribe_server
+
+
+SERVER = {"id": 1, "name": "srv-01", "host": "h", "agent_port": 9109, "token": "t"}
+
+
+def test_stream_agent_snapshots_parses_events(monkeypatch):
+    """测试：解析 data 行，跳过 event/id 字段和保活注释"""
+    body = (
+        b'event: snapshot\nid: 1\ndata: {"seq":1,"cpu_pct":1.0}\n\n'
+        b": keepalive\n\n"
+        b'event: snapshot\nid: 2\ndata: {"seq":2,"base_seq":1,"changed":{},"lists":{}}\n\n'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/v1/stream"
+        assert request.headers["Authorization"] == "Bearer t"
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        collector.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+
+    async def run():
+        return [doc async for doc in stream_agent_snapshots("h", 9109, "t")]
+
+    docs = asyncio.run(run())
+    assert [d["seq"] for d in docs] == [1, 2]
+
+
+def test_subscribe_server_merges_and_reconnects(monkeypatch):
+    """测试：合并增量、按间隔抽样持久化，断线后标记离线并重连"""
+    connects = []
+    processed = []
+    failures = []
+
+    async def fake_stream(host, port, token, timeout=2.0, min_interval=0.0):
+        connects.append(host)
+        yield {"epoch": "e1", "seq": 1, "cpu_pct": 10.0}
+        yield {"epoch": "e1", "seq": 2, "base_seq": 1, "changed": {"cpu_pct": 20.0}, "lists": {}}
+
+    async def fake_process(server, snapshot, persist=True):
+        processed.append((snapshot["cpu_pct"], persist))
+
+    async def fake_failure(server, error):
+        failures.append(str(error))
+
+    async def fake_sleep(delay):
+        if len(connects) >= 2:
+            raise asyncio.CancelledError()
+
+    monkeypatch.setattr(collector, "stream_agent_snapshots", fake_stream)
+    monkeypatch.setattr(collector, "process_snapshot", fake_process)
+    monkeypatch.setattr(collector, "process_failure", fake_failure)
+    monkeypatch.setattr(collector.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(subscribe_server(SERVER, 1.0))
+
+    assert len(connects) == 2
+    assert processed[:2] == [(10.0, True), (20.0, False)]
+    assert failures == ["stream closed by agent", "stream closed by agent"]
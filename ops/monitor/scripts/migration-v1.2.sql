@@ -0,0 +1,79 @@
+-- ============================================================================
+-- 监控系统数据库迁移脚本 v1.1 -> v1.2
+-- 
+-- 版本: 1.2.0
+-- 日期: 2026-10-17
+-- 说明: 
+--   1. samples_hourly 表新增磁盘 I/O 吞吐字段（avg/max）
+--   2. samples_hourly 表新增网络吞吐（avg/max）和错误/丢包峰值字段
+--   3. samples_hourly 表新增内存、交换分区、负载和 PSI 字段（avg/max）
+-- 
+-- 用法: sqlite3 monitor.db < migration-v1.2.sql
+-- 回滚: sqlite3 monitor.db < rollback-v1.2.sql
+-- 
+-- 注意：Aggregator 会自动探测这些字段，未执行本迁移时新指标只出现在实时数据中，
+-- 不写入历史表。
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Step 1: samples_hourly 表 - 新增磁盘 I/O 吞吐字段
+-- ----------------------------------------------------------------------------
+-- 说明：所有块设备读写吞吐之和（字节/秒），按小时计算 avg 和 max
+
+ALTER TABLE samples_hourly ADD COLUMN disk_read_bps_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN disk_read_bps_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN disk_write_bps_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN disk_write_bps_max REAL;
+
+-- ----------------------------------------------------------------------------
+-- Step 2: samples_hourly 表 - 新增网络字段
+-- ----------------------------------------------------------------------------
+-- 说明：所有网卡收发吞吐之和（字节/秒）的 avg/max，错误和丢包速率（个/秒）只记录峰值
+
+ALTER TABLE samples_hourly ADD COLUMN net_rx_bps_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN net_rx_bps_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN net_tx_bps_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN net_tx_bps_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN net_errs_ps_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN net_drops_ps_max REAL;
+
+-- ----------------------------------------------------------------------------
+-- Step 3: samples_hourly 表 - 新增内存/负载/PSI 字段
+-- ----------------------------------------------------------------------------
+-- 说明：内存和交换分区使用率（%）、1 分钟负载、PSI avg10（%）的小时 avg/max
+
+ALTER TABLE samples_hourly ADD COLUMN mem_used_pct_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN mem_used_pct_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN swap_used_pct_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN swap_used_pct_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN load1_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN load1_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_cpu_some_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_cpu_some_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_mem_some_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_mem_some_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_mem_full_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_mem_full_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_io_some_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_io_some_max REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_io_full_avg REAL;
+ALTER TABLE samples_hourly ADD COLUMN psi_io_full_max REAL;
+
+-- ----------------------------------------------------------------------------
+-- Step 4: 记录迁移
+-- ----------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    description TEXT
+);
+
+INSERT OR REPLACE INTO schema_migrations (version, description) 
+VALUES ('1.2.0', 'Add extended hourly metrics to samples_hourly');
+
+-- ----------------------------------------------------------------------------
+-- 迁移完成
+-- ----------------------------------------------------------------------------
+-- 验证命令：
+-- sqlite3 monitor.db "PRAGMA table_info(samples_hourly);"
+-- sqlite3 monitor.db "SELECT * FROM schema_migrations;"
@@ -0,0 +1,68 @@
+-- ============================================================================
+-- 监控系统数据库回滚脚本 v1.2 -> v1.1
+-- 
+-- 版本: 1.2.0 回滚
+-- 日期: 2026-10-17
+-- 说明: 回滚 migration-v1.2.sql 的更改（samples_hourly 恢复为 v1.1 字段）
+-- 
+-- ⚠️  警告：
+--   1. 此脚本通过重建表实现回滚，v1.2 新增字段的数据会丢失
+--   2. 执行前请确保已备份数据库！
+-- 
+-- 用法: sqlite3 monitor.db < rollback-v1.2.sql
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Step 1: 重建 samples_hourly 表（保留 v1.1 字段）
+-- ----------------------------------------------------------------------------
+BEGIN TRANSACTION;
+
+CREATE TABLE samples_hourly_backup (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server_id INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    cpu_pct_avg REAL,
+    cpu_pct_max REAL,
+    disk_used_pct REAL,
+    disk_used_bytes INTEGER,
+    disk_total_bytes INTEGER,
+    gpu_util_pct_avg REAL,
+    gpu_util_pct_max REAL,
+    gpu_mem_used_mb INTEGER,
+    gpu_mem_total_mb INTEGER,
+    gpu_details TEXT,
+    FOREIGN KEY (server_id) REFERENCES servers(id) ON DELETE CASCADE
+);
+
+INSERT INTO samples_hourly_backup 
+    (id, server_id, ts, cpu_pct_avg, cpu_pct_max, 
+     disk_used_pct, disk_used_bytes, disk_total_bytes,
+     gpu_util_pct_avg, gpu_util_pct_max, gpu_mem_used_mb, gpu_mem_total_mb,
+     gpu_details)
+SELECT 
+    id, server_id, ts, cpu_pct_avg, cpu_pct_max,
+    disk_used_pct, disk_used_bytes, disk_total_bytes,
+    gpu_util_pct_avg, gpu_util_pct_max, gpu_mem_used_mb, gpu_mem_total_mb,
+    gpu_details
+FROM samples_hourly;
+
+DROP TABLE samples_hourly;
+
+ALTER TABLE samples_hourly_backup RENAME TO samples_hourly;
+
+CREATE INDEX IF NOT EXISTS idx_samples_hourly_server_ts ON samples_hourly(server_id, ts DESC);
+CREATE INDEX IF NOT EXISTS idx_samples_hourly_ts ON samples_hourly(ts);
+
+COMMIT;
+
+-- ----------------------------------------------------------------------------
+-- Step 2: 删除迁移记录
+-- ----------------------------------------------------------------------------
+DELETE FROM schema_migrations WHERE version = '1.2.0';
+
+-- ----------------------------------------------------------------------------
+-- 回滚完成
+-- ----------------------------------------------------------------------------
+-- 验证命令：
+-- sqlite3 monitor.db "PRAGMA table_info(samples_hourly);"
+-- sqlite3 monitor.db "SELECT * FROM schema_migrations;"